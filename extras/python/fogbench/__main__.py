@@ -27,6 +27,9 @@ fogbench
  [IN]   -O --occurrences The number of occurrences of the template (default: 1)
  [IN]   -P --port        The Fledge port. Default depends on payload and protocol
  [IN]   -S --statistic   The type of statistics to collect
+        -r --rate        Open loop: messages per second to send, regardless of responses (default: off)
+        -c --concurrency Closed loop: messages in flight at any time (default: 1)
+        -b --batch       Readings per HTTP request (default: all the readings of an iteration)
 
  Example:
 
@@ -40,7 +43,9 @@ fogbench
    * Create reading objects from given template, as per the json file name specified with -t
    * Save those objects to the file, as per the file name specified with -o
    * Read those objects
-   * Send those to CoAP or HTTP south plugin server, on specific host and port
+   * Send those to CoAP or HTTP south plugin server, on specific host and port, over one client
+     context or session, either at a fixed rate (open loop) or with a number of messages in flight (closed loop)
+   * Report the encoded bytes sent and the 50th, 95th and 99th percentile latencies of the messages
 
  .. todo::
 
@@ -54,6 +59,8 @@ import json
 from datetime import datetime, timezone
 import argparse
 import collections
+import math
+import time
 
 import asyncio
 import aiohttp
@@ -73,6 +80,9 @@ _start_time = []
 _end_time = []
 _tot_msgs_transferred = []
 _tot_byte_transferred = []
+_tot_requests = []
+_tot_failed = []
+_latencies = []
 _num_iterated = 0
 """Statistics to be collected"""
 
@@ -155,95 +165,160 @@ def _prepare_sensor_reading(data, supported_format_types):
     return readings
 
 
-def read_out_file(_file=None, _keep=False, _iterations=1, _interval=0, send_to='coap'):
-
-    global _start_time
-    global _end_time
-    global _tot_msgs_transferred
-    global _tot_byte_transferred
-    global _num_iterated
-
-    # from pprint import pprint
-    import time
-    # _file = os.path.join(os.path.dirname(__file__), "out/{}".format(outfile))
+def read_out_file(_file=None, _keep=False, _iterations=1, _interval=0, send_to='coap', _rate=None,
+                  _concurrency=1, _batch=None):
     with open(_file) as f:
         readings_list = [json.loads(line) for line in f]
 
     loop = asyncio.get_event_loop()
-
-    while _iterations > 0:
-
-        # Pre-calculate the messages and size
-        msg_transferred_itr = 0  # Messages transferred in every iteration
-        byte_transferred_itr = 0  # Bytes transferred in every iteration
-
-        for r in readings_list:
-            msg_transferred_itr += 1
-            byte_transferred_itr += sys.getsizeof(r)
-
-        if send_to == 'coap':
-            _start_time.append(datetime.now())
-            for r in readings_list:
-                is_sent = loop.run_until_complete(send_to_coap(r))
-                if not is_sent:
-                    break
-        elif send_to == 'http':
-            _start_time.append(datetime.now())
-            loop.run_until_complete(send_to_http(readings_list))
-
-        _end_time.append(datetime.now())  # End time of every iteration
-        _tot_msgs_transferred.append(msg_transferred_itr)
-        _tot_byte_transferred.append(byte_transferred_itr)
-        _iterations -= 1
-        _num_iterated += 1
-        if _iterations != 0:
-            # print(u"Iteration {} completed, waiting for {} seconds".format(_iterations, _interval))
-            time.sleep(_interval)
+    loop.run_until_complete(_run(readings_list, _iterations, _interval, send_to, _rate, _concurrency, _batch))
 
     if not _keep:
         os.remove(_file)
 
 
-async def send_to_coap(payload):
+async def _run(readings_list, iterations, interval, send_to, rate, concurrency, batch):
+    global _num_iterated
+
+    sender = CoapSender() if send_to == 'coap' else HttpSender(batch)
+    # Encode once, what is sent is what is counted
+    messages = sender.encode(readings_list)
+    await sender.open()
+    try:
+        while iterations > 0:
+            _start_time.append(datetime.now())
+            if rate:
+                sent, failed = await _send_open_loop(sender, messages, rate)
+            else:
+                sent, failed = await _send_closed_loop(sender, messages, concurrency)
+            _end_time.append(datetime.now())  # End time of every iteration
+            _tot_msgs_transferred.append(len(readings_list))
+            _tot_byte_transferred.append(sum(len(m) for m in messages))
+            _tot_requests.append(sent)
+            _tot_failed.append(failed)
+            iterations -= 1
+            _num_iterated += 1
+            if iterations != 0:
+                await asyncio.sleep(interval)
+    finally:
+        await sender.close()
+
+
+async def _timed_send(sender, message, started):
+    """ Send a message and record its latency from the given start, the time it was due to be sent at """
+    try:
+        is_sent = await sender.send(message)
+    except Exception as ex:
+        print("Error: ", ex)
+        is_sent = False
+    _latencies.append(time.perf_counter() - started)
+    return is_sent
+
+
+async def _send_closed_loop(sender, messages, concurrency):
+    """ Send the messages with up to concurrency of them in flight; returns the messages sent and failed """
+    pending = iter(messages)
+    results = []
+
+    async def worker():
+        for message in pending:
+            results.append(await _timed_send(sender, message, time.perf_counter()))
+
+    await asyncio.gather(*[worker() for _ in range(max(concurrency, 1))])
+    return len(results), results.count(False)
+
+
+async def _send_open_loop(sender, messages, rate):
+    """ Send the messages at a fixed rate, whether or not responses keep up; returns the messages sent and failed
+
+    The latency of a message is measured from the time it was due to be sent at, so that a server falling behind
+    shows in the latencies rather than slowing down the load.
+    """
+    loop = asyncio.get_event_loop()
+    started = time.perf_counter()
+    tasks = []
+    for index, message in enumerate(messages):
+        due = started + index / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(loop.create_task(_timed_send(sender, message, due)))
+    results = await asyncio.gather(*tasks)
+    return len(results), results.count(False)
+
+
+class CoapSender:
     """
-    POST request to:
+    POST requests to:
      localhost
      port 5683 (official IANA assigned CoAP port),
      URI "/other/sensor-values".
-
+    over one client context, one reading per message
     """
-    from aiocoap import Context, Message
-    from aiocoap.numbers.codes import Code
-    from cbor2 import dumps
 
-    context = await Context.create_client_context()
+    def __init__(self):
+        self._context = None
+
+    @staticmethod
+    def encode(readings_list):
+        from cbor2 import dumps
+        return [dumps(r) for r in readings_list]
+
+    async def open(self):
+        from aiocoap import Context
+        self._context = await Context.create_client_context()
+
+    async def close(self):
+        await self._context.shutdown()
 
-    request = Message(payload=dumps(payload), code=Code.POST)
-    request.opt.uri_host = arg_host
-    request.opt.uri_port = arg_port
-    request.opt.uri_path = ("other", "sensor-values")
+    async def send(self, payload):
+        from aiocoap import Message
+        from aiocoap.numbers.codes import Code
 
-    response = await context.request(request).response
-    str_res = str(response.code)
-    status_code = str_res[:4]  # or str_res.split()[0]
-    if status_code == "4.00" or status_code == "5.00":
-        print("Error: ", str_res)
-        return False
+        request = Message(payload=payload, code=Code.POST)
+        request.opt.uri_host = arg_host
+        request.opt.uri_port = arg_port
+        request.opt.uri_path = ("other", "sensor-values")
 
-    return True
+        response = await self._context.request(request).response
+        str_res = str(response.code)
+        status_code = str_res[:4]  # or str_res.split()[0]
+        if status_code == "4.00" or status_code == "5.00":
+            print("Error: ", str_res)
+            return False
 
+        return True
 
-async def send_to_http(payload):
+
+class HttpSender:
     """
-    POST request to:
+    POST requests to:
      host localhost
      port 6683 (default HTTP south plugin port),
      uri  sensor-reading
+    over one session, batch readings per request
     """
-    headers = {'content-type': 'application/json'}
-    url = 'http://{}:{}/sensor-reading'.format(arg_host, arg_port)
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, data=json.dumps(payload), headers=headers) as resp:
+
+    def __init__(self, batch=None):
+        self._batch = batch
+        self._session = None
+
+    def encode(self, readings_list):
+        batch = self._batch or len(readings_list) or 1
+        return [json.dumps(readings_list[i:i + batch]).encode()
+                for i in range(0, len(readings_list), batch)]
+
+    async def open(self):
+        # No limit on connections, the concurrency or rate decides how many requests are in flight
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0))
+
+    async def close(self):
+        await self._session.close()
+
+    async def send(self, payload):
+        headers = {'content-type': 'application/json'}
+        url = 'http://{}:{}/sensor-reading'.format(arg_host, arg_port)
+        async with self._session.post(url, data=payload, headers=headers) as resp:
             await resp.text()
             status_code = resp.status
             if status_code in range(400, 500):
@@ -255,19 +330,24 @@ async def send_to_http(payload):
             return True
 
 
+def percentile(sorted_values, p):
+    """ Nearest rank percentile of an ascending list """
+    if not sorted_values:
+        return 0
+    rank = max(int(math.ceil(p / 100 * len(sorted_values))), 1)
+    return sorted_values[rank - 1]
+
+
 def get_statistics(_stats_type=None, _out_file=None):
     stat = ''
-    global _start_time
-    global _end_time
-    global _tot_msgs_transferred
-    global _tot_byte_transferred
-    global _num_iterated
     if _stats_type == 'total':
         stat += u"Total Statistics:\n"
         stat += (u"\nStart Time: {}".format(datetime.strftime(_start_time[0], "%Y-%m-%d %H:%M:%S.%f")))
         stat += (u"\nEnd Time:   {}\n".format(datetime.strftime(_end_time[-1], "%Y-%m-%d %H:%M:%S.%f")))
         stat += (u"\nTotal Messages Transferred: {}".format(sum(_tot_msgs_transferred)))
-        stat += (u"\nTotal Bytes Transferred:    {}\n".format(sum(_tot_byte_transferred)))
+        stat += (u"\nTotal Bytes Transferred:    {}".format(sum(_tot_byte_transferred)))
+        stat += (u"\nTotal Requests:             {}".format(sum(_tot_requests)))
+        stat += (u"\nTotal Failed Requests:      {}\n".format(sum(_tot_failed)))
         stat += (u"\nTotal Iterations: {}".format(_num_iterated))
         stat += (u"\nTotal Messages per Iteration: {}".format(sum(_tot_msgs_transferred)/_num_iterated))
         stat += (u"\nTotal Bytes per Iteration:    {}\n".format(sum(_tot_byte_transferred)/_num_iterated))
@@ -282,7 +362,12 @@ def get_statistics(_stats_type=None, _out_file=None):
         stat += (u"\nAvg messages/second: {}\n".format(sum(_msg_rate)/_num_iterated))
         stat += (u"\nMin Bytes/second: {}".format(min(_byte_rate)))
         stat += (u"\nMax Bytes/second: {}".format(max(_byte_rate)))
-        stat += (u"\nAvg Bytes/second: {}".format(sum(_byte_rate)/_num_iterated))
+        stat += (u"\nAvg Bytes/second: {}\n".format(sum(_byte_rate)/_num_iterated))
+        latencies = sorted(_latencies)
+        stat += (u"\nRequest latency p50 (ms): {:.3f}".format(percentile(latencies, 50) * 1E3))
+        stat += (u"\nRequest latency p95 (ms): {:.3f}".format(percentile(latencies, 95) * 1E3))
+        stat += (u"\nRequest latency p99 (ms): {:.3f}".format(percentile(latencies, 99) * 1E3))
+        stat += (u"\nRequest latency max (ms): {:.3f}".format(latencies[-1] * 1E3 if latencies else 0))
     if _out_file:
         with open(_out_file, 'w') as f:
             f.write(stat)
@@ -319,6 +404,12 @@ parser.add_argument('-i', '--interval', default=0, help='The interval in seconds
 
 parser.add_argument('-S', '--statistics', default='total', choices=['total'], help='The type of statistics to collect '
                                                                                    '(default: total)')
+parser.add_argument('-r', '--rate', default=None, help='Open loop: the messages per second to send, regardless of '
+                                                       'the responses (default: off)')
+parser.add_argument('-c', '--concurrency', default=1, help='Closed loop: the messages in flight at any time '
+                                                           '(default: 1)')
+parser.add_argument('-b', '--batch', default=None, help='The readings per HTTP request (default: all the readings '
+                                                        'of an iteration)')
 
 namespace = parser.parse_args(sys.argv[1:])
 infile = '{0}'.format(namespace.template if namespace.template else '')
@@ -334,6 +425,11 @@ arg_interval = int(namespace.interval) if namespace.interval else 0
 
 arg_stats_type = '{0}'.format(namespace.statistics) if namespace.statistics else 'total'
 
+# load: open loop rate or closed loop concurrency, and HTTP batch size
+arg_rate = float(namespace.rate) if namespace.rate else None
+arg_concurrency = int(namespace.concurrency) if namespace.concurrency else 1
+arg_batch = int(namespace.batch) if namespace.batch else None
+
 if namespace.payload:
     arg_payload_protocol = namespace.payload
 
@@ -346,7 +442,7 @@ check_server(arg_payload_protocol)
 sample_file = os.path.join("/tmp", "fledge_running_sample.{}".format(os.getpid()))
 parse_template_and_prepare_json(_template_file=infile, _write_to_file=sample_file, _occurrences=arg_occurrences)
 read_out_file(_file=sample_file, _keep=keep_the_file, _iterations=arg_iterations, _interval=arg_interval,
-              send_to=arg_payload_protocol)
+              send_to=arg_payload_protocol, _rate=arg_rate, _concurrency=arg_concurrency, _batch=arg_batch)
 get_statistics(_stats_type=arg_stats_type, _out_file=statistics_file)
 
 # TODO: Change below per local_timestamp() values
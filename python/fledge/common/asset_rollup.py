@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Per asset, per datapoint rollups of the readings at 1 second, 1 minute and 1 hour granularity
+
+The asset rollup task appends rows with minimum, maximum, total and samples of the numeric datapoints to the
+asset_rollups table for every block of readings it reads. A bucket may be spread over several rows, one for each block
+that had readings in it, which the queries below merge.
+"""
+
+import calendar
+import math
+import time
+
+from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.utils import utc_timestamp
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+ROLLUP_TABLE = 'asset_rollups'
+ROLLUP_POSITION_TABLE = 'asset_rollups_position'
+GRANULARITIES = (1, 60, 3600)
+""" Rollup bucket sizes in seconds """
+
+ROLLUP_LAG = 60
+""" Seconds readings may reach the storage late by, buckets this recent are read from the readings """
+
+_TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def granularity_for(bucket_size, offset=0) -> int:
+    """ Coarsest rollup granularity whose buckets tile buckets of the given size starting offset seconds before
+    multiples of it, None if there is none """
+    try:
+        size = float(bucket_size)
+        offset = float(offset)
+    except (TypeError, ValueError):
+        return None
+    if size < 1 or size != int(size) or offset != int(offset):
+        return None
+    for granularity in reversed(GRANULARITIES):
+        if int(size) % granularity == 0 and int(offset) % granularity == 0:
+            return granularity
+
+
+def to_epoch(ts: str) -> int:
+    """ Seconds since epoch of a UTC timestamp string, None if it can not be parsed """
+    ts = utc_timestamp(ts)
+    if ts is None:
+        return None
+    return calendar.timegm(time.strptime(ts[:19], _TS_FORMAT))
+
+
+def from_epoch(epoch: float) -> str:
+    """ UTC timestamp string with offset, as the ts of the rollup rows are stored and compared """
+    return time.strftime(_TS_FORMAT, time.gmtime(epoch)) + '+00:00'
+
+
+def local_time(epoch: float, fmt: str = _TS_FORMAT) -> str:
+    """ Bucket timestamp in local time, as the readings plugins format timebucket and group timestamps """
+    return time.strftime(fmt, time.localtime(epoch))
+
+
+class RollupAccumulator:
+    """ Rollup rows of a block of readings """
+
+    def __init__(self):
+        self._buckets = {}
+        """ {(granularity, asset_code, datapoint, bucket start): [minimum, maximum, total, samples, last_id]} """
+        self._epochs = {}
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def add(self, reading_id: int, asset_code: str, user_ts: str, reading: dict) -> None:
+        """ Add the numeric datapoints of a reading to its 1 second, 1 minute and 1 hour buckets """
+        if not isinstance(reading, dict):
+            return
+        # Readings of a block mostly share a few seconds, parse each of them once
+        epoch = self._epochs.get(user_ts)
+        if epoch is None:
+            epoch = to_epoch(user_ts)
+            if epoch is None:
+                return
+            self._epochs[user_ts] = epoch
+        for datapoint, value in reading.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            for granularity in GRANULARITIES:
+                key = (granularity, asset_code, datapoint, epoch - epoch % granularity)
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    self._buckets[key] = [value, value, value, 1, reading_id]
+                else:
+                    if value < bucket[0]:
+                        bucket[0] = value
+                    if value > bucket[1]:
+                        bucket[1] = value
+                    bucket[2] += value
+                    bucket[3] += 1
+                    if reading_id > bucket[4]:
+                        bucket[4] = reading_id
+
+    def rows(self) -> list:
+        """ Rows to insert into the asset_rollups table """
+        return [{"granularity": granularity, "asset_code": asset_code, "datapoint": datapoint,
+                 "ts": from_epoch(start), "minimum": b[0], "maximum": b[1], "total": b[2], "samples": b[3],
+                 "last_id": b[4]}
+                for (granularity, asset_code, datapoint, start), b in self._buckets.items()]
+
+
+async def rollup_spans(storage, asset_codes: list, granularity: int) -> dict:
+    """ Start of the oldest and of the newest rollup bucket of each of the given assets """
+    payload = PayloadBuilder().AGGREGATE(["min", "ts"], ["max", "ts"]).ALIAS(
+        "aggregate", ("ts", "min", "first"), ("ts", "max", "last")).WHERE(["asset_code", "in", asset_codes]).AND_WHERE(
+        ["granularity", "=", granularity]).GROUP_BY("asset_code").payload()
+    results = await storage.query_tbl_with_payload(ROLLUP_TABLE, payload)
+    spans = {}
+    for row in results['rows']:
+        first = to_epoch(row['first']) if row.get('first') else None
+        last = to_epoch(row['last']) if row.get('last') else None
+        if first is not None and last is not None:
+            spans[row['asset_code']] = (first, last)
+    return spans
+
+
+async def covered_window(storage, asset_codes: list, granularity: int, start: float, stop: float,
+                         bucket_size: int, offset: int = 0) -> tuple:
+    """ Whole buckets between start and stop the rollups hold all readings of the given assets for
+
+    The newest rollup bucket of an asset may still be filling, as may any bucket within ROLLUP_LAG seconds of now,
+    so the window ends before them; the readings before and after the window are to be read from the readings.
+
+    Returns:
+        (window start, window stop), both offset seconds before a multiple of bucket_size,
+        or None if there is no whole bucket in the window
+    """
+    spans = await rollup_spans(storage, asset_codes, granularity)
+    if not asset_codes or any(asset_code not in spans for asset_code in asset_codes):
+        return None
+    first = max(spans[asset_code][0] for asset_code in asset_codes)
+    last = min(spans[asset_code][1] for asset_code in asset_codes)
+    window_start = math.ceil((max(start, first) + offset) / bucket_size) * bucket_size - offset
+    window_stop = math.floor((min(stop, last, time.time() - ROLLUP_LAG) + offset) / bucket_size) * bucket_size - offset
+    if window_stop <= window_start:
+        return None
+    return window_start, window_stop
+
+
+async def query_buckets(storage, asset_codes: list, granularity: int, start: int, stop: int, bucket_size: int,
+                        datapoint: str = None, offset: int = 0) -> dict:
+    """ Minimum, maximum, total and samples of each datapoint in the buckets of bucket_size seconds from start to stop
+
+    A bucket starts offset seconds before a multiple of bucket_size seconds since epoch and is keyed by that multiple,
+    i.e. an offset of half the bucket size gives buckets keyed by their middle, as the readings plugins round them.
+
+    Returns:
+        {(asset_code, bucket key): {datapoint: [minimum, maximum, total, samples]}}
+    """
+    _where = PayloadBuilder().AGGREGATE(["min", "minimum"], ["max", "maximum"], ["sum", "total"], ["sum", "samples"]) \
+        .ALIAS("aggregate", ("minimum", "min", "minimum"), ("maximum", "max", "maximum"), ("total", "sum", "total"),
+               ("samples", "sum", "samples")).WHERE(["asset_code", "in", asset_codes]).AND_WHERE(
+        ["granularity", "=", granularity], ["ts", ">=", from_epoch(start)], ["ts", "<", from_epoch(stop)]).chain_payload()
+    if datapoint is not None:
+        _where = PayloadBuilder(_where).AND_WHERE(["datapoint", "=", datapoint]).chain_payload()
+    payload = PayloadBuilder(_where).GROUP_BY("asset_code", "datapoint", "ts").payload()
+    results = await storage.query_tbl_with_payload(ROLLUP_TABLE, payload)
+    buckets = {}
+    for row in results['rows']:
+        epoch = to_epoch(row['ts'])
+        if epoch is None:
+            continue
+        values = buckets.setdefault((row['asset_code'], (epoch + offset) // bucket_size * bucket_size), {})
+        minimum, maximum = float(row['minimum']), float(row['maximum'])
+        total, samples = float(row['total']), int(row['samples'])
+        merged = values.get(row['datapoint'])
+        if merged is None:
+            values[row['datapoint']] = [minimum, maximum, total, samples]
+        else:
+            merged[0] = min(merged[0], minimum)
+            merged[1] = max(merged[1], maximum)
+            merged[2] += total
+            merged[3] += samples
+    return buckets
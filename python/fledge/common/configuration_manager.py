@@ -12,6 +12,7 @@ import inspect
 import ipaddress
 import datetime
 import os
+import time
 from math import *
 import collections
 import ast
@@ -108,6 +109,95 @@ class ConfigurationCache(object):
         return len(self.cache)
 
 
+class CategoryTree(object):
+    """Parent/child graph and metadata of the configuration categories, held in memory
+
+    The tree is loaded with two queries, one on configuration and one on category_children, and kept up to date by
+    the ConfigurationManager methods which create and delete categories and child relationships. Other processes,
+    e.g. the purge task, write categories to storage behind the back of the core, so the tree is reloaded on the first
+    use after RELOAD_INTERVAL seconds.
+    """
+
+    RELOAD_INTERVAL = 60
+    """ Seconds the tree is used for before it is reloaded from storage """
+
+    def __init__(self):
+        """
+        categories: {category_name: {'description': ..., 'display_name': ...}}
+        children: {parent: [child, ...]} in the order the relationships were created
+        loaded: monotonic time of the last load, None until loaded
+        """
+        self.categories = collections.OrderedDict()
+        self.children = {}
+        self.loaded = None
+
+    def is_current(self):
+        return self.loaded is not None and time.monotonic() - self.loaded < self.RELOAD_INTERVAL
+
+    async def load(self, storage):
+        payload = PayloadBuilder().SELECT("key", "description", "display_name").payload()
+        categories = await storage.query_tbl_with_payload('configuration', payload)
+        payload = PayloadBuilder().SELECT("parent", "child").ORDER_BY(["id"]).payload()
+        relationships = await storage.query_tbl_with_payload('category_children', payload)
+        self.categories = collections.OrderedDict(
+            (row['key'], {'description': row['description'], 'display_name': row['display_name']})
+            for row in categories['rows'])
+        self.children = {}
+        for row in relationships['rows']:
+            self.add_child(row['parent'], row['child'])
+        self.loaded = time.monotonic()
+
+    def add_category(self, category_name, category_description, display_name):
+        self.categories[category_name] = {'description': category_description, 'display_name': display_name}
+
+    def remove_category(self, category_name):
+        """Remove a category, its child relationships are kept as they are in category_children"""
+        self.categories.pop(category_name, None)
+
+    def add_child(self, parent, child):
+        children = self.children.setdefault(parent, [])
+        if child not in children:
+            children.append(child)
+
+    def remove_child(self, parent, child):
+        children = self.children.get(parent, [])
+        if child in children:
+            children.remove(child)
+
+    def remove_children(self, parent):
+        self.children.pop(parent, None)
+
+    def remove_parents(self, child):
+        for children in self.children.values():
+            if child in children:
+                children.remove(child)
+
+    def child_names(self, parent):
+        return list(self.children.get(parent, []))
+
+    def child_info(self, parent):
+        """Key, description and display name of the children of a category which exist"""
+        return [{"key": c, "description": self.categories[c]['description'],
+                 "displayName": self.categories[c]['display_name']}
+                for c in self.children.get(parent, []) if c in self.categories]
+
+    def category_names(self):
+        return [(k, v['description'], v['display_name']) for k, v in self.categories.items()]
+
+    def groups(self, root, children):
+        """Root categories, those which are nobody's child, or the others, as tuples or as nested trees"""
+        all_children = {c for cs in self.children.values() for c in cs}
+        groups = [c for c in self.category_names() if (c[0] in all_children) != bool(root)]
+        if not children:
+            return groups
+
+        def branch(category_name, description, display_name):
+            return {"key": category_name, "description": description, "displayName": display_name,
+                    "children": [branch(c["key"], c["description"], c["displayName"])
+                                 for c in self.child_info(category_name)]}
+        return [branch(*c) for c in groups]
+
+
 class ConfigurationManagerSingleton(object):
     """ ConfigurationManagerSingleton
 
@@ -149,6 +239,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
     _registered_interests = None
     _registered_interests_child = None
     _cacheManager = None
+    _category_tree = None
     _acl_handler = None
 
     def __init__(self, storage=None):
@@ -166,6 +257,9 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         if self._cacheManager is None:
             self._cacheManager = ConfigurationCache()
 
+        if self._category_tree is None:
+            self._category_tree = CategoryTree()
+
         if self._acl_handler is None:
             self._acl_handler = ACLManager(storage)
 
@@ -647,6 +741,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             result = await self._storage.insert_into_tbl("configuration", payload)
             response = result['response']
             self._cacheManager.update(category_name, category_description, new_category_val, display_name)
+            self._category_tree.add_category(category_name, category_description, display_name)
         except KeyError:
             raise ValueError(result['message'])
         except StorageServerError as ex:
@@ -697,7 +792,32 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         # If nothing found then return False
         return False, None, None, None
 
+    async def load_category_tree(self):
+        """Load the category tree, which then answers the category hierarchy queries of this process
+
+        Processes which do not load it, or fail to, read the hierarchy from storage on every query.
+        """
+        try:
+            await self._category_tree.load(self._storage)
+        except Exception as ex:
+            _logger.error(ex, 'Failed to load the configuration category tree.')
+            self._category_tree.loaded = None
+
+    async def _get_category_tree(self):
+        """The loaded category tree, reloaded if it is older than its interval; None if it is not in use"""
+        tree = self._category_tree
+        if tree.loaded is None:
+            return None
+        if not tree.is_current():
+            await self.load_category_tree()
+            if tree.loaded is None:
+                return None
+        return tree
+
     async def _read_all_category_names(self):
+        tree = await self._get_category_tree()
+        if tree is not None:
+            return tree.category_names()
         # SELECT configuration.key, configuration.description, configuration.value, configuration.display_name, configuration.ts FROM configuration
         payload = PayloadBuilder().SELECT("key", "description", "value", "display_name", "ts") \
             .ALIAS("return", ("ts", 'timestamp')) \
@@ -718,6 +838,10 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         return result['rows'][0] if result['rows'] else None
 
     async def _read_all_groups(self, root, children):
+        tree = await self._get_category_tree()
+        if tree is not None:
+            return tree.groups(root, children)
+
         async def nested_children(child):
             # Recursively find children
             if not child:
@@ -1001,6 +1125,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
                 self._cacheManager.cache.update({category_name: {"description": category_description,
                                                                  "value": new_category_val_db,
                                                                  "displayName": display_name}})
+            self._category_tree.add_category(category_name, category_description, display_name)
         except KeyError:
             raise ValueError(result['message'])
         except StorageServerError as ex:
@@ -1109,6 +1234,41 @@ class ConfigurationManager(ConfigurationManagerSingleton):
                 item_name)
             raise
 
+    async def get_categories_item_value_entry(self, category_names, item_name):
+        """Get the "value" entry of a given item within each of the given categories.
+
+        Categories held in the cache are served from it and the rest are read with a single storage query.
+
+        Keyword Arguments:
+        category_names -- list of category names (required)
+        item_name -- name of the item within the categories (required)
+
+        Return Values:
+        a dictionary of category name and a string of the "value" entry, None if the item is not found
+        """
+        values = {}
+        uncached = []
+        for category_name in category_names:
+            if category_name in self._cacheManager:
+                item = self._cacheManager.cache[category_name]['value'].get(item_name)
+                values[category_name] = item.get('value') if item is not None else None
+            else:
+                values[category_name] = None
+                uncached.append(category_name)
+        if uncached:
+            try:
+                payload = PayloadBuilder().SELECT(("key", ["value", [item_name, "value"]])) \
+                    .ALIAS("return", ("value", "value")) \
+                    .WHERE(["key", "in", uncached]).payload()
+                results = await self._storage.query_tbl_with_payload('configuration', payload)
+            except:
+                _logger.exception('Unable to get the "value" entry of item_name %s for categories %s', item_name,
+                                  uncached)
+                raise
+            for row in results['rows']:
+                values[row['key']] = row['value']
+        return values
+
     async def set_category_item_value_entry(self, category_name, item_name, new_value_entry, script_file_path="",
                                             request=None):
         """Set the "value" entry of a given item within a given category.
@@ -1452,6 +1612,9 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         return None
 
     async def _read_all_child_category_names(self, category_name):
+        tree = await self._get_category_tree()
+        if tree is not None:
+            return [{"parent": category_name, "child": c} for c in tree.child_names(category_name)]
         _children = []
         payload = PayloadBuilder().SELECT("parent", "child").WHERE(["parent", "=", category_name]).ORDER_BY(
             ["id"]).payload()
@@ -1478,6 +1641,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             payload = PayloadBuilder().INSERT(parent=category_name, child=child).payload()
             result = await self._storage.insert_into_tbl("category_children", payload)
             response = result['response']
+            self._category_tree.add_child(category_name, child)
         except KeyError:
             raise ValueError(result['message'])
         except StorageServerError as ex:
@@ -1495,6 +1659,12 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         Return Values:
         JSON
         """
+        tree = await self._get_category_tree()
+        if tree is not None:
+            if category_name not in tree.categories:
+                raise ValueError('No such {} category exist'.format(category_name))
+            return tree.child_info(category_name)
+
         category = await self._read_category_val(category_name)
         if category is None:
             raise ValueError('No such {} category exist'.format(category_name))
@@ -1608,6 +1778,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             result = await self._storage.delete_from_tbl("category_children", payload)
 
             if result['response'] == 'deleted':
+                self._category_tree.remove_child(category_name, child_category)
                 child_dict = await self._read_all_child_category_names(category_name)
                 _children = []
                 for item in child_dict:
@@ -1649,6 +1820,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             payload = PayloadBuilder().WHERE(["parent", "=", category_name]).payload()
             result = await self._storage.delete_from_tbl("category_children", payload)
             response = result["response"]
+            self._category_tree.remove_children(category_name)
             # TODO: Shall we write audit trail code entry here? log_code?
 
         except KeyError:
@@ -1714,12 +1886,14 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             result = await self._storage.delete_from_tbl("category_children", payload)
             if result['response'] == 'deleted':
                 _logger.info('Deleted parent in category_children: {}'.format(cat))
+                self._category_tree.remove_parents(cat)
 
             # Remove category.
             payload = PayloadBuilder().WHERE(["key", "=", cat]).payload()
             result = await self._storage.delete_from_tbl("configuration", payload)
             if result['response'] == 'deleted':
                 _logger.info('Deleted parent category from configuration: {}'.format(cat))
+                self._category_tree.remove_category(cat)
                 audit = AuditLogger(self._storage)
                 audit_details = {'categoryDeleted': cat}
                 # FIXME: FOGL-2140
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Reduction of a time series to a bounded number of representative points for plotting
+
+Both methods split the time range into equal time buckets and work in one pass over the points in time order, holding
+at most two buckets of points, so a series can be read from storage a slice at a time.
+
+lttb
+    Largest Triangle Three Buckets: the first and last points and, from every bucket, the point forming the largest
+    triangle with the point selected from the previous bucket and the average of the next bucket. Keeps the visual
+    shape of the series, spikes included.
+minmax
+    The minimum and maximum point of every bucket, in time order. Keeps the envelope of the series exactly.
+"""
+
+import calendar
+import time
+
+from fledge.common.utils import utc_timestamp
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+METHODS = ('lttb', 'minmax')
+MIN_POINTS = {'lttb': 3, 'minmax': 2}
+
+
+class EpochParser:
+    """ Seconds since epoch of UTC timestamps as the readings plugins return them, YYYY-MM-DD HH:MM:SS[.ffffff]
+
+    Consecutive readings mostly share the second, which is parsed once. Timestamps with an offset are converted to UTC
+    first; ValueError is raised for a timestamp which can not be parsed.
+    """
+
+    def __init__(self):
+        self._second = None
+        self._epoch = None
+
+    def __call__(self, ts: str) -> float:
+        if len(ts) > 19 and ts[19] != '.' or len(ts) > 26:
+            converted = utc_timestamp(ts)
+            if converted is None:
+                raise ValueError("Invalid timestamp {}".format(ts))
+            ts = converted
+        second = ts[:19]
+        if second != self._second:
+            self._epoch = calendar.timegm(time.strptime(second, '%Y-%m-%d %H:%M:%S'))
+            self._second = second
+        fraction = ts[19:]
+        return self._epoch + float(fraction) if fraction else float(self._epoch)
+
+
+class Downsampler:
+    """ One pass reduction of a series to at most the given number of points
+
+    Points are added in ascending time order with add(); result() returns the items of the selected points.
+    """
+
+    def __init__(self, method: str, points: int, start: float, stop: float):
+        if method not in METHODS:
+            raise ValueError("downsample must be one of {}".format(', '.join(METHODS)))
+        if points < MIN_POINTS[method]:
+            raise ValueError("points must be at least {} for {}".format(MIN_POINTS[method], method))
+        self._method = method
+        self._start = start
+        # lttb always keeps the first and last point
+        self._buckets = points - 2 if method == 'lttb' else points // 2
+        self._width = max(stop - start, 1e-6) / self._buckets
+        self._selected = []
+        self._first = None
+        self._last = None
+        self._a = None
+        """ Point selected last, the first vertex of the next triangles """
+        self._index = None
+        self._current = []
+        self._pending = None
+        self._count = 0
+
+    def __len__(self):
+        """ Number of points added """
+        return self._count
+
+    def add(self, x: float, y: float, item) -> None:
+        self._count += 1
+        if self._method == 'minmax':
+            self._add_minmax(self._bucket(x), x, y, item)
+            return
+        if self._first is None:
+            self._first = self._last = (x, y, item)
+            self._selected.append(item)
+            self._a = (x, y)
+            return
+        point = self._last
+        self._last = (x, y, item)
+        if point is self._first:
+            return
+        # The point before the newest joins its bucket, the newest may be the last point of the series
+        self._add_lttb(self._bucket(point[0]), point)
+
+    def result(self) -> list:
+        """ Items of the selected points in time order """
+        if self._method == 'minmax':
+            self._flush_minmax()
+            return self._selected
+        if self._first is None:
+            return []
+        if self._last is not self._first:
+            if self._current:
+                self._complete_bucket(self._mean(self._current))
+                self._select(self._pending, (self._last[0], self._last[1]))
+            self._selected.append(self._last[2])
+        selected, self._selected = self._selected, []
+        return selected
+
+    def _bucket(self, x):
+        return min(max(int((x - self._start) / self._width), 0), self._buckets - 1)
+
+    def _add_lttb(self, index, point):
+        if self._index is not None and index != self._index:
+            self._complete_bucket(self._mean(self._current))
+            self._current = []
+        self._index = index
+        self._current.append(point)
+
+    def _complete_bucket(self, next_mean):
+        # A point of the pending bucket is selected once the average of the bucket after it is known
+        if self._pending is not None:
+            self._select(self._pending, next_mean)
+        self._pending = self._current
+
+    def _select(self, bucket, c):
+        ax, ay = self._a
+        cx, cy = c
+        best = None
+        best_area = -1.0
+        for x, y, item in bucket:
+            # Twice the triangle area, the factor does not change which is largest
+            area = abs((ax - cx) * (y - ay) - (ax - x) * (cy - ay))
+            if area > best_area:
+                best_area = area
+                best = (x, y, item)
+        self._selected.append(best[2])
+        self._a = (best[0], best[1])
+
+    @staticmethod
+    def _mean(bucket):
+        n = len(bucket)
+        return sum(p[0] for p in bucket) / n, sum(p[1] for p in bucket) / n
+
+    def _add_minmax(self, index, x, y, item):
+        if index != self._index:
+            self._flush_minmax()
+            self._index = index
+            point = (x, y, item)
+            self._current = [point, point]
+            return
+        low, high = self._current
+        if y < low[1]:
+            self._current[0] = (x, y, item)
+        elif y > high[1]:
+            self._current[1] = (x, y, item)
+
+    def _flush_minmax(self):
+        if not self._current:
+            return
+        low, high = self._current
+        if low is high:
+            self._selected.append(low[2])
+        else:
+            self._selected.extend(p[2] for p in sorted((low, high), key=lambda p: p[0]))
+        self._current = []
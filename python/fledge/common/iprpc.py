@@ -16,7 +16,11 @@ __version__ = "${VERSION}"
 import os
 import sys
 import io
+import array
+import collections
+import concurrent.futures
 import subprocess
+import struct
 import threading
 import pickle
 import tempfile
@@ -37,7 +41,7 @@ except ImportError:
             self.CONSOLE = 0
             self.SYSLOG = 1
             self.default_destination = self.CONSOLE
-            
+
         def setup(self, name, level):
             _logger = logging.getLogger(name)
             _logger.setLevel(level)
@@ -49,7 +53,7 @@ _LOGGER = logger.setup(__name__, level=logging.INFO)
 
 def eprint(*args, **kwargs):
     print(*args, *kwargs, file=sys.stderr)
-    
+
 
 def is_server_process():
     # temp backward compatibility: if we have a default
@@ -65,24 +69,36 @@ def is_server_process():
 # InterProcessRPC is spawned with a pipe to the client. Writes and reads on the pipe are used to
 # synchronize work that is done in the server. Servers are required to be single threaded.
 #
-# The basic mechanism is to send a newline-terminated "length" to the server which signals
-# new method/arguments are available. (In a pure-pipe implementation, the length precedes
-# a "length"-sized encoded dict. In mapped file implementation, the "length" is merely
-# used for signaling.)
+# Every request and every result is a binary frame on the pipe: a fixed header (kind, number of
+# out-of-band buffers, request id, count of the peer's frames read so far, payload offset, pickle
+# length) followed by the length of each out-of-band buffer. The payload is the pickle of the
+# object followed by its out-of-band buffers; it is pickled straight into the shared memory, or
+# follows the header in the pipe when the shared memory has no room for it.
 #
 # Arguments are sent in an encoded dict: {'method': <method-name>, 'args': <list of arguments>}
 #
-# In the mapped file implementation, there is a tmpfile of ARGFILE_SIZE mapped into client and
-# server where the arguments are written using pickle. Results are written back the same way.
+# Each direction has its own shared memory file, mapped by both processes and used as a ring by
+# its writer: a payload stays in the ring until the peer acknowledged, in the header of one of its
+# own frames, that it read the frame. The file starts at ARGFILE_SIZE and is grown when a payload
+# larger than it is sent while the ring is empty, so there is no limit on the size of a payload.
+#
+# With pickle protocol 5 (python 3.8 and later) large buffers -- numpy arrays, array.array and
+# objects wrapped in pickle.PickleBuffer -- are not copied into the pickle but written straight
+# into the shared memory, and received into a bytearray the unpickled object uses without copying.
 #
-# For the process receiving the results, the length indicates a couple of special things:
+# The kind of a frame tells what the payload is:
 # >0 -> standard dict
-# =0 -> None
+# =0 -> None, no payload
 # <0 -> exception, which is re-constituted and re-raised, so the client receives it
 #
-# Argfile is a temp file (mkstemp) which is created by the client. The name is sent
-# to the server as the first pipe message; it is opened and unlinked once opened so
-# that it will disappear on close.
+# The server answers the requests in order, the result of a request carries its request id. A call
+# reads its own result, until the client sends several requests before reading their results
+# (InterProcessRPCClient.rpc_submit): from then a thread of the client reads the results and
+# completes the future of each request as its result arrives.
+#
+# The shared memory files are temp files (mkstemp) which are created by the client. Their names
+# are sent to the server as the first two lines on the pipe; they are opened and unlinked once
+# opened so that they will disappear on close.
 #
 # The InterProcessRPCClient class will invoke a subprocess to create the server. Special
 # care is taken to read stderr if the client is a server, so that error messages written to
@@ -92,38 +108,369 @@ def is_server_process():
 # invokes a named python module as a server.
 
 
-ARGFILE_SIZE = 1024*1024*20
+ARGFILE_SIZE = 1024*1024
+""" Initial size of each shared memory file, grown as the payloads need """
+
+_INLINE_MAX = 16*1024
+""" Payloads up to this size are sent in the pipe """
+
+_OUT_OF_BAND_MIN = 16*1024
+""" Buffers from this size are sent out-of-band, when pickle protocol 5 is available """
+
+_MAX_BUFFERS = 0xffff
+
+_FRAME = struct.Struct('<bxHIQQQ')
+""" Frame header: kind, out-of-band buffers, request id, peer frames read, payload offset, pickle length """
+
+_BUFFER_LENGTH = struct.Struct('<Q')
+
+_INLINE = 2**64 - 1
+""" Payload offset of a frame whose payload follows it in the pipe """
+
+_NONE, _OBJECT, _EXCEPTION = 0, 1, -1
+
+
+def _array_from_buffer(typecode, buffer):
+    _array = array.array(typecode)
+    _array.frombytes(buffer)
+    return _array
+
+
+if hasattr(pickle, 'PickleBuffer'):
+    class _Pickler(pickle.Pickler):
+        """ Pickler sending large arrays out-of-band, as numpy does its arrays """
+
+        def reducer_override(self, obj):
+            if type(obj) is array.array and len(obj) * obj.itemsize >= _OUT_OF_BAND_MIN:
+                return _array_from_buffer, (obj.typecode, pickle.PickleBuffer(obj))
+            return NotImplemented
+else:
+    _Pickler = None
+
+
+def _pickler(file, buffers):
+    """ pickler writing to file and appending the out-of-band buffers to buffers """
+    if _Pickler is None:
+        return pickle.Pickler(file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def buffer_callback(buffer):
+        _raw = buffer.raw()
+        if _raw.nbytes < _OUT_OF_BAND_MIN or len(buffers) == _MAX_BUFFERS:
+            return True  # in the pickle
+        buffers.append(_raw)
+        return False
+
+    return _Pickler(file, protocol=5, buffer_callback=buffer_callback)
+
+
+def _dumps(obj):
+    """ pickle obj, returning the pickle and the list of its out-of-band buffers """
+    _stream = io.BytesIO()
+    _buffers = []
+    _pickler(_stream, _buffers).dump(obj)
+    return _stream.getbuffer(), _buffers
+
+
+def _loads(stream, buffers):
+    if buffers:
+        return pickle.loads(stream, buffers=buffers)
+    return pickle.loads(stream)
+
+
+def _remote_exception(ex):
+    """ reconstitute the exception of the peer, pass server exception through locally """
+    _ex_class, _ex_msg = ex['class'], ex['message']
+    _builtins = globals()['__builtins__']
+    if _ex_class in _builtins:
+        return _builtins[_ex_class](_ex_msg)
+
+    # unknown exception
+    _LOGGER.warning("unknown local exception {}".format(_ex_class))
+    return Exception("{}: {}".format(_ex_class, _ex_msg))
+
+
+class _SharedFile:
+    """ memory map of a shared memory file, remapped when the peer grew the file """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.map = mmap.mmap(fd, os.fstat(fd).st_size)
+
+    def _remap(self, size):
+        _old = self.map
+        self.map = mmap.mmap(self.fd, size)
+        _old.close()
+
+    def loads(self, offset, length, lengths):
+        """ unpickle the payload at offset, copying its out-of-band buffers out of the map """
+        _end = offset + length + sum(lengths)
+        if _end > len(self.map):
+            self._remap(os.fstat(self.fd).st_size)
+
+        with memoryview(self.map) as _view:
+            _buffers = []
+            _position = offset + length
+            for _length in lengths:
+                with _view[_position:_position + _length] as _buffer:
+                    _buffers.append(bytearray(_buffer))
+                _position += _length
+            with _view[offset:offset + length] as _stream:
+                return _loads(_stream, _buffers)
+
+
+class _SharedRing(_SharedFile):
+    """ ring of the payloads written to a shared memory file, each kept until the peer has read its frame """
+
+    def __init__(self, fd):
+        super().__init__(fd)
+        self._frames = collections.deque()  # (frame number, start, end) of the payloads the peer may not have read
+        self._head = 0
+
+    def span(self, acknowledged):
+        """ span - start and size of the largest room for a payload, which is never split over the end of the ring """
+        while self._frames and self._frames[0][0] < acknowledged:
+            self._frames.popleft()
+
+        _capacity = len(self.map)
+        if not self._frames:
+            return 0, _capacity
+        _first = self._frames[0][1]
+        _offset = self._head % _capacity
+        _size = min(_capacity - _offset, _capacity - (self._head - _first))
+        # or skip to the beginning of the ring
+        _wrapped = self._head + _capacity - _offset
+        _wrapped_size = _capacity - (_wrapped - _first)
+        if _wrapped_size > _size:
+            return _wrapped, _wrapped_size
+        return self._head, _size
+
+    def offset(self, start):
+        return start % len(self.map)
+
+    def commit(self, frame, start, size):
+        """ commit - keep the payload of frame written at start, returning its offset in the file """
+        self._head = start + size
+        self._frames.append((frame, start, self._head))
+        return start % len(self.map)
+
+    def reserve(self, frame, size, acknowledged):
+        """ reserve - offset of size bytes for the payload of frame, None if the ring has no room for them """
+        _start, _room = self.span(acknowledged)
+        if size > _room:
+            if self._frames:
+                return None
+            # only grown when empty, the payloads in the ring keep their offsets
+            _capacity = max(2 * len(self.map), -(-size // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY)
+            os.ftruncate(self.fd, _capacity)
+            self._remap(_capacity)
+        return self.commit(frame, _start, size)
+
+    def write(self, offset, parts):
+        for _part in parts:
+            _length = len(_part)
+            self.map[offset:offset + _length] = _part
+            offset += _length
+
+
+class _Overflow(Exception):
+    """ the payload does not fit in the room of the ring """
+
+
+class _PayloadWriter:
+    """ file keeping a small pickle for the pipe, and writing a larger one straight into the room of a ring """
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.reset(0)
+
+    def reset(self, acknowledged):
+        self.acknowledged = acknowledged
+        self.parts = []
+        self.size = 0
+        self.start = None  # of the payload in the ring, once too large for the pipe
+
+    def write(self, data):
+        if self.start is None:
+            if type(data) is bytes and self.size + len(data) <= _INLINE_MAX:
+                self.parts.append(data)
+                self.size += len(data)
+                return
+            self.start, _room = self.ring.span(self.acknowledged)
+            self.position = self.start % len(self.ring.map)
+            self.end = self.position + _room
+            _parts, self.parts = self.parts, []
+            for _part in _parts:
+                self.write(_part)
+
+        with memoryview(data) as _data:
+            _end = self.position + _data.nbytes
+            if _end > self.end:
+                raise _Overflow
+            self.ring.map[self.position:_end] = _data
+        self.position = _end
+
+
+class _Channel:
+    """ frames exchanged on a pair of pipes, with a shared memory file for each direction """
+
+    def __init__(self, infd, outfd, incoming_fd, outgoing_fd):
+        self.infd = infd
+        self.outfd = outfd
+        self.incoming = _SharedFile(incoming_fd)
+        self.outgoing = _SharedRing(outgoing_fd)
+        self.received = 0      # frames read
+        self.sent = 0          # frames written
+        self.acknowledged = 0  # frames written the peer has read
+        # one pickler for all the frames, its memo is cleared after each
+        self._writer = _PayloadWriter(self.outgoing)
+        self._buffers = []
+        self._pickler = _pickler(self._writer, self._buffers)
+
+    def _read(self, size):
+        _data = self.infd.read(size)
+        if len(_data) < size:
+            # closed fd on one side or the other of the pipe
+            raise EOFError
+        return _data
+
+    def _read_buffer(self, size):
+        _buffer = bytearray(size)
+        _view = memoryview(_buffer)
+        _position = 0
+        while _position < size:
+            _count = self.infd.readinto(_view[_position:])
+            if not _count:
+                raise EOFError
+            _position += _count
+        _view.release()
+        return _buffer
+
+    def receive(self):
+        """ receive - read the next frame
+        Returns:
+            kind, request id and object of the frame; a payload which can't be unpickled is received
+            as an exception
+        Raises:
+            EOFError if pipe closes
+        """
+        _header = self.infd.read(_FRAME.size)
+        if len(_header) < _FRAME.size:
+            # closed fd on one side or the other of the pipe
+            raise EOFError
+        _kind, _count, _request_id, _acknowledged, _offset, _length = _FRAME.unpack(_header)
+        _lengths = [_l for (_l,) in _BUFFER_LENGTH.iter_unpack(self._read(_count * _BUFFER_LENGTH.size))] \
+            if _count else []
+        self.acknowledged = _acknowledged
+        try:
+            if _kind == _NONE:
+                _obj = None
+            elif _offset == _INLINE:
+                _stream = self._read(_length)
+                _obj = _loads(_stream, [self._read_buffer(_l) for _l in _lengths])
+            else:
+                _obj = self.incoming.loads(_offset, _length, _lengths)
+        except (EOFError, OSError):
+            raise
+        except Exception as ex:
+            _kind, _obj = _EXCEPTION, {'class': ex.__class__.__name__, 'message': str(ex)}
+        finally:
+            # the payload was copied out, the peer may reuse its room once told
+            self.received += 1
+        return _kind, _request_id, _obj
+
+    def send(self, kind, request_id, obj=None):
+        """ send - write a frame, with obj as its payload unless kind is None """
+        _offset, _length, _stream, _buffers = _INLINE, 0, b'', []
+        if kind != _NONE:
+            # pickle into the pipe or into the room of the ring, the payload is copied once
+            _writer = self._writer
+            _writer.reset(self.acknowledged)
+            _buffers = self._buffers
+            try:
+                try:
+                    self._pickler.dump(obj)
+                finally:
+                    self._pickler.clear_memo()
+                _length = _writer.size if _writer.start is None else \
+                    _writer.position - self.outgoing.offset(_writer.start)
+                for _buffer in _buffers:
+                    _writer.write(_buffer)
+            except _Overflow:
+                # no room, a larger ring once empty or else the pipe
+                _stream, _buffers = _dumps(obj)
+                _length = len(_stream)
+                _offset = self.outgoing.reserve(self.sent, _length + sum(_b.nbytes for _b in _buffers),
+                                                self.acknowledged)
+                if _offset is None:
+                    _offset = _INLINE
+                else:
+                    self.outgoing.write(_offset, [_stream] + _buffers)
+            else:
+                _buffers = list(_buffers)
+                if _writer.start is None:
+                    _stream = b''.join(_writer.parts)
+                else:
+                    _offset = self.outgoing.commit(self.sent, _writer.start,
+                                                   _writer.position - self.outgoing.offset(_writer.start))
+
+        _header = _FRAME.pack(kind, len(_buffers), request_id, self.received, _offset, _length)
+        if _buffers:
+            _header += b''.join(_BUFFER_LENGTH.pack(_b.nbytes) for _b in _buffers)
+        if _offset == _INLINE:
+            if len(_stream) <= _INLINE_MAX:
+                self.outfd.write(_header + _stream)
+            else:
+                self.outfd.write(_header)
+                self.outfd.write(_stream)
+            for _buffer in _buffers:
+                self.outfd.write(_buffer)
+        else:
+            self.outfd.write(_header)
+        self.outfd.flush()
+        self.sent += 1
+        if self._buffers:
+            # do not keep the arrays of the caller
+            del self._buffers[:]
 
 
 class InterProcessRPC:
     def __init__(self,
-                 infd=io.BufferedReader(io.FileIO(os.dup(sys.stdin.fileno()))),
-                 outfd=io.BufferedWriter(io.FileIO(os.dup(sys.stdout.fileno()), mode='w')),
-                 errfd=sys.stderr,
+                 infd=None,
+                 outfd=None,
+                 errfd=None,
                  name="",
-                 argfile_fd=None):
+                 shared_fds=None):
+        if infd is None:
+            infd = io.BufferedReader(io.FileIO(os.dup(sys.stdin.fileno())))
+        if outfd is None:
+            outfd = io.BufferedWriter(io.FileIO(os.dup(sys.stdout.fileno()), mode='w'))
         self.infd = infd    # for direct i/o between client/server
         self.outfd = outfd
 
-        self.errfd = errfd
+        self.errfd = sys.stderr if errfd is None else errfd
         self.name = name
+        self._request_id = 0
 
-        if argfile_fd is None:
+        if shared_fds is None:
             # server
             # close 0/1/2 in case client is trying to do i/o on them. use stderr for output
             os.close(0)
             os.close(1)
             os.dup2(2, 1)
 
-            # special protocol for server process: first line read is the name of our mapped arg file
-            _argfile_name = self.infd.readline()[:-1].decode('utf-8')
-            self.argfile_fd = os.open(_argfile_name, os.O_RDWR)
-            os.unlink(_argfile_name)  # delete on close
+            # special protocol for server process: first lines read are the names of the shared memory
+            # files of the requests and of the results
+            _fds = []
+            for _ in range(2):
+                _argfile_name = self.infd.readline()[:-1].decode('utf-8')
+                _fds.append(os.open(_argfile_name, os.O_RDWR))
+                os.unlink(_argfile_name)  # delete on close
+            _incoming_fd, _outgoing_fd = _fds
         else:
-            # client process opens the file then passes it up to superclass
-            self.argfile_fd = argfile_fd
+            # client process opens the files then passes them up to superclass
+            _outgoing_fd, _incoming_fd = shared_fds
 
-        self.mfile = mmap.mmap(self.argfile_fd, ARGFILE_SIZE)  # assume input > output
+        self._channel = _Channel(self.infd, self.outfd, _incoming_fd, _outgoing_fd)
 
     def call(self, rpcobj):
         """ call - local instance of rpc call """
@@ -136,87 +483,44 @@ class InterProcessRPC:
         return _method(*_args)
 
     def rpc_read(self):
-        """ rpc_read - read len/buf from the remote host
+        """ rpc_read - read the next frame from the remote host
         protocol:
-        each call is preceded by an ascii - <len>\n
-          len == '' : EOF from remote side
-          len > 0   : len sized buffer with json method + args follows
-          len == 0  : None
-          len < 0   : len sized buffer with named exception plus arg follows
+        each call is a frame whose kind is
+          kind > 0   : payload is the method + args
+          kind == 0  : None
+          kind < 0   : payload is the named exception plus arg
         Returns:
-            json dict if method or exception
-            None if len == 0
+            dict if method
+            None if kind == 0
         Raises:
             EOFError if pipe closes
+            the exception of the remote host if kind < 0
         """
-
-        # protocol: pipe produces a length of next object
-        _len = self.infd.readline()  # assume small enough to not deadlock
-        self.mfile.seek(0)
-
-        if _len == b'':
-            # closed fd on one side or the other of the pipe
-            raise EOFError
-
-        _len = int(_len)
-        if _len > 0:
-            # len > 0 -> json object
-
-            # eprint("read >0")
-            obj = pickle.loads(self.mfile)
-            return obj
-
-        elif _len < 0:
-            # _len < 0 -> Exception
-            _ex = pickle.loads(self.mfile)
-
-            # reconstitute the exception, pass server exception through locally
-            _ex_class, _ex_msg = _ex['class'], _ex['message']
-            _builtins = globals()['__builtins__']
-            if _ex_class in _builtins:
-                raise _builtins[_ex_class](_ex_msg)
-
-            # raise unknown exception
-            _LOGGER.warning("unknown local exception {}".format(_ex_class))
-            raise Exception("{}: {}".format(_ex_class, _ex_msg))
-
-        # we fall through here when len == 0 -> None
-        return None
+        _kind, self._request_id, _obj = self._channel.receive()
+        if _kind == _EXCEPTION:
+            raise _remote_exception(_obj)
+        return _obj
 
     def rpc_write(self, obj, is_exception=False):
-        """ rpc_write -- write an rpc return value to the receiver 
+        """ rpc_write -- write an rpc return value to the receiver, as the result of the request last read
         protocol:
-        each call is preceded by an ascii - <len>\n
-          len > 0   : len sized buffer with json method + args follows
-          len == 0  : None
-          len < 0   : len sized buffer with named exception plus arg follows
+        each call is a frame whose kind is
+          kind > 0   : payload is the object
+          kind == 0  : None
+          kind < 0   : payload is the named exception plus arg
         Returns:
         Raises:
         """
 
-        _lenmult = 1
         if is_exception:
-            # replace exception object with something that can be turned into JSON
+            # replace exception object with something that can be pickled anywhere
             _class = obj.__class__.__name__
-            obj = { 'class': str(_class), 'message': str(obj) }
-            _lenmult = -1
-
-        if obj is not None:
-            # put the dict into shared memory
-            self.mfile.seek(0)
-            pickle.dump(obj, self.mfile)
-
-            # write a leading "len", positive (object) or negative (exception)
-            # and signal to the server there's something to do
-            _lenstr = str(_lenmult * 1)+'\n'
-            self.outfd.write(_lenstr.encode('utf-8', 'ignore'))
+            obj = {'class': str(_class), 'message': str(obj)}
+            _kind = _EXCEPTION
         else:
-            # no payload for None return
-            # eprint("rpc write none")
-            _lenstr = '0\n'
-            self.outfd.write(_lenstr.encode('utf-8', 'ignore'))
+            _kind = _NONE if obj is None else _OBJECT
 
-        self.outfd.flush()
+        self._channel.send(_kind, self._request_id, obj)
 
     def rpc_exception(self, ex):
         """ exception -- write an exception object to client to represent internal error """
@@ -227,14 +531,14 @@ class InterProcessRPC:
     def serve(self):
         """ receive "methods" to invoke on infd, return results on outfd
 
-        each method is represented using (string) len followed by "len" worth of JSON packet
-        JSON input packet is {method: methodname, args: args}
+        each method is a frame with the pickled packet {method: methodname, args: args}
 
-        return values and exceptions are written back on outfd in the same format; 
+        return values and exceptions are written back on outfd in the same format, with the request id
+        of the method;
 
-        . None returns have a zero length and are not JSON
-        . Exceptions are JSON objects with exception type and message, and have a negative length
-        . A length which is null string indicates closed channel
+        . None returns have a zero kind and no payload
+        . Exceptions are dicts with exception type and message, and have a negative kind
+        . A closed channel ends the server
         """
 
         while True:
@@ -244,9 +548,10 @@ class InterProcessRPC:
                 break
             except Exception as ex:
                 self.rpc_exception(ex)
+                continue
 
             try:
-                _ret = self.call(_obj)  # local "call" - returns json-able value; may raise
+                _ret = self.call(_obj)  # local "call" - returns picklable value; may raise
 
             except Exception as ex:
                 if DEBUG_RPC and type(ex) not in [EOFError, SystemExit]:
@@ -267,6 +572,50 @@ class InterProcessRPC:
         sys.exit()
 
 
+class _Replies:
+    """ futures of the requests in flight, completed by a thread reading the results """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.closed = False
+
+    def add(self, request_id):
+        _future = concurrent.futures.Future()
+        with self.lock:
+            if self.closed:
+                raise EOFError("rpc server has exited")
+            self.futures[request_id] = _future
+        return _future
+
+    def discard(self, request_id):
+        with self.lock:
+            self.futures.pop(request_id, None)
+
+    def read(self):
+        """ read - complete the future of each result until the server exits """
+        while True:
+            try:
+                _kind, _request_id, _obj = self.channel.receive()
+            except (EOFError, OSError, ValueError):
+                break
+            with self.lock:
+                _future = self.futures.pop(_request_id, None)
+            if _future is None:
+                _LOGGER.warning("rpc result for unknown request {}".format(_request_id))
+            elif _kind == _EXCEPTION:
+                _future.set_exception(_remote_exception(_obj))
+            else:
+                _future.set_result(_obj)
+
+        with self.lock:
+            self.closed = True
+            _futures, self.futures = self.futures, {}
+        for _future in _futures.values():
+            _future.set_exception(EOFError("rpc server has exited"))
+
+
 class InterProcessRPCClient(InterProcessRPC):
     """
     InterProcessRPCClient: companion to InterProcessRPC, client code that calls into a server in a separate process
@@ -278,15 +627,21 @@ class InterProcessRPCClient(InterProcessRPC):
         _is_server = is_server_process()
         _stderr = subprocess.PIPE if _is_server else None
 
-        # set up a big shared memory file for argument transfer
-        (_argfile_fd, _argfile_path) = tempfile.mkstemp()
-        os.pwrite(_argfile_fd, b' ', ARGFILE_SIZE-1)
+        # set up the shared memory files of the requests and of the results
+        (_request_fd, _request_path) = tempfile.mkstemp()
+        (_result_fd, _result_path) = tempfile.mkstemp()
+        for _fd in (_request_fd, _result_fd):
+            os.ftruncate(_fd, ARGFILE_SIZE)
 
         p = subprocess.Popen(server_args,
                              stdin=subprocess.PIPE, stdout=subprocess.PIPE,
                              stderr=_stderr,
                              env=env)
-        super().__init__(infd=p.stdout, outfd=p.stdin, errfd=p.stderr, argfile_fd=_argfile_fd)
+        self._process = p
+        super().__init__(infd=p.stdout, outfd=p.stdin, errfd=p.stderr, shared_fds=(_request_fd, _result_fd))
+        self._write_lock = threading.Lock()
+        self._replies = _Replies(self._channel)
+        self._reply_thread = None
 
         if _is_server:
             def log_errors(fd):
@@ -311,26 +666,83 @@ class InterProcessRPCClient(InterProcessRPC):
             # Process hasn't exited yet, let's wait some
             time.sleep(0.5)
 
-        # special prtocol, now tell the server the name of the mapped arg file
-        self.outfd.write('{}\n'.format(_argfile_path).encode('utf-8'))
+        # special prtocol, now tell the server the names of the shared memory files
+        self.outfd.write('{}\n{}\n'.format(_request_path, _result_path).encode('utf-8'))
+        self.outfd.flush()
+
+    def rpc_submit(self, rpcobj):
+        """ rpc_submit - rpc client writes rpc request, without waiting for the result
+        Requests are pipelined: several may be submitted, from any thread, before the results arrive
+        Args:
+            rpcobj : dict() with:
+            'method': name of remote method to invoke
+            'args': picklable list of arguments to be sent to remote object
+        Returns:
+            concurrent.futures.Future of the result of the remote execution
+        Raises:
+            EOFError if the server has exited
+        """
+        with self._write_lock:
+            if self._reply_thread is None:
+                # from now on the results are read in the background; the thread only holds the channel,
+                # the server gets EOF once the client is gone
+                self._reply_thread = threading.Thread(target=self._replies.read, name="iprpc-results", daemon=True)
+                self._reply_thread.start()
+            self._request_id = (self._request_id + 1) & 0xffffffff
+            _request_id = self._request_id
+            _future = self._replies.add(_request_id)
+            try:
+                self._channel.send(_OBJECT, _request_id, rpcobj)
+            except BaseException:
+                self._replies.discard(_request_id)
+                raise
+        return _future
 
     def call(self, rpcobj):
-        """ call - rpc client writes rpc request, reads and returns the result 
+        """ call - rpc client writes rpc request, reads and returns the result
         Args:
             rpcobj : dict() with:
             'method': name of remote method to invoke
-            'args': JSON-able list of arguments to be sent to remote object
+            'args': picklable list of arguments to be sent to remote object
         Returns:
-            de-JSON-ified return result from remote execution
+            unpickled return result from remote execution
         Raises:
             Exception with appropriate message raised in remote execution (xxx -- reinstantiate exception class)
         """
-        self.rpc_write(rpcobj)
-        return self.rpc_read()
+        with self._write_lock:
+            if self._reply_thread is None:
+                # nothing else in flight, the result is the next frame
+                self._request_id = (self._request_id + 1) & 0xffffffff
+                self._channel.send(_OBJECT, self._request_id, rpcobj)
+                return self.rpc_read()
+        return self.rpc_submit(rpcobj).result()
+
+    def rpc_close(self, timeout=5):
+        """ rpc_close - close the request pipe, which ends the server, and wait for the server to exit """
+        try:
+            self.outfd.close()
+        except OSError:
+            pass
+        try:
+            self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+    def __del__(self):
+        _outfd = self.__dict__.get('outfd')
+        if _outfd is not None:
+            try:
+                _outfd.close()
+            except OSError:
+                pass
 
 
 class IPCModuleClient(InterProcessRPCClient):
     """ IPCModuleClient - specifically invoke python to create a server from a python module """
+
+    _PYTHON = 'python3'
+
     def __init__(self, module_name, module_dir):
 
         env = os.environ.copy()
@@ -338,7 +750,7 @@ class IPCModuleClient(InterProcessRPCClient):
         env['PYTHONPATH'] = env.get('PYTHONPATH', '') + ":"+module_dir
 
         _LOGGER.debug("STARTING module {} path={}".format(module_name, env['PYTHONPATH']))
-        super().__init__(['python3', '-m', module_name], env=env)
+        super().__init__([self._PYTHON, '-m', module_name], env=env)
 
     def __getattr__(self, method_name):
         """ __getattr__  - override getattr so that we can proxy function calls by name """
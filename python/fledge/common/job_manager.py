@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Long running admin operations of the core, run as jobs off the event loop"""
+
+import asyncio
+import datetime
+import functools
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from fledge.common.logger import FLCoreLogger
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = FLCoreLogger().get_logger(__name__)
+
+
+class JobCancelled(Exception):
+    """ Raised in a job which was asked to cancel """
+    pass
+
+
+class Job(object):
+    """ A long running operation, its state and progress
+
+    The operation is given its job, reports progress with set_progress() and calls check_cancelled() between its
+    steps: a running operation, blocking or not, is only cancelled there.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, name, executor):
+        self.id = str(uuid.uuid4())
+        self.name = name
+        self.status = self.QUEUED
+        self.progress = 0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created = self._now()
+        self.started = None
+        self.finished = None
+        self._executor = executor
+        self._cancel_requested = threading.Event()
+        self._task = None
+        self._exception = None
+
+    @staticmethod
+    def _now():
+        return datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+    @property
+    def done(self):
+        return self.status in (self.COMPLETED, self.FAILED, self.CANCELLED)
+
+    def set_progress(self, progress, message=None):
+        """ Percentage of the operation done and what it is doing; safe to call from a worker thread """
+        self.progress = max(0, min(int(progress), 100))
+        if message is not None:
+            self.message = message
+
+    def check_cancelled(self):
+        if self._cancel_requested.is_set():
+            raise JobCancelled("{} job cancelled".format(self.name))
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """ Run a blocking step of a coroutine job on a worker thread of the job pool """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor(), functools.partial(func, *args, **kwargs))
+
+    async def wait(self):
+        """ Result of the job once done; the exception of a failed job is raised """
+        if self._task is not None:
+            await asyncio.shield(self._task)
+        if self._exception is not None:
+            raise self._exception
+        return self.result
+
+    def to_dict(self):
+        job = {"id": self.id, "name": self.name, "status": self.status, "progress": self.progress,
+               "message": self.message, "created": self.created, "started": self.started,
+               "finished": self.finished}
+        if self.status == self.COMPLETED:
+            job["result"] = self.result
+        if self.error is not None:
+            job["error"] = self.error
+        return job
+
+
+class JobManagerSingleton(object):
+    _shared_state = {}
+
+    def __init__(self):
+        self.__dict__ = self._shared_state
+
+
+class JobManager(JobManagerSingleton):
+    """ Runs long running operations as jobs, at most MAX_WORKERS at a time, and keeps the last RETAIN of them
+
+    A job is a function given its Job and the arguments it was submitted with. A coroutine function runs on the event
+    loop and hands its blocking steps to Job.run_blocking; any other function runs on a thread of the job pool.
+    """
+
+    MAX_WORKERS = 2
+    """ Jobs run at the same time, the others are queued """
+
+    RETAIN = 100
+    """ Jobs kept for their status, the oldest finished ones are dropped first """
+
+    _jobs = None
+    _executor = None
+    _slots = None
+    _slots_loop = None
+
+    def __init__(self):
+        JobManagerSingleton.__init__(self)
+        if self._jobs is None:
+            self._jobs = OrderedDict()
+
+    def submit(self, name, func, *args, **kwargs):
+        """ Queue a job and return it at once """
+        job = Job(name, self._get_executor)
+        self._jobs[job.id] = job
+        self._trim()
+        job._task = asyncio.ensure_future(self._run(job, func, args, kwargs))
+        _logger.info("{} job {} queued.".format(name, job.id))
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def get_all(self):
+        return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """ Ask a job to cancel; a queued job is cancelled at once, a running one at its next check_cancelled()
+
+        Returns:
+            the job, None if there is no such job
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        job._cancel_requested.set()
+        if job.status == Job.QUEUED:
+            # The task may not have started, when it would not see its cancellation
+            job.status = Job.CANCELLED
+            job._exception = JobCancelled("{} job cancelled".format(job.name))
+            job.finished = Job._now()
+            job._task.cancel()
+        return job
+
+    async def stop(self):
+        """ Cancel the jobs not done and release the job pool """
+        for job in list(self._jobs.values()):
+            self.cancel(job.id)
+        pending = [j._task for j in self._jobs.values() if j._task is not None and not j._task.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix='fledge-job')
+        return self._executor
+
+    def _get_slots(self):
+        loop = asyncio.get_event_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.MAX_WORKERS)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _run(self, job, func, args, kwargs):
+        try:
+            async with self._get_slots():
+                job.check_cancelled()
+                job.status = Job.RUNNING
+                job.started = Job._now()
+                if asyncio.iscoroutinefunction(func):
+                    job.result = await func(job, *args, **kwargs)
+                else:
+                    job.result = await asyncio.get_event_loop().run_in_executor(
+                        self._get_executor(), functools.partial(func, job, *args, **kwargs))
+        except (JobCancelled, asyncio.CancelledError) as ex:
+            job.status = Job.CANCELLED
+            job._exception = ex if isinstance(ex, JobCancelled) else JobCancelled("{} job cancelled".format(job.name))
+            _logger.info("{} job {} cancelled.".format(job.name, job.id))
+        except Exception as ex:
+            job.status = Job.FAILED
+            job.error = str(ex)
+            job._exception = ex
+            _logger.error(ex, "{} job {} failed.".format(job.name, job.id))
+        else:
+            job.status = Job.COMPLETED
+            job.progress = 100
+        finally:
+            job.finished = Job._now()
+
+    def _trim(self):
+        if len(self._jobs) <= self.RETAIN:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.done][:len(self._jobs) - self.RETAIN]:
+            del self._jobs[job_id]
@@ -6,10 +6,13 @@
 
 """ Fledge Logger """
 import os
+import queue
 import subprocess
 import logging
+import threading
 import traceback
-from logging.handlers import SysLogHandler
+import atexit
+from logging.handlers import SysLogHandler, QueueHandler, QueueListener
 from functools import wraps
 
 
@@ -30,6 +33,14 @@ FLEDGE_LOGS_DESTINATION = 'FLEDGE_LOGS_DESTINATION'
 """Log destination environment variable"""
 default_destination = SYSLOG
 """Default destination of logger"""
+SYSLOG_ADDRESS = '/dev/log'
+"""Address of the syslog socket"""
+QUEUE_SIZE = 10000
+"""Log records waiting for the background thread; records logged while the queue is full are dropped and counted"""
+RATE_LIMIT_BURST = 100
+"""Records of the same logger, level and message template let through per RATE_LIMIT_INTERVAL; 0 disables"""
+RATE_LIMIT_INTERVAL = 10
+"""Seconds of a rate limiting window"""
 
 
 def set_default_destination(destination: int):
@@ -57,6 +68,167 @@ def get_process_name() -> str:
     return pname
 
 
+class _RateLimitFilter(logging.Filter):
+    """ Lets through at most RATE_LIMIT_BURST records per RATE_LIMIT_INTERVAL for each logger, level and message
+    template. The first record of the next window reports how many were suppressed.
+
+    Filtering happens in the logging thread, before the record is formatted and queued.
+    """
+
+    _MAX_TEMPLATES = 1024
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._windows = {}
+        self.suppressed = {}
+        """ Total of suppressed records per (logger name, level name, message template) """
+
+    def filter(self, record):
+        if RATE_LIMIT_BURST <= 0:
+            return True
+        template = record.msg if isinstance(record.msg, str) else type(record.msg).__name__
+        key = (record.name, record.levelname, template)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or record.created - window[0] >= RATE_LIMIT_INTERVAL:
+                if window is None and len(self._windows) >= self._MAX_TEMPLATES:
+                    self._expire(record.created)
+                self._windows[key] = [record.created, 1, 0]
+                if window is not None and window[2]:
+                    record.msg = "{} [{} similar messages suppressed]".format(record.getMessage(), window[2])
+                    record.args = None
+                return True
+            window[1] += 1
+            if window[1] <= RATE_LIMIT_BURST:
+                return True
+            window[2] += 1
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return False
+
+    def _expire(self, now):
+        for key in [k for k, w in self._windows.items() if now - w[0] >= RATE_LIMIT_INTERVAL]:
+            del self._windows[key]
+
+
+class _QueueHandler(QueueHandler):
+    """ Process-wide handler of a set of destinations; it formats the record in the logging thread and leaves
+    the write to syslog and/or stderr to the listener thread """
+
+    def __init__(self, log_queue, destinations):
+        super().__init__(log_queue)
+        self.destinations = destinations
+        self.name = "queueHandler:" + ",".join("syslog" if d == SYSLOG else "console" for d in destinations)
+        self.dropped = 0
+        self.addFilter(_rate_limit_filter)
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.fl_destinations = self.destinations
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _DestinationHandler(logging.Handler):
+    """ Runs on the listener thread and hands a record to the shared handler of each of its destinations """
+
+    def handle(self, record):
+        for destination in record.fl_destinations:
+            _target_handlers[destination].handle(record)
+        return True
+
+
+_rate_limit_filter = _RateLimitFilter()
+_pipeline_lock = threading.RLock()
+_log_queue = None
+_listener = None
+_target_handlers = {}
+_queue_handlers = {}
+_formatter = None
+
+
+def _get_formatter() -> logging.Formatter:
+    global _formatter
+    if _formatter is None:
+        # TODO: Consider using %r with message when using syslog .. \n looks better than #
+        fmt = '{}[%(process)d] %(levelname)s: %(module)s: %(name)s: %(message)s'.format(get_process_name())
+        _formatter = logging.Formatter(fmt=fmt)
+    return _formatter
+
+
+def _start_listener() -> None:
+    global _log_queue, _listener
+    _log_queue = queue.Queue(QUEUE_SIZE)
+    for handler in _queue_handlers.values():
+        handler.queue = _log_queue
+    _listener = QueueListener(_log_queue, _DestinationHandler())
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    """ Writes out the queued records and stops the listener thread """
+    global _listener
+    with _pipeline_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _reset_after_fork() -> None:
+    # The listener thread does not survive fork; the child gets a fresh queue and starts its own listener
+    global _pipeline_lock, _listener
+    _pipeline_lock = threading.RLock()
+    if _listener is not None:
+        _listener = None
+        _start_listener()
+
+
+def get_queue_handler(destinations) -> logging.Handler:
+    """ Returns the process-wide handler logging to the given destinations, SYSLOG and/or CONSOLE
+
+    All handlers feed one queue. A single background thread writes the records to one shared syslog handler and
+    one shared console handler, so logging never blocks on the syslog socket.
+    """
+    destinations = tuple(sorted(set(destinations)))
+    for destination in destinations:
+        if destination not in (SYSLOG, CONSOLE):
+            raise ValueError("Invalid destination {}".format(destination))
+    with _pipeline_lock:
+        if _listener is None:
+            _start_listener()
+        handler = _queue_handlers.get(destinations)
+        if handler is None:
+            for destination in destinations:
+                if destination not in _target_handlers:
+                    target = SysLogHandler(address=SYSLOG_ADDRESS) if destination == SYSLOG \
+                        else logging.StreamHandler()  # stderr
+                    target.setFormatter(_get_formatter())
+                    _target_handlers[destination] = target
+            handler = _QueueHandler(_log_queue, destinations)
+            _queue_handlers[destinations] = handler
+        return handler
+
+
+def get_suppressed_counts() -> dict:
+    """ Returns the number of rate limited records per (logger name, level name, message template) """
+    return dict(_rate_limit_filter.suppressed)
+
+
+def get_dropped_count() -> int:
+    """ Returns the number of records dropped because the log queue was full """
+    return sum(h.dropped for h in _queue_handlers.values())
+
+
+atexit.register(_stop_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def setup(logger_name: str = None,
           destination: int = None,
           level: int = None,
@@ -101,20 +273,11 @@ def setup(logger_name: str = None,
     if destination is None:
         destination = default_destination
 
-    if destination == SYSLOG:
-        handler = SysLogHandler(address='/dev/log')
-    elif destination == CONSOLE:
-        handler = logging.StreamHandler()  # stderr
-    else:
-        raise ValueError("Invalid destination {}".format(destination))
-
-    # TODO: Consider using %r with message when using syslog .. \n looks better than #
-    fmt = '{}[%(process)d] %(levelname)s: %(module)s: %(name)s: %(message)s'.format(get_process_name())
-    formatter = logging.Formatter(fmt=fmt)
-    handler.setFormatter(formatter)
+    handler = get_queue_handler([destination])
     if level is not None:
         logger.setLevel(level)
-    logger.addHandler(handler)
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
     logger.propagate = propagate
 
     # Call error override
@@ -130,6 +293,8 @@ def error_override(_logger: logging.Logger) -> None:
     Returns:
         None
     """
+    if getattr(_logger.error, '_error_override', False):
+        return
     # save the old logging.error function
     __logging_error = _logger.error
 
@@ -160,6 +325,7 @@ def error_override(_logger: logging.Logger) -> None:
             else:
                 # Default logging error
                 __logging_error(msg)
+    error._error_override = True
     # overwrite the default logging.error
     _logger.error = error
 
@@ -177,9 +343,7 @@ class FLCoreLogger:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            process_name = get_process_name()
-            fmt = '{}[%(process)d] %(levelname)s: %(module)s: %(name)s: %(message)s'.format(process_name)
-            cls.formatter = logging.Formatter(fmt=fmt)
+            cls.formatter = _get_formatter()
         return cls._instance
 
     def get_syslog_handler(self):
@@ -229,9 +393,7 @@ class FLCoreLogger:
             logger: returns logger for module
         """
         _logger = logging.getLogger(logger_name)
-        console_handler = self.get_console_handler()
-        syslog_handler = self.get_syslog_handler()
-        self.add_handlers(_logger, [syslog_handler, console_handler])
+        self.add_handlers(_logger, [get_queue_handler([SYSLOG, CONSOLE])])
         _logger.propagate = False
         # Call error override
         error_override(_logger)
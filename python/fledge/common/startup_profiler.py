@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" Startup profiler of the Fledge Python services and tasks
+
+Profiling is enabled by FLEDGE_STARTUP_PROFILE, set to a directory, in the environment of a process, which the core
+passes on to the services and tasks it starts. A profiled process records from start() the import time of every
+module, as a tree of the modules each import triggered, and the time of each phase of its startup ended by mark().
+finish() ends the profile and writes it as JSON to <directory>/<name>-<pid>.json; the Python microservices also
+serve the profile of their own startup at GET /fledge/service/profile of their management API.
+
+The profile has the form
+    {"name": "core", "pid": 1234, "total": 2.41,
+     "phases": [{"name": "storage", "start": 0.52, "duration": 0.8}, ...],
+     "imports": {"name": "", "total": 0.49, "self": 0.0, "children": [{"name": "aiohttp", ...}, ...]},
+     "slowest": [{"name": "aiohttp", "total": 0.09, "self": 0.001}, ...]}
+with times in seconds. This module only uses the standard library so that it can be started before anything else.
+"""
+
+import json
+import os
+import sys
+import time
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+ENVIRONMENT_VARIABLE = 'FLEDGE_STARTUP_PROFILE'
+
+SLOWEST_IMPORTS = 25
+""" Number of modules listed by cumulative import time in a profile """
+
+_profiler = None
+""" StartupProfiler of this process, None when not profiled """
+
+
+class _TimedLoader(object):
+    """ Loader proxy timing the execution of a module, the module and its spec get the original loader back """
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        create_module = getattr(self._loader, 'create_module', None)
+        return None if create_module is None else create_module(spec)
+
+    def exec_module(self, module):
+        module.__loader__ = self._loader
+        if getattr(module, '__spec__', None) is not None:
+            module.__spec__.loader = self._loader
+        node = self._profiler._enter_import(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit_import(node)
+
+
+class _ImportTimer(object):
+    """ Meta path finder handing the loaders found by the other finders over to a _TimedLoader """
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+        self._finding = set()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname in self._finding:
+            return None
+        self._finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                        spec.loader = _TimedLoader(spec.loader, self._profiler)
+                    return spec
+            return None
+        finally:
+            self._finding.discard(fullname)
+
+
+class StartupProfiler(object):
+    """ Import tree and phase timings of the startup of a process """
+
+    def __init__(self, name, directory=None):
+        self.name = name
+        self.directory = directory
+        self._started = time.perf_counter()
+        self._last_mark = 0.0
+        self._finished = None
+        self._phases = []
+        self._root = {"name": "", "total": 0.0, "self": 0.0, "children": []}
+        self._stack = [self._root]
+        self._timer = None
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def install(self):
+        """ Start timing the imports """
+        if self._timer is None:
+            self._timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self._timer)
+
+    def uninstall(self):
+        if self._timer is not None:
+            if self._timer in sys.meta_path:
+                sys.meta_path.remove(self._timer)
+            self._timer = None
+
+    def _enter_import(self, name):
+        node = {"name": name, "total": 0.0, "self": 0.0, "children": [], "_start": time.perf_counter()}
+        self._stack[-1]["children"].append(node)
+        self._stack.append(node)
+        return node
+
+    def _exit_import(self, node):
+        node["total"] = time.perf_counter() - node.pop("_start")
+        node["self"] = max(node["total"] - sum(c["total"] for c in node["children"]), 0.0)
+        # An import which raised may leave the imports it triggered on the stack
+        while self._stack[-1] is not node:
+            self._stack.pop()
+        self._stack.pop()
+
+    def mark(self, phase):
+        """ End a phase of the startup, which began at the previous mark or at the start """
+        now = self.elapsed()
+        self._phases.append({"name": phase, "start": round(self._last_mark, 6),
+                             "duration": round(now - self._last_mark, 6)})
+        self._last_mark = now
+
+    def finish(self):
+        """ Stop profiling and write the profile to the directory, if any, returning its path """
+        if self._finished is not None:
+            return None
+        self.uninstall()
+        self._finished = self.elapsed()
+        if not self.directory:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, "{}-{}.json".format(self.name.replace(os.sep, '_'), os.getpid()))
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def report(self):
+        """ The profile so far, or of the startup once finished """
+        self._root["total"] = sum(c["total"] for c in self._root["children"])
+        flat = []
+
+        def walk(node):
+            for child in node["children"]:
+                flat.append({"name": child["name"], "total": round(child["total"], 6),
+                             "self": round(child["self"], 6)})
+                walk(child)
+        walk(self._root)
+        flat.sort(key=lambda n: n["total"], reverse=True)
+
+        def rounded(node):
+            return {"name": node["name"], "total": round(node["total"], 6), "self": round(node["self"], 6),
+                    "children": [rounded(c) for c in node["children"] if "_start" not in c]}
+        return {"name": self.name, "pid": os.getpid(),
+                "total": round(self._finished if self._finished is not None else self.elapsed(), 6),
+                "finished": self._finished is not None,
+                "phases": list(self._phases), "imports": rounded(self._root), "slowest": flat[:SLOWEST_IMPORTS]}
+
+
+def start(name):
+    """ Start profiling this process as name when FLEDGE_STARTUP_PROFILE is set; call before the imports to time """
+    global _profiler
+    directory = os.environ.get(ENVIRONMENT_VARIABLE)
+    if not directory or _profiler is not None:
+        return _profiler
+    _profiler = StartupProfiler(name, directory)
+    _profiler.install()
+    return _profiler
+
+
+def mark(phase):
+    """ End a phase of the startup of a profiled process """
+    if _profiler is not None:
+        _profiler.mark(phase)
+
+
+def finish():
+    """ End the profile of the startup of a profiled process and write it """
+    if _profiler is not None:
+        try:
+            return _profiler.finish()
+        except OSError as ex:
+            sys.stderr.write("Unable to write the startup profile: {}\n".format(ex))
+    return None
+
+
+def report():
+    """ The startup profile of this process, None when not profiled """
+    return None if _profiler is None else _profiler.report()
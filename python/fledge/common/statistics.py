@@ -4,9 +4,10 @@
 # See: http://fledge-iot.readthedocs.io/
 # FLEDGE_END
 
+import asyncio
 import json
 from fledge.common.logger import FLCoreLogger
-from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.storage_client.payload_builder import PayloadBuilder, Param
 from fledge.common.storage_client.storage_client import StorageClientAsync
 
 
@@ -17,6 +18,9 @@ __version__ = "${VERSION}"
 
 _logger = FLCoreLogger().get_logger(__name__)
 
+_INCREMENT_TEMPLATE = PayloadBuilder().WHERE(["key", "=", Param("key")]).EXPR(
+    ["value", "+", Param("increment")]).template()
+
 
 async def create_statistics(storage=None):
     stat = Statistics(storage)
@@ -28,8 +32,15 @@ class Statistics(object):
     """ Statistics interface of the API to gather the available statistics counters,
         calculate the deltas from the previous run of the process and write the deltas
         to a statistics record.
+
+        The state is shared by all the instances of a process. Counters given to add() are accumulated in memory and
+        written by flush() with one bulk update, after the keys not registered yet are registered with one insert.
+        start() flushes every FLUSH_INTERVAL seconds and stop() writes what is left on shutdown.
     """
 
+    FLUSH_INTERVAL = 5
+    """ Seconds between the flushes of the accumulated statistics once started """
+
     _shared_state = {}
 
     _storage = None
@@ -37,12 +48,25 @@ class Statistics(object):
     _registered_keys = None
     """ Set of keys already in the storage tables """
 
+    _pending = None
+    """ {key: increment} accumulated since the last flush """
+
+    _new_keys = None
+    """ {key: description} of the keys to register with the next flush """
+
+    _flush_task = None
+
+    _flush_lock = None
+
     def __init__(self, storage=None):
         self.__dict__ = self._shared_state
         if self._storage is None:
             if not isinstance(storage, StorageClientAsync):
                 raise TypeError('Must be a valid Async Storage object')
             self._storage = storage
+        if self._pending is None:
+            self._pending = {}
+            self._new_keys = {}
 
     async def _init(self):
         if self._registered_keys is None:
@@ -61,13 +85,7 @@ class Statistics(object):
             raise TypeError('stat_list must be a dict')
 
         try:
-            payload = {"updates": []}
-            for k, v in stat_list.items():
-                payload_item = PayloadBuilder() \
-                    .WHERE(["key", "=", k]) \
-                    .EXPR(["value", "+", v]) \
-                    .payload()
-                payload['updates'].append(json.loads(payload_item))
+            payload = {"updates": [_INCREMENT_TEMPLATE.bind(key=k, increment=v) for k, v in stat_list.items()]}
             await self._storage.update_tbl("statistics", json.dumps(payload, sort_keys=False))
         except Exception as ex:
             _logger.exception(ex, 'Unable to bulk update statistics')
@@ -90,10 +108,7 @@ class Statistics(object):
             raise ValueError('value must be an integer')
 
         try:
-            payload = PayloadBuilder()\
-                .WHERE(["key", "=", key])\
-                .EXPR(["value", "+", value_increment])\
-                .payload()
+            payload = _INCREMENT_TEMPLATE.payload(key=key, increment=value_increment)
             await self._storage.update_tbl("statistics", payload)
         except Exception as ex:
             msg = 'Unable to update statistics value based on statistics_key {} and value_increment {}'.format(
@@ -113,10 +128,7 @@ class Statistics(object):
         for key, value_increment in sensor_stat_dict.items():
             # Try updating the statistics value for given key
             try:
-                payload = PayloadBuilder() \
-                    .WHERE(["key", "=", key]) \
-                    .EXPR(["value", "+", value_increment]) \
-                    .payload()
+                payload = _INCREMENT_TEMPLATE.payload(key=key, increment=value_increment)
                 result = await self._storage.update_tbl("statistics", payload)
                 if result["response"] != "updated":
                     raise KeyError
@@ -130,6 +142,120 @@ class Statistics(object):
                 _logger.exception(ex, msg)
                 raise
 
+    def add(self, key, value_increment=1, description=None):
+        """ Accumulate an increment of a statistics value, written to storage by the next flush
+
+        Args:
+            key: statistics key value (required)
+            value_increment: amount to increment the value by
+            description: description the key is registered with by the next flush if it is not registered yet
+
+        Returns:
+            None
+        """
+        if not isinstance(key, str):
+            raise TypeError('key must be a string')
+
+        if not isinstance(value_increment, int):
+            raise ValueError('value must be an integer')
+
+        if description is not None and key not in self._new_keys and \
+                (self._registered_keys is None or key not in self._registered_keys):
+            self._new_keys[key] = description
+        self._pending[key] = self._pending.get(key, 0) + value_increment
+
+    async def flush(self):
+        """ Register the new keys and write the accumulated increments with one bulk update
+
+        Increments and keys which could not be written are kept for the next flush.
+
+        Returns:
+            None
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if self._new_keys:
+                new_keys, self._new_keys = self._new_keys, {}
+                try:
+                    await self.register_many(new_keys)
+                except Exception:
+                    new_keys.update(self._new_keys)
+                    self._new_keys = new_keys
+                    raise
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            try:
+                await self.update_bulk(pending)
+            except Exception:
+                for key, value_increment in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + value_increment
+                raise
+
+    def start(self, interval=FLUSH_INTERVAL):
+        """ Flush the accumulated statistics every interval seconds until stop() """
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_periodically(interval))
+
+    async def stop(self):
+        """ Stop the periodic flush and write the statistics accumulated since the last one """
+        task, self._flush_task = self._flush_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.flush()
+        finally:
+            self._flush_lock = None
+
+    async def _flush_periodically(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # A flush is completed even when stop() cancels the wait for it
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                _logger.exception(ex, 'Unable to flush statistics')
+
+    async def register_many(self, keys):
+        """ Register with one insert those of the given statistics keys that are not registered yet
+
+        Args:
+            keys: dict of statistics keys and their descriptions
+
+        Returns:
+            None
+        """
+        if not self._registered_keys:
+            await self._load_keys()
+        new_keys = {k: v for k, v in keys.items() if k not in self._registered_keys}
+        if not new_keys:
+            return
+        try:
+            await self._insert_keys(new_keys)
+        except Exception:
+            """ Some of the keys may have been created by another process, reload keys and insert the others """
+            await self._load_keys()
+            new_keys = {k: v for k, v in new_keys.items() if k not in self._registered_keys}
+            if not new_keys:
+                return
+            try:
+                await self._insert_keys(new_keys)
+            except Exception as ex:
+                _logger.exception(ex, 'Unable to create new statistics keys {}'.format(', '.join(new_keys)))
+                raise
+
+    async def _insert_keys(self, keys):
+        payload = {"inserts": [{"key": k, "description": v, "value": 0, "previous_value": 0} for k, v in keys.items()]}
+        await self._storage.insert_into_tbl("statistics", json.dumps(payload, sort_keys=False))
+        self._registered_keys.update(keys)
+
     async def register(self, key, description):
         if key in self._registered_keys:
             return
@@ -138,7 +264,7 @@ class Statistics(object):
         try:
             payload = PayloadBuilder().INSERT(key=key, description=description, value=0, previous_value=0).payload()
             await self._storage.insert_into_tbl("statistics", payload)
-            self._registered_keys.append(key)
+            self._registered_keys.add(key)
         except Exception as ex:
             """ The error may be because the key has been created in another process, reload keys """
             await self._load_keys()
@@ -147,11 +273,11 @@ class Statistics(object):
                 raise
 
     async def _load_keys(self):
-        self._registered_keys = []
+        self._registered_keys = set()
         try:
             payload = PayloadBuilder().SELECT("key").payload()
             results = await self._storage.query_tbl_with_payload('statistics', payload)
             for row in results['rows']:
-                self._registered_keys.append(row['key'])
+                self._registered_keys.add(row['key'])
         except Exception as ex:
             _logger.exception(ex, 'Failed to retrieve statistics keys')
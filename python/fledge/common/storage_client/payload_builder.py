@@ -35,11 +35,9 @@ class PayloadBuilder(object):
     '''
     # TODO: Add tests
 
-    query_payload = None
-
-    def __init__(self, initial_payload=OrderedDict()):
-        # TODO: Investigate why simple "self.__class__.query_payload = initial_payload" is not working
-        self.__class__.query_payload = initial_payload if len(initial_payload) else OrderedDict()
+    def __init__(self, initial_payload=None):
+        # Each builder owns its payload, so concurrently built queries can not leak clauses into each other
+        self.query_payload = initial_payload if initial_payload else OrderedDict()
 
     @staticmethod
     def verify_select(arg):
@@ -119,8 +117,7 @@ class PayloadBuilder(object):
             return False
         return True
 
-    @classmethod
-    def add_clause_to_select(cls, clause, qp_list, col, clause_value):
+    def add_clause_to_select(self, clause, qp_list, col, clause_value):
         for i, item in enumerate(qp_list):
             if isinstance(item, str):
                 if item == col:
@@ -143,8 +140,7 @@ class PayloadBuilder(object):
                 elif 'column' in qp_list[i] and qp_list[i]['column'] == col:
                     qp_list[i][clause] = clause_value
 
-    @classmethod
-    def add_clause_to_aggregate(cls, clause, qp_list, col, opr, clause_value):
+    def add_clause_to_aggregate(self, clause, qp_list, col, opr, clause_value):
         if isinstance(qp_list, dict):
             if 'json' in qp_list:
                 if qp_list['json']['column'] == col and qp_list['operation'] == opr:
@@ -161,23 +157,21 @@ class PayloadBuilder(object):
                     elif qp_list[i]['column'] == col and qp_list[i]['operation'] == opr:
                         qp_list[i][clause] = clause_value
 
-    @classmethod
-    def add_clause_to_group(cls, clause, qp, col, clause_value):
+    def add_clause_to_group(self, clause, qp, col, clause_value):
         item = qp['group']
-        if cls.is_json(item) is False and isinstance(item, str):
+        if self.is_json(item) is False and isinstance(item, str):
             if item == col:
                 with_clause = OrderedDict()
                 with_clause['column'] = item
                 with_clause[clause] = clause_value
                 qp['group'] = with_clause
-        if isinstance(item, dict) or cls.is_json(item) is True:
+        if isinstance(item, dict) or self.is_json(item) is True:
             my_item = json.loads(item) if isinstance(item, dict) is False else item
             if 'column' in my_item and my_item['column'] == col:
                 my_item[clause] = clause_value
             qp['group'] = my_item
 
-    @classmethod
-    def _add_clause(cls, clause, main_key, args):
+    def _add_clause(self, clause, main_key, args):
         """
         Adds "alias" and "format" clauses to columns in payload info. Currently, adding clauses is supported at two
         actions only - SELECT and AGGREGATE.
@@ -190,29 +184,28 @@ class PayloadBuilder(object):
         :return:
         """
         if clause not in ['alias', 'format', 'group']:
-            return cls
+            return self
 
         if main_key in ['return', 'aggregate', 'group']:
             for arg in args:
-                if cls.verify_alias(arg):
+                if self.verify_alias(arg):
                     if main_key == 'return':
                         col = arg[0]
                         alias = arg[1]
-                        cls.add_clause_to_select(clause, cls.query_payload[main_key], col, alias)
+                        self.add_clause_to_select(clause, self.query_payload[main_key], col, alias)
                     if main_key == 'aggregate':
                         col = arg[0]
                         opr = arg[1]
                         alias = arg[2]
-                        cls.add_clause_to_aggregate(clause, cls.query_payload[main_key], col, opr, alias)
+                        self.add_clause_to_aggregate(clause, self.query_payload[main_key], col, opr, alias)
                     if main_key == 'group':
                         col = arg[0]
                         alias = arg[1]
-                        cls.add_clause_to_group(clause, cls.query_payload, col, alias)
+                        self.add_clause_to_group(clause, self.query_payload, col, alias)
 
-        return cls
+        return self
 
-    @classmethod
-    def ALIAS(cls, main_key, *args):
+    def ALIAS(self, main_key, *args):
         """
         Adds "alias" to columns in payload info. Currently, adding clauses is supported at two
         actions only - SELECT and AGGREGATE.
@@ -278,10 +271,9 @@ class PayloadBuilder(object):
               ]
             }
         """
-        return cls._add_clause('alias', main_key, args)
+        return self._add_clause('alias', main_key, args)
 
-    @classmethod
-    def FORMAT(cls, main_key, *args):
+    def FORMAT(self, main_key, *args):
         """
         Adds "format" to columns in payload info. Currently, adding clauses is supported at two
         actions only - SELECT and AGGREGATE.
@@ -296,10 +288,9 @@ class PayloadBuilder(object):
             FORMAT('return', ('user_ts', "YYYY-MM-DD HH24:MI:SS.MS")).payload() returns
             {"return": ["reading", {"format": "YYYY-MM-DD HH24:MI:SS.MS", "column": "user_ts", "alias": "timestamp"}]}
         """
-        return cls._add_clause('format', main_key, args)
+        return self._add_clause('format', main_key, args)
 
-    @classmethod
-    def SELECT(cls, *args):
+    def SELECT(self, *args):
         """
         Forms a json to return a list of columns.
 
@@ -307,97 +298,87 @@ class PayloadBuilder(object):
         :return:
         """
         for arg in args:
-            if cls.verify_select(arg):
-                if 'return' not in cls.query_payload:
-                    cls.query_payload["return"] = list()
+            if self.verify_select(arg):
+                if 'return' not in self.query_payload:
+                    self.query_payload["return"] = list()
                 if isinstance(arg, tuple):
                     for a in arg:
                         if isinstance(a, list):
                             select = {"json": {'column': a[0], 'properties': a[1]}}
                         elif isinstance(a, str):
-                            select = json.loads(a) if cls.is_json(a) else a
+                            select = json.loads(a) if self.is_json(a) else a
                         else:
                             continue
-                        cls.query_payload["return"].append(select)
+                        self.query_payload["return"].append(select)
                 else:
                     if isinstance(arg, list):
                         select = {"json": {'column': arg[0], 'properties': arg[1]}}
                     elif isinstance(arg, str):
-                        select = json.loads(arg) if cls.is_json(arg) else arg
+                        select = json.loads(arg) if self.is_json(arg) else arg
                     else:
                         continue
-                    cls.query_payload["return"].append(select)
-        return cls
+                    self.query_payload["return"].append(select)
+        return self
 
-    @classmethod
-    def FROM(cls, tbl_name):
-        cls.query_payload["table"] = tbl_name
-        return cls
+    def FROM(self, tbl_name):
+        self.query_payload["table"] = tbl_name
+        return self
 
-    @classmethod
-    def DISTINCT(cls, cols):
+    def DISTINCT(self, cols):
         if cols is None:
-            return cls
+            return self
         if not isinstance(cols, list):
-            return cls
+            return self
         if len(cols) == 0:
-            return cls
-        cls.query_payload["modifier"] = "distinct"
-        cls.query_payload["return"] = cols
-        return cls
+            return self
+        self.query_payload["modifier"] = "distinct"
+        self.query_payload["return"] = cols
+        return self
 
-    @classmethod
-    def MODIFIER(cls, arg):
+    def MODIFIER(self, arg):
         if arg is None:
-            return cls
+            return self
         if not isinstance(arg, list):
-            return cls
+            return self
         if len(arg) == 0:
-            return cls
-        cls.query_payload["modifier"] = arg
-        return cls
+            return self
+        self.query_payload["modifier"] = arg
+        return self
 
-    @classmethod
-    def UPDATE_TABLE(cls, tbl_name):
-        return cls.FROM(tbl_name)
+    def UPDATE_TABLE(self, tbl_name):
+        return self.FROM(tbl_name)
 
-    @classmethod
-    def COLS(cls, kwargs):
+    def COLS(self, kwargs):
         values = OrderedDict()
         for key, value in kwargs.items():
             values[key] = value
         return values
 
-    @classmethod
-    def SET(cls, **kwargs):
-        if 'values' in cls.query_payload:
-            cls.query_payload["values"].update(cls.COLS(kwargs))
+    def SET(self, **kwargs):
+        if 'values' in self.query_payload:
+            self.query_payload["values"].update(self.COLS(kwargs))
         else:
-            cls.query_payload["values"] = cls.COLS(kwargs)
-        return cls
+            self.query_payload["values"] = self.COLS(kwargs)
+        return self
 
-    @classmethod
-    def INSERT(cls, **kwargs):
-        cls.query_payload.update(cls.COLS(kwargs))
-        return cls
+    def INSERT(self, **kwargs):
+        self.query_payload.update(self.COLS(kwargs))
+        return self
 
-    @classmethod
-    def INSERT_INTO(cls, tbl_name):
-        return cls.FROM(tbl_name)
+    def INSERT_INTO(self, tbl_name):
+        return self.FROM(tbl_name)
 
-    @classmethod
-    def DELETE(cls, tbl_name):
-        return cls.FROM(tbl_name)
+    def DELETE(self, tbl_name):
+        return self.FROM(tbl_name)
 
-    @classmethod
-    def add_new_clause(cls, and_or, main, new):
+    def add_new_clause(self, and_or, main, new):
         """
-        Recursively searches for the innermost and/or block, or cls.query_payload["where"] if none, in "main" to add
+        Recursively searches for the innermost and/or block, or self.query_payload["where"] if none, in "main" to add
         the 'new' condition block under "and_or" key.
 
         Args:
             and_or: one of 'and', 'or'
-            main: Dict (cls.query_payload["where"] or the innermost and/or subset of it) where
+            main: Dict (self.query_payload["where"] or the innermost and/or subset of it) where
                   the new condition block is to be added
             new: condition block to be added
 
@@ -407,72 +388,67 @@ class PayloadBuilder(object):
             if 'or' not in main:
                 main[and_or] = new
             else:
-                cls.add_new_clause(and_or, main['or'], new)
+                self.add_new_clause(and_or, main['or'], new)
         else:
-            cls.add_new_clause(and_or, main['and'], new)
+            self.add_new_clause(and_or, main['and'], new)
 
-    @classmethod
-    def WHERE(cls, arg, *args):
+    def WHERE(self, arg, *args):
         # Pass multiple arguments in a single tuple also. Useful when called from external process i.e. api, test.
         args = (arg,) + args if not isinstance(arg, tuple) else arg
         for arg in args:
             condition = OrderedDict()
-            if cls.verify_condition(arg):
+            if self.verify_condition(arg):
                 condition["column"] = arg[0]
                 condition["condition"] = arg[1]
                 # Note: append value KV pair only if 3 argument supplied
                 if len(arg) == 3:
                     condition["value"] = arg[2]
-                if 'where' not in cls.query_payload:
-                    cls.query_payload["where"] = condition
+                if 'where' not in self.query_payload:
+                    self.query_payload["where"] = condition
                 else:
-                    cls.add_new_clause('and', cls.query_payload['where'], condition)
-        return cls
+                    self.add_new_clause('and', self.query_payload['where'], condition)
+        return self
 
-    @classmethod
-    def AND_WHERE(cls, arg, *args):
+    def AND_WHERE(self, arg, *args):
         # Pass multiple arguments in a single tuple also. Useful when called from external process i.e. api, test.
         args = (arg,) + args if not isinstance(arg, tuple) else arg
         for arg in args:
             condition = OrderedDict()
-            if cls.verify_condition(arg):
+            if self.verify_condition(arg):
                 condition["column"] = arg[0]
                 condition["condition"] = arg[1]
                 # Note: append value KV pair only if 3 argument supplied
                 if len(arg) == 3:
                     condition["value"] = arg[2]
-                if 'where' not in cls.query_payload:
-                    cls.query_payload["where"] = condition
+                if 'where' not in self.query_payload:
+                    self.query_payload["where"] = condition
                 else:
-                    cls.add_new_clause('and', cls.query_payload['where'], condition)
-        return cls
+                    self.add_new_clause('and', self.query_payload['where'], condition)
+        return self
 
-    @classmethod
-    def OR_WHERE(cls, arg, *args):
+    def OR_WHERE(self, arg, *args):
         # Pass multiple arguments in a single tuple also. Useful when called from external process i.e. api, test.
         args = (arg,) + args if not isinstance(arg, tuple) else arg
         for arg in args:
             condition = OrderedDict()
-            if cls.verify_condition(arg):
+            if self.verify_condition(arg):
                 condition["column"] = arg[0]
                 condition["condition"] = arg[1]
                 # Note: append value KV pair only if 3 argument supplied
                 if len(arg) == 3:
                     condition["value"] = arg[2]
-                if 'where' not in cls.query_payload:
-                    cls.query_payload["where"] = condition
+                if 'where' not in self.query_payload:
+                    self.query_payload["where"] = condition
                 else:
-                    cls.add_new_clause('or', cls.query_payload['where'], condition)
-        return cls
+                    self.add_new_clause('or', self.query_payload['where'], condition)
+        return self
 
-    @classmethod
-    def GROUP_BY(cls, *args):
+    def GROUP_BY(self, *args):
         # TODO: Add dict format for args
-        cls.query_payload["group"] = ', '.join(args)
-        return cls
+        self.query_payload["group"] = ', '.join(args)
+        return self
 
-    @classmethod
-    def JOIN(cls, *args):
+    def JOIN(self, *args):
         """
         Class method for JOIN. Use like this 1. PayloadBuilder().JOIN("table_name", "column_name")
                                         or   2. PayloadBuilder().JOIN("table_name").
@@ -507,11 +483,10 @@ class PayloadBuilder(object):
         else:
             raise Exception("Expected at least table name with JOIN clause.")
 
-        cls.query_payload["join"] = table_dict
-        return cls
+        self.query_payload["join"] = table_dict
+        return self
 
-    @classmethod
-    def ON(cls, *args):
+    def ON(self, *args):
         """
             Class method for ON. Use like this PayloadBuilder().JOIN("table_name", "column_name").\
                                                                 ON("column_name")
@@ -522,21 +497,20 @@ class PayloadBuilder(object):
             Returns:
                 The object of payload builder class.
         """
-        if "join" not in cls.query_payload:
+        if "join" not in self.query_payload:
             raise Exception("ON Clause used without using JOIN first.")
 
         if len(args) != 1:
             raise Exception("Expected column name with ON clause.")
 
         col_name = args[0]
-        cls.query_payload["join"]["on"] = col_name
-        return cls
+        self.query_payload["join"]["on"] = col_name
+        return self
 
-    @classmethod
-    def QUERY(cls, *args):
+    def QUERY(self, *args):
         """
              Class method for QUERY. Used only with JOIN and ON.
-             Inserts a query payload inside cls.query_payload['join']['query.']
+             Inserts a query payload inside self.query_payload['join']['query.']
              Usage
               1. First make a query payload like this
               qp = PayloadBuilder().SELECT(("name", "id")) \
@@ -573,10 +547,10 @@ class PayloadBuilder(object):
                 The object of payload builder class.
         """
 
-        if "join" not in cls.query_payload:
+        if "join" not in self.query_payload:
             raise Exception("Query used without JOIN clause.")
 
-        if 'on' not in cls.query_payload['join']:
+        if 'on' not in self.query_payload['join']:
             raise Exception("Query used without ON clause.")
 
         if len(args) != 1:
@@ -586,17 +560,16 @@ class PayloadBuilder(object):
         if not isinstance(payload, OrderedDict):
             raise Exception("The query payload parameter must be an OrderedDict.")
 
-        if 'query' in cls.query_payload['join']:
+        if 'query' in self.query_payload['join']:
             # Used when we have to perform only one join.
-            cls.query_payload['join']['query'].update(payload)
+            self.query_payload['join']['query'].update(payload)
         else:
             # Used when we have to perform nested join.
             # This will update the already existent query field.
-            cls.query_payload['join']['query'] = payload
-        return cls
+            self.query_payload['join']['query'] = payload
+        return self
 
-    @classmethod
-    def AGGREGATE(cls, arg, *args):
+    def AGGREGATE(self, arg, *args):
         """
         Forms a json to return a dict (for a single col) or a list of dicts required in an aggregate clause.
 
@@ -619,7 +592,7 @@ class PayloadBuilder(object):
         args = (arg,) + args if not isinstance(arg, tuple) else arg
         for arg in args:
             aggregate = OrderedDict()
-            if cls.verify_aggregation(arg):
+            if self.verify_aggregation(arg):
                 aggregate["operation"] = arg[0]
                 if len(arg) >= 2:
                     if isinstance(arg[1], list):
@@ -628,51 +601,46 @@ class PayloadBuilder(object):
                         aggregate["column"] = arg[1]
                     else:
                         continue
-                if 'aggregate' in cls.query_payload:
-                    if not isinstance(cls.query_payload['aggregate'], list):
-                        cls.query_payload['aggregate'] = [cls.query_payload.get('aggregate')]
-                    cls.query_payload['aggregate'].append(aggregate)
+                if 'aggregate' in self.query_payload:
+                    if not isinstance(self.query_payload['aggregate'], list):
+                        self.query_payload['aggregate'] = [self.query_payload.get('aggregate')]
+                    self.query_payload['aggregate'].append(aggregate)
                 else:
-                    cls.query_payload["aggregate"] = aggregate
-        return cls
+                    self.query_payload["aggregate"] = aggregate
+        return self
 
-    @classmethod
-    def HAVING(cls):
+    def HAVING(self):
         raise NotImplementedError("To be implemented")
 
-    @classmethod
-    def LIMIT(cls, arg):
+    def LIMIT(self, arg):
         if isinstance(arg, numbers.Real):
-            cls.query_payload["limit"] = arg
-        return cls
+            self.query_payload["limit"] = arg
+        return self
 
-    @classmethod
-    def OFFSET(cls, arg):
+    def OFFSET(self, arg):
         if isinstance(arg, numbers.Real):
-            cls.query_payload["skip"] = arg
-        return cls
+            self.query_payload["skip"] = arg
+        return self
 
     SKIP = OFFSET
 
-    @classmethod
-    def ORDER_BY(cls, arg, *args):
+    def ORDER_BY(self, arg, *args):
         # Pass multiple arguments in a single tuple also. Useful when called from external process i.e. api, test.
         args = (arg,) + args if not isinstance(arg, tuple) else arg
         for arg in args:
             sort = OrderedDict()
-            if cls.verify_orderby(arg):
+            if self.verify_orderby(arg):
                 sort["column"] = arg[0]
                 sort["direction"] = arg[1]
-                if 'sort' in cls.query_payload:
-                    if not isinstance(cls.query_payload['sort'], list):
-                        cls.query_payload['sort'] = [cls.query_payload.get('sort')]
-                    cls.query_payload['sort'].append(sort)
+                if 'sort' in self.query_payload:
+                    if not isinstance(self.query_payload['sort'], list):
+                        self.query_payload['sort'] = [self.query_payload.get('sort')]
+                    self.query_payload['sort'].append(sort)
                 else:
-                    cls.query_payload["sort"] = sort
-        return cls
+                    self.query_payload["sort"] = sort
+        return self
 
-    @classmethod
-    def EXPR(cls, arg, *args):
+    def EXPR(self, arg, *args):
         args = (arg,) + args if not isinstance(arg, tuple) else arg
 
         for arg in args:
@@ -681,14 +649,13 @@ class PayloadBuilder(object):
             expr["operator"] = arg[1]
             expr["value"] = arg[2]
 
-            if 'expressions' in cls.query_payload:
-                cls.query_payload['expressions'].append(expr)
+            if 'expressions' in self.query_payload:
+                self.query_payload['expressions'].append(expr)
             else:
-                cls.query_payload['expressions'] = [expr]
-        return cls
+                self.query_payload['expressions'] = [expr]
+        return self
 
-    @classmethod
-    def JSON_PROPERTY(cls, *args):
+    def JSON_PROPERTY(self, *args):
         """
         Forms a json to return a list of dicts required in a json_properties clause.
 
@@ -711,20 +678,19 @@ class PayloadBuilder(object):
         # Pass multiple arguments in a single tuple also. Useful when called from external process i.e. api, test.
         for arg in args:
             json_property = OrderedDict()
-            if cls.verify_json_property(arg):
+            if self.verify_json_property(arg):
                 json_property["column"] = arg[0]
                 json_property["path"] = arg[1]
                 json_property["value"] = arg[2]
-                if 'json_properties' in cls.query_payload:
-                    if not isinstance(cls.query_payload['json_properties'], list):
-                        cls.query_payload['json_properties'] = [cls.query_payload.get('json_properties')]
-                    cls.query_payload['json_properties'].append(json_property)
+                if 'json_properties' in self.query_payload:
+                    if not isinstance(self.query_payload['json_properties'], list):
+                        self.query_payload['json_properties'] = [self.query_payload.get('json_properties')]
+                    self.query_payload['json_properties'].append(json_property)
                 else:
-                    cls.query_payload["json_properties"] = [json_property]
-        return cls
+                    self.query_payload["json_properties"] = [json_property]
+        return self
 
-    @classmethod
-    def TIMEBUCKET(cls, timestamp, size="1", fmt=None, alias=None):
+    def TIMEBUCKET(self, timestamp, size="1", fmt=None, alias=None):
         """
         Forms a json to return a dict of timebucket col
 
@@ -763,27 +729,94 @@ class PayloadBuilder(object):
             timebucket["format"] = fmt
         if alias is not None:
             timebucket["alias"] = alias
-        cls.query_payload["timebucket"] = timebucket
+        self.query_payload["timebucket"] = timebucket
 
-        return cls
+        return self
 
-    @classmethod
-    def payload(cls):
-        return json.dumps(cls.query_payload, sort_keys=False)
+    def payload(self):
+        return json.dumps(self.query_payload, sort_keys=False)
 
-    @classmethod
-    def chain_payload(cls):
+    def chain_payload(self):
         """
         Sometimes, we may want to create payload incremently, based upon some conditions, this method will come
         handy in such Use cases.
         """
-        return cls.query_payload
+        return self.query_payload
+
+    def template(self):
+        """
+        Compiles the payload built so far into a PayloadTemplate, for queries that are issued many times with only
+        a few values changing, e.g. one bulk update item per statistics key.
 
-    @classmethod
-    def query_params(cls):
-        where = cls.query_payload['where']
+        :example:
+        t = PayloadBuilder().WHERE(["key", "=", Param("key")]).EXPR(["value", "+", Param("increment")]).template()
+        t.bind(key="READINGS", increment=10) returns
+            {"where": {"column": "key", "condition": "=", "value": "READINGS"},
+             "expressions": [{"column": "value", "operator": "+", "value": 10}]}
+        """
+        return PayloadTemplate(self.query_payload)
+
+    def query_params(self):
+        where = self.query_payload['where']
         query_params = OrderedDict({where['column']: where['value']})
         for key, value in where.items():
             if key == 'and':
                 query_params.update({value['column']: value['value']})
         return urllib.parse.urlencode(query_params)
+
+
+class Param(object):
+    """ Named placeholder for a value that is bound later in a PayloadTemplate """
+
+    __slots__ = ['name']
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "Param({!r})".format(self.name)
+
+
+class PayloadTemplate(object):
+    """ Payload built once by PayloadBuilder whose Param placeholders are bound for every row
+
+    Only the dicts and lists holding a Param are rebuilt on bind, the rest of the payload is shared by all bound
+    payloads; therefore a bound payload must not be modified in place.
+    """
+
+    def __init__(self, query_payload):
+        self._params = set()
+        bind = self._compile(query_payload)
+        self._bind = bind if bind is not None else (lambda values: query_payload)
+
+    @property
+    def params(self):
+        """ Names of the Param placeholders in the template """
+        return frozenset(self._params)
+
+    def _compile(self, node):
+        """ Returns a function building node from bound values, or None when node holds no Param """
+        if isinstance(node, Param):
+            name = node.name
+            self._params.add(name)
+            return lambda values: values[name]
+        if isinstance(node, dict):
+            items = [(key, value, self._compile(value)) for key, value in node.items()]
+            if all(fn is None for _, _, fn in items):
+                return None
+            return lambda values: {key: value if fn is None else fn(values) for key, value, fn in items}
+        if isinstance(node, list):
+            items = [(value, self._compile(value)) for value in node]
+            if all(fn is None for _, fn in items):
+                return None
+            return lambda values: [value if fn is None else fn(values) for value, fn in items]
+        return None
+
+    def bind(self, **values):
+        """ Returns the payload dict with values bound; raises KeyError if a Param value is missing.
+            Useful to append items to a bulk payload without a json round trip.
+        """
+        return self._bind(values)
+
+    def payload(self, **values):
+        return json.dumps(self._bind(values), sort_keys=False)
@@ -527,6 +527,44 @@ class ReadingsStorageClientAsync(StorageClientAsync):
 
         return jdoc
 
+    async def register_interest(self, asset, url):
+        """ Register interest in the readings appended for an asset, the storage service posts a copy of them to url
+
+        :param asset: asset code or * for all assets
+        :param url: callback URL
+        :return:
+        :Example:
+            curl -X POST http://0.0.0.0:8080/storage/reading/interest/* -d '{"url": "http://0.0.0.0:8081/cb"}'
+        """
+        return await self._interest('POST', asset, url)
+
+    async def unregister_interest(self, asset, url):
+        """ Unregister the interest in readings of an asset registered with the given url
+
+        :Example:
+            curl -X DELETE http://0.0.0.0:8080/storage/reading/interest/* -d '{"url": "http://0.0.0.0:8081/cb"}'
+        """
+        return await self._interest('DELETE', asset, url)
+
+    async def _interest(self, method, asset, url):
+        if not asset:
+            raise ValueError("Asset code is missing")
+        if not url:
+            raise ValueError("Callback URL is missing")
+        import urllib.parse
+        # The storage route only accepts * unescaped
+        interest_url = '/storage/reading/interest/{}'.format(urllib.parse.quote(asset, safe='*'))
+        payload = json.dumps({"url": url})
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method, 'http://' + self._base_url + interest_url, data=payload) as resp:
+                status_code = resp.status
+                jdoc = await resp.json(content_type=None)
+                if status_code not in range(200, 209):
+                    _LOGGER.error("%s url %s with payload: %s, Error code: %d, reason: %s, details: %s", method,
+                                  interest_url, payload, resp.status, resp.reason, jdoc)
+                    raise StorageServerError(code=resp.status, reason=resp.reason, error=jdoc)
+        return jdoc
+
     async def purge(self, age=None, sent_id=0, size=None, flag=None, asset=None):
         """ Purge readings based on the age of the readings
 
@@ -8,6 +8,8 @@
 
 import functools
 import datetime
+import re
+import time
 
 __author__ = "Amarendra K Sinha"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -16,6 +18,10 @@ __version__ = "${VERSION}"
 
 import sys
 
+_DT_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+# The minutes of the offset are optional, as in the timestamptz text of Postgres e.g. +00
+_TZ_SUFFIX = re.compile(r'(Z|[+-]\d\d(:?\d\d)?)$')
+
 
 def check_reserved(string):
     """
@@ -69,6 +75,33 @@ def local_timestamp():
     return str(datetime.datetime.now(datetime.timezone.utc).astimezone())
 
 
+def utc_timestamp(ts: str) -> str:
+    """ Timestamp in the form the readings plugins return user_ts, i.e. UTC as
+    YYYY-MM-DD HH:MM:SS.ffffff without offset. Returns None if it can not be parsed.
+    """
+    if not isinstance(ts, str):
+        return None
+    ts = ts.strip().replace('T', ' ', 1)
+    offset = None
+    match = _TZ_SUFFIX.search(ts)
+    if match:
+        suffix = match.group(1)
+        ts = ts[:match.start()]
+        if suffix != 'Z':
+            sign = -1 if suffix[0] == '-' else 1
+            digits = suffix[1:].replace(':', '')
+            offset = sign * datetime.timedelta(hours=int(digits[:2]), minutes=int(digits[2:] or 0))
+    if '.' not in ts:
+        ts += '.0'
+    try:
+        dt = datetime.datetime.strptime(ts, _DT_FORMAT)
+    except ValueError:
+        return None
+    if offset:
+        dt -= offset
+    return dt.strftime(_DT_FORMAT)
+
+
 def add_functions_as_methods(functions):
     """ add_functions_as_methods - add the given functions to a class (to allow multi-file definition) 
         Type: class decorator
@@ -149,6 +182,31 @@ def make_async(fn):
     return wrapper
 
 
+def ttl_cache(seconds):
+    """ Like functools.lru_cache but every cached result expires after given seconds
+
+    The wrapped function exposes cache_clear() to drop the cached results before they expire.
+    """
+    def decorator(fn):
+        cache = {}
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            hit = cache.get(key)
+            if hit is not None and hit[0] > now:
+                return hit[1]
+            result = fn(*args, **kwargs)
+            cache[key] = (now + seconds, result)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
 def dict_difference(dict1, dict2):
     """ Compare two dictionaries and return their difference """
     diff = {}
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Persistent index of C plugin capabilities"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fledge.common.common import _FLEDGE_ROOT, _FLEDGE_DATA
+from fledge.common.logger import FLCoreLogger
+from fledge.services.core.api import utils as api_utils
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = FLCoreLogger().get_logger(__name__)
+
+_INDEX_FILE = "{}/etc/plugin_index.json".format(_FLEDGE_DATA if _FLEDGE_DATA else _FLEDGE_ROOT + '/data')
+_PLUGIN_TYPES = ["south", "north", "filter", "notificationDelivery", "notificationRule"]
+_INFO_KEYS = ("name", "version", "type", "interface", "flag")
+_MAX_WORKERS = 8
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class PluginIndex:
+    """ Flags, versions and types of installed C plugins, keyed by plugin type and library name
+
+    The index is held in memory and mirrored to a JSON file in the data directory, so it survives a restart
+    and can be invalidated by the package install, update and remove processes. Lookups are answered from memory;
+    a rescan only stats the libraries and runs get_plugin_info, in parallel, for the ones that are new or changed.
+    """
+
+    _lock = threading.Lock()
+    _plugins = None
+    """ {plugin_type: {library name: {name, version, type, interface, flag, path, mtime, size}}} """
+    _stale = set()
+    """ plugin types to be rescanned on next lookup, shared across processes through the index file """
+    _verified = set()
+    """ plugin types rescanned by this process """
+    _stamp = None
+
+    @classmethod
+    def get(cls, plugin_type: str) -> dict:
+        """ Return the index entries of the given plugin type """
+        with cls._lock:
+            cls._load()
+            if plugin_type not in cls._verified or plugin_type in cls._stale:
+                cls._scan(plugin_type)
+            return dict(cls._plugins.get(plugin_type, {}))
+
+    @classmethod
+    def invalidate(cls, plugin_type: str = None) -> None:
+        """ Mark a plugin type, or all of them, to be rescanned on next lookup """
+        with cls._lock:
+            cls._load()
+            cls._stale.update([plugin_type] if plugin_type else _PLUGIN_TYPES)
+            cls._save()
+
+    @classmethod
+    def _load(cls) -> None:
+        stamp = _file_stamp(_INDEX_FILE)
+        if cls._plugins is not None and stamp == cls._stamp:
+            return
+        plugins = {}
+        stale = set()
+        if stamp is not None:
+            try:
+                with open(_INDEX_FILE, 'r') as fh:
+                    doc = json.load(fh)
+                plugins = doc.get('plugins', {})
+                stale = set(doc.get('stale', []))
+            except (OSError, ValueError, AttributeError) as ex:
+                _logger.warning("Ignoring unreadable plugin index {}: {}".format(_INDEX_FILE, str(ex)))
+        cls._plugins = plugins
+        cls._stale = stale
+        cls._stamp = stamp
+
+    @classmethod
+    def _scan(cls, plugin_type: str) -> None:
+        known = cls._plugins.get(plugin_type, {})
+        entries = {}
+        pending = []
+        for name, path in api_utils.find_c_plugin_lib_paths(plugin_type):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = known.get(name)
+            if entry and entry['path'] == path and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+                entries[name] = entry
+            else:
+                pending.append((name, path, st))
+        if pending:
+            _logger.debug("Fetching plugin info of {} {} plugins".format(len(pending), plugin_type))
+            with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(pending))) as executor:
+                infos = list(executor.map(lambda p: api_utils.get_plugin_info(p[0], dir=plugin_type), pending))
+            for (name, path, st), jdoc in zip(pending, infos):
+                # A failed probe is not recorded, so it is retried on next rescan
+                if jdoc:
+                    entry = {k: jdoc.get(k) for k in _INFO_KEYS}
+                    entry.update({'path': path, 'mtime': st.st_mtime_ns, 'size': st.st_size})
+                    entries[name] = entry
+        changed = entries != known or plugin_type in cls._stale
+        cls._plugins[plugin_type] = entries
+        cls._stale.discard(plugin_type)
+        cls._verified.add(plugin_type)
+        if changed:
+            cls._save()
+
+    @classmethod
+    def _save(cls) -> None:
+        tmp_file = "{}.{}.tmp".format(_INDEX_FILE, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(_INDEX_FILE), exist_ok=True)
+            with open(tmp_file, 'w') as fh:
+                json.dump({'plugins': cls._plugins, 'stale': sorted(cls._stale)}, fh)
+            os.replace(tmp_file, _INDEX_FILE)
+        except OSError as ex:
+            # Keep serving from memory; the index is rebuilt by stat on next start
+            _logger.warning("Failed to save plugin index {}: {}".format(_INDEX_FILE, str(ex)))
+            return
+        cls._stamp = _file_stamp(_INDEX_FILE)
@@ -8,7 +8,7 @@
 
 import datetime
 
-from fledge.services.core.api import utils as api_utils
+from fledge.plugins.common.plugin_index import PluginIndex
 
 __author__ = "Amarendra Kumar Sinha, Ashish Jabble"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -66,12 +66,8 @@ def get_persist_plugins(directory=None):
     if directory is not None:
         supported_persist_dirs = [directory, "filter"]
     for plugin_type in supported_persist_dirs:
-        libs = api_utils.find_c_plugin_libs(plugin_type)
-        for name, _type in libs:
-            if _type == 'binary':
-                jdoc = api_utils.get_plugin_info(name, dir=plugin_type)
-                if jdoc:
-                    if 'flag' in jdoc:
-                        if bit_at_given_position_set_or_unset(jdoc['flag'], PERSIST_DATA_BIT_POSITION):
-                            plugin_list.append(jdoc['name'])
+        for entry in PluginIndex.get(plugin_type).values():
+            if entry['flag'] is not None:
+                if bit_at_given_position_set_or_unset(entry['flag'], PERSIST_DATA_BIT_POSITION):
+                    plugin_list.append(entry['name'])
     return plugin_list
@@ -43,6 +43,9 @@ _MESSAGES_LIST = {
 _CMD_TIMEOUT = " timeout --signal=9  "
 """ Every external commands will be launched using timeout to avoid endless executions """
 
+_PROGRESS_FILE_EXT = ".progress"
+""" Extension of the file reporting the progress of a backup in execution """
+
 _logger = None
 _storage = None
 """" Objects references assigned by the caller """
@@ -152,6 +155,72 @@ def exec_wait_retry(cmd, output_capture=False, exit_code_ok=0, max_retry=3, writ
     return _exit_code, _output
 
 
+def backup_progress_file(backup_file):
+    """ Identifies the file used to report the progress of a backup in execution
+
+    Args:
+        backup_file: backup file name as a full path, as stored in the backups table
+    Returns:
+        full path of the progress file
+    Raises:
+    """
+
+    return backup_file + _PROGRESS_FILE_EXT
+
+
+def write_backup_progress(backup_file, phase, percent, **kwargs):
+    """ Writes the progress of a backup in execution, so that it can be reported by the backup API
+
+    Args:
+        backup_file: backup file name as a full path, as stored in the backups table
+        phase: current phase of the backup i.e. {"copy"|"archive"}
+        percent: completion percentage of the whole backup
+        kwargs: additional details to report, e.g. remaining and total pages of the database copy
+    Returns:
+    Raises:
+    """
+
+    progress = {"phase": phase, "percent": round(percent, 1)}
+    progress.update(kwargs)
+    # Writes a temporary file and renames it, so that a reader never sees a partially written file
+    temp_file = backup_progress_file(backup_file) + ".tmp"
+    with open(temp_file, 'w') as file:
+        json.dump(progress, file)
+    os.replace(temp_file, backup_progress_file(backup_file))
+
+
+def read_backup_progress(backup_file):
+    """ Reads the progress of a backup in execution
+
+    Args:
+        backup_file: backup file name as a full path, as stored in the backups table
+    Returns:
+        progress: dict with the progress information or None if it is not available
+    Raises:
+    """
+
+    try:
+        with open(backup_progress_file(backup_file)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def clear_backup_progress(backup_file):
+    """ Removes the progress information of a backup no longer in execution
+
+    Args:
+        backup_file: backup file name as a full path, as stored in the backups table
+    Returns:
+    Raises:
+    """
+
+    try:
+        os.remove(backup_progress_file(backup_file))
+    except FileNotFoundError:
+        pass
+
+
 def cr_strip(text):
     """
     Args:
@@ -372,6 +441,21 @@ class BackupRestoreLib(object):
             "default": "5",
             "displayName": "Restart Status Check Interval (In Seconds)"
         },
+        "backup-pages-per-step": {
+            "description": "Number of database pages copied in each step of the SQLite online backup",
+            "type": "integer",
+            "default": "1024",
+            "displayName": "SQLite Backup Pages Per Step",
+            "minimum": "1"
+        },
+        "backup-step-sleep": {
+            "description": "Pause in milliseconds between each step of the SQLite online backup, "
+                           "to limit the load on the storage service while the backup is running",
+            "type": "integer",
+            "default": "10",
+            "displayName": "SQLite Backup Step Pause (In Milliseconds)",
+            "minimum": "0"
+        },
     }
 
     config = {}
@@ -822,6 +906,13 @@ class BackupRestoreLib(object):
         self.config['timeout'] = int(_config_from_manager['timeout']['value'])
         self.config['restart-max-retries'] = int(_config_from_manager['restart-max-retries']['value'])
         self.config['restart-sleep'] = int(_config_from_manager['restart-sleep']['value'])
+        # Items added after the configuration cache file could have been created
+        self.config['backup-pages-per-step'] = int(
+            _config_from_manager['backup-pages-per-step']['value'] if 'backup-pages-per-step' in _config_from_manager
+            else self._CONFIG_DEFAULT['backup-pages-per-step']['default'])
+        self.config['backup-step-sleep'] = int(
+            _config_from_manager['backup-step-sleep']['value'] if 'backup-step-sleep' in _config_from_manager
+            else self._CONFIG_DEFAULT['backup-step-sleep']['default'])
 
     def _retrieve_configuration_from_file(self):
         """" Retrieves the configuration from the local file
@@ -13,11 +13,13 @@ retrieving the parameters for the execution from the local file 'backup_configur
 
 """
 
+import io
 import sys
 import time
 import os
 import asyncio
 import json
+import sqlite3
 import tarfile
 
 from fledge.common.process import FledgeProcess
@@ -73,6 +75,9 @@ class BackupProcess(FledgeProcess):
     _BACKUP_FILE_NAME_PREFIX = "fledge_backup_"
     """ Prefix used to generate a backup file name """
 
+    _COPY_PROGRESS_WEIGHT = 90
+    """ Share of the reported progress percentage taken by the database copy, the remaining by the archive """
+
     _MESSAGES_LIST = {
 
         # Information messages
@@ -204,31 +209,15 @@ class BackupProcess(FledgeProcess):
                                                                                               backup_file_tar))
         self._backup_lib.sl_backup_status_create(backup_file_tar, lib.BackupType.FULL, lib.BackupStatus.RUNNING)
 
-        status, exit_code = self._run_backup_command(backup_file)
-
-        # Create tar file
-        t = tarfile.open(backup_file_tar, "w:gz")
-        t.add(backup_file, arcname=os.path.basename(backup_file))
-        # Add external scripts if any
-        backup_path = self._backup_lib.dir_fledge_data + "/scripts"
-        if os.path.isdir(backup_path):
-            t.add(backup_path, arcname=os.path.basename(backup_path))
-        # Add data/etc directory
-        t.add(self._backup_lib.dir_fledge_data_etc, arcname=os.path.basename(self._backup_lib.dir_fledge_data_etc))
-        # Add software both plugins & services
-        data = {
-            "plugins": PluginDiscovery.get_plugins_installed(),
-            "services": get_service_installed()
-        }
-        temp_software_file = "{}/software.json".format(self._backup_lib.dir_backups)
-        with open(temp_software_file, 'w') as outfile:
-            json.dump(data, outfile, indent=4)
-        t.add(temp_software_file, arcname=os.path.basename(temp_software_file))
-        t.close()
-
-        # Delete the temporary files
-        os.remove(backup_file)
-        os.remove(temp_software_file)
+        try:
+            status, exit_code = self._run_backup_command(backup_file, backup_file_tar)
+            if status == lib.BackupStatus.COMPLETED:
+                self._create_archive(backup_file, backup_file_tar)
+        finally:
+            # Delete the temporary files
+            if os.path.exists(backup_file):
+                os.remove(backup_file)
+            lib.clear_backup_progress(backup_file_tar)
 
         backup_information = self._backup_lib.sl_get_backup_details_from_file_name(backup_file_tar)
 
@@ -244,6 +233,41 @@ class BackupProcess(FledgeProcess):
         else:
             loop.run_until_complete(audit.information('BKEXC', {'status': 'completed'}))
 
+    def _create_archive(self, _backup_file, _backup_file_tar):
+        """ Streams the database copy and the Fledge data files into the compressed archive
+
+        Args:
+            _backup_file: database copy to archive as a full path, it is removed by the caller
+            _backup_file_tar: archive to create as a full path
+        Returns:
+        Raises:
+        """
+
+        self._logger.debug("{func} - file_name |{file}|".format(func="_create_archive", file=_backup_file_tar))
+
+        lib.write_backup_progress(_backup_file_tar, "archive", self._COPY_PROGRESS_WEIGHT)
+        with tarfile.open(_backup_file_tar, "w:gz") as t:
+            t.add(_backup_file, arcname=os.path.basename(_backup_file))
+            lib.write_backup_progress(_backup_file_tar, "archive", 95)
+            # Add external scripts if any
+            backup_path = self._backup_lib.dir_fledge_data + "/scripts"
+            if os.path.isdir(backup_path):
+                t.add(backup_path, arcname=os.path.basename(backup_path))
+            # Add data/etc directory
+            t.add(self._backup_lib.dir_fledge_data_etc,
+                  arcname=os.path.basename(self._backup_lib.dir_fledge_data_etc))
+            # Add software both plugins & services, written directly into the archive
+            data = {
+                "plugins": PluginDiscovery.get_plugins_installed(),
+                "services": get_service_installed()
+            }
+            software = json.dumps(data, indent=4).encode()
+            tar_info = tarfile.TarInfo(name="software.json")
+            tar_info.size = len(software)
+            tar_info.mtime = int(time.time())
+            tar_info.mode = 0o644
+            t.addfile(tar_info, io.BytesIO(software))
+
     def _purge_old_backups(self):
         """  Deletes old backups in relation at the retention parameter
 
@@ -277,11 +301,16 @@ class BackupProcess(FledgeProcess):
                                                                                     file=file_name))
                 asyncio.get_event_loop().run_until_complete(self._backup.delete_backup(backup_id))
 
-    def _run_backup_command(self, _backup_file):
+    def _run_backup_command(self, _backup_file, _backup_file_tar):
         """ Backups the entire Fledge repository into a file in the local file system
 
+        It uses the SQLite online backup API, copying a limited number of pages per step and pausing between steps
+        to limit the load on the storage service. A read transaction is held on the source for the whole copy,
+        so the copy is a consistent snapshot and it is not restarted by the writes of the storage service.
+
         Args:
             _backup_file: backup file to create  as a full path
+            _backup_file_tar: archive the backup is reported for in the progress information
         Returns:
             _status: status of the backup
             _exit_code: exit status of the operation, 0=Successful
@@ -291,38 +320,45 @@ class BackupProcess(FledgeProcess):
         self._logger.debug("{func} - file_name |{file}|".format(func="_run_backup_command",
                                                                 file=_backup_file))
 
-        # Force the checkpoint - WAL mechanism
-        cmd = "{sqlite_cmd} {path}/{db} 'PRAGMA wal_checkpoint(PASSIVE);'".format(
-            sqlite_cmd=self._backup_lib.SQLITE_SQLITE,
-            path=self._backup_lib.dir_fledge_data,
-            db=self._backup_lib.config['database-filename']
-        )
-
-        # noinspection PyArgumentEqualDefault
-        _exit_code, output = lib.exec_wait_retry(cmd,
-                                                 output_capture=True,
-                                                 exit_code_ok=0,
-                                                 max_retry=self._backup_lib.config['max_retry'],
-                                                 timeout=self._backup_lib.config['timeout']
-                                                 )
-
-        # Prepares the backup command
-        cmd = "{sqlite_cmd} {path}/{db} '{backup_cmd} {file}'".format(
-                                                sqlite_cmd=self._backup_lib.SQLITE_SQLITE,
-                                                path=self._backup_lib.dir_fledge_data,
-                                                db=self._backup_lib.config['database-filename'],
-                                                backup_cmd=self._backup_lib.SQLITE_BACKUP,
-                                                file=_backup_file
-        )
-
-        # Executes the backup waiting for the completion and using a retry mechanism
-        # noinspection PyArgumentEqualDefault
-        _exit_code, output = lib.exec_wait_retry(cmd,
-                                                 output_capture=True,
-                                                 exit_code_ok=0,
-                                                 max_retry=self._backup_lib.config['max_retry'],
-                                                 timeout=self._backup_lib.config['timeout']
-                                                 )
+        db_file = "{path}/{db}".format(path=self._backup_lib.dir_fledge_data,
+                                       db=self._backup_lib.config['database-filename'])
+        pages_per_step = self._backup_lib.config['backup-pages-per-step']
+        step_sleep = self._backup_lib.config['backup-step-sleep'] / 1000
+
+        def _progress(status, remaining, total):
+            percent = ((total - remaining) / total) * self._COPY_PROGRESS_WEIGHT if total else 0
+            lib.write_backup_progress(_backup_file_tar, "copy", percent, remaining=remaining, total=total)
+            if remaining and step_sleep:
+                time.sleep(step_sleep)
+
+        _exit_code = 1
+        output = ""
+        # Executes the backup using a retry mechanism
+        for retry in range(1, self._backup_lib.config['max_retry'] + 2):
+            try:
+                source = sqlite3.connect(db_file, timeout=self._backup_lib.config['timeout'])
+                try:
+                    # Holds a read transaction so the pages are copied from a single snapshot
+                    source.execute("BEGIN")
+                    source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+                    target = sqlite3.connect(_backup_file)
+                    try:
+                        source.backup(target, pages=pages_per_step, progress=_progress)
+                    finally:
+                        target.close()
+                    source.rollback()
+                finally:
+                    source.close()
+            except sqlite3.Error as ex:
+                output = str(ex)
+                self._logger.debug("{func} - N retry |{retry}| - message |{msg}| ".format(
+                    func="_run_backup_command", retry=retry, msg=output))
+                if os.path.exists(_backup_file):
+                    os.remove(_backup_file)
+                time.sleep(1)
+            else:
+                _exit_code = 0
+                break
 
         if _exit_code == 0:
             _status = lib.BackupStatus.COMPLETED
@@ -330,11 +366,11 @@ class BackupProcess(FledgeProcess):
             _status = lib.BackupStatus.FAILED
 
         self._logger.debug("{func} - status |{status}| - exit_code |{exit_code}| "
-                           "- cmd |{cmd}|  output |{output}| ".format(
+                           "- db |{db}|  output |{output}| ".format(
                                                                         func="_run_backup_command",
                                                                         status=_status,
                                                                         exit_code=_exit_code,
-                                                                        cmd=cmd,
+                                                                        db=db_file,
                                                                         output=output))
 
         return _status, _exit_code
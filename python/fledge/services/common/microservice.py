@@ -8,7 +8,7 @@
 
 from aiohttp import web
 from fledge.services.common.microservice_management import routes
-from fledge.common import logger
+from fledge.common import logger, startup_profiler
 from fledge.common.process import FledgeProcess
 from fledge.common.web import middleware
 from abc import abstractmethod
@@ -128,3 +128,14 @@ class FledgeMicroservice(FledgeProcess):
         """
         since_started = time.time() - self._start_time
         return web.json_response({'uptime': since_started})
+
+    async def get_startup_profile(self, request):
+        """ import and phase timings of the startup of the microservice, see fledge.common.startup_profiler
+
+        """
+        profile = startup_profiler.report()
+        if profile is None:
+            msg = "Startup profiling is not enabled, set {} to enable it".format(
+                startup_profiler.ENVIRONMENT_VARIABLE)
+            raise web.HTTPNotFound(reason=msg, body=json.dumps({"message": msg}))
+        return web.json_response(profile)
@@ -4,8 +4,6 @@
 # See: http://fledge-iot.readthedocs.io/
 # FLEDGE_END
 
-from fledge.services.core import proxy
-
 __author__ = "Ashish Jabble, Praveen Garg, Ashwin Gopalakrishnan, Massimiliano Pinto"
 __copyright__ = "Copyright (c) 2021 OSIsoft, LLC"
 __license__ = "Apache 2.0"
@@ -24,6 +22,7 @@ def setup(app, obj, is_core=False):
     app.router.add_route('GET', '/fledge/service/ping', obj.ping)
     app.router.add_route('POST', '/fledge/service/shutdown', obj.shutdown)
     app.router.add_route('POST', '/fledge/change', obj.change)
+    app.router.add_route('GET', '/fledge/service/profile', obj.get_startup_profile)
 
     if is_core:
         # Configuration
@@ -56,6 +55,9 @@ def setup(app, obj, is_core=False):
         app.router.add_route('GET', '/fledge/track', obj.get_track)
         app.router.add_route('POST', '/fledge/track', obj.add_track)
 
+        # Latest readings feed from the storage service
+        app.router.add_route('POST', '/fledge/readings/feed', obj.readings_feed)
+
         # Audit Log
         app.router.add_route('POST', '/fledge/audit', obj.add_audit)
 
@@ -78,7 +80,8 @@ def setup(app, obj, is_core=False):
         app.router.add_route('POST', '/fledge/alert', obj.add_alert)
         app.router.add_route('DELETE', '/fledge/alert/{key}', obj.delete_alert)
 
-        # Proxy API setup for a microservice
+        # Proxy API setup for a microservice; imported here as it imports the core server
+        from fledge.services.core import proxy
         proxy.setup(app)
 
         # enable cors support
@@ -8,6 +8,9 @@
 """Core server starter"""
 
 import sys
+from fledge.common import startup_profiler
+# Started before the core server is imported, to time its imports
+startup_profiler.start("core")
 from fledge.services.core.server import Server
 
 __author__ = "Terris Linenbach"
@@ -17,4 +20,5 @@ __version__ = "${VERSION}"
 
 
 is_safe_mode = True if sys.argv[1] == 'safe-mode' else False
+startup_profiler.mark("imports")
 Server().start(is_safe_mode)
@@ -13,7 +13,8 @@ from fledge.common.audit_logger import AuditLogger
 from fledge.common.logger import FLCoreLogger
 from fledge.common.storage_client.exceptions import StorageServerError
 from fledge.common.storage_client.payload_builder import PayloadBuilder
-from fledge.services.core import connect
+from fledge.services.core import connect, server
+from fledge.services.core.asset_tracker.asset_tracker import AssetTrackerRecords
 
 __author__ = "Ashish Jabble"
 __copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
@@ -46,10 +47,29 @@ async def get_asset_tracker_events(request: web.Request) -> web.Response:
             curl -sX GET http://localhost:8081/fledge/track?deprecated=true
             curl -sX GET http://localhost:8081/fledge/track?event=XXX&asset=XXX&service=XXX
     """
-    payload = PayloadBuilder().SELECT("asset", "event", "service", "fledge", "plugin", "ts", "deprecated_ts", "data") \
-        .ALIAS("return", ("ts", 'timestamp')).FORMAT("return", ("ts", "YYYY-MM-DD HH24:MI:SS.MS")) \
-        .ALIAS("return", ("deprecated_ts", 'deprecatedTimestamp')) \
-        .WHERE(['1', '=', 1])
+    asset = urllib.parse.unquote(request.query['asset']) if request.query.get('asset', '') != '' else None
+    event = request.query['event'] if request.query.get('event', '') != '' else None
+    service = urllib.parse.unquote(request.query['service']) if request.query.get('service', '') != '' else None
+    deprecated = request.query.get('deprecated', '').strip().lower() == "true"
+    try:
+        records = await _get_records()
+        response = records.find(asset=asset, event=event, service=service, deprecated=deprecated)
+    except KeyError as err:
+        msg = err.args[0]
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+    except Exception as ex:
+        msg = str(ex)
+        _logger.error(ex, "Failed to get asset tracker events.")
+        raise web.HTTPInternalServerError(reason=msg, body=json.dumps({"message": msg}))
+    else:
+        return web.json_response({'track': response})
+
+
+async def query_asset_tracker_events(request: web.Request) -> web.Response:
+    """ The asset tracker events as in storage, for the services which populate their asset tracker cache from it
+    and then write the table directly
+    """
+    payload = AssetTrackerRecords.select()
     if 'asset' in request.query and request.query['asset'] != '':
         asset = urllib.parse.unquote(request.query['asset'])
         payload.AND_WHERE(['asset', '=', asset])
@@ -80,6 +100,26 @@ async def get_asset_tracker_events(request: web.Request) -> web.Response:
         return web.json_response({'track': response})
 
 
+async def _get_records() -> AssetTrackerRecords:
+    """ The asset tracker records of the core, loaded again when changed or stale """
+    tracker = server.Server._asset_tracker
+    if tracker is None or tracker._registered_asset_records is None:
+        # The core asset tracker is not started
+        records = AssetTrackerRecords()
+    else:
+        records = tracker._registered_asset_records
+    if not records.is_current():
+        await records.load(connect.get_storage_async())
+    return records
+
+
+def invalidate() -> None:
+    """ Tell the asset tracker records of the core that the asset_tracker table was changed """
+    tracker = server.Server._asset_tracker
+    if tracker is not None and tracker._registered_asset_records is not None:
+        tracker._registered_asset_records.invalidate()
+
+
 async def deprecate_asset_track_entry(request: web.Request) -> web.Response:
     """
     Args:
@@ -117,6 +157,7 @@ async def deprecate_asset_track_entry(request: web.Request) -> web.Response:
                         ['service', '=', svc_name]).AND_WHERE(['asset', '=', asset_name]).AND_WHERE(
                         and_where_val).AND_WHERE(['deprecated_ts', 'isnull']).payload()
                     update_result = await storage_client.update_tbl("asset_tracker", update_payload)
+                    invalidate()
                     if 'response' in update_result:
                         response = update_result['response']
                         if response != 'updated':
@@ -188,53 +229,8 @@ async def get_datapoint_usage(request: web.Request) -> web.Response:
                 "assets": []
                 }
     try:
-        storage_client = connect.get_storage_async()
-        q_payload = PayloadBuilder().SELECT(). \
-            DISTINCT(["asset", "data"]). \
-            WHERE(["event", "=", "store"]). \
-            payload()
-
-        results = await storage_client.query_tbl_with_payload('asset_tracker', q_payload)
-
-        total_datapoints = 0
-        asset_info_list = []
-        for row in results["rows"]:
-            # The no of datapoints for this asset.
-            asset_name = row["asset"]
-            # Construct a dict that contains information about a single asset.
-            current_count = int(row["data"]["count"])
-            dict_to_add = {"asset": row["asset"], "datapoints": row["data"]["datapoints"], 'count': current_count}
-            # appending information of single asset to the asset information list.
-
-            # now find that this is a new asset or not.
-            # Initialize index_of_found_asset by -1 . -1 means not found.
-            index_of_found_asset = -1
-            for (idx, asset_info) in enumerate(asset_info_list):
-                if 'asset' in asset_info and asset_info['asset'] == asset_name:
-                    index_of_found_asset = idx
-
-            if index_of_found_asset != -1:
-                # If current data point count exceed the maximum data point then replace
-                # this new data point information else do nothing
-                if current_count >= asset_info_list[index_of_found_asset]['count']:
-                    asset_info_list.pop(index_of_found_asset)
-                    asset_info_list.append(dict_to_add)
-            else:
-                # This is a new asset simply add to list.
-                asset_info_list.append(dict_to_add)
-
-        # finally calculate the total data points
-        for asset_info in asset_info_list:
-            total_datapoints += int(asset_info['count'])
-
-        # Remove count for each asset_info
-        for ast_info in asset_info_list:
-            ast_info.pop('count')
-
-        # update the required information.
-        response['assets'] = asset_info_list
-        response["count"] = total_datapoints
-
+        records = await _get_records()
+        response["count"], response['assets'] = records.datapoint_usage()
     except KeyError as msg:
         raise web.HTTPBadRequest(reason=str(msg), body=json.dumps({"message": str(msg)}))
     except TypeError as ex:
@@ -5,6 +5,7 @@
 # FLEDGE_END
 
 """Backup and Restore Rest API support"""
+import asyncio
 import os
 import sys
 import tarfile
@@ -21,6 +22,7 @@ from fledge.common.logger import FLCoreLogger
 from fledge.common.storage_client import payload_builder
 from fledge.common.web.middleware import has_permission
 from fledge.plugins.storage.common import exceptions
+from fledge.plugins.storage.common import lib
 from fledge.services.core import connect
 
 if 'fledge.plugins.storage.common.backup' not in sys.modules:
@@ -36,6 +38,7 @@ __version__ = "${VERSION}"
 
 __DEFAULT_LIMIT = 20
 __DEFAULT_OFFSET = 0
+_STREAM_QUEUE_SIZE = 16
 
 _help = """
     -----------------------------------------------------------------------------------
@@ -67,6 +70,68 @@ def _get_status(status_code):
     return Status(status_code).name
 
 
+def _add_progress(row, backup_json):
+    """ Adds the progress reported by the backup process to a running backup """
+    if int(backup_json["status"]) == Status.RUNNING:
+        progress = lib.read_backup_progress(backup_json["file_name"])
+        if progress is not None:
+            row["progress"] = progress
+    return row
+
+
+class _QueueWriter:
+    """ File like object that hands over the chunks written by a worker thread to the event loop,
+    blocking the worker while the queue is full so the memory in use is bounded by the queue size """
+
+    def __init__(self, loop, queue):
+        self._loop = loop
+        self._queue = queue
+
+    def write(self, data):
+        if data:
+            asyncio.run_coroutine_threadsafe(self._queue.put(bytes(data)), self._loop).result()
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+async def _stream_tar_gz(request, source):
+    """ Streams a gzip compressed tar archive of the source file to the client, without creating it on disk """
+    loop = asyncio.get_event_loop()
+    queue = asyncio.Queue(maxsize=_STREAM_QUEUE_SIZE)
+    writer = _QueueWriter(loop, queue)
+
+    def _build():
+        try:
+            with tarfile.open(fileobj=writer, mode="w|gz") as t:
+                t.add(source, arcname=os.path.basename(source))
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+    response = web.StreamResponse(headers={
+        'Content-Type': 'application/gzip',
+        'Content-Disposition': 'attachment; filename="{}.tar.gz"'.format(os.path.basename(source))})
+    await response.prepare(request)
+    builder = loop.run_in_executor(None, _build)
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            await response.write(chunk)
+    finally:
+        # Unblock the worker if the client went away
+        while not builder.done():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                await asyncio.sleep(0.01)
+    await builder
+    await response.write_eof()
+    return response
+
+
 async def get_backups(request):
     """ Returns a list of all backups
 
@@ -114,7 +179,7 @@ async def get_backups(request):
             r["id"] = row["id"]
             r["date"] = row["ts"]
             r["status"] = _get_status(int(row["status"]))
-            res.append(r)
+            res.append(_add_progress(r, row))
     except Exception as ex:
         msg = str(ex)
         _logger.error(ex, "Failed to get the list of Backup records.")
@@ -153,6 +218,7 @@ async def get_backup_details(request):
                 'id': backup_json["id"],
                 'date': backup_json["ts"]
                 }
+        _add_progress(resp, backup_json)
 
     except ValueError:
         raise web.HTTPBadRequest(reason='Invalid backup id')
@@ -169,6 +235,9 @@ async def get_backup_details(request):
 async def get_backup_download(request):
     """ Download back up file by id
 
+    Backups created by older releases (<= 1.9.2) are plain database files, these are compressed and streamed to the
+    client on the fly.
+
     :Example:
         wget -O fledge-backup-1.tar.gz http://localhost:8081/fledge/backup/1/download
 
@@ -188,16 +257,7 @@ async def get_backup_download(request):
             raise FileNotFoundError('{} backup file does not exist in {} directory'.format(file_name, dir_name))
         # Find the source extension
         dummy, file_extension = os.path.splitext(source)
-        # backward compatibility (<= 1.9.2)
-        if file_extension in (".db", ".dump"):
-            # Create tar file
-            t = tarfile.open(source + ".tar.gz", "w:gz")
-            t.add(source, arcname=os.path.basename(source))
-            t.close()
-            gz_path = Path(source + ".tar.gz")
-        else:
-            gz_path = Path(source)
-        _logger.debug("get_backup_download - file_extension :{}: - gz_path :{}:".format(file_extension, gz_path))
+        _logger.debug("get_backup_download - file_extension :{}: - source :{}:".format(file_extension, source))
     except FileNotFoundError as err:
         msg = str(err)
         raise web.HTTPNotFound(reason=msg, body=json.dumps({"message": msg}))
@@ -211,8 +271,10 @@ async def get_backup_download(request):
         msg = str(ex)
         _logger.error(ex, "Failed to download Backup file for ID: <{}>.".format(backup_id))
         raise web.HTTPInternalServerError(reason=msg, body=json.dumps({"message": msg}))
-    else:
-        return web.FileResponse(path=gz_path, headers={'Content-Type': 'application/gzip'})
+    # backward compatibility (<= 1.9.2)
+    if file_extension in (".db", ".dump"):
+        return await _stream_tar_gz(request, source)
+    return web.FileResponse(path=Path(source), headers={'Content-Type': 'application/gzip'})
 
 
 @has_permission("admin")
@@ -15,6 +15,8 @@ Supports a number of REST API:
     - Return a set of asset readings for the given asset
   http://<address>/fledge/asset/{asset_code}/latest
     - Return latest reading for the given asset
+  http://<address>/fledge/asset/{asset_code}/export
+    - Stream all readings of the given assets as NDJSON or CSV, optionally gzip compressed
   http://<address>/fledge/asset/{asset_code}/summary
     - Return a set of the summary of all sensors values for the given asset
   http://<address>/fledge/asset/{asset_code}/{reading}
@@ -33,19 +35,29 @@ Supports a number of REST API:
     minutes=x   Limit the data returned to be less than x minutes old
     hours=x     Limit the data returned to be less than x hours old
 
+  The time series of /fledge/asset/{asset_code}/{reading} with a time window and of the bucket APIs may be reduced
+  to a number of representative points instead, using
+    downsample=lttb|minmax  Largest Triangle Three Buckets or minimum and maximum of every time bucket
+    points=x                Return at most x points, by default the number of buckets for the bucket APIs
+
   Note: seconds, minutes and hours can not be combined in a URL. If they are then only seconds
   will have an effect.
   Note: if datetime units are supplied then limit will not respect i.e mutually exclusive
 """
+import asyncio
+import csv
+import io
 import time
 import datetime
 import json
+import zlib
 
 from aiohttp import web
 
+from fledge.common import asset_rollup, downsample
 from fledge.common.logger import FLCoreLogger
 from fledge.common.storage_client.payload_builder import PayloadBuilder
-from fledge.services.core import connect
+from fledge.services.core import connect, server
 
 _logger = FLCoreLogger().get_logger(__name__)
 
@@ -61,6 +73,15 @@ __DEFAULT_OFFSET = 0
 DATAPOINT_TYPES = ['__DPIMAGE', '__DATABUFFER']
 IMAGE_PLACEHOLDER = "Data removed for brevity"
 
+DOWNSAMPLE_SLICES = 16
+""" Time slices the readings of a downsampled time window are read in """
+DOWNSAMPLE_PAGE_SIZE = 5000
+""" Readings of a time slice read at a time, bounding the readings held while downsampling """
+
+EXPORT_PAGE_SIZE = 5000
+""" Readings read from storage and written to the client at a time by the export """
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
 
 def setup(app):
     """ Add the routes for the API endpoints supported by the data browser """
@@ -68,6 +89,7 @@ def setup(app):
     app.router.add_route('GET', '/fledge/asset/timespan', asset_timespan)
     app.router.add_route('GET', '/fledge/asset/{asset_code}', asset)
     app.router.add_route('GET', '/fledge/asset/{asset_code}/latest', asset_latest)
+    app.router.add_route('GET', '/fledge/asset/{asset_code}/export', asset_export)
     app.router.add_route('GET', '/fledge/asset/{asset_code}/summary', asset_all_readings_summary)
     app.router.add_route('GET', '/fledge/asset/{asset_code}/timespan', asset_reading_timespan)
     app.router.add_route('GET', '/fledge/asset/{asset_code}/{reading}', asset_reading)
@@ -138,10 +160,21 @@ async def asset_counts(request):
 
     Returns:
            json result on basis of SELECT asset_code, count(*) FROM readings GROUP BY asset_code;
+           served from the asset index of the core when there is one
 
     :Example:
             curl -sX GET http://localhost:8081/fledge/asset
     """
+    if server.Server._asset_index is not None:
+        try:
+            return web.json_response(await server.Server._asset_index.counts())
+        except ValueError as err:
+            msg = str(err)
+            raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+        except Exception as exc:
+            msg = str(exc)
+            _logger.error(exc, "Failed to get all assets.")
+            raise web.HTTPInternalServerError(reason=msg, body=json.dumps({"message": msg}))
     payload = PayloadBuilder().AGGREGATE(["count", "*"]).ALIAS("aggregate", ("*", "count", "count")) \
         .GROUP_BY("asset_code").payload()
     _readings = connect.get_readings_async()
@@ -207,16 +240,20 @@ async def asset(request):
             else:
                 # To get latest reading for an asset's
                 asset_codes = additional_asset_codes if 'additional' in request.query else [asset_code]
-                _readings = connect.get_readings_async()
                 date_times = []
                 dt_format = '%Y-%m-%d %H:%M:%S.%f'
-                for ac in asset_codes:
-                    payload = PayloadBuilder().SELECT("user_ts").ALIAS("return", ("user_ts", "timestamp")).WHERE(
-                        ["asset_code", "=", ac]).LIMIT(1).ORDER_BY(["user_ts", "desc"]).payload()
-                    results = await _readings.query(payload)
-                    response = results['rows']
-                    if response and 'timestamp' in response[0]:
-                        date_times.append(datetime.datetime.strptime(response[0]['timestamp'], dt_format))
+                if server.Server._latest_readings is not None:
+                    timestamps = await server.Server._latest_readings.get_timestamps(asset_codes)
+                    date_times = [datetime.datetime.strptime(ts, dt_format) for ts in timestamps.values()]
+                else:
+                    _readings = connect.get_readings_async()
+                    for ac in asset_codes:
+                        payload = PayloadBuilder().SELECT("user_ts").ALIAS("return", ("user_ts", "timestamp")).WHERE(
+                            ["asset_code", "=", ac]).LIMIT(1).ORDER_BY(["user_ts", "desc"]).payload()
+                        results = await _readings.query(payload)
+                        response = results['rows']
+                        if response and 'timestamp' in response[0]:
+                            date_times.append(datetime.datetime.strptime(response[0]['timestamp'], dt_format))
                 if date_times:
                     most_recent_ts = max(date_times)
                     _logger.debug("DTS: {} most_recent_ts: {}".format(date_times, most_recent_ts))
@@ -279,6 +316,130 @@ async def asset(request):
         return web.json_response(response)
 
 
+async def asset_export(request: web.Request) -> web.StreamResponse:
+    """ Stream the readings of one or more comma separated assets to the client, oldest first
+
+    Readings are paged through in reading id order, EXPORT_PAGE_SIZE at a time, and each page is written to the
+    client before the next is read, so memory use does not depend on the number of readings exported.
+
+    Query parameters:
+        format=ndjson|csv   One JSON object per line with id, asset_code, timestamp and reading (default),
+                            or CSV with one id,asset_code,timestamp,datapoint,value line per datapoint
+        compress=gzip       Return a gzip compressed file
+        seconds, minutes, hours and previous limit the readings to a time window as for the other APIs
+        images=include|exclude  As for the other APIs
+
+    :Example:
+            curl -sX GET http://localhost:8081/fledge/asset/sinusoid/export
+            curl -sX GET "http://localhost:8081/fledge/asset/sinusoid,randomwalk/export?format=csv&hours=24"
+            curl -sX GET "http://localhost:8081/fledge/asset/sinusoid/export?compress=gzip" -o sinusoid.ndjson.gz
+    """
+    asset_code = request.match_info.get('asset_code', '')
+    asset_codes = asset_code.split(',')
+    fmt = request.query.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        msg = "format must be one of {}".format(', '.join(EXPORT_FORMATS))
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+    compress = request.query.get('compress', '')
+    if compress not in ('', 'gzip'):
+        msg = "compress must be gzip"
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+    exclude_images = is_image_excluded(request)
+    try:
+        window = time_window(request)
+    except ValueError as err:
+        msg = str(err)
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+
+    def page_payload(last_id):
+        _select = PayloadBuilder().SELECT(("id", "asset_code", "reading", "user_ts")).ALIAS(
+            "return", ("user_ts", "timestamp")).chain_payload()
+        _where = PayloadBuilder(_select).WHERE(["asset_code", "in", asset_codes]).AND_WHERE(
+            ["id", ">", last_id]).chain_payload()
+        if window is not None:
+            _where = PayloadBuilder(_where).AND_WHERE(
+                ["user_ts", ">=", datetime.datetime.fromtimestamp(
+                    window[0], datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")],
+                ["user_ts", "<=", datetime.datetime.fromtimestamp(
+                    window[1], datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")]).chain_payload()
+        return PayloadBuilder(_where).ORDER_BY(["id", "asc"]).LIMIT(EXPORT_PAGE_SIZE).payload()
+
+    _readings = connect.get_readings_async()
+
+    async def read_page(last_id):
+        results = await _readings.query(page_payload(last_id))
+        if 'rows' not in results:
+            raise ValueError(results.get('message', 'Failed to export the readings of {}'.format(asset_code)))
+        return results['rows']
+
+    # The first page is read before the response is started, so that a failure can still be reported
+    try:
+        rows = await read_page(0)
+    except ValueError as err:
+        msg = str(err)
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+    except Exception as ex:
+        msg = str(ex)
+        _logger.error(ex, "Failed to export {} asset readings.".format(asset_code))
+        raise web.HTTPInternalServerError(reason=msg, body=json.dumps({"message": msg}))
+
+    filename = "{}.{}".format(asset_code.replace(',', '_'), fmt)
+    if compress:
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        headers = {'Content-Type': 'application/gzip',
+                   'Content-Disposition': 'attachment; filename="{}.gz"'.format(filename)}
+    else:
+        compressor = None
+        headers = {'Content-Type': EXPORT_FORMATS[fmt],
+                   'Content-Disposition': 'attachment; filename="{}"'.format(filename)}
+    encode = _csv_lines if fmt == 'csv' else _ndjson_lines
+    response = web.StreamResponse(headers=headers)
+    await response.prepare(request)
+    header = "id,asset_code,timestamp,datapoint,value\r\n" if fmt == 'csv' else ""
+    try:
+        while True:
+            data = (header + encode(rows, exclude_images)).encode()
+            header = ""
+            await response.write(compressor.compress(data) if compressor else data)
+            if len(rows) < EXPORT_PAGE_SIZE:
+                break
+            rows = await read_page(rows[-1]['id'])
+        if compressor:
+            await response.write(compressor.flush())
+    except (ConnectionResetError, asyncio.CancelledError):
+        raise
+    except Exception as ex:
+        # Too late for an error response, the client gets a truncated export
+        _logger.error(ex, "Failed to export {} asset readings.".format(asset_code))
+        raise
+    await response.write_eof()
+    return response
+
+
+def _export_value(value, exclude_images):
+    if isinstance(value, str) and value.startswith(tuple(DATAPOINT_TYPES)) and exclude_images:
+        return IMAGE_PLACEHOLDER
+    return value
+
+
+def _ndjson_lines(rows, exclude_images):
+    return "".join(json.dumps({"id": row['id'], "asset_code": row['asset_code'], "timestamp": row['timestamp'],
+                               "reading": {dp: _export_value(value, exclude_images)
+                                           for dp, value in row['reading'].items()}}) + "\n" for row in rows)
+
+
+def _csv_lines(rows, exclude_images):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        for dp, value in row['reading'].items():
+            value = _export_value(value, exclude_images)
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            writer.writerow((row['id'], row['asset_code'], row['timestamp'], dp, value))
+    return buffer.getvalue()
+
+
 async def asset_latest(request: web.Request) -> web.Response:
     """ Browse a particular asset for which we have recorded readings and
     return a single latest reading with timestamps for an asset.
@@ -292,12 +453,19 @@ async def asset_latest(request: web.Request) -> web.Response:
         ["asset_code", "=", asset_code]).LIMIT(1).ORDER_BY(["user_ts", "desc"]).payload()
     results = {}
     try:
-        _readings = connect.get_readings_async()
-        results = await _readings.query(payload)
-        response = results['rows']
+        if server.Server._latest_readings is not None:
+            # Served from the latest readings cache; a miss is read from storage with the same payload
+            response = await server.Server._latest_readings.get(asset_code)
+        else:
+            _readings = connect.get_readings_async()
+            results = await _readings.query(payload)
+            response = results['rows']
     except KeyError:
         msg = results['message']
         raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+    except ValueError as err:
+        msg = str(err)
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
     except Exception as exc:
         msg = str(exc)
         _logger.error(exc, "Failed to get latest {} asset.".format(asset_code))
@@ -335,13 +503,34 @@ async def asset_reading(request):
             curl -sX GET http://localhost:8081/fledge/asset/fogbench_humidity/temperature?skip=10
             curl -sX GET "http://localhost:8081/fledge/asset/fogbench_humidity/temperature?limit=1&skip=10"
             curl -sX GET http://localhost:8081/fledge/asset/fogbench_humidity/temperature?minutes=60
+            curl -sX GET "http://localhost:8081/fledge/asset/fogbench_humidity/temperature?hours=24&downsample=lttb&points=500"
     """
     asset_code = request.match_info.get('asset_code', '')
     reading = request.match_info.get('reading', '')
 
-    _select = PayloadBuilder().SELECT(("user_ts", ["reading", reading])) \
-        .ALIAS("return", ("user_ts", "timestamp"), ("reading", reading)).chain_payload()
-    _where = PayloadBuilder(_select).WHERE(["asset_code", "=", asset_code]).chain_payload()
+    def reading_select():
+        return PayloadBuilder().SELECT(("user_ts", ["reading", reading])) \
+            .ALIAS("return", ("user_ts", "timestamp"), ("reading", reading)).chain_payload()
+
+    try:
+        downsampling = downsample_params(request)
+        if downsampling is not None:
+            window = time_window(request)
+            if window is None:
+                raise ValueError("downsample can only be given if one of seconds, minutes or hours is also given")
+            response = await _downsampled_reading(asset_code, reading, window[0], window[1], downsampling)
+            return web.json_response(response)
+    except web.HTTPException:
+        raise
+    except ValueError as err:
+        msg = str(err)
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+    except Exception as ex:
+        msg = str(ex)
+        _logger.error(ex, "Failed to downsample {} readings of {} asset.".format(reading, asset_code))
+        raise web.HTTPInternalServerError(reason=msg, body=json.dumps({"message": msg}))
+
+    _where = PayloadBuilder(reading_select()).WHERE(["asset_code", "=", asset_code]).chain_payload()
     if 'previous' in request.query and (
             'seconds' in request.query or 'minutes' in request.query or 'hours' in request.query):
         _and_where = where_window(request, _where)
@@ -538,6 +727,8 @@ async def asset_averages(request):
     The amount of time covered by each returned value is set using the
     query parameter group. This may be set to seconds, minutes or hours
 
+    Whole groups of a time limited series the asset rollups hold are read from them instead of the readings
+
     Returns:
             on the basis of
             SELECT min((reading->>'reading')::float) AS "min",
@@ -564,6 +755,7 @@ async def asset_averages(request):
     reading = request.match_info.get('reading', '')
 
     ts_restraint = 'YYYY-MM-DD HH24:MI:SS'
+    group_size = 1
     if 'group' in request.query and request.query['group'] != '':
         _group = request.query['group']
         if _group in ('seconds', 'minutes', 'hours'):
@@ -571,21 +763,28 @@ async def asset_averages(request):
                 ts_restraint = 'YYYY-MM-DD HH24:MI:SS'
             elif _group == 'minutes':
                 ts_restraint = 'YYYY-MM-DD HH24:MI'
+                group_size = 60
             elif _group == 'hours':
                 ts_restraint = 'YYYY-MM-DD HH24'
+                group_size = 3600
         else:
             raise web.HTTPBadRequest(reason="{} is not a valid group".format(_group))
 
-    _aggregate = PayloadBuilder().AGGREGATE(["min", ["reading", reading]], ["max", ["reading", reading]],
-                                            ["avg", ["reading", reading]]) \
-        .ALIAS('aggregate', ('reading', 'min', 'min'), ('reading', 'max', 'max'),
-               ('reading', 'avg', 'average')).chain_payload()
-    _where = PayloadBuilder(_aggregate).WHERE(["asset_code", "=", asset_code]).chain_payload()
+    def asset_where():
+        _aggregate = PayloadBuilder().AGGREGATE(["min", ["reading", reading]], ["max", ["reading", reading]],
+                                                ["avg", ["reading", reading]]) \
+            .ALIAS('aggregate', ('reading', 'min', 'min'), ('reading', 'max', 'max'),
+                   ('reading', 'avg', 'average')).chain_payload()
+        return PayloadBuilder(_aggregate).WHERE(["asset_code", "=", asset_code]).chain_payload()
+
+    _where = asset_where()
 
+    window = 0
     if 'previous' in request.query and (
             'seconds' in request.query or 'minutes' in request.query or 'hours' in request.query):
         _and_where = where_window(request, _where)
     elif 'seconds' in request.query or 'minutes' in request.query or 'hours' in request.query:
+        window = window_seconds(request)
         _and_where = where_clause(request, _where)
     elif 'previous' in request.query:
         msg = "the parameter previous can only be given if one of seconds, minutes or hours is also given"
@@ -594,14 +793,35 @@ async def asset_averages(request):
         # Add LIMIT, OFFSET
         _and_where = prepare_limit_skip_payload(request, _where)
 
-    # Add the GROUP BY and ORDER BY timestamp DESC
-    _group = PayloadBuilder(_and_where).GROUP_BY("user_ts").ALIAS("group", ("user_ts", "timestamp")) \
-        .FORMAT("group", ("user_ts", ts_restraint)).chain_payload()
-    payload = PayloadBuilder(_group).ORDER_BY(["user_ts", "desc"]).payload()
+    def series_payload(where):
+        # Add the GROUP BY and ORDER BY timestamp DESC
+        _group = PayloadBuilder(where).GROUP_BY("user_ts").ALIAS("group", ("user_ts", "timestamp")) \
+            .FORMAT("group", ("user_ts", ts_restraint)).chain_payload()
+        return PayloadBuilder(_group).ORDER_BY(["user_ts", "desc"]).payload()
+
     try:
         _readings = connect.get_readings_async()
-        results = await _readings.query(payload)
-        rows = results['rows']
+        rollups = None
+        if window:
+            now = time.time()
+            rollups = await _rollup_buckets([asset_code], group_size, now - window, now, reading)
+        if rollups is None:
+            results = await _readings.query(series_payload(_and_where))
+            rows = results['rows']
+        else:
+            # Readings newer than the rollups window, the rollups, then readings older than the window
+            window_start, window_stop, buckets = rollups
+            results = await _readings.query(series_payload(
+                PayloadBuilder(asset_where()).AND_WHERE(['user_ts', '>=', _utc_date(window_stop)]).chain_payload()))
+            rows = results['rows']
+            ts_format = {1: '%Y-%m-%d %H:%M:%S', 60: '%Y-%m-%d %H:%M', 3600: '%Y-%m-%d %H'}[group_size]
+            for (_, bucket), values in sorted(buckets.items(), key=lambda item: item[0][1], reverse=True):
+                minimum, maximum, total, samples = values[reading]
+                rows.append({"min": minimum, "max": maximum, "average": total / samples,
+                             "timestamp": asset_rollup.local_time(bucket, ts_format)})
+            results = await _readings.query(series_payload(
+                PayloadBuilder(_and_where).AND_WHERE(['user_ts', '<', _utc_date(window_start)]).chain_payload()))
+            rows += results['rows']
         for index, data in enumerate(rows):
             for item_name, item_val in data.items():
                 if item_name != 'timestamp':
@@ -619,7 +839,8 @@ async def asset_averages(request):
         return web.json_response(response)
 
 
-def where_clause(request, where):
+def window_seconds(request):
+    """ Seconds of the time window given by one of the seconds, minutes or hours query parameters, 0 if none """
     val = 0
     try:
         if 'seconds' in request.query and request.query['seconds'] != '':
@@ -633,6 +854,11 @@ def where_clause(request, where):
             raise ValueError
     except ValueError:
         raise web.HTTPBadRequest(reason="Time must be a positive integer")
+    return val
+
+
+def where_clause(request, where):
+    val = window_seconds(request)
 
     # if no time units then NO AND_WHERE condition applied
     if val == 0:
@@ -692,17 +918,195 @@ def where_window(request, where):
     return PayloadBuilder(payload).AND_WHERE(['user_ts', 'older', previous]).chain_payload()
 
 
+def _utc_date(epoch):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch))
+
+
+def time_window(request):
+    """ Start and stop of the time window given by the seconds, minutes or hours and previous query parameters,
+    None if there is none """
+    val = window_seconds(request)
+    if val == 0:
+        return None
+    previous = 0
+    if 'previous' in request.query:
+        if 'seconds' in request.query and request.query['seconds'] != '':
+            unit = 1
+        elif 'minutes' in request.query and request.query['minutes'] != '':
+            unit = 60
+        else:
+            unit = 60 * 60
+        try:
+            previous = int(request.query['previous']) * unit
+            if previous < 0:
+                raise ValueError
+        except ValueError:
+            raise ValueError("Time must be a positive integer")
+    stop = time.time() - previous
+    return stop - val, stop
+
+
+def downsample_params(request, default_points=None):
+    """ Method and number of points of the downsample and points query parameters, None if no downsampling
+
+    Raises:
+        ValueError: for an unknown method or a number of points the method can not return
+    """
+    if 'downsample' not in request.query or request.query['downsample'] == '':
+        return None
+    method = request.query['downsample']
+    if method not in downsample.METHODS:
+        raise ValueError("downsample must be one of {}".format(', '.join(downsample.METHODS)))
+    try:
+        points = int(request.query['points']) if request.query.get('points', '') != '' else default_points
+        if points is None or points < downsample.MIN_POINTS[method]:
+            raise ValueError
+    except ValueError:
+        raise ValueError("points must be an integer of at least {} for {}".format(downsample.MIN_POINTS[method],
+                                                                                  method))
+    return method, points
+
+
+async def _stream_readings(asset_codes, select, start, stop):
+    """ Readings of the assets from start to stop in ascending time order, read a time slice at a time and each slice
+    DOWNSAMPLE_PAGE_SIZE readings at a time
+
+    select must return the reading id, which is used to page and removed from the rows. A page resumes from the
+    timestamp of the last reading of the previous page and skips the readings of that timestamp already returned,
+    by their id; in the unlikely case a full page holds no later timestamp, the next page is made larger.
+    """
+    _readings = connect.get_readings_async()
+    width = (stop - start) / DOWNSAMPLE_SLICES
+    for index in range(DOWNSAMPLE_SLICES):
+        slice_start = datetime.datetime.fromtimestamp(start + index * width, datetime.timezone.utc)
+        last = index == DOWNSAMPLE_SLICES - 1
+        slice_stop = datetime.datetime.fromtimestamp(stop if last else start + (index + 1) * width,
+                                                     datetime.timezone.utc)
+        after_ts = slice_start.strftime("%Y-%m-%d %H:%M:%S.%f")
+        after_id = None
+        limit = DOWNSAMPLE_PAGE_SIZE
+        while True:
+            _where = PayloadBuilder(select()).WHERE(["asset_code", "in", asset_codes]).AND_WHERE(
+                ["user_ts", ">=", after_ts],
+                ["user_ts", "<=" if last else "<", slice_stop.strftime("%Y-%m-%d %H:%M:%S.%f")]).chain_payload()
+            results = await _readings.query(PayloadBuilder(_where).ORDER_BY(["user_ts", "asc"], ["id", "asc"]).LIMIT(
+                limit).payload())
+            if 'rows' not in results:
+                raise ValueError(results.get('message', 'Failed to read the readings of {}'.format(asset_codes)))
+            rows = results['rows']
+            row_id = None
+            for row in rows:
+                row_id = row.pop('id', None)
+                if after_id is not None and row['timestamp'] == after_ts and row_id <= after_id:
+                    continue
+                yield row
+            if len(rows) < limit:
+                break
+            limit = limit * 2 if rows[-1]['timestamp'] == after_ts else DOWNSAMPLE_PAGE_SIZE
+            after_ts = rows[-1]['timestamp']
+            after_id = row_id
+
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+async def _downsampled_reading(asset_code, reading, start, stop, downsampling):
+    """ Representative points of the reading of an asset from start to stop, newest first """
+    method, points = downsampling
+
+    def select():
+        return PayloadBuilder().SELECT(("id", "user_ts", ["reading", reading])) \
+            .ALIAS("return", ("user_ts", "timestamp"), ("reading", reading)).chain_payload()
+
+    sampler = downsample.Downsampler(method, points, start, stop)
+    epoch = downsample.EpochParser()
+    async for row in _stream_readings([asset_code], select, start, stop):
+        value = row.get(reading)
+        if _numeric(value):
+            sampler.add(epoch(row['timestamp']), value, row)
+    response = sampler.result()
+    response.reverse()
+    return response
+
+
+async def _downsampled_datapoints(asset_codes, start, stop, downsampling):
+    """ Readings of the assets from start to stop selected as representative points of any of their numeric
+    datapoints, newest first
+
+    Every numeric datapoint of every asset is downsampled to the given number of points on its own and the readings
+    selected for any of them are returned: at most points times the number of numeric asset datapoints readings, fewer
+    as a reading selected for several datapoints is returned once.
+    """
+    method, points = downsampling
+    samplers = {}
+    epoch = downsample.EpochParser()
+
+    def select():
+        return PayloadBuilder().SELECT(("id", "asset_code", "reading", "user_ts")).ALIAS(
+            "return", ("user_ts", "timestamp")).chain_payload()
+
+    async for row in _stream_readings(asset_codes, select, start, stop):
+        x = None
+        for datapoint, value in row['reading'].items():
+            if not _numeric(value):
+                continue
+            if x is None:
+                x = epoch(row['timestamp'])
+            key = (row['asset_code'], datapoint)
+            sampler = samplers.get(key)
+            if sampler is None:
+                sampler = samplers[key] = downsample.Downsampler(method, points, start, stop)
+            sampler.add(x, value, row)
+    selected = {}
+    for sampler in samplers.values():
+        for row in sampler.result():
+            selected[id(row)] = row
+    return sorted(selected.values(), key=lambda row: row['timestamp'], reverse=True)
+
+
+async def _rollup_buckets(asset_codes, bucket_size, start, stop, datapoint=None, offset=0):
+    """ Window of whole buckets from start to stop the asset rollups hold and the buckets in it
+
+    Returns:
+        (window start, window stop, buckets) as of asset_rollup.query_buckets,
+        None if the whole time range is to be read from the readings
+    """
+    granularity = asset_rollup.granularity_for(bucket_size, offset)
+    if granularity is None:
+        return None
+    bucket_size = int(float(bucket_size))
+    offset = int(offset)
+    try:
+        _storage = connect.get_storage_async()
+        window = await asset_rollup.covered_window(_storage, asset_codes, granularity, start, stop, bucket_size,
+                                                   offset)
+        if window is None:
+            return None
+        buckets = await asset_rollup.query_buckets(_storage, asset_codes, granularity, window[0], window[1],
+                                                   bucket_size, datapoint, offset)
+    except Exception as ex:
+        # The readings answer all the same, only slower
+        _logger.warning("Failed to read asset rollups: {}".format(str(ex)))
+        return None
+    return window[0], window[1], buckets
+
+
 async def asset_datapoints_with_bucket_size(request: web.Request) -> web.Response:
     """ Retrieve datapoints for an asset.
 
         If bucket_size is not given then the bucket size is 1
         If start is not given then the start point is now - 60 seconds.
         If length is not given then length is 60 seconds. And length is calculated with length / bucket_size
+        Whole buckets the asset rollups hold are read from them instead of the readings
         For multiple assets use comma separated values in request and this will allow data from one or more asset to be returned.
+        With downsample, each numeric datapoint of each asset is reduced to points readings, the response holds at
+        most points times the number of asset datapoints readings.
 
        :Example:
                curl -sX GET http://localhost:8081/fledge/asset/{asset_code}/bucket/{bucket_size}
                curl -sX GET http://localhost:8081/fledge/asset/{asset_code_1},{asset_code_2}/bucket/{bucket_size}
+               curl -sX GET "http://localhost:8081/fledge/asset/{asset_code}/bucket/{bucket_size}?downsample=lttb&points=200"
        """
     try:
         start_found = False
@@ -732,6 +1136,11 @@ async def asset_datapoints_with_bucket_size(request: web.Request) -> web.Respons
             if start_found is False:
                 start = ts - length
 
+        downsampling = downsample_params(request, int(float(length / float(bucket_size))))
+        if downsampling is not None:
+            return web.json_response(await _downsampled_datapoints(asset_code_list, start, start + length,
+                                                                   downsampling))
+
         use_microseconds = False
         # Check subsecond request in start
         start_micros = "{:.6f}".format(start).split('.')[1]
@@ -751,20 +1160,40 @@ async def asset_datapoints_with_bucket_size(request: web.Request) -> web.Respons
             start_date = datetime.datetime.fromtimestamp(start, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
             stop_date = datetime.datetime.fromtimestamp(start + length, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
 
-        # Prepare payload
-        _aggregate = PayloadBuilder().AGGREGATE(["all"]).chain_payload()
-        _and_where = PayloadBuilder(_aggregate).WHERE(["asset_code", "in", asset_code_list]).AND_WHERE([
-            "user_ts", ">=", str(start_date)], ["user_ts", "<=", str(stop_date)]).chain_payload()
+        limit = int(float(length / float(bucket_size)))
 
-        _bucket = PayloadBuilder(_and_where).TIMEBUCKET('user_ts', bucket_size,
-                                                        'YYYY-MM-DD HH24:MI:SS', 'timestamp').chain_payload()
+        def bucket_payload(*conditions):
+            # Prepare payload
+            _aggregate = PayloadBuilder().AGGREGATE(["all"]).chain_payload()
+            _and_where = PayloadBuilder(_aggregate).WHERE(["asset_code", "in", asset_code_list]).AND_WHERE(
+                *conditions).chain_payload()
 
-        payload = PayloadBuilder(_bucket).LIMIT(int(float(length / float(bucket_size)))).payload()
+            _bucket = PayloadBuilder(_and_where).TIMEBUCKET('user_ts', bucket_size,
+                                                            'YYYY-MM-DD HH24:MI:SS', 'timestamp').chain_payload()
 
-        # Sort & timebucket modifiers can not be used in same payload
-        # payload = PayloadBuilder(limit).ORDER_BY(["user_ts", "desc"]).payload()
-        results = await _readings.query(payload)
-        response = results['rows']
+            # Sort & timebucket modifiers can not be used in same payload
+            return PayloadBuilder(_bucket).LIMIT(limit).payload()
+
+        # The readings plugins key the buckets of all datapoints by their rounded middle
+        rollups = await _rollup_buckets(asset_code_list, bucket_size, start, start + length,
+                                        offset=float(bucket_size) / 2)
+        if rollups is None:
+            results = await _readings.query(bucket_payload(["user_ts", ">=", str(start_date)],
+                                                           ["user_ts", "<=", str(stop_date)]))
+            response = results['rows']
+        else:
+            # Readings newer than the rollups window, the rollups, then readings older than the window
+            window_start, window_stop, buckets = rollups
+            results = await _readings.query(bucket_payload(["user_ts", ">=", _utc_date(window_stop)],
+                                                           ["user_ts", "<=", str(stop_date)]))
+            response = results['rows']
+            for (code, bucket), values in sorted(buckets.items(), key=lambda item: (-item[0][1], item[0][0])):
+                response.append({"asset_code": code, "timestamp": asset_rollup.local_time(bucket), "reading": {
+                    dp: {"min": v[0], "max": v[1], "average": v[2] / v[3], "count": v[3], "sum": v[2]}
+                    for dp, v in values.items()}})
+            results = await _readings.query(bucket_payload(["user_ts", ">=", str(start_date)],
+                                                           ["user_ts", "<", _utc_date(window_start)]))
+            response = (response + results['rows'])[:limit]
     except (KeyError, IndexError) as e:
         raise web.HTTPNotFound(reason=e)
     except (TypeError, ValueError) as e:
@@ -788,12 +1217,14 @@ async def asset_readings_with_bucket_size(request: web.Request) -> web.Response:
         If bucket_size is not given then the bucket size is 1
         If start is not given then the start point is now - 60 seconds.
         If length is not given then length is 60 seconds. And length is calculated with length / bucket_size
+        Whole buckets the asset rollups hold are read from them instead of the readings
 
        :Example:
                curl -sX GET http://localhost:8081/fledge/asset/{asset_code}/{reading}/bucket/{bucket_size}
                curl -sX GET http://localhost:8081/fledge/asset/{asset_code}/{reading}/bucket/{bucket_size}?start=<start point>
                curl -sX GET http://localhost:8081/fledge/asset/{asset_code}/{reading}/bucket/{bucket_size}?length=<length>
                curl -sX GET "http://localhost:8081/fledge/asset/{asset_code}/{reading}/bucket/{bucket_size}?start=<start point>&length=<length>"
+               curl -sX GET "http://localhost:8081/fledge/asset/{asset_code}/{reading}/bucket/{bucket_size}?downsample=minmax"
        """
     try:
         start_found = False
@@ -803,10 +1234,6 @@ async def asset_readings_with_bucket_size(request: web.Request) -> web.Response:
         length = 60
         ts = datetime.datetime.now().timestamp()
         start = ts - 60
-        _aggregate = PayloadBuilder().AGGREGATE(["min", ["reading", reading]], ["max", ["reading", reading]],
-                                                ["avg", ["reading", reading]]) \
-            .ALIAS('aggregate', ('reading', 'min', 'min'), ('reading', 'max', 'max'),
-                   ('reading', 'avg', 'average')).chain_payload()
         _readings = connect.get_readings_async()
 
         if 'start' in request.query and request.query['start'] != '':
@@ -825,25 +1252,51 @@ async def asset_readings_with_bucket_size(request: web.Request) -> web.Response:
             if start_found is False:
                 start = ts - length
 
+        downsampling = downsample_params(request, int(length / int(bucket_size)))
+        if downsampling is not None:
+            return web.json_response(await _downsampled_reading(asset_code, reading, start, start + length,
+                                                                downsampling))
+
         # Build datetime from timestamp
         start_time = time.gmtime(start)
         start_date = time.strftime("%Y-%m-%d %H:%M:%S", start_time)
         stop_time = time.gmtime(start + length)
         stop_date = time.strftime("%Y-%m-%d %H:%M:%S", stop_time)
 
-        # Prepare payload
-        _where = PayloadBuilder(_aggregate).WHERE(["asset_code", "=", asset_code]).AND_WHERE([
-            "user_ts", ">=", str(start_date)], ["user_ts", "<=", str(stop_date)], [
-            "user_ts", "<=", str(stop_date)]).chain_payload()
-        _bucket = PayloadBuilder(_where).TIMEBUCKET('user_ts', bucket_size, 'YYYY-MM-DD HH24:MI:SS',
-                                                    'timestamp').chain_payload()
-
-        payload = PayloadBuilder(_bucket).LIMIT(int(length / int(bucket_size))).payload()
+        limit = int(length / int(bucket_size))
 
-        # Sort & timebucket modifiers can not be used in same payload
-        # payload = PayloadBuilder(limit).ORDER_BY(["user_ts", "desc"]).payload()
-        results = await _readings.query(payload)
-        response = results['rows']
+        def bucket_payload(*conditions):
+            # Prepare payload
+            _aggregate = PayloadBuilder().AGGREGATE(["min", ["reading", reading]], ["max", ["reading", reading]],
+                                                    ["avg", ["reading", reading]]) \
+                .ALIAS('aggregate', ('reading', 'min', 'min'), ('reading', 'max', 'max'),
+                       ('reading', 'avg', 'average')).chain_payload()
+            _where = PayloadBuilder(_aggregate).WHERE(["asset_code", "=", asset_code]).AND_WHERE(
+                *conditions).chain_payload()
+            _bucket = PayloadBuilder(_where).TIMEBUCKET('user_ts', bucket_size, 'YYYY-MM-DD HH24:MI:SS',
+                                                        'timestamp').chain_payload()
+
+            # Sort & timebucket modifiers can not be used in same payload
+            return PayloadBuilder(_bucket).LIMIT(limit).payload()
+
+        rollups = await _rollup_buckets([asset_code], bucket_size, start, start + length, reading)
+        if rollups is None:
+            results = await _readings.query(bucket_payload(["user_ts", ">=", str(start_date)],
+                                                           ["user_ts", "<=", str(stop_date)]))
+            response = results['rows']
+        else:
+            # Readings newer than the rollups window, the rollups, then readings older than the window
+            window_start, window_stop, buckets = rollups
+            results = await _readings.query(bucket_payload(["user_ts", ">=", _utc_date(window_stop)],
+                                                           ["user_ts", "<=", str(stop_date)]))
+            response = results['rows']
+            for (_, bucket), values in sorted(buckets.items(), key=lambda item: item[0][1], reverse=True):
+                minimum, maximum, total, samples = values[reading]
+                response.append({"min": minimum, "max": maximum, "average": total / samples,
+                                 "timestamp": asset_rollup.local_time(bucket)})
+            results = await _readings.query(bucket_payload(["user_ts", ">=", str(start_date)],
+                                                           ["user_ts", "<", _utc_date(window_start)]))
+            response = (response + results['rows'])[:limit]
     except (KeyError, IndexError) as e:
         raise web.HTTPNotFound(reason=e)
     except (TypeError, ValueError) as e:
@@ -948,6 +1401,10 @@ async def asset_purge_all(request):
         start_time = time.strftime('%Y-%m-%d %H:%M:%S.%s', time.localtime(time.time()))
 
         results = await _readings.purge(asset="")
+        if server.Server._latest_readings is not None:
+            server.Server._latest_readings.invalidate()
+        if server.Server._asset_index is not None:
+            server.Server._asset_index.invalidate()
 
         if 'purged' in results:
             end_time = time.strftime('%Y-%m-%d %H:%M:%S.%s', time.localtime(time.time()))
@@ -988,6 +1445,10 @@ async def asset_purge(request):
         start_time = time.strftime('%Y-%m-%d %H:%M:%S.%s', time.localtime(time.time()))
 
         results = await _readings.purge(asset=asset_code)
+        if server.Server._latest_readings is not None:
+            server.Server._latest_readings.invalidate(asset_code)
+        if server.Server._asset_index is not None:
+            server.Server._asset_index.invalidate(asset_code)
 
         if 'purged' in results:
             end_time = time.strftime('%Y-%m-%d %H:%M:%S.%s', time.localtime(time.time()))
@@ -1017,12 +1478,15 @@ async def asset_timespan(request):
             curl -sX GET http://localhost:8081/fledge/asset/timespan
     """
     try:
-        payload = PayloadBuilder().AGGREGATE(["min", "user_ts"], ["max", "user_ts"]).GROUP_BY("asset_code") \
-                .ALIAS('aggregate', ('user_ts', 'min', 'oldest'), ('user_ts', 'max', 'newest')).payload()
-        # Call storage service
-        _readings = connect.get_readings_async()
-        results = await _readings.query(payload)
-        response = results['rows']
+        if server.Server._asset_index is not None:
+            response = await server.Server._asset_index.timespans()
+        else:
+            payload = PayloadBuilder().AGGREGATE(["min", "user_ts"], ["max", "user_ts"]).GROUP_BY("asset_code") \
+                    .ALIAS('aggregate', ('user_ts', 'min', 'oldest'), ('user_ts', 'max', 'newest')).payload()
+            # Call storage service
+            _readings = connect.get_readings_async()
+            results = await _readings.query(payload)
+            response = results['rows']
     except (KeyError, IndexError) as err:
         msg = str(err)
         raise web.HTTPNotFound(reason=msg, body=json.dumps({"message": msg}))
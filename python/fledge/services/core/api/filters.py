@@ -19,6 +19,7 @@ from fledge.common.storage_client.exceptions import StorageServerError
 from fledge.common.storage_client.storage_client import StorageClientAsync
 
 from fledge.services.core import connect
+from fledge.services.core.api import asset_tracker as asset_tracker_api
 from fledge.services.core.api import utils as apiutils
 from fledge.services.core.api.plugins import common
 
@@ -452,6 +453,7 @@ async def delete_filter(request: web.Request) -> web.Response:
                 update_payload = PayloadBuilder().SET(deprecated_ts=current_time).WHERE(
                     ['plugin', '=', filter_name]).payload()
                 await storage.update_tbl("asset_tracker", update_payload)
+                asset_tracker_api.invalidate()
     except StorageServerError as ex:
         msg = ex.error
         _LOGGER.exception("Delete {} filter, caught storage exception: {}".format(filter_name, msg))
@@ -500,6 +502,7 @@ async def _delete_configuration_category(storage: StorageClientAsync, key: str)
     config_mgr = ConfigurationManager(storage)
     config_mgr.delete_category_related_things(key)
     config_mgr._cacheManager.remove(key)
+    config_mgr._category_tree.remove_category(key)
 
 
 def _diff(list1: Union[List, str], list2: Union[List, str]) -> List:
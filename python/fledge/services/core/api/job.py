@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+import json
+from aiohttp import web
+
+from fledge.common.job_manager import JobManager
+from fledge.common.web.middleware import has_permission
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_help = """
+    ----------------------------------------------------------------
+    | GET                  | /fledge/job                           |
+    | GET DELETE           | /fledge/job/{id}                      |
+    ----------------------------------------------------------------
+"""
+
+
+def setup(app):
+    app.router.add_route('GET', '/fledge/job', get_jobs)
+    app.router.add_route('GET', '/fledge/job/{id}', get_job)
+    app.router.add_route('DELETE', '/fledge/job/{id}', cancel_job)
+
+
+def wait_requested(request: web.Request) -> bool:
+    """ True if the request asked with wait=true to be answered once its job is done """
+    wait = request.query.get('wait', 'false').lower()
+    if wait not in ('true', 'false'):
+        msg = "wait must be true or false"
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+    return wait == 'true'
+
+
+def accepted(job, message: str, **kwargs) -> web.Response:
+    """ 202 response to a request whose job is queued, with the link to its status """
+    payload = {"message": message, "id": job.id, "status": job.status, "statusLink": "fledge/job/{}".format(job.id)}
+    payload.update(kwargs)
+    return web.json_response(payload, status=202)
+
+
+async def get_jobs(request: web.Request) -> web.Response:
+    """ GET the jobs of the long running operations, oldest first
+
+    :Example:
+        curl -sX GET http://localhost:8081/fledge/job
+        curl -sX GET http://localhost:8081/fledge/job?status=running
+    """
+    status = request.query.get('status')
+    jobs = [j.to_dict() for j in JobManager().get_all() if status is None or j.status == status]
+    return web.json_response({"jobs": jobs})
+
+
+async def get_job(request: web.Request) -> web.Response:
+    """ GET status, progress and result of a job
+
+    :Example:
+        curl -sX GET http://localhost:8081/fledge/job/<id>
+    """
+    job_id = request.match_info.get('id', None)
+    job = JobManager().get(job_id)
+    if job is None:
+        msg = "Job {} not found".format(job_id)
+        raise web.HTTPNotFound(reason=msg, body=json.dumps({"message": msg}))
+    return web.json_response(job.to_dict())
+
+
+@has_permission("admin")
+async def cancel_job(request: web.Request) -> web.Response:
+    """ Cancel a job; a running job stops at the end of its current step
+
+    :Example:
+        curl -sX DELETE http://localhost:8081/fledge/job/<id>
+    """
+    job_id = request.match_info.get('id', None)
+    job = JobManager().cancel(job_id)
+    if job is None:
+        msg = "Job {} not found".format(job_id)
+        raise web.HTTPNotFound(reason=msg, body=json.dumps({"message": msg}))
+    if job.done and job.status != job.CANCELLED:
+        msg = "Job {} is already {}".format(job_id, job.status)
+        raise web.HTTPConflict(reason=msg, body=json.dumps({"message": msg}))
+    return web.json_response(job.to_dict())
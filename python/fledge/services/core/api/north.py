@@ -5,7 +5,6 @@
 # FLEDGE_END
 
 import json
-from functools import lru_cache
 from aiohttp import web
 
 from fledge.common.configuration_manager import ConfigurationManager
@@ -13,6 +12,7 @@ from fledge.common.logger import FLCoreLogger
 from fledge.common.plugin_discovery import PluginDiscovery
 from fledge.common.service_record import ServiceRecord
 from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.utils import ttl_cache
 from fledge.services.core import connect, server
 from fledge.services.core.scheduler.entities import Task
 from fledge.services.core.scheduler.exceptions import NotReadyError
@@ -30,6 +30,8 @@ _help = """
     -------------------------------------------------------------------------------
 """
 _logger = FLCoreLogger().get_logger(__name__)
+_INSTALLED_PLUGINS_CACHE_TTL = 30
+""" Seconds for which the installed plugins list is reused across requests, unless asked with cached=false """
 
 
 async def _get_sent_stats(storage_client, north_schedules):
@@ -46,25 +48,11 @@ async def _get_sent_stats(storage_client, north_schedules):
 
 
 async def _get_tasks_status():
-    payload = PayloadBuilder().SELECT("id", "schedule_name", "process_name", "state", "start_time",
-                                      "end_time", "reason", "pid", "exit_code")\
-        .WHERE(["process_name", "=", "north"])\
-        .OR_WHERE(["process_name", "=", "north_c"])\
-        .ALIAS("return", ("start_time", 'start_time'), ("end_time", 'end_time'))\
-        .FORMAT("return", ("start_time", "YYYY-MM-DD HH24:MI:SS.MS"), ("end_time", "YYYY-MM-DD HH24:MI:SS.MS"))\
-        .ORDER_BY(["schedule_name", "asc"], ["start_time", "desc"])
-
     tasks = {}
     try:
-        _storage = connect.get_storage_async()
-        results = await _storage.query_tbl_with_payload('tasks', payload.payload())
-        previous_schedule = None
-        for row in results['rows']:
-            if not row['schedule_name'].strip():
-                continue
-            if previous_schedule != row['schedule_name']:
-                tasks.update({row['schedule_name']: row})
-                previous_schedule = row['schedule_name']
+        for row in await server.Server.scheduler.get_latest_tasks():
+            if row['process_name'] in ("north", "north_c"):
+                tasks[row['schedule_name']] = row
     except Exception as ex:
         raise ValueError(str(ex))
     return tasks
@@ -73,7 +61,7 @@ async def _get_tasks_status():
 async def _get_north_schedules(cf_mgr):
     try:
         north_categories = await cf_mgr.get_category_child("North")
-        north_schedules = [nc["key"] for nc in north_categories]
+        north_schedules = {nc["key"] for nc in north_categories}
     except ValueError:
         return []
 
@@ -85,6 +73,7 @@ async def _get_north_schedules(cf_mgr):
         services_from_registry = ServiceRegistry.get(s_type="Northbound")
     except DoesNotExist:
         services_from_registry = []
+    registry_by_name = {s_record._name: s_record for s_record in services_from_registry}
     for sch in schedule_list:
         if sch.name in north_schedules:
             if sch.process_name != "north_C" and sch.schedule_type != 1:
@@ -107,22 +96,22 @@ async def _get_north_schedules(cf_mgr):
                     }
                 }
             else:
-                for s_record in services_from_registry:
-                    if s_record._name == sch.name:
-                        north_sch_dict = {
-                            'id': str(sch.schedule_id),
-                            'name': sch.name,
-                            'processName': sch.process_name,
-                            'enabled': sch.enabled,
-                            'execution': 'service',
-                            'address': s_record._address,
-                            'managementPort': s_record._management_port,
-                            'servicePort': s_record._port,
-                            'protocol': s_record._protocol,
-                            'status': ServiceRecord.Status(int(s_record._status)).name.lower()
-                        }
+                s_record = registry_by_name.get(sch.name)
+                if s_record is not None:
+                    north_sch_dict = {
+                        'id': str(sch.schedule_id),
+                        'name': sch.name,
+                        'processName': sch.process_name,
+                        'enabled': sch.enabled,
+                        'execution': 'service',
+                        'address': s_record._address,
+                        'managementPort': s_record._management_port,
+                        'servicePort': s_record._port,
+                        'protocol': s_record._protocol,
+                        'status': ServiceRecord.Status(int(s_record._status)).name.lower()
+                    }
                 # north-C service case, If not in service registry
-                if sch.enabled is False and sch.name not in [s_record._name for s_record in services_from_registry]:
+                if sch.enabled is False and s_record is None:
                     north_sch_dict = {
                         'id': str(sch.schedule_id),
                         'name': sch.name,
@@ -141,9 +130,12 @@ async def _get_north_schedules(cf_mgr):
     return list({v['name']: v for v in schedules}.values())
 
 
-@lru_cache(maxsize=1024)
+@ttl_cache(_INSTALLED_PLUGINS_CACHE_TTL)
 def _get_installed_plugins():
-    return PluginDiscovery.get_plugins_installed("north", False)
+    versions = {}
+    for p in PluginDiscovery.get_plugins_installed("north", False):
+        versions.setdefault(p["name"], p["version"])
+    return versions
 
 
 async def get_north_schedules(request):
@@ -165,21 +157,16 @@ async def get_north_schedules(request):
         north_schedules = await _get_north_schedules(cf_mgr)
         
         north_schs = [ns["name"] for ns in north_schedules]
-        stats = []
+        stats = {}
+        plugins = {}
         if len(north_schs):
-            stats = await _get_sent_stats(storage_client, north_schs)
+            stats = {s["key"]: s["value"] for s in await _get_sent_stats(storage_client, north_schs)}
+            plugins = await cf_mgr.get_categories_item_value_entry(north_schs, 'plugin')
         installed_plugins = _get_installed_plugins()
         for sch in north_schedules:
-            stat = next((s for s in stats if s["key"] == sch["name"]), None)
-            sch["sent"] = stat["value"] if stat else -1
-            plugin = await cf_mgr.get_category_item(sch["name"], 'plugin')
-            plugin_name = plugin['value'] if plugin is not None else ''
-            plugin_version = ''
-            for p in installed_plugins:
-                if p["name"] == plugin_name:
-                    plugin_version = p["version"]
-                    break
-            sch["plugin"] = {"name": plugin_name, "version": plugin_version}
+            sch["sent"] = stats.get(sch["name"], -1)
+            plugin_name = plugins.get(sch["name"]) or ''
+            sch["plugin"] = {"name": plugin_name, "version": installed_plugins.get(plugin_name, '')}
 
     except (KeyError, ValueError) as e:  # Handles KeyError of _get_sent_stats
         msg = str(e)
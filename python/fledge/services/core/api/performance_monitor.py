@@ -4,6 +4,9 @@
 # See: http://fledge-iot.readthedocs.io/
 # FLEDGE_END
 
+import datetime
+import json
+
 from aiohttp import web
 
 from fledge.common.logger import FLCoreLogger
@@ -32,37 +35,117 @@ def setup(app):
     app.router.add_route('DELETE', '/fledge/monitors/{service}', purge_by_service)
     app.router.add_route('DELETE', '/fledge/monitors/{service}/{counter}', purge_by_service_and_counter)
 
-# TODO: 8167 - Limit and Offset support and other pending queries
+_DEFAULT_TS_FORMAT = "YYYY-MM-DD HH24:MI:SS.MS"
+_BUCKET_TS_FORMAT = "YYYY-MM-DD HH24:MI:SS"
+
+
+def _prepare_payload(request: web.Request, where: list) -> dict:
+    """ Build the monitors query payload from the optional from, to, limit and bucket query parameters
+
+    Args:
+        request: request query params
+        where: list of conditions to be applied before the time window i.e. service and/or monitor name
+    Returns:
+        payload dict for monitors table
+    Raises:
+        ValueError: for an invalid value of any of the query parameters
+
+    from and to are UTC timestamps in seconds since epoch; bucket is given in seconds and when supplied the samples
+    are downsampled per service, monitor and bucket with minimum of minimums, maximum of maximums,
+    average of averages and total of samples.
+    """
+    conditions = list(where)
+    for param, condition in (('from', '>='), ('to', '<=')):
+        if param in request.query and request.query[param] != '':
+            try:
+                ts = float(request.query[param])
+                dt = datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+            except (ValueError, OverflowError, OSError):
+                raise ValueError("{} must be a valid UTC timestamp in seconds since epoch.".format(param))
+            conditions.append(["ts", condition, dt])
+    limit = None
+    if 'limit' in request.query and request.query['limit'] != '':
+        try:
+            limit = int(request.query['limit'])
+            if limit <= 0:
+                raise ValueError
+        except ValueError:
+            raise ValueError("limit must be a positive integer.")
+    bucket = None
+    if 'bucket' in request.query and request.query['bucket'] != '':
+        try:
+            bucket = int(request.query['bucket'])
+            if bucket <= 0:
+                raise ValueError
+        except ValueError:
+            raise ValueError("bucket must be a positive integer in seconds.")
+
+    if bucket is None:
+        builder = PayloadBuilder().SELECT("service", "monitor", "average", "maximum", "minimum", "samples", "ts").ALIAS(
+            "return", ("ts", 'timestamp')).FORMAT("return", ("ts", _DEFAULT_TS_FORMAT))
+    else:
+        builder = PayloadBuilder().AGGREGATE(["min", "minimum"], ["max", "maximum"], ["avg", "average"],
+                                             ["sum", "samples"]).ALIAS(
+            'aggregate', ('minimum', 'min', 'minimum'), ('maximum', 'max', 'maximum'),
+            ('average', 'avg', 'average'), ('samples', 'sum', 'samples'))
+    if conditions:
+        builder.WHERE(tuple(conditions))
+    if bucket is None:
+        if limit is not None:
+            # Most recent samples first, so that limit keeps the latest ones; see _in_time_order
+            builder.ORDER_BY(["ts", "desc"])
+    else:
+        # Sort & timebucket modifiers can not be used in same payload; timebucket results are in descending order
+        builder.GROUP_BY("service", "monitor").TIMEBUCKET("ts", str(bucket), _BUCKET_TS_FORMAT, "timestamp")
+    if limit is not None:
+        builder.LIMIT(limit)
+    return builder.chain_payload()
+
+
+def _in_time_order(payload: dict, rows: list) -> list:
+    """ Rows of a limited query are fetched latest first, return them in the order of an unlimited query """
+    if 'sort' in payload:
+        return rows[::-1]
+    return rows
+
+
+def _monitor_values(rows: list) -> dict:
+    """ Group the rows by monitor name in a single pass over the result set """
+    monitor = {}
+    for row in rows:
+        val = {"average": row["average"], "maximum": row["maximum"], "minimum": row["minimum"],
+               "samples": row["samples"], "timestamp": row["timestamp"]}
+        monitor.setdefault(row['monitor'], []).append(val)
+    return monitor
+
 
 async def get_all(request: web.Request) -> web.Response:
     """ GET list of performance monitors
 
+    Optional query parameters:
+        from=x      Return samples recorded at or after UTC timestamp x (seconds since epoch)
+        to=x        Return samples recorded at or before UTC timestamp x (seconds since epoch)
+        limit=x     Return the most recent x samples only
+        bucket=x    Downsample into buckets of x seconds with minimum, maximum, average and total samples per bucket
+
     :Example:
         curl -sX GET http://localhost:8081/fledge/monitors
+        curl -sX GET "http://localhost:8081/fledge/monitors?from=1708360000&to=1708363600"
+        curl -sX GET "http://localhost:8081/fledge/monitors?bucket=600&limit=144"
     """
+    try:
+        payload = _prepare_payload(request, [])
+    except ValueError as err:
+        msg = str(err)
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
     storage = connect.get_storage_async()
-    monitors = await storage.query_tbl("monitors")
-    counters = monitors["rows"]
-    monitor = {}
-    for c in counters:
-        val = {"average": c["average"], "maximum": c["maximum"], "minimum": c["minimum"], "samples": c["samples"],
-               "timestamp": c["ts"], "service": c["service"]}
-        monitor.setdefault(c['monitor'], []).append(val)
-    monitors = [{'monitor': k, 'values': v} for k, v in monitor.items()]
-    # Group by service name
+    result = await storage.query_tbl_with_payload("monitors", json.dumps(payload))
+    # Group by service name and then by monitor
     grouped_data = {}
-    for entry in monitors:
-        monitor_name = entry['monitor']
-        values = entry['values']
-        for value in values:
-            service = value.pop('service', None)
-            if service:
-                if service not in grouped_data:
-                    grouped_data[service] = {}
-                if monitor_name not in grouped_data[service]:
-                    grouped_data[service][monitor_name] = []
-                # Group by monitor
-                grouped_data[service][monitor_name].append(value)
+    for row in _in_time_order(payload, result.get("rows", [])):
+        val = {"average": row["average"], "maximum": row["maximum"], "minimum": row["minimum"],
+               "samples": row["samples"], "timestamp": row["timestamp"]}
+        grouped_data.setdefault(row["service"], {}).setdefault(row["monitor"], []).append(val)
     return web.json_response({"monitors": grouped_data})
 
 
@@ -73,20 +156,17 @@ async def get_by_service_name(request: web.Request) -> web.Response:
         curl -sX GET http://localhost:8081/fledge/monitors/<SVC_NAME>
     """
     service = request.match_info.get('service', None)
+    try:
+        payload = _prepare_payload(request, [["service", '=', service]])
+    except ValueError as err:
+        msg = str(err)
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
     storage = connect.get_storage_async()
-    payload = PayloadBuilder().SELECT("average", "maximum", "minimum", "monitor", "samples", "ts").ALIAS(
-        "return", ("ts", 'timestamp')).FORMAT("return", ("ts", "YYYY-MM-DD HH24:MI:SS.MS")).WHERE(
-        ["service", '=', service]).payload()
     response = {"service": service}
-    result = await storage.query_tbl_with_payload('monitors', payload)
+    result = await storage.query_tbl_with_payload('monitors', json.dumps(payload))
     if 'rows' in result:
-        monitor = {}
-        for row in result["rows"]:
-            val = {"average": row["average"], "maximum": row["maximum"], "minimum": row["minimum"],
-                   "samples": row["samples"], "timestamp": row["timestamp"]}
-            monitor.setdefault(row['monitor'], []).append(val)
-        monitors = [{'monitor': k, 'values': v} for k, v in monitor.items()]
-        response["monitors"] = monitors
+        monitor = _monitor_values(_in_time_order(payload, result["rows"]))
+        response["monitors"] = [{'monitor': k, 'values': v} for k, v in monitor.items()]
     return web.json_response(response)
 
 async def get_by_service_and_counter_name(request: web.Request) -> web.Response:
@@ -98,15 +178,17 @@ async def get_by_service_and_counter_name(request: web.Request) -> web.Response:
     service = request.match_info.get('service', None)
     counter = request.match_info.get('counter', None)
 
+    try:
+        payload = _prepare_payload(request, [["service", '=', service], ["monitor", '=', counter]])
+    except ValueError as err:
+        msg = str(err)
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
     storage = connect.get_storage_async()
-    payload = PayloadBuilder().SELECT("average", "maximum", "minimum", "samples", "ts").ALIAS(
-        "return", ("ts", 'timestamp')).FORMAT("return", ("ts", "YYYY-MM-DD HH24:MI:SS.MS")).WHERE(
-        ["service", '=', service]).AND_WHERE(["monitor", '=', counter]).payload()
-    result = await storage.query_tbl_with_payload('monitors', payload)
+    result = await storage.query_tbl_with_payload('monitors', json.dumps(payload))
     response = {}
     if 'rows' in result:
-        response = {"service": service, "monitors":{"monitor": counter}}
-        response["monitors"]["values"] = result["rows"] if result["rows"] else []
+        response = {"service": service, "monitors": {"monitor": counter}}
+        response["monitors"]["values"] = list(_monitor_values(_in_time_order(payload, result["rows"])).get(counter, []))
     return web.json_response(response)
 
 async def purge_all(request: web.Request) -> web.Response:
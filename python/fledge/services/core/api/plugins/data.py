@@ -4,6 +4,7 @@
 # See: http://fledge-iot.readthedocs.io/
 # FLEDGE_END
 
+import asyncio
 import json
 import urllib.parse
 from aiohttp import web
@@ -53,7 +54,9 @@ async def get_persist_plugins(request: web.Request) -> web.Response:
         if not svc_info[0]:
             raise ValueError("{} service not found.".format(service))
         # Return all persistent plugins on the basis of directory + filters always
-        all_plugins = common_utils.get_persist_plugins(dir_name)
+        # The first call scans the plugin libraries, keep it off the event loop
+        loop = asyncio.get_event_loop()
+        all_plugins = await loop.run_in_executor(None, common_utils.get_persist_plugins, dir_name)
         plugins = []
         # Get key names from plugin_data table
         payload = PayloadBuilder().SELECT("key", "data").WHERE(['key', 'like', "{}%".format(service)])
@@ -23,11 +23,14 @@ from fledge.common import utils
 from fledge.common.audit_logger import AuditLogger
 from fledge.common.common import _FLEDGE_ROOT, _FLEDGE_DATA
 from fledge.common.configuration_manager import ConfigurationManager
+from fledge.common.job_manager import Job, JobManager
 from fledge.common.logger import FLCoreLogger
 from fledge.common.plugin_discovery import PluginDiscovery
 from fledge.common.storage_client.payload_builder import PayloadBuilder
 from fledge.common.storage_client.exceptions import StorageServerError
+from fledge.plugins.common.plugin_index import PluginIndex
 from fledge.services.core import connect, server
+from fledge.services.core.api import job
 from fledge.services.core.api.plugins import common
 from fledge.services.core.api.plugins.exceptions import *
 
@@ -61,9 +64,12 @@ async def add_plugin(request: web.Request) -> web.Response:
             compressed - (optional) boolean this is used to indicate the package is a compressed gzip image
             checksum - the checksum of the file, used to verify correct upload
 
+        A file pulled from a url is installed as a job; with wait=true the response is sent once it is installed.
+
         curl -sX POST http://localhost:8081/fledge/plugins -d '{"format":"repository", "name": "fledge-south-sinusoid"}'
         curl -sX POST http://localhost:8081/fledge/plugins -d '{"format":"repository", "name": "fledge-notify-slack", "version":"1.6.0"}'
     """
+    wait = job.wait_requested(request)
     try:
         data = await request.json()
         url = data.get('url', None)
@@ -160,27 +166,11 @@ async def add_plugin(request: web.Request) -> web.Response:
             if not os.path.exists(_PATH):
                 os.makedirs(_PATH)
 
-            result = await download([url])
-            file_name = result[0]
-
-            # validate checksum with MD5sum
-            if validate_checksum(checksum, file_name) is False:
-                raise ValueError("Checksum is failed.")
-
-            _LOGGER.debug("Found {} format with compressed {}".format(file_format, is_compressed))
-            if file_format == 'tar':
-                files = extract_file(file_name, is_compressed)
-                _LOGGER.debug("Files {} {}".format(files, type(files)))
-                code, msg = copy_file_install_requirement(files, plugin_type, file_name)
-                if code != 0:
-                    raise ValueError(msg)
-            else:
-                pkg_mgt = 'yum' if file_format == 'rpm' else 'apt'
-                code, msg = install_package(file_name, pkg_mgt)
-                if code != 0:
-                    raise ValueError(msg)
-
-            result_payload = {"message": "{} is successfully downloaded and installed".format(file_name)}
+            install_job = JobManager().submit("Plugin installation", _install_from_file, url, checksum, file_format,
+                                              plugin_type, is_compressed)
+            if not wait:
+                return job.accepted(install_job, "Plugin installation started.")
+            result_payload = {"message": await install_job.wait()}
     except StorageServerError as err:
         msg = str(err)
         raise web.HTTPInternalServerError(reason=msg, body=json.dumps({"message": "Storage error: {}".format(msg)}))
@@ -196,6 +186,39 @@ async def add_plugin(request: web.Request) -> web.Response:
         return web.json_response(result_payload)
 
 
+async def _install_from_file(install_job: Job, url: str, checksum: str, file_format: str, plugin_type: str,
+                             is_compressed: bool) -> str:
+    install_job.set_progress(0, "Downloading {}".format(url))
+    result = await download([url])
+    file_name = result[0]
+
+    # validate checksum with MD5sum
+    install_job.check_cancelled()
+    install_job.set_progress(30, "Validating checksum")
+    if await install_job.run_blocking(validate_checksum, checksum, file_name) is False:
+        raise ValueError("Checksum is failed.")
+
+    _LOGGER.debug("Found {} format with compressed {}".format(file_format, is_compressed))
+    install_job.check_cancelled()
+    if file_format == 'tar':
+        install_job.set_progress(40, "Extracting {}".format(file_name))
+        files = await install_job.run_blocking(extract_file, file_name, is_compressed)
+        _LOGGER.debug("Files {} {}".format(files, type(files)))
+        install_job.check_cancelled()
+        install_job.set_progress(60, "Installing {}".format(file_name))
+        code, msg = await install_job.run_blocking(copy_file_install_requirement, files, plugin_type, file_name)
+        if code != 0:
+            raise ValueError(msg)
+    else:
+        install_job.set_progress(40, "Installing {}".format(file_name))
+        pkg_mgt = 'yum' if file_format == 'rpm' else 'apt'
+        code, msg = await install_job.run_blocking(install_package, file_name, pkg_mgt)
+        if code != 0:
+            raise ValueError(msg)
+    PluginIndex.invalidate()
+    return "{} is successfully downloaded and installed".format(file_name)
+
+
 async def get_url(url: str, session: aiohttp.ClientSession) -> str:
     file_name = str(url.split("/")[-1])
     async with async_timeout.timeout(_TIME_OUT):
@@ -349,6 +372,7 @@ def install_package_from_repo(name: str, pkg_mgt: str, version: str, uid: uuid,
     payload = PayloadBuilder().SET(status=ret_code, log_file_uri=link).WHERE(['id', '=', uid]).payload()
     loop.run_until_complete(storage.update_tbl("packages", payload))
     if ret_code == 0:
+        PluginIndex.invalidate()
         # Audit info
         audit = AuditLogger(storage)
         audit_detail = {'packageName': name}
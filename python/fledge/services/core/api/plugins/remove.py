@@ -20,6 +20,7 @@ from fledge.common.logger import FLCoreLogger
 from fledge.common.plugin_discovery import PluginDiscovery
 from fledge.common.storage_client.exceptions import StorageServerError
 from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.plugins.common.plugin_index import PluginIndex
 from fledge.services.core import connect
 from fledge.services.core.api.plugins import common
 from fledge.services.core.api.plugins.exceptions import *
@@ -168,6 +169,7 @@ def _uninstall(pkg_name: str, version: str, uid: uuid, storage: connect) -> tupl
         loop = asyncio.new_event_loop()
         loop.run_until_complete(storage.update_tbl("packages", payload))
         if code == 0:
+            PluginIndex.invalidate()
             # Clear internal cache
             loop.run_until_complete(_put_refresh_cache("http", Server._host, Server.core_management_port))
             # Audit logger
@@ -444,4 +446,6 @@ def purge_plugin(plugin_type: str, plugin_name: str, pkg_name: str, version: str
             code = 1
             _logger.error(ex, "Error in removing plugin.")
         _logger.info('{} plugin removed successfully.'.format(plugin_name))
+    if code == 0:
+        PluginIndex.invalidate()
     return code, stdout_file_path, is_package
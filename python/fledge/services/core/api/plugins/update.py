@@ -19,6 +19,7 @@ from fledge.common.logger import FLCoreLogger
 from fledge.common.plugin_discovery import PluginDiscovery
 from fledge.common.storage_client.exceptions import StorageServerError
 from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.plugins.common.plugin_index import PluginIndex
 from fledge.services.core import connect, server
 from fledge.services.core.api.plugins import common
 
@@ -389,6 +390,7 @@ def do_update(protocol: str, host: str, port: int, storage: connect, _type: str,
     loop.run_until_complete(storage.update_tbl("packages", payload))
 
     if code == 0:
+        PluginIndex.invalidate()
         # Audit info
         audit = AuditLogger(storage)
         installed_plugins = PluginDiscovery.get_plugins_installed(_type, False)
@@ -7,7 +7,6 @@
 import asyncio
 import json
 from typing import List
-import pkg_resources
 from aiohttp import web
 
 from fledge.common.audit_logger import AuditLogger
@@ -29,6 +28,8 @@ _LOGGER = FLCoreLogger().get_logger(__name__)
 
 
 def get_packages_installed() -> List:
+    # pkg_resources takes a while to import and is only needed here
+    import pkg_resources
     package_ws = pkg_resources.WorkingSet()
     installed_pkgs = [{'package': dist.project_name, 'version': dist.version} for dist in package_ws]
     return installed_pkgs
@@ -69,6 +70,7 @@ async def install_package(request: web.Request) -> web.Response:
         return web.HTTPBadRequest(reason="Package name empty.")
 
     def get_installed_package_info(input_package):
+        import pkg_resources
         packages = pkg_resources.WorkingSet()
         for package in packages:
             if package.project_name.lower() == input_package.lower():
@@ -868,31 +868,16 @@ async def get_tasks_latest(request):
 
               curl -X GET  http://localhost:8081/fledge/task/latest?name=xxx
     """
-    payload = PayloadBuilder().SELECT("id", "schedule_name", "process_name", "state", "start_time", "end_time", "reason", "pid", "exit_code")\
-        .ALIAS("return", ("start_time", 'start_time'), ("end_time", 'end_time'))\
-        .FORMAT("return", ("start_time", "YYYY-MM-DD HH24:MI:SS.MS"), ("end_time", "YYYY-MM-DD HH24:MI:SS.MS"))\
-        .ORDER_BY(["schedule_name", "asc"], ["start_time", "desc"])
-
+    name = None
     if 'name' in request.query and request.query['name'] != '':
         name = request.query['name']
-        payload.WHERE(["schedule_name", "=", name])
 
     try:
-        _storage = connect.get_storage_async()
-        results = await _storage.query_tbl_with_payload('tasks', payload.payload())
+        tasks = await server.Server.scheduler.get_latest_tasks(name)
 
-        if len(results['rows']) == 0:
+        if len(tasks) == 0:
             raise web.HTTPNotFound(reason="No Tasks found")
 
-        tasks = []
-        previous_schedule = None
-        for row in results['rows']:
-            if not row['schedule_name'].strip():
-                continue
-            if previous_schedule != row['schedule_name']:
-                tasks.append(row)
-                previous_schedule = row['schedule_name']
-
         new_tasks = []
         for task in tasks:
             new_tasks.append(
@@ -22,6 +22,7 @@ from fledge.common.storage_client.exceptions import StorageServerError
 from fledge.common.configuration_manager import ConfigurationManager
 from fledge.services.core import server
 from fledge.services.core import connect
+from fledge.services.core.api import asset_tracker as asset_tracker_api
 from fledge.services.core.api import utils as apiutils
 from fledge.services.core.scheduler.entities import StartUpSchedule
 from fledge.services.core.service_registry.service_registry import ServiceRegistry
@@ -217,6 +218,7 @@ async def update_deprecated_ts_in_asset_tracker(storage, svc):
             update_payload = PayloadBuilder().SET(deprecated_ts=current_time).WHERE(
                 ['service', '=', svc]).payload()
             await storage.update_tbl("asset_tracker", update_payload)
+            asset_tracker_api.invalidate()
 
 
 async def add_service(request):
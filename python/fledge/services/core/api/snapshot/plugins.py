@@ -9,7 +9,9 @@ import os
 from aiohttp import web
 from fledge.services.core.snapshot import SnapshotPluginBuilder
 from fledge.common.common import _FLEDGE_ROOT, _FLEDGE_DATA
+from fledge.common.job_manager import JobManager
 from fledge.common.web.middleware import has_permission
+from fledge.services.core.api import job
 
 __author__ = "Amarendra K Sinha"
 __copyright__ = "Copyright (c) 2019 Dianomic Systems"
@@ -52,18 +54,22 @@ async def get_snapshot(request):
 
 @has_permission("admin")
 async def post_snapshot(request):
-    """ Create a snapshot  by name
+    """ Create a snapshot, as a job; with wait=true the response is sent once the snapshot is created
 
     :Example:
         curl -X POST http://localhost:8081/fledge/snapshot/plugins
+        curl -X POST http://localhost:8081/fledge/snapshot/plugins?wait=true
 
         When auth is mandatory:
         curl -X POST http://localhost:8081/fledge/snapshot/plugins -H "authorization: <token>" 
     """
+    wait = job.wait_requested(request)
     try:
         snapshot_dir = _get_snapshot_dir()
-        snapshot_id, snapshot_name = await SnapshotPluginBuilder(
-            snapshot_dir).build()
+        snapshot_job = JobManager().submit("Plugin snapshot", _create_snapshot, snapshot_dir)
+        if not wait:
+            return job.accepted(snapshot_job, "Snapshot creation started.")
+        snapshot_id, snapshot_name = await snapshot_job.wait()
     except Exception as ex:
         raise web.HTTPInternalServerError(
             reason='Snapshot could not be created. {}'.format(str(ex)))
@@ -75,14 +81,16 @@ async def post_snapshot(request):
 
 @has_permission("admin")
 async def put_snapshot(request):
-    """extract a snapshot
+    """extract a snapshot, as a job; with wait=true the response is sent once the snapshot is restored
 
     :Example:
         curl -X PUT http://localhost:8081/fledge/snapshot/plugins/1554204238
+        curl -X PUT http://localhost:8081/fledge/snapshot/plugins/1554204238?wait=true
 
         When auth is mandatory:
         curl -X PUT http://localhost:8081/fledge/snapshot/plugins/1554204238 -H "authorization: <token>" 
     """
+    wait = job.wait_requested(request)
     try:
         snapshot_id = request.match_info.get('id', None)
         snapshot_name = "snapshot-plugin-{}.tar.gz".format(snapshot_id)
@@ -101,7 +109,10 @@ async def put_snapshot(request):
                 raise web.HTTPNotFound(reason='{} not found'.format(snapshot_name))
 
         p = "{}/{}".format(snapshot_dir, snapshot_name)
-        SnapshotPluginBuilder(snapshot_dir).extract_files(p)
+        restore_job = JobManager().submit("Plugin snapshot restore", _restore_snapshot, snapshot_dir, p)
+        if not wait:
+            return job.accepted(restore_job, "Snapshot {} restore started.".format(snapshot_name))
+        await restore_job.wait()
     except ValueError as ex:
         raise web.HTTPBadRequest(reason=str(ex))
     except Exception as ex:
@@ -155,6 +166,14 @@ async def delete_snapshot(request):
                 snapshot_name)})
 
 
+def _create_snapshot(snapshot_job, snapshot_dir):
+    return SnapshotPluginBuilder(snapshot_dir).create(snapshot_job)
+
+
+def _restore_snapshot(restore_job, snapshot_dir, snapshot_file):
+    return SnapshotPluginBuilder(snapshot_dir).extract_files(snapshot_file)
+
+
 def _get_snapshot_dir():
     if _FLEDGE_DATA:
         snapshot_dir = os.path.expanduser(_FLEDGE_DATA + '/snapshots/plugins')
@@ -4,8 +4,6 @@
 # See: http://fledge-iot.readthedocs.io/
 # FLEDGE_END
 
-from functools import lru_cache
-
 from aiohttp import web
 
 from fledge.common.service_record import ServiceRecord
@@ -15,6 +13,7 @@ from fledge.services.core.service_registry.exceptions import DoesNotExist
 from fledge.services.core import connect
 from fledge.common.configuration_manager import ConfigurationManager
 from fledge.common.plugin_discovery import PluginDiscovery
+from fledge.common.utils import ttl_cache
 
 __author__ = "Praveen Garg"
 __copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
@@ -26,17 +25,22 @@ _help = """
     | GET                 | /fledge/south                                         |
     -------------------------------------------------------------------------------
 """
+_INSTALLED_PLUGINS_CACHE_TTL = 30
+""" Seconds for which the installed plugins list is reused across requests, unless asked with cached=false """
 
 
-async def _get_schedule_status(storage_client, svc_name):
-    payload = PayloadBuilder().SELECT("enabled").WHERE(['schedule_name', '=', svc_name]).payload()
+async def _get_schedules_status(storage_client, svc_names):
+    payload = PayloadBuilder().SELECT("schedule_name", "enabled").WHERE(['schedule_name', 'in', svc_names]).payload()
     result = await storage_client.query_tbl_with_payload('schedules', payload)
-    return True if result['rows'][0]['enabled'] == 't' else False
+    return {r['schedule_name']: r['enabled'] == 't' for r in result['rows']}
 
 
-@lru_cache(maxsize=1024)
+@ttl_cache(_INSTALLED_PLUGINS_CACHE_TTL)
 def _get_installed_plugins():
-    return PluginDiscovery.get_plugins_installed("south", False)
+    versions = {}
+    for p in PluginDiscovery.get_plugins_installed("south", False):
+        versions.setdefault(p["name"], p["version"])
+    return versions
 
 
 async def _services_with_assets(storage_client, cf_mgr, south_services):
@@ -47,25 +51,25 @@ async def _services_with_assets(storage_client, cf_mgr, south_services):
         except DoesNotExist:
             services_from_registry = []
 
-        def is_svc_in_service_registry(name):
-            return next((svc for svc in services_from_registry if svc._name == name), None)
+        registered = {svc._name for svc in services_from_registry}
+        svc_names = [svc._name for svc in services_from_registry] + [
+            s_name for s_name in south_services if s_name not in registered]
+        if not svc_names:
+            return sr_list
 
         installed_plugins = _get_installed_plugins()
+        plugins = {name: value if value is not None else ''
+                   for name, value in (await cf_mgr.get_categories_item_value_entry(svc_names, 'plugin')).items()}
+        assets = await _get_tracked_assets_and_readings(storage_client, svc_names, plugins)
+        # Service running on another machine have no scheduler entry
+        schedules_status = {}
+        try:
+            schedules_status = await _get_schedules_status(storage_client, svc_names)
+        except:
+            pass
 
         for s_record in services_from_registry:
-            plugin, assets = await _get_tracked_plugin_assets_and_readings(storage_client, cf_mgr, s_record._name)
-            plugin_version = ''
-            for p in installed_plugins:
-                if p["name"] == plugin:
-                    plugin_version = p["version"]
-                    break
-
-            # Service running on another machine have no scheduler entry
-            sched_enable = 'unknown'
-            try:
-                sched_enable = await _get_schedule_status(storage_client, s_record._name)
-            except:
-                pass
+            plugin = plugins.get(s_record._name, '')
             sr_list.append(
                 {
                     'name': s_record._name,
@@ -74,71 +78,57 @@ async def _services_with_assets(storage_client, cf_mgr, south_services):
                     'service_port': s_record._port,
                     'protocol': s_record._protocol,
                     'status': ServiceRecord.Status(int(s_record._status)).name.lower(),
-                    'assets': assets,
-                    'plugin': {'name': plugin, 'version': plugin_version},
-                    'schedule_enabled': sched_enable
+                    'assets': assets[s_record._name],
+                    'plugin': {'name': plugin, 'version': installed_plugins.get(plugin, '')},
+                    'schedule_enabled': schedules_status.get(s_record._name, 'unknown')
+                })
+        for s_name in svc_names[len(services_from_registry):]:
+            plugin = plugins.get(s_name, '')
+            # Handle schedule status when there is no schedule entry matching a South child category name
+            sr_list.append(
+                {
+                    'name': s_name,
+                    'address': '',
+                    'management_port': '',
+                    'service_port': '',
+                    'protocol': '',
+                    'status': '',
+                    'assets': assets[s_name],
+                    'plugin': {'name': plugin, 'version': installed_plugins.get(plugin, '')},
+                    'schedule_enabled': schedules_status.get(s_name, 'unknown')
                 })
-        for s_name in south_services:
-            south_svc = is_svc_in_service_registry(s_name)
-            if not south_svc:
-                plugin, assets = await _get_tracked_plugin_assets_and_readings(storage_client, cf_mgr, s_name)
-                plugin_version = ''
-                for p in installed_plugins:
-                    if p["name"] == plugin:
-                        plugin_version = p["version"]
-                        break
-                # Handle schedule status when there is no schedule entry matching a South child category name
-                sch_status = 'unknown'
-                try:
-                    sch_status = await _get_schedule_status(storage_client, s_name)
-                except:
-                    pass
-                sr_list.append(
-                    {
-                        'name': s_name,
-                        'address': '',
-                        'management_port': '',
-                        'service_port': '',
-                        'protocol': '',
-                        'status': '',
-                        'assets': assets,
-                        'plugin': {'name': plugin, 'version': plugin_version},
-                        'schedule_enabled': sch_status
-                    })
     except:
         raise
     else:
         return sr_list
 
 
-async def _get_tracked_plugin_assets_and_readings(storage_client, cf_mgr, svc_name):
-    asset_json = []
-    plugin_value = await cf_mgr.get_category_item(svc_name, 'plugin')
-    plugin = plugin_value['value'] if plugin_value is not None else ''
-    payload = PayloadBuilder().SELECT(["asset", "plugin"]).WHERE(['service', '=', svc_name]).AND_WHERE(
-        ['event', '=', 'Ingest']).AND_WHERE(['plugin', '=', plugin]).AND_WHERE(['deprecated_ts', 'isnull']).payload()
+async def _get_tracked_assets_and_readings(storage_client, svc_names, plugins):
+    """ Ingest assets tracked by each service with their readings count, from one asset_tracker and
+        one statistics query """
+    assets = {name: [] for name in svc_names}
+    payload = PayloadBuilder().SELECT(["service", "asset", "plugin"]).WHERE(['service', 'in', svc_names]).AND_WHERE(
+        ['event', '=', 'Ingest']).AND_WHERE(['deprecated_ts', 'isnull']).payload()
     try:
         result = await storage_client.query_tbl_with_payload('asset_tracker', payload)
         # TODO: FOGL-2549
         # old asset track entry still appears with combination of service name + plugin name + event name if exists
-        asset_records = result['rows']
-        assets = [ar["asset"].upper()for ar in asset_records]
-        if len(assets):
-            def map_original_asset_name(asset_stats_key):
-                # asset name are being recorded in uppercase as key in statistics table
-                for ar in asset_records:
-                    if ar["asset"].upper() == asset_stats_key:
-                        return ar["asset"]
-                return None
-
-            payload = PayloadBuilder().SELECT(["key", "value"]).WHERE(["key", "in", assets]).payload()
+        # asset name are being recorded in uppercase as key in statistics table
+        tracked = {}
+        for ar in result['rows']:
+            if ar['plugin'] == plugins.get(ar['service'], ''):
+                svc_assets = tracked.setdefault(ar['asset'].upper(), {})
+                svc_assets.setdefault(ar['service'], ar['asset'])
+        if tracked:
+            payload = PayloadBuilder().SELECT(["key", "value"]).WHERE(["key", "in", list(tracked)]).payload()
             results = await storage_client.query_tbl_with_payload("statistics", payload)
             for _r in results['rows']:
-                asset_json.append({"count": _r['value'], "asset": map_original_asset_name(_r['key'])})
+                for svc_name, asset_name in tracked.get(_r['key'], {}).items():
+                    assets[svc_name].append({"count": _r['value'], "asset": asset_name})
     except:
         raise
     else:
-        return plugin, asset_json
+        return assets
 
 
 async def get_south_services(request):
@@ -7,7 +7,7 @@ import datetime
 from aiohttp import web
 
 from fledge.common.storage_client.payload_builder import PayloadBuilder
-from fledge.services.core import connect
+from fledge.services.core import connect, server
 from fledge.services.core.scheduler.scheduler import Scheduler
 from fledge.common.logger import FLCoreLogger
 
@@ -104,26 +104,34 @@ async def get_statistics_history(request):
     except ValueError:
         raise web.HTTPBadRequest(reason="Time unit must be a positive integer")
 
+    # A resident stats collector skips the repeated zero rows of an idle key, LIMIT is no count of collections then
+    in_core = server.Server.scheduler is not None and server.Server.scheduler.stats_collector_in_core
+    limit = None
     if 'limit' in request.query and request.query['limit'] != '':
         try:
             limit = int(request.query['limit'])
             if limit < 0:
                 raise ValueError
-            if 'key' in request.query:
-                limit_count = limit
+            if in_core:
+                stats_history_chain_payload = PayloadBuilder(stats_history_chain_payload).AND_WHERE(
+                    ['history_ts', 'newer', int(limit * interval_in_secs)]).chain_payload()
             else:
-                # FIXME: Hack straight away multiply the LIMIT by the group count
-                # i.e. if there are 8 records per distinct (stats_key), and limit supplied is 2
-                # then internally, actual LIMIT = 2*8
-                # TODO: FOGL-663 Need support for "subquery" from storage service
-                # Remove python side handling date_trunc and use
-                # SELECT date_trunc('second', history_ts::timestamptz)::varchar as history_ts
-
-                count_payload = PayloadBuilder().AGGREGATE(["count", "*"]).payload()
-                result = await storage_client.query_tbl_with_payload("statistics", count_payload)
-                key_count = result['rows'][0]['count_*']
-                limit_count = limit * key_count
-            stats_history_chain_payload = PayloadBuilder(stats_history_chain_payload).LIMIT(limit_count).chain_payload()
+                if 'key' in request.query:
+                    limit_count = limit
+                else:
+                    # FIXME: Hack straight away multiply the LIMIT by the group count
+                    # i.e. if there are 8 records per distinct (stats_key), and limit supplied is 2
+                    # then internally, actual LIMIT = 2*8
+                    # TODO: FOGL-663 Need support for "subquery" from storage service
+                    # Remove python side handling date_trunc and use
+                    # SELECT date_trunc('second', history_ts::timestamptz)::varchar as history_ts
+
+                    count_payload = PayloadBuilder().AGGREGATE(["count", "*"]).payload()
+                    result = await storage_client.query_tbl_with_payload("statistics", count_payload)
+                    key_count = result['rows'][0]['count_*']
+                    limit_count = limit * key_count
+                stats_history_chain_payload = PayloadBuilder(stats_history_chain_payload).LIMIT(
+                    limit_count).chain_payload()
         except ValueError:
             raise web.HTTPBadRequest(reason="Limit must be a positive integer")
 
@@ -151,6 +159,15 @@ async def get_statistics_history(request):
 
     # Append the last set of records which do not get appended above
     results.append(temp_dict)
+    if in_core:
+        # Every collection writes rows, a key missing from one was idle; report it as 0
+        keys = {row['key'] for row in result_from_storage['rows']}
+        for temp_dict in results:
+            if temp_dict:
+                for key in keys:
+                    temp_dict.setdefault(key, 0)
+        if limit is not None:
+            results = results[:limit]
     return web.json_response({"interval": interval_in_secs, 'statistics': results})
 
 
@@ -207,8 +224,9 @@ async def get_statistics_rate(request: web.Request) -> web.Response:
     resp = []
     for x, y in [(x, y) for x in period_split_list for y in stat_split_list]:
         # Get value column as per given key along with history_ts column order by
-        _payload = PayloadBuilder().SELECT("value").WHERE(['key', '=', y]).ORDER_BY(["history_ts", "desc"]
-                                                                                    ).chain_payload()
+        # Bounded to the period as well, as rows of an idle key may be skipped by a resident stats collector
+        _payload = PayloadBuilder().SELECT("value").WHERE(['key', '=', y]).AND_WHERE(
+            ['history_ts', 'newer', 60 * int(x)]).ORDER_BY(["history_ts", "desc"]).chain_payload()
         # LIMIT set to ((60 * period) / stats_collector_interval))
         calculated_formula = int((60 * int(x) / int(interval_in_secs)))
         stats_rate_payload = PayloadBuilder(_payload).LIMIT(calculated_formula).payload()
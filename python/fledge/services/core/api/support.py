@@ -4,6 +4,7 @@
 # See: http://fledge-iot.readthedocs.io/
 # FLEDGE_END
 
+import asyncio
 import os
 import subprocess
 import json
@@ -15,9 +16,12 @@ from aiohttp import web
 
 from fledge.common import utils
 from fledge.common.common import _FLEDGE_ROOT, _FLEDGE_DATA
+from fledge.common.job_manager import JobManager
 from fledge.common.logger import FLCoreLogger
 from fledge.common.web.middleware import has_permission
-from fledge.services.core.support import SupportBuilder
+from fledge.services.core.api import job
+from fledge.services.core.support import (SupportBuilder, BUNDLE_EXTENSIONS, COMPRESSIONS, DEFAULT_COMPRESSION,
+                                          DEFAULT_COMPRESSION_LEVEL)
 
 
 __author__ = "Ashish Jabble"
@@ -32,6 +36,8 @@ _SCRIPTS_DIR = "{}/scripts".format(_FLEDGE_ROOT)
 __DEFAULT_LIMIT = 20
 __DEFAULT_OFFSET = 0
 __DEFAULT_LOG_SOURCE = 'Fledge'
+_STREAM_CHUNK_SIZE = 256 * 1024
+_STREAM_POLL_INTERVAL = 0.5
 
 # Debug and above
 __GET_SYSLOG_CMD_TEMPLATE = "grep -a -E '({})\[' {} | head -n {} | tail -n {}"
@@ -67,17 +73,16 @@ async def fetch_support_bundle(request):
     """
     # Get support directory path
     support_dir = _get_support_dir()
-    valid_extension = '.tar.gz'
     found_files = []
     for root, dirs, files in os.walk(support_dir):
-        found_files = [f for f in files if f.endswith(valid_extension)]
+        found_files = [f for f in files if f.endswith(BUNDLE_EXTENSIONS)]
 
     return web.json_response({"bundles": found_files})
 
 
 @has_permission("admin")
 async def fetch_support_bundle_item(request):
-    """ check existence of a bundle support by name
+    """ check existence of a bundle support by name; a bundle being built is streamed as it grows
 
     :Example:
         curl -O http://localhost:8081/fledge/support/support-180301-13-35-23.tar.gz
@@ -87,9 +92,13 @@ async def fetch_support_bundle_item(request):
     """
     bundle_name = request.match_info.get('bundle', None)
 
-    if not str(bundle_name).endswith('.tar.gz'):
+    if not str(bundle_name).endswith(BUNDLE_EXTENSIONS):
         return web.HTTPBadRequest(reason="Bundle file extension is invalid")
 
+    p = Path(_get_support_dir()) / str(bundle_name)
+    if SupportBuilder.is_building(str(bundle_name)):
+        return await _stream_bundle(request, p)
+
     if not os.path.isdir(_get_support_dir()):
         raise web.HTTPNotFound(reason="Support bundle directory does not exist")
 
@@ -97,20 +106,73 @@ async def fetch_support_bundle_item(request):
         if str(bundle_name) not in files:
             raise web.HTTPNotFound(reason='{} not found'.format(bundle_name))
 
-    p = Path(_get_support_dir()) / str(bundle_name)
     return web.FileResponse(path=p)
 
 
+async def _stream_bundle(request, path):
+    """ Send the bundle being built as it is written, until it is closed; a queued bundle is waited for """
+    while not path.is_file():
+        if not SupportBuilder.is_building(path.name):
+            # The build may have been done since the bundle was looked for; if not it failed or was cancelled
+            if path.is_file():
+                break
+            raise web.HTTPNotFound(reason='{} not found'.format(path.name))
+        await asyncio.sleep(_STREAM_POLL_INTERVAL)
+    resp = web.StreamResponse(headers={'Content-Type': 'application/octet-stream',
+                                       'Content-Disposition': 'attachment; filename="{}"'.format(path.name)})
+    await resp.prepare(request)
+    loop = asyncio.get_event_loop()
+    with open(str(path), 'rb') as bundle:
+        while True:
+            # Whatever was written before the build was done is read before the end of the file is taken as the end
+            building = SupportBuilder.is_building(path.name)
+            chunk = await loop.run_in_executor(None, bundle.read, _STREAM_CHUNK_SIZE)
+            if chunk:
+                await resp.write(chunk)
+            elif building:
+                await asyncio.sleep(_STREAM_POLL_INTERVAL)
+            else:
+                break
+    if not path.is_file():
+        # The build failed or was cancelled; the response is left incomplete
+        raise ConnectionAbortedError("Support bundle {} was not created".format(path.name))
+    await resp.write_eof()
+    return resp
+
+
 @has_permission("admin")
 async def create_support_bundle(request):
-    """ Create a support bundle by name
+    """ Create a support bundle, as a job; with wait=true the response is sent once the bundle is created.
+    The bundle may be downloaded while it is being built, compression is one of gz, bz2, xz or none and level
+    from 1 (fastest) to 9 (smallest)
 
     :Example:
         curl -X POST http://localhost:8081/fledge/support
+        curl -X POST http://localhost:8081/fledge/support?wait=true
+        curl -X POST "http://localhost:8081/fledge/support?compression=xz&level=3"
     """
+    wait = job.wait_requested(request)
+    compression = request.query.get('compression', DEFAULT_COMPRESSION).lower()
+    if compression not in COMPRESSIONS:
+        msg = "compression must be one of {}".format(", ".join(COMPRESSIONS))
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+    try:
+        level = int(request.query.get('level', DEFAULT_COMPRESSION_LEVEL))
+        if not 1 <= level <= 9:
+            raise ValueError
+    except ValueError:
+        msg = "level must be an integer from 1 to 9"
+        raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
     support_dir = _get_support_dir()
     try:
-        bundle_name = await SupportBuilder(support_dir).build()
+        builder = SupportBuilder(support_dir, compression, level)
+        bundle = os.path.basename(builder.bundle_name())
+        bundle_job = JobManager().submit("Support bundle", _build_support_bundle, builder)
+        builder.register(bundle_job)
+        if not wait:
+            return job.accepted(bundle_job, "Support bundle creation started.", bundle=bundle,
+                                bundleLink="fledge/support/{}".format(bundle))
+        bundle_name = await bundle_job.wait()
     except Exception as ex:
         msg = 'Failed to create support bundle.'
         _logger.error(ex, msg)
@@ -119,6 +181,10 @@ async def create_support_bundle(request):
     return web.json_response({"bundle created": bundle_name})
 
 
+async def _build_support_bundle(bundle_job, builder):
+    return await builder.build(bundle_job)
+
+
 async def get_syslog_entries(request):
     """ Returns a list of syslog trail entries sorted with most recent first and total count
         (including the criteria search if applied)
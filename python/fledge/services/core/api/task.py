@@ -18,6 +18,7 @@ from fledge.common.storage_client.exceptions import StorageServerError
 from fledge.services.core import server
 from fledge.services.core import connect
 from fledge.services.core.scheduler.entities import Schedule, TimedSchedule, IntervalSchedule, ManualSchedule
+from fledge.services.core.api import asset_tracker as asset_tracker_api
 from fledge.services.core.api import utils as apiutils
 from fledge.common.common import _FLEDGE_ROOT
 from fledge.services.core.api.plugins import common
@@ -309,8 +310,10 @@ async def delete_task(request):
         # delete it
         await server.Server.scheduler.delete_schedule(sch_id)
 
-        # delete tasks
+        # delete tasks, the queued task states of the schedule are written first
+        await server.Server.scheduler.forget_recent_tasks(sch_id)
         await delete_task_entry_with_schedule_id(storage, sch_id)
+        server.Server.scheduler.forget_latest_task(north_instance)
 
         # delete all configuration for the north task instance name
         config_mgr = ConfigurationManager(storage)
@@ -387,3 +390,4 @@ async def update_deprecated_ts_in_asset_tracker(storage, north_instance):
             update_payload = PayloadBuilder().SET(deprecated_ts=current_time).WHERE(
                 ['service', '=', north_instance]).payload()
             await storage.update_tbl("asset_tracker", update_payload)
+            asset_tracker_api.invalidate()
@@ -64,24 +64,38 @@ def _find_c_lib(name, installed_dir):
     return lib_path
 
 
-def find_c_plugin_libs(direction):
-    libraries = []
+def _c_plugin_files(direction):
+    """ Yields (plugin directory, file name) of every file in the C plugin directories of the given direction """
     _path = [_lib_path]
     _path = _find_plugins_from_env(_path)
     for fp in _path:
         if os.path.isdir(fp + "/" + direction):
             for name in os.listdir(fp + "/" + direction):
                 p = fp + "/" + direction + "/" + name
+                if not os.path.isdir(p):
+                    continue
                 for fname in os.listdir(p):
-                    if fname.endswith('.so'):
-                        # Replace lib and .so from fname
-                        libraries.append((fname.replace("lib", "").replace(".so", ""), 'binary'))
-                    # For Hybrid plugins
-                    if direction == 'south' and fname.endswith('.json'):
-                        libraries.append((fname.replace(".json", ""), 'json'))
+                    yield p, fname
+
+
+def find_c_plugin_libs(direction):
+    libraries = []
+    for p, fname in _c_plugin_files(direction):
+        if fname.endswith('.so'):
+            # Replace lib and .so from fname
+            libraries.append((fname.replace("lib", "").replace(".so", ""), 'binary'))
+        # For Hybrid plugins
+        if direction == 'south' and fname.endswith('.json'):
+            libraries.append((fname.replace(".json", ""), 'json'))
     return libraries
 
 
+def find_c_plugin_lib_paths(direction):
+    """ Same walk as find_c_plugin_libs but returns (name, library path) of C-binary plugins only """
+    return [(fname.replace("lib", "").replace(".so", ""), p + "/" + fname)
+            for p, fname in _c_plugin_files(direction) if fname.endswith('.so')]
+
+
 def _find_plugins_from_env(_plugin_path: list) -> list:
     if _FLEDGE_PLUGIN_PATH:
         my_list = _FLEDGE_PLUGIN_PATH.split(";")
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Per asset count and timespan of the buffered readings, maintained from the storage readings feed"""
+
+import asyncio
+
+from fledge.common.logger import FLCoreLogger
+from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.utils import utc_timestamp
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = FLCoreLogger().get_logger(__name__)
+
+
+class AssetIndex:
+    """ Number of buffered readings and timestamps of the oldest and newest of them for each asset
+
+    With the readings feed of all assets, which the latest readings cache registers with the storage service, the
+    index is loaded by GROUP BY queries on the readings and then kept up to date with the feed: every appended reading
+    is counted and extends the timespan of its asset, and purges through the API drop the purged assets. The purge
+    task removes readings behind the back of the core, so a background task reloads the index from the readings with
+    one GROUP BY query after each purge run the scheduler reports, else every RECONCILE_INTERVAL seconds; no request
+    waits for it. Without the feed every call is answered by the readings storage with the one query it needs, as
+    without the index, and the background task is stopped.
+    """
+
+    RECONCILE_INTERVAL = 3600
+    """ Seconds between the reloads of the index from the readings when no purge run is reported """
+
+    def __init__(self, readings_storage, feed):
+        """
+        Args:
+            readings_storage: readings storage client
+            feed: LatestReadings which owns the readings feed registration
+        """
+        self._readings_storage = readings_storage
+        self._feed = feed
+        self._entries = {}
+        """ {asset_code: [count, oldest timestamp, newest timestamp]} """
+        self._loaded = False
+        """ Whether the index is loaded and kept up to date by the feed """
+        self._lock = None
+        self._reconcile_task = None
+        self._purged = None
+        """ Set after a purge run, to wake the background task up """
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, readings: list) -> None:
+        """ Count the given appended readings """
+        if not self._loaded:
+            return
+        for r in readings:
+            try:
+                asset_code = r['asset_code']
+            except (KeyError, TypeError):
+                continue
+            ts = utc_timestamp(r.get('user_ts'))
+            if ts is None:
+                continue
+            entry = self._entries.get(asset_code)
+            if entry is None:
+                self._entries[asset_code] = [1, ts, ts]
+                continue
+            entry[0] += 1
+            if entry[1] is None or ts < entry[1]:
+                entry[1] = ts
+            if entry[2] is None or ts > entry[2]:
+                entry[2] = ts
+
+    def invalidate(self, asset_code: str = None) -> None:
+        """ Drop an asset, or all of them, after all of its readings are purged """
+        if asset_code is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(asset_code, None)
+
+    async def counts(self) -> list:
+        """ Buffered readings count of each asset, as returned by GET /fledge/asset """
+        if not await self._ensure_loaded():
+            results = await self._query(self._counts_payload())
+            return [{"count": r['count'], "assetCode": r['asset_code']} for r in results]
+        return [{"count": self._entries[asset_code][0], "assetCode": asset_code}
+                for asset_code in sorted(self._entries)]
+
+    async def timespans(self) -> list:
+        """ Oldest and newest buffered reading timestamp of each asset, as returned by GET /fledge/asset/timespan """
+        if not await self._ensure_loaded():
+            return await self._query(self._timespans_payload())
+        return [{"asset_code": asset_code, "oldest": self._entries[asset_code][1],
+                 "newest": self._entries[asset_code][2]} for asset_code in sorted(self._entries)]
+
+    def purged(self) -> None:
+        """ Reload the index in the background, after a run of the purge task """
+        if self._purged is not None:
+            self._purged.set()
+
+    async def stop(self) -> None:
+        """ Stop the background reconciliation """
+        task = self._stop_reconciling()
+        if task is not None:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _stop_reconciling(self):
+        """ Unload the index and cancel its background task, which is returned """
+        self._loaded = False
+        task, self._reconcile_task = self._reconcile_task, None
+        if task is not None:
+            task.cancel()
+        return task
+
+    async def _ensure_loaded(self):
+        """ Whether the index answers, loading it the first time the feed is found active """
+        await self._feed.ensure_feed()
+        if not self._feed.feed_active:
+            # Not kept up to date without the feed
+            self._stop_reconciling()
+            self.misses += 1
+            return False
+        if self._loaded:
+            self.hits += 1
+            return True
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._loaded:
+                self.hits += 1
+                return True
+            self.misses += 1
+            await self._reconcile()
+            self._loaded = True
+            if self._reconcile_task is None:
+                self._purged = asyncio.Event()
+                self._reconcile_task = asyncio.ensure_future(self._reconcile_periodically())
+        return True
+
+    async def _reconcile_periodically(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._purged.wait(), self.RECONCILE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._purged.clear()
+            if not self._feed.feed_active:
+                self._loaded = False
+                self._reconcile_task = None
+                return
+            try:
+                await self._reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                # The index goes on with the feed, reloaded next time
+                _logger.warning("Failed to reconcile the asset index: {}".format(str(ex)))
+
+    async def _query(self, payload):
+        results = await self._readings_storage.query(payload)
+        if 'rows' not in results:
+            raise ValueError(results.get('message', 'Failed to index the buffered readings'))
+        return results['rows']
+
+    @staticmethod
+    def _counts_payload():
+        return PayloadBuilder().AGGREGATE(["count", "*"]).ALIAS("aggregate", ("*", "count", "count")) \
+            .GROUP_BY("asset_code").payload()
+
+    @staticmethod
+    def _timespans_payload():
+        return PayloadBuilder().AGGREGATE(["min", "user_ts"], ["max", "user_ts"]).GROUP_BY("asset_code") \
+            .ALIAS('aggregate', ('user_ts', 'min', 'oldest'), ('user_ts', 'max', 'newest')).payload()
+
+    @staticmethod
+    def _index_payload():
+        return PayloadBuilder().AGGREGATE(["count", "*"], ["min", "user_ts"], ["max", "user_ts"]) \
+            .ALIAS('aggregate', ("*", "count", "count"), ('user_ts', 'min', 'oldest'), ('user_ts', 'max', 'newest')) \
+            .GROUP_BY("asset_code").payload()
+
+    async def _reconcile(self):
+        # As the feed timestamps, so that they compare
+        entries = {r['asset_code']: [r['count'], utc_timestamp(r['oldest']) or r['oldest'],
+                                     utc_timestamp(r['newest']) or r['newest']]
+                   for r in await self._query(self._index_payload())}
+        # Readings the feed delivered while the query was in flight may be counted twice or not at all until the
+        # next reconciliation
+        self._entries = entries
+        _logger.debug("Asset index reconciled with {} assets".format(len(entries)))
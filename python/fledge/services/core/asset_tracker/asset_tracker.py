@@ -4,6 +4,11 @@
 # See: http://fledge-iot.readthedocs.io/
 # FLEDGE_END
 
+import copy
+import json
+import time
+from collections import OrderedDict
+
 from fledge.common.configuration_manager import ConfigurationManager
 from fledge.common.logger import FLCoreLogger
 from fledge.common.storage_client.payload_builder import PayloadBuilder
@@ -18,6 +23,99 @@ __version__ = "${VERSION}"
 _logger = FLCoreLogger().get_logger(__name__)
 
 
+class AssetTrackerRecords(object):
+    """ In memory copy of the asset_tracker table, shared by the core asset tracker and the asset tracker API
+
+    Rows are kept in storage order and hashed by (asset, event, service, plugin) with the data each was recorded
+    with, for the duplicate check of the tracker. The rows are loaded again when the core changes the table, and
+    every RELOAD_INTERVAL seconds as the C services also write it directly.
+    """
+
+    RELOAD_INTERVAL = 60
+
+    def __init__(self):
+        self.rows = []
+        self._keys = {}
+        self._usage = None
+        self.loaded = None
+        self._stale = True
+
+    @staticmethod
+    def select():
+        """ PayloadBuilder of the rows, as returned by the asset tracker API; conditions may be added to it """
+        return PayloadBuilder().SELECT("asset", "event", "service", "fledge", "plugin", "ts", "deprecated_ts", "data") \
+            .ALIAS("return", ("ts", 'timestamp')).FORMAT("return", ("ts", "YYYY-MM-DD HH24:MI:SS.MS")) \
+            .ALIAS("return", ("deprecated_ts", 'deprecatedTimestamp')) \
+            .WHERE(['1', '=', 1])
+
+    @staticmethod
+    def _data_key(data):
+        return data if isinstance(data, str) else json.dumps(data, sort_keys=True)
+
+    def is_current(self):
+        return not self._stale and self.loaded is not None and time.monotonic() - self.loaded < self.RELOAD_INTERVAL
+
+    async def load(self, storage):
+        """ Load all the rows of the asset_tracker table
+
+        Raises:
+            KeyError: with the message of the storage when the rows are not returned
+        """
+        result = await storage.query_tbl_with_payload('asset_tracker', self.select().payload())
+        if 'rows' not in result:
+            raise KeyError(result.get('message', 'Failed to retrieve asset tracker records'))
+        self.index(result['rows'])
+        self.rows = result['rows']
+        self._stale = False
+        self.loaded = time.monotonic()
+
+    def index(self, rows):
+        """ Hash the rows for the duplicate check only, the rows themselves are left to be loaded """
+        self._keys = {}
+        for row in rows:
+            self._keys.setdefault((row["asset"], row["event"], row["service"], row["plugin"]), set()).add(
+                self._data_key(row.get("data", {})))
+        self.invalidate()
+
+    def contains(self, asset, event, service, plugin, data):
+        data_keys = self._keys.get((asset, event, service, plugin))
+        return data_keys is not None and self._data_key(data) in data_keys
+
+    def add(self, asset, event, service, plugin, data):
+        """ Record a row inserted by the core; the rows are loaded again for its timestamp """
+        self._keys.setdefault((asset, event, service, plugin), set()).add(self._data_key(data))
+        self.invalidate()
+
+    def invalidate(self):
+        self._stale = True
+        self._usage = None
+
+    def find(self, asset=None, event=None, service=None, deprecated=False):
+        return [r for r in self.rows
+                if (asset is None or r["asset"] == asset) and (event is None or r["event"] == event)
+                and (service is None or r["service"] == service)
+                and (not deprecated or r.get("deprecatedTimestamp") not in (None, ""))]
+
+    def datapoint_usage(self):
+        """ Datapoints of each asset in storage, from its store record with the most of them
+
+        Returns:
+            the total count of datapoints and the asset with its datapoints, in the order of their records
+        """
+        if self._usage is None:
+            assets = OrderedDict()
+            for row in self.rows:
+                if row["event"] != "store":
+                    continue
+                count = int(row["data"]["count"])
+                current = assets.get(row["asset"])
+                if current is None or count >= current[0]:
+                    assets[row["asset"]] = (count, row["data"]["datapoints"])
+            self._usage = (sum(c for c, _ in assets.values()),
+                           [{"asset": a, "datapoints": d} for a, (_, d) in assets.items()])
+        return self._usage[0], copy.deepcopy(self._usage[1])
+
+
 class AssetTracker(object):
 
     _storage = None
@@ -27,7 +125,7 @@ class AssetTracker(object):
     """Fledge service name"""
 
     _registered_asset_records = None
-    """Set of rows for asset_tracker already in the storage tables"""
+    """AssetTrackerRecords of the rows for asset_tracker already in the storage tables"""
 
     def __init__(self, storage=None):
         if self._storage is None:
@@ -39,12 +137,11 @@ class AssetTracker(object):
     async def load_asset_records(self):
         """ Fetch all asset_tracker records from database """
 
-        self._registered_asset_records = []
+        self._registered_asset_records = AssetTrackerRecords()
         try:
             payload = PayloadBuilder().SELECT("asset", "event", "service", "plugin", "data").payload()
             results = await self._storage.query_tbl_with_payload('asset_tracker', payload)
-            for row in results['rows']:
-                self._registered_asset_records.append(row)
+            self._registered_asset_records.index(results['rows'])
         except Exception as ex:
             _logger.exception(ex, 'Failed to retrieve asset records')
 
@@ -58,7 +155,7 @@ class AssetTracker(object):
         """
         # If (asset + event + service + plugin) row combination exists in _find_registered_asset_record then return
         d = {"asset": asset, "event": event, "service": service, "plugin": plugin, "data":jsondata}
-        if d in self._registered_asset_records:
+        if self._registered_asset_records.contains(asset, event, service, plugin, jsondata):
             return {}
 
         # The name of the Fledge this entry has come from.
@@ -74,14 +171,13 @@ class AssetTracker(object):
 
             result = await self._storage.insert_into_tbl('asset_tracker', payload)
             response = result['response']
-            self._registered_asset_records.append(d)
+            self._registered_asset_records.add(asset, event, service, plugin, jsondata)
         except KeyError:
             raise ValueError(result['message'])
         except StorageServerError as ex:
             err_response = ex.error
             raise ValueError(err_response)
         else:
-            import copy
             result = copy.deepcopy(d)
             result.update({"fledge": self.fledge_svc_name})
             return result
@@ -7,6 +7,7 @@
 """Interest Registry Class"""
 
 import uuid
+from collections import OrderedDict
 from fledge.common.configuration_manager import ConfigurationManager
 from fledge.common import logger
 from fledge.services.core.interest_registry.interest_record import InterestRecord
@@ -40,6 +41,15 @@ class InterestRegistry(InterestRegistrySingleton):
     _registered_interests = None
     """ maintains the list of InterestRecord objects """
 
+    _interests_by_id = None
+    """ {registration_id: InterestRecord} """
+
+    _interests_by_category = None
+    """ {category_name: {registration_id: InterestRecord}} in registration order """
+
+    _interests_by_microservice = None
+    """ {microservice_uuid: {registration_id: InterestRecord}} in registration order """
+
     _configuration_manager = None
     """ ConfigurationManager used by InterestRegistry """
 
@@ -58,14 +68,45 @@ class InterestRegistry(InterestRegistrySingleton):
             self._configuration_manager = configuration_manager
         if self._registered_interests is None:
             self._registered_interests = list()
-    
+            self._interests_by_id = {}
+            self._interests_by_category = {}
+            self._interests_by_microservice = {}
+
     def and_filter(self, **kwargs):
         """ Used to filter InterestRecord objects based on attribute values.
+
+        The candidates are taken from the index of registration id, microservice uuid or category name, in that
+        order of selectivity, when one of them is given; the other attributes are compared on the candidates only.
         """
-        interest_records = None
-        interest_records = [s for s in self._registered_interests if all(getattr(s, k, None) == v for k, v in kwargs.items() if v is not None)]
+        conditions = {k: v for k, v in kwargs.items() if v is not None}
+        if '_registration_id' in conditions:
+            record = self._interests_by_id.get(conditions.pop('_registration_id'))
+            candidates = [] if record is None else [record]
+        elif '_microservice_uuid' in conditions:
+            candidates = self._interests_by_microservice.get(conditions.pop('_microservice_uuid'), {}).values()
+        elif '_category_name' in conditions:
+            candidates = self._interests_by_category.get(conditions.pop('_category_name'), {}).values()
+        else:
+            candidates = self._registered_interests
+        interest_records = [s for s in candidates if all(getattr(s, k, None) == v for k, v in conditions.items())]
         return interest_records
 
+    def _add_to_indexes(self, interest_record):
+        self._interests_by_id[interest_record._registration_id] = interest_record
+        self._interests_by_category.setdefault(interest_record._category_name, OrderedDict())[
+            interest_record._registration_id] = interest_record
+        self._interests_by_microservice.setdefault(interest_record._microservice_uuid, OrderedDict())[
+            interest_record._registration_id] = interest_record
+
+    def _remove_from_indexes(self, interest_record):
+        del self._interests_by_id[interest_record._registration_id]
+        for index, key in ((self._interests_by_category, interest_record._category_name),
+                           (self._interests_by_microservice, interest_record._microservice_uuid)):
+            records = index[key]
+            del records[interest_record._registration_id]
+            if not records:
+                del index[key]
+
     def get(self, registration_id=None, category_name=None, microservice_uuid=None):
         """ Used to filter InterestRecord objects based on attribute values.
         Args:
@@ -167,6 +208,7 @@ class InterestRegistry(InterestRegistrySingleton):
         registered_interest = InterestRecord(registration_id, microservice_uuid, category_name)
         # add interest record to list of registered interests
         self._registered_interests.append(registered_interest)
+        self._add_to_indexes(registered_interest)
 
         return registration_id
 
@@ -185,6 +227,7 @@ class InterestRegistry(InterestRegistrySingleton):
             registered_interests = self.get(registration_id=registration_id)
             interest_record = registered_interests[0]
             self._registered_interests.remove(registered_interests[0])
+            self._remove_from_indexes(interest_record)
         except interest_registry_exceptions.DoesNotExist:
             raise
         # remove entry from configuration manager if no registered interests exist for this category_name
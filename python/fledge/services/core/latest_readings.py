@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Per asset cache of the latest reading, fed by the storage service"""
+
+import asyncio
+import json
+import time
+
+from fledge.common.logger import FLCoreLogger
+from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.utils import utc_timestamp
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = FLCoreLogger().get_logger(__name__)
+
+FEED_URI = '/fledge/readings/feed'
+""" Core management API route the storage service posts the appended readings to """
+
+FEED_OFF = 'off'
+FEED_QUERIED_ASSETS = 'queried assets'
+FEED_ALL_ASSETS = 'all assets'
+FEED_MODES = [FEED_OFF, FEED_QUERIED_ASSETS, FEED_ALL_ASSETS]
+""" Readings the core asks the storage service to post to it, set by the readingsFeed item of the service category """
+
+
+class LatestReadings:
+    """ Latest reading and its timestamp of each asset
+
+    The storage service feed is opt-in. With FEED_QUERIED_ASSETS the cache registers interest in the readings of an
+    asset the first time it is asked for, up to MAX_ASSETS assets, and the storage service posts the readings appended
+    for them to the core. With FEED_ALL_ASSETS it registers interest in all assets, which the asset index needs too,
+    and a copy of every appended block is posted. Only the newest reading of each asset is kept.
+    Without the feed, for an asset not in the feed, or for an entry the feed has not refreshed for FRESHNESS seconds,
+    the readings storage is queried and the result cached. The refresh bounds how long a reading removed by the purge
+    task can still be served.
+    """
+
+    FRESHNESS = 60
+    """ Seconds an entry is served without being refreshed by the feed """
+
+    RETRY_INTERVAL = 60
+    """ Seconds between attempts to register the feed with the storage service """
+
+    MAX_ASSETS = 50
+    """ Assets registered with FEED_QUERIED_ASSETS, the storage service filters each block once for each of them """
+
+    def __init__(self, readings_storage, callback_url, mode=FEED_OFF):
+        self._readings_storage = readings_storage
+        self._callback_url = callback_url
+        self._mode = mode if mode in FEED_MODES else FEED_OFF
+        self._entries = {}
+        """ {asset_code: [timestamp, reading, monotonic time the entry was refreshed]} """
+        self._feed_active = False
+        self._assets = set()
+        """ Assets registered with FEED_QUERIED_ASSETS """
+        self._last_attempt = None
+        self._lock = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """ Whether readings are to be posted by the storage service at all """
+        return self._mode != FEED_OFF
+
+    @property
+    def feed_active(self) -> bool:
+        """ Whether the readings of all assets are posted by the storage service """
+        return self._feed_active
+
+    def update(self, readings: list) -> None:
+        """ Keep the newest of the given appended readings for each asset """
+        if not self._feed_active and not self._assets:
+            return
+        now = time.monotonic()
+        for r in readings:
+            try:
+                asset_code = r['asset_code']
+                reading = r['reading']
+            except (KeyError, TypeError):
+                continue
+            if not self._is_fed(asset_code):
+                continue
+            ts = utc_timestamp(r.get('user_ts'))
+            if ts is None:
+                continue
+            entry = self._entries.get(asset_code)
+            if entry is None or ts >= entry[0]:
+                self._entries[asset_code] = [ts, reading, now]
+            else:
+                entry[2] = now
+
+    def invalidate(self, asset_code: str = None) -> None:
+        """ Forget an asset, or all of them, e.g. after its readings are purged """
+        if asset_code is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(asset_code, None)
+
+    async def get(self, asset_code: str) -> list:
+        """ Latest reading of an asset, as returned by GET /fledge/asset/{asset_code}/latest """
+        entry = await self._entry(asset_code)
+        return [{"reading": entry[1], "timestamp": entry[0]}] if entry else []
+
+    async def get_timestamps(self, asset_codes: list) -> dict:
+        """ Timestamp of the latest reading of each of the given assets which has readings """
+        timestamps = {}
+        for asset_code in asset_codes:
+            entry = await self._entry(asset_code)
+            if entry:
+                timestamps[asset_code] = entry[0]
+        return timestamps
+
+    async def start(self) -> None:
+        """ Clear the registration for all assets a previous run of the core may have left with the storage service
+
+        The storage service keeps registrations until they are removed, so one left by a core which did not stop
+        cleanly would go on posting all appended readings, or have them posted twice once registered again.
+        """
+        try:
+            await self._readings_storage.unregister_interest('*', self._callback_url)
+        except Exception as ex:
+            _logger.warning("Failed to clear the latest readings feed registration: {}".format(str(ex)))
+
+    async def stop(self) -> None:
+        """ Unregister the feed from the storage service """
+        registered = (['*'] if self._feed_active else []) + sorted(self._assets)
+        self._feed_active = False
+        self._assets = set()
+        for asset_code in registered:
+            try:
+                await self._readings_storage.unregister_interest(asset_code, self._callback_url)
+            except Exception as ex:
+                _logger.warning("Failed to unregister latest readings feed of {}: {}".format(asset_code, str(ex)))
+
+    def _is_fed(self, asset_code):
+        return self._feed_active or asset_code in self._assets
+
+    async def _entry(self, asset_code):
+        if self._mode == FEED_QUERIED_ASSETS:
+            await self._ensure_asset(asset_code)
+        else:
+            await self.ensure_feed()
+        entry = self._entries.get(asset_code)
+        if entry and self._is_fed(asset_code) and time.monotonic() - entry[2] < self.FRESHNESS:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        payload = PayloadBuilder().SELECT(("reading", "user_ts")).ALIAS("return", ("user_ts", "timestamp")).WHERE(
+            ["asset_code", "=", asset_code]).LIMIT(1).ORDER_BY(["user_ts", "desc"]).payload()
+        results = await self._readings_storage.query(payload)
+        if 'rows' not in results:
+            raise ValueError(results.get('message', 'Failed to get the latest reading of {}'.format(asset_code)))
+        rows = results['rows']
+        if not rows:
+            self._entries.pop(asset_code, None)
+            return None
+        entry = [rows[0]['timestamp'], rows[0]['reading'], time.monotonic()]
+        # The feed may have delivered a newer reading while the query was in flight
+        current = self._entries.get(asset_code)
+        if current is None or entry[0] >= current[0]:
+            self._entries[asset_code] = entry
+        else:
+            current[2] = entry[2]
+            entry = current
+        return entry
+
+    def _may_register(self):
+        return self._last_attempt is None or time.monotonic() - self._last_attempt >= self.RETRY_INTERVAL
+
+    async def _register(self, asset_code):
+        """ Register interest in an asset, or all of them, after removing any registration left from earlier """
+        self._last_attempt = time.monotonic()
+        try:
+            await self._readings_storage.unregister_interest(asset_code, self._callback_url)
+            await self._readings_storage.register_interest(asset_code, self._callback_url)
+        except Exception as ex:
+            _logger.warning("Failed to register latest readings feed of {}, retrying in {} seconds: {}".format(
+                asset_code, self.RETRY_INTERVAL, str(ex)))
+            return False
+        # Entries read before the registration may have missed readings appended meanwhile
+        self._last_attempt = None
+        return True
+
+    async def ensure_feed(self) -> None:
+        """ Register the feed for all assets with the storage service, if enabled, not registered and not attempted
+        recently """
+        if self._mode != FEED_ALL_ASSETS or self._feed_active or not self._may_register():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._feed_active or not self._may_register():
+                return
+            if not await self._register('*'):
+                return
+            self._entries.clear()
+            self._feed_active = True
+            _logger.info("Latest readings feed registered with storage service at {}".format(self._callback_url))
+
+    async def _ensure_asset(self, asset_code):
+        if asset_code in self._assets or len(self._assets) >= self.MAX_ASSETS or not self._may_register():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if asset_code in self._assets or len(self._assets) >= self.MAX_ASSETS or not self._may_register():
+                return
+            if not await self._register(asset_code):
+                return
+            self._entries.pop(asset_code, None)
+            self._assets.add(asset_code)
+            _logger.info("Latest readings feed of {} registered with storage service".format(asset_code))
+
+    @staticmethod
+    def parse_feed(body: str) -> list:
+        """ Readings of a block posted by the storage service """
+        doc = json.loads(body)
+        readings = doc.get('readings') if isinstance(doc, dict) else None
+        if not isinstance(readings, list):
+            raise ValueError("readings list is missing from the payload")
+        return readings
@@ -9,6 +9,7 @@
 import asyncio
 import collections
 import datetime
+import json
 import logging
 import math
 import time
@@ -18,15 +19,15 @@ import subprocess
 import signal
 from typing import List
 
-from fledge.common import utils as common_utils
 from fledge.common.audit_logger import AuditLogger
 from fledge.common.configuration_manager import ConfigurationManager
 from fledge.common.logger import FLCoreLogger
 from fledge.common.storage_client.exceptions import *
-from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.storage_client.payload_builder import PayloadBuilder, Param
 from fledge.common.storage_client.storage_client import StorageClientAsync
 from fledge.services.core.scheduler.entities import *
 from fledge.services.core.scheduler.exceptions import *
+from fledge.services.core.scheduler.task_worker import RESIDENT_TASK_MODULES, TaskWorker
 from fledge.services.core.service_registry.service_registry import ServiceRegistry
 from fledge.services.core.service_registry import exceptions as service_registry_exceptions
 from fledge.services.common import utils
@@ -40,6 +41,13 @@ __version__ = "${VERSION}"
 _FLEDGE_ROOT = os.getenv("FLEDGE_ROOT", default='/usr/local/fledge')
 _SCRIPTS_DIR = os.path.expanduser(_FLEDGE_ROOT + '/scripts')
 
+_TASK_INSERT_TEMPLATE = PayloadBuilder().INSERT(
+    id=Param("id"), pid=Param("pid"), schedule_name=Param("schedule_name"), schedule_id=Param("schedule_id"),
+    process_name=Param("process_name"), state=int(Task.State.RUNNING), start_time=Param("start_time")).template()
+_TASK_END_TEMPLATE = PayloadBuilder().SET(
+    exit_code=Param("exit_code"), state=Param("state"), end_time=Param("end_time")).WHERE(
+    ['id', '=', Param("id")]).template()
+
 
 class Scheduler(object):
     """Fledge Task Scheduler
@@ -66,6 +74,37 @@ class Scheduler(object):
                                                           'enabled', 'process_name'])
     """Represents a row in the schedules table"""
 
+    class _InCoreProcess(object):
+        """A task run as a coroutine of the core, with what the scheduler uses of asyncio.subprocess.Process"""
+
+        def __init__(self, coro):
+            self.pid = os.getpid()
+            self._task = asyncio.ensure_future(coro)
+
+        async def wait(self):
+            try:
+                await asyncio.shield(self._task)
+            except asyncio.CancelledError:
+                if not self._task.done():
+                    # the wait itself was cancelled
+                    raise
+            except Exception:
+                pass
+            return self.returncode
+
+        @property
+        def returncode(self):
+            if not self._task.done():
+                return None
+            if self._task.cancelled():
+                return -signal.SIGTERM
+            return 1 if self._task.exception() is not None else 0
+
+        def terminate(self):
+            self._task.cancel()
+
+        kill = terminate
+
     class _TaskProcess(object):
         """Tracks a running task with some flags"""
         __slots__ = ['task_id', 'process', 'cancel_requested', 'schedule', 'start_time', 'future']
@@ -122,6 +161,12 @@ class Scheduler(object):
     _PURGE_TASKS_FREQUENCY_SECONDS = _DAY_SECONDS
     """How frequently to purge the tasks table"""
 
+    _TASK_STATES_WRITE_SECONDS = 1
+    """Task starts and completions are queued for this number of seconds and written to the tasks table in bulk"""
+
+    _RECENT_TASKS_SIZE = 1000
+    """Number of the most recently started tasks kept in memory for :meth:`get_task` and :meth:`get_tasks`"""
+
     # Mostly constant class attributes
     _logger = None  # type: logging.Logger
 
@@ -182,6 +227,30 @@ class Scheduler(object):
         """asynico task for :meth:`purge_tasks`, if scheduled to run"""
         self._restore_backup_id = None # type: int
         """Restore backup id and it will be used when SCHEDULE_RESTORE_ON_DEMAND runs"""
+        self._task_inserts = collections.OrderedDict()
+        """Dictionary of tasks.id to the row of a started task not written to the tasks table yet"""
+        self._task_updates = collections.OrderedDict()
+        """Dictionary of tasks.id to the update of a completed task not written to the tasks table yet"""
+        self._task_states_write_task = None  # type: asyncio.Task
+        """Task for :meth:`_write_task_states_later`, if task states are queued"""
+        self._task_states_lock = None  # type: asyncio.Lock
+        """Keeps the writes of the queued task states in order"""
+        self._recent_tasks = collections.OrderedDict()
+        """Dictionary of tasks.id to Task for the most recently started tasks, oldest first"""
+        self._latest_tasks = dict()
+        """Dictionary of schedules.name to the tasks row of the most recent task of the schedule"""
+        self._latest_tasks_read = False
+        """True once the most recent task of every schedule has been read from the tasks table"""
+        self._stats_collector_in_core = False
+        """When True, the stats collector schedule runs as a coroutine of the core instead of a process"""
+        self._statistics_history = None
+        """StatisticsHistoryCollector of the stats collector run in the core, kept between its tasks"""
+        self._resident_task_workers = False
+        """When True, the Python tasks of RESIDENT_TASK_MODULES are forked by a resident TaskWorker"""
+        self._task_workers = {}
+        """Dictionary of process scripts to the TaskWorker running them"""
+        self._task_end_callbacks = {}
+        """Dictionary of process names to the functions called when one of their tasks ends"""
 
     @property
     def max_completed_task_age(self) -> datetime.timedelta:
@@ -208,6 +277,16 @@ class Scheduler(object):
         self._max_running_tasks = value
         self._resume_check_schedules()
 
+    @property
+    def stats_collector_in_core(self) -> bool:
+        """Returns True when the statistics history is collected in the core, which skips the repeated zero rows
+        """
+        return self._stats_collector_in_core
+
+    def on_task_end(self, process_name: str, callback) -> None:
+        """Calls callback, with no arguments, whenever a task of the given process ends"""
+        self._task_end_callbacks.setdefault(process_name, []).append(callback)
+
     def _resume_check_schedules(self):
         """Wakes up :meth:`_scheduler_loop` so that
         :meth:`_check_schedules` will be called the next time 'await'
@@ -265,18 +344,14 @@ class Scheduler(object):
             else:
                 state = Task.State.COMPLETE
             # Update the task's status
-            update_payload = PayloadBuilder() \
-                .SET(exit_code=exit_code,
-                     state=int(state),
-                     end_time=str(common_utils.local_timestamp())) \
-                .WHERE(['id', '=', str(task_process.task_id)]) \
-                .payload()
-            try:
-                self._logger.debug('Database command: %s', update_payload)
-                res = await self._storage_async.update_tbl("tasks", update_payload)
-            except Exception:
-                self._logger.exception('Update failed: %s', update_payload)
-                # Must keep going!
+            self._queue_task_end(task_process.task_id, schedule.name, exit_code, state)
+
+            for callback in self._task_end_callbacks.get(schedule.process_name, []):
+                try:
+                    callback()
+                except Exception as ex:
+                    self._logger.exception(ex, "An exception was raised by the end callback of process '{}'".format(
+                        schedule.process_name))
 
         # Due to maximum running tasks reached, it is necessary to
         # look for schedules that are ready to run even if there
@@ -351,8 +426,15 @@ class Scheduler(object):
         task_process = self._TaskProcess()
         task_process.start_time = time.time()
 
+        in_core_task = None if dryrun else self._in_core_task(schedule)
+        task_worker = None if dryrun or in_core_task is not None else self._task_worker(schedule)
         try:
-            process = await asyncio.create_subprocess_exec(*args_to_exec, cwd=_SCRIPTS_DIR)
+            if in_core_task is not None:
+                process = self._InCoreProcess(in_core_task)
+            elif task_worker is not None:
+                process = await task_worker.run(args_to_exec[1:])
+            else:
+                process = await asyncio.create_subprocess_exec(*args_to_exec, cwd=_SCRIPTS_DIR)
         except EnvironmentError:
             self._logger.exception(
                 "Unable to start schedule '%s' process '%s'\n%s",
@@ -378,45 +460,182 @@ class Scheduler(object):
 
         # Startup tasks are not tracked in the tasks table and do not have any future associated with them.
         if schedule.type != Schedule.Type.STARTUP:
-            # The task row needs to exist before the completion handler runs
-            insert_payload = PayloadBuilder() \
-                .INSERT(id=str(task_id),
-                        pid=(self._schedule_executions[schedule.id].
-                             task_processes[task_id].process.pid),
-                        schedule_name=schedule.name,
-                        schedule_id=str(schedule.id),
-                        process_name=schedule.process_name,
-                        state=int(Task.State.RUNNING),
-                        start_time=str(common_utils.local_timestamp())) \
-                .payload()
-            try:
-                self._logger.debug('Database command: %s', insert_payload)
-                res = await self._storage_async.insert_into_tbl("tasks", insert_payload)
-            except Exception:
-                self._logger.exception('Insert failed: %s', insert_payload)
-                # The process has started. Regardless of this error it must be waited on.
+            # The task row is queued before the completion handler can queue its update
+            self._queue_task_start(task_id, process.pid, schedule)
             self._task_processes[task_id].future = asyncio.ensure_future(self._wait_for_task_completion(task_process))
 
+    def _in_core_task(self, schedule):
+        """The coroutine of a task which runs in the core rather than as a process, None for the other tasks"""
+        if schedule.type == Schedule.Type.STARTUP or schedule.process_name != 'stats collector' \
+                or not self._stats_collector_in_core:
+            return None
+        if self._statistics_history is None:
+            from fledge.tasks.statistics.statistics_history import StatisticsHistoryCollector
+            self._statistics_history = StatisticsHistoryCollector(self._storage_async)
+        return self._run_in_core(schedule, self._statistics_history.collect())
+
+    def _task_worker(self, schedule):
+        """The TaskWorker of a task run by a resident worker rather than as a new process, None for the other tasks"""
+        if schedule.type == Schedule.Type.STARTUP or not self._resident_task_workers:
+            return None
+        script = self._process_scripts[schedule.process_name][0]
+        module = RESIDENT_TASK_MODULES.get(script[0])
+        if module is None:
+            return None
+        if script[0] not in self._task_workers:
+            self._task_workers[script[0]] = TaskWorker(module, os.path.join(_FLEDGE_ROOT, 'python'))
+        return self._task_workers[script[0]]
+
+    async def _run_in_core(self, schedule, coro):
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            self._logger.error(ex, "Schedule '{}' failed in the core.".format(schedule.name))
+            raise
+
+    def _queue_task_start(self, task_id, pid, schedule) -> None:
+        """Queues the row of a started task for the next bulk write and adds the task to the recent tasks"""
+        start_time = datetime.datetime.now(datetime.timezone.utc).astimezone()
+        self._task_inserts[str(task_id)] = _TASK_INSERT_TEMPLATE.bind(
+            id=str(task_id),
+            pid=pid,
+            schedule_name=schedule.name,
+            schedule_id=str(schedule.id),
+            process_name=schedule.process_name,
+            start_time=str(start_time))
+
+        task = Task()
+        task.task_id = str(task_id)
+        task.schedule_name = schedule.name
+        task.schedule_id = str(schedule.id)
+        task.process_name = schedule.process_name
+        task.state = Task.State.RUNNING
+        task.start_time = self._task_time(start_time)
+        self._recent_tasks[str(task_id)] = task
+        if len(self._recent_tasks) > self._RECENT_TASKS_SIZE:
+            self._recent_tasks.popitem(last=False)
+
+        self._latest_tasks[schedule.name] = {
+            "id": str(task_id), "schedule_name": schedule.name, "process_name": schedule.process_name,
+            "state": int(Task.State.RUNNING), "start_time": task.start_time, "end_time": None, "reason": None,
+            "pid": pid, "exit_code": None}
+
+        self._schedule_task_states_write()
+
+    def _queue_task_end(self, task_id, schedule_name, exit_code, state) -> None:
+        """Queues the completion of a task for the next bulk write and updates the recent task"""
+        end_time = datetime.datetime.now(datetime.timezone.utc).astimezone()
+        row = self._task_inserts.get(str(task_id))
+        if row is not None:
+            # Started and completed since the last write, one insert does; bound payloads are not modified in place
+            self._task_inserts[str(task_id)] = dict(row, exit_code=exit_code, state=int(state), end_time=str(end_time))
+        else:
+            self._task_updates[str(task_id)] = _TASK_END_TEMPLATE.bind(
+                exit_code=exit_code, state=int(state), end_time=str(end_time), id=str(task_id))
+
+        task = self._recent_tasks.get(str(task_id))
+        if task is not None:
+            task.state = state
+            task.exit_code = exit_code
+            task.end_time = self._task_time(end_time)
+
+        # Unless a later task of the schedule has started
+        latest = self._latest_tasks.get(schedule_name)
+        if latest is not None and latest["id"] == str(task_id):
+            self._latest_tasks[schedule_name] = dict(latest, state=int(state), exit_code=exit_code,
+                                                     end_time=self._task_time(end_time))
+
+        self._schedule_task_states_write()
+
+    @staticmethod
+    def _task_time(dt):
+        """A task time as the tasks table returns it, see :meth:`get_tasks`"""
+        return dt.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+    def _schedule_task_states_write(self) -> None:
+        if self._task_states_write_task is None:
+            self._task_states_write_task = asyncio.ensure_future(self._write_task_states_later())
+
+    async def _write_task_states_later(self):
+        await asyncio.sleep(self._TASK_STATES_WRITE_SECONDS)
+        self._task_states_write_task = None
+        # The write is completed even when stop() cancels the wait for it
+        await asyncio.shield(self._write_task_states())
+
+    async def _write_task_states(self) -> None:
+        """Writes the queued task states, the rows of the started tasks with one insert and the completions with one
+        update. A failed write is logged and not retried, as when the tasks table was written for every task.
+        """
+        if self._task_states_lock is None:
+            self._task_states_lock = asyncio.Lock()
+        async with self._task_states_lock:
+            inserts, self._task_inserts = self._task_inserts, collections.OrderedDict()
+            updates, self._task_updates = self._task_updates, collections.OrderedDict()
+            if inserts:
+                insert_payload = json.dumps({"inserts": list(inserts.values())}, sort_keys=False)
+                try:
+                    self._logger.debug('Database command: %s', insert_payload)
+                    await self._storage_async.insert_into_tbl("tasks", insert_payload)
+                except Exception:
+                    self._logger.exception('Insert failed: %s', insert_payload)
+                    # Must keep going!
+            if updates:
+                update_payload = json.dumps({"updates": list(updates.values())}, sort_keys=False)
+                try:
+                    self._logger.debug('Database command: %s', update_payload)
+                    await self._storage_async.update_tbl("tasks", update_payload)
+                except Exception:
+                    self._logger.exception('Update failed: %s', update_payload)
+                    # Must keep going!
+
+    async def _flush_task_states(self) -> None:
+        """Writes the queued task states now"""
+        if self._task_states_write_task is not None:
+            self._task_states_write_task.cancel()
+            self._task_states_write_task = None
+        await self._write_task_states()
+
     async def purge_tasks(self):
-        """Deletes rows from the tasks table"""
+        """Deletes rows from the tasks table
+
+        The finished tasks older than max_completed_task_age are deleted oldest first, at most _DELETE_TASKS_LIMIT
+        rows per transaction, until none is left or the scheduler is stopped.
+        """
         if self._paused:
             return
 
         if not self._ready:
             raise NotReadyError()
 
-        delete_payload = PayloadBuilder() \
+        select_payload = PayloadBuilder() \
+            .SELECT("id") \
             .WHERE(["state", "!=", int(Task.State.RUNNING)]) \
             .AND_WHERE(["start_time", "<", str(datetime.datetime.now() - self._max_completed_task_age)]) \
+            .ORDER_BY(["start_time", "asc"]) \
             .LIMIT(self._DELETE_TASKS_LIMIT) \
             .payload()
+        delete_payload = select_payload
         try:
-            self._logger.debug('Database command: %s', delete_payload)
             while not self._paused:
-                res = await self._storage_async.delete_from_tbl("tasks", delete_payload)
-                # TODO: Uncomment below when delete count becomes available in storage layer
-                # if res.get("count") < self._DELETE_TASKS_LIMIT:
-                break
+                self._logger.debug('Database command: %s', select_payload)
+                res = await self._storage_async.query_tbl_with_payload("tasks", select_payload)
+                task_ids = [row['id'] for row in res['rows']]
+                if not task_ids:
+                    break
+                delete_payload = PayloadBuilder().WHERE(["id", "in", task_ids]).payload()
+                self._logger.debug('Database command: %s', delete_payload)
+                await self._storage_async.delete_from_tbl("tasks", delete_payload)
+                for task_id in task_ids:
+                    self._recent_tasks.pop(task_id, None)
+                purged = set(task_ids)
+                for schedule_name in [name for name, row in self._latest_tasks.items() if row["id"] in purged]:
+                    del self._latest_tasks[schedule_name]
+                if len(task_ids) < self._DELETE_TASKS_LIMIT:
+                    break
+                # Do not starve other coroutines between the batches
+                await asyncio.sleep(0)
         except Exception:
             self._logger.exception('Delete failed: %s', delete_payload)
             raise
@@ -790,6 +1009,21 @@ class Scheduler(object):
                 "default": str(self._DEFAULT_MAX_COMPLETED_TASK_AGE_DAYS),
                 "displayName": "Max Age Of Task (In days)"
             },
+            "stats_collector_in_core": {
+                "description": "Collect the statistics history in the core instead of starting a stats collector "
+                               "task process at every interval. Takes effect on restart",
+                "type": "boolean",
+                "default": "false",
+                "displayName": "Stats Collector In Core"
+            },
+            "resident_task_workers": {
+                "description": "Fork the purge, rollup, north and automation script tasks from a resident worker "
+                               "process per task type instead of starting a new interpreter for every run. "
+                               "Takes effect on restart",
+                "type": "boolean",
+                "default": "false",
+                "displayName": "Resident Task Workers"
+            },
         }
 
         cfg_manager = ConfigurationManager(self._storage_async)
@@ -799,6 +1033,10 @@ class Scheduler(object):
         self._max_running_tasks = int(config['max_running_tasks']['value'])
         self._max_completed_task_age = datetime.timedelta(
             seconds=int(config['max_completed_task_age_days']['value']) * self._DAY_SECONDS)
+        self._stats_collector_in_core = config.get(
+            'stats_collector_in_core', {}).get('value', 'false').lower() == 'true'
+        self._resident_task_workers = config.get(
+            'resident_task_workers', {}).get('value', 'false').lower() == 'true'
 
     async def start(self):
         """Starts the scheduler
@@ -849,6 +1087,11 @@ class Scheduler(object):
         await self._read_config()
         await self._mark_tasks_interrupted()
         await self._read_storage()
+        try:
+            await self._read_latest_tasks()
+        except Exception:
+            # Read again when they are asked for
+            pass
 
         self._ready = True
         if not self._is_safe_mode:
@@ -942,6 +1185,19 @@ class Scheduler(object):
             if task_count != 0:
                 raise TimeoutError("Timeout Error: Could not stop scheduler as {} tasks are pending".format(task_count))
 
+        await self._flush_task_states()
+
+        if self._statistics_history is not None:
+            # The zeros at the end of the runs of idle keys, which would be written at their next change
+            try:
+                await self._statistics_history.flush()
+            except Exception as ex:
+                self._logger.exception(ex, 'An exception was raised by StatisticsHistoryCollector.flush')
+
+        for task_worker in self._task_workers.values():
+            await task_worker.stop()
+        self._task_workers = {}
+
         self._schedule_executions = None
         self._task_processes = None
         self._schedules = None
@@ -1509,6 +1765,10 @@ class Scheduler(object):
 
     async def get_task(self, task_id: uuid.UUID) -> Task:
         """Retrieves a task given its id"""
+        task = self._recent_tasks.get(str(task_id))
+        if task is not None:
+            return task
+
         query_payload = PayloadBuilder().SELECT("id", "process_name", "schedule_name", "state", "start_time", "end_time", "reason", "exit_code")\
             .ALIAS("return", ("start_time", 'start_time'), ("end_time", 'end_time'))\
             .FORMAT("return", ("start_time", "YYYY-MM-DD HH24:MI:SS.MS"), ("end_time", "YYYY-MM-DD HH24:MI:SS.MS"))\
@@ -1547,7 +1807,18 @@ class Scheduler(object):
             sort:
                 A tuple of Task attributes to sort by.
                 Defaults to ("start_time", "desc")
+
+        The most recent tasks are returned from memory when there are enough of them matching the query;
+        the tasks table is queried otherwise, once the queued task states are written to it.
         """
+        if not (offset or and_where or or_where or sort):
+            tasks = self._get_recent_tasks(limit, where)
+            if tasks is not None:
+                return tasks
+        await self._flush_task_states()
+
+        if not sort:
+            sort = ["start_time", "desc"]
         chain_payload = PayloadBuilder().SELECT("id", "process_name", "schedule_name", "state", "start_time", "end_time", "reason", "exit_code") \
             .ALIAS("return", ("start_time", 'start_time'), ("end_time", 'end_time'))\
             .FORMAT("return", ("start_time", "YYYY-MM-DD HH24:MI:SS.MS"), ("end_time", "YYYY-MM-DD HH24:MI:SS.MS"))\
@@ -1587,6 +1858,81 @@ class Scheduler(object):
 
         return tasks
 
+    def _get_recent_tasks(self, limit, where):
+        """Returns the most recent tasks matching the where clause of :meth:`get_tasks`, newest first, or None
+        when the recent tasks can not answer it: a condition other than the equality of a schedule name, process name
+        or state, or less than limit recent tasks matching.
+
+        As every task is started by the scheduler, the recent tasks matching are the most recent tasks matching.
+        """
+        conditions = where if isinstance(where, tuple) else (where,) if where else ()
+        for condition in conditions:
+            if not (isinstance(condition, list) and len(condition) == 3 and condition[1] == "=" and
+                    condition[0] in ("schedule_name", "process_name", "state")):
+                return None
+        tasks = []
+        if limit <= 0:
+            return tasks
+        for task in reversed(self._recent_tasks.values()):
+            if all(getattr(task, condition[0]) == condition[2] for condition in conditions):
+                tasks.append(task)
+                if len(tasks) == limit:
+                    return tasks
+        return None
+
+    async def get_latest_tasks(self, schedule_name=None) -> List[dict]:
+        """Retrieves the most recent task of every schedule, or of the given schedule, from memory
+
+        Returns:
+            A list of rows of the tasks table, ordered by schedule name, with the start and end times formatted as
+            :meth:`get_tasks` returns them
+        """
+        if not self._latest_tasks_read:
+            await self._read_latest_tasks()
+        if schedule_name is not None:
+            row = self._latest_tasks.get(schedule_name)
+            return [] if row is None else [row]
+        return [self._latest_tasks[name] for name in sorted(self._latest_tasks)]
+
+    def forget_latest_task(self, schedule_name) -> None:
+        """Drops the most recent task of a schedule whose tasks have been deleted from the tasks table"""
+        self._latest_tasks.pop(schedule_name, None)
+
+    async def forget_recent_tasks(self, schedule_id) -> None:
+        """Writes the queued task states and drops the recent tasks of a schedule whose tasks are to be deleted from
+        the tasks table
+
+        Called before the rows are deleted, so that no queued row of the schedule is written after them.
+        """
+        await self._flush_task_states()
+        schedule_id = str(schedule_id)
+        for task_id in [task_id for task_id, task in self._recent_tasks.items() if task.schedule_id == schedule_id]:
+            del self._recent_tasks[task_id]
+
+    async def _read_latest_tasks(self) -> None:
+        """Reads the most recent task of every schedule from the tasks table
+
+        Tasks started since the scheduler started are newer than any row read and are kept.
+        """
+        await self._flush_task_states()
+        query_payload = PayloadBuilder().SELECT("id", "schedule_name", "process_name", "state", "start_time",
+                                                "end_time", "reason", "pid", "exit_code") \
+            .ALIAS("return", ("start_time", 'start_time'), ("end_time", 'end_time')) \
+            .FORMAT("return", ("start_time", "YYYY-MM-DD HH24:MI:SS.MS"), ("end_time", "YYYY-MM-DD HH24:MI:SS.MS")) \
+            .ORDER_BY(["start_time", "desc"]) \
+            .payload()
+        try:
+            self._logger.debug('Database command: %s', query_payload)
+            res = await self._storage_async.query_tbl_with_payload("tasks", query_payload)
+        except Exception:
+            self._logger.exception('Query failed: %s', query_payload)
+            raise
+        for row in res['rows']:
+            schedule_name = row.get('schedule_name')
+            if schedule_name and schedule_name.strip():
+                self._latest_tasks.setdefault(schedule_name, row)
+        self._latest_tasks_read = True
+
     async def cancel_task(self, task_id: uuid.UUID) -> None:
         """Cancels a running task
 
@@ -1636,6 +1982,9 @@ class Scheduler(object):
             await self._wait_for_task_completion(task_process)
 
     def _terminate_child_processes(self, parent_id):
+        if parent_id == os.getpid():
+            # A task run in the core has no processes of its own
+            return
         ps_command = subprocess.Popen("ps -o pid --ppid {} --noheaders".format(parent_id), shell=True,
                                       stdout=subprocess.PIPE)
         ps_output, err = ps_command.communicate()
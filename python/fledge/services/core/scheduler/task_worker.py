@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Resident workers of the scheduler, see fledge.tasks.common.worker"""
+
+import asyncio
+import json
+import os
+import signal
+
+from fledge.common.logger import FLCoreLogger
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = FLCoreLogger().get_logger(__name__)
+
+RESIDENT_TASK_MODULES = {
+    'tasks/purge': 'fledge.tasks.purge',
+    'tasks/rollup': 'fledge.tasks.rollup',
+    'tasks/north': 'fledge.tasks.north.sending_process',
+    'tasks/automation_script': 'fledge.tasks.automation_script'
+}
+"""Python task scripts which can run in a resident worker, to the module each one runs with python3 -m"""
+
+
+class WorkerRun(object):
+    """A run of a task in a worker, with what the scheduler uses of asyncio.subprocess.Process"""
+
+    def __init__(self, run_id):
+        self.id = run_id
+        self.pid = None
+        self.returncode = None
+        loop = asyncio.get_event_loop()
+        self._started = loop.create_future()
+        self._exited = loop.create_future()
+
+    async def wait(self):
+        return await asyncio.shield(self._exited)
+
+    def _set_pid(self, pid):
+        self.pid = pid
+        if not self._started.done():
+            self._started.set_result(pid)
+
+    def _set_returncode(self, returncode):
+        self.returncode = returncode
+        if not self._started.done():
+            self._started.set_exception(OSError("Task worker exited before the task started"))
+        if not self._exited.done():
+            self._exited.set_result(returncode)
+
+    def send_signal(self, sig):
+        if self.returncode is None:
+            os.kill(self.pid, sig)
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class TaskWorker(object):
+    """A worker process which forks the runs of a task module, started at the first run and again after it exited"""
+
+    _STOP_WAIT_SECONDS = 5
+
+    _PYTHON = "python3"
+    """Interpreter of the worker, the one the task scripts run"""
+
+    def __init__(self, module, cwd):
+        self._module = module
+        self._cwd = cwd
+        self._process = None
+        self._reader = None
+        self._runs = {}
+        """id of each run not yet exited to its WorkerRun"""
+        self._next_id = 0
+
+    @property
+    def pid(self):
+        return None if self._process is None else self._process.pid
+
+    async def run(self, argv) -> WorkerRun:
+        """Start a run of the task with the given arguments
+
+        Raises:
+            EnvironmentError: If the worker could not be started or exited before the run started
+        """
+        if self._process is None:
+            await self._start()
+        self._next_id += 1
+        run = WorkerRun(self._next_id)
+        self._runs[run.id] = run
+        try:
+            self._process.stdin.write((json.dumps({"id": run.id, "argv": list(argv)}) + '\n').encode())
+            await self._process.stdin.drain()
+        except (ConnectionError, RuntimeError) as ex:
+            self._runs.pop(run.id, None)
+            raise OSError("Unable to send the run to task worker of {}: {}".format(self._module, ex))
+        await run._started
+        return run
+
+    async def _start(self):
+        self._process = await asyncio.create_subprocess_exec(
+            self._PYTHON, "-m", "fledge.tasks.common.worker", self._module, cwd=self._cwd,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+        self._reader = asyncio.ensure_future(self._read(self._process))
+        _logger.info("Task worker of {} started with pid {}".format(self._module, self._process.pid))
+
+    async def _read(self, process):
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                message = json.loads(line.decode())
+                run = self._runs.get(message['id'])
+                if run is None:
+                    continue
+                if 'pid' in message:
+                    run._set_pid(message['pid'])
+                if 'returncode' in message:
+                    del self._runs[run.id]
+                    run._set_returncode(message['returncode'])
+        except Exception as ex:
+            _logger.error(ex, "Unable to read from task worker of {}.".format(self._module))
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        finally:
+            await process.wait()
+            if self._process is process:
+                self._process = None
+            if self._runs:
+                # The runs of a worker which died can no longer be tracked
+                _logger.warning("Task worker of {} exited with {}, {} runs lost".format(
+                    self._module, process.returncode, len(self._runs)))
+            runs, self._runs = self._runs, {}
+            for run in runs.values():
+                run._set_returncode(1)
+
+    async def stop(self):
+        """Close the channel of the worker and wait for it to exit after its runs, killing it after a while"""
+        process = self._process
+        if process is None:
+            return
+        process.stdin.close()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._reader), self._STOP_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await self._reader
@@ -22,7 +22,7 @@ import signal
 from datetime import datetime, timedelta
 import jwt
 
-from fledge.common import logger
+from fledge.common import logger, startup_profiler
 from fledge.common.alert_manager import AlertManager
 from fledge.common.audit_logger import AuditLogger
 from fledge.common.configuration_manager import ConfigurationManager
@@ -46,6 +46,9 @@ from fledge.services.common.service_announcer import ServiceAnnouncer
 from fledge.services.core.user_model import User
 from fledge.common.storage_client import payload_builder
 from fledge.services.core.asset_tracker.asset_tracker import AssetTracker
+from fledge.common.job_manager import JobManager
+from fledge.services.core.asset_index import AssetIndex
+from fledge.services.core.latest_readings import LatestReadings, FEED_URI, FEED_MODES, FEED_OFF
 from fledge.services.core.api import asset_tracker as asset_tracker_api
 from fledge.common.web.ssl_wrapper import SSLVerifier
 from fledge.services.core.api import exceptions as api_exception
@@ -160,6 +163,15 @@ class Server:
             'default': 'Fledge administrative API',
             'displayName': 'Description',
             'order': '2'
+        },
+        'readingsFeed': {
+            'description': 'Readings the storage service posts to the core to serve the latest reading and buffered '
+                           'readings count of assets without querying the readings. Restart is required',
+            'type': 'enumeration',
+            'options': FEED_MODES,
+            'default': FEED_OFF,
+            'displayName': 'Readings Feed',
+            'order': '3'
         }
     }
 
@@ -350,6 +362,15 @@ class Server:
     _alert_manager = None
     """ Alert Manager """
 
+    _latest_readings = None
+    """ Latest reading per asset cache """
+
+    _readings_feed = FEED_OFF
+    """ Readings the storage service posts to the core """
+
+    _asset_index = None
+    """ Buffered readings count and timespan per asset """
+
     running_in_safe_mode = False
     """ Fledge running in Safe mode """
 
@@ -598,6 +619,10 @@ class Server:
                 cls._service_description = config['description']['value']
             except KeyError:
                 cls._service_description = 'Fledge REST Services'
+            try:
+                cls._readings_feed = config['readingsFeed']['value']
+            except KeyError:
+                cls._readings_feed = FEED_OFF
         except Exception as ex:
             _logger.exception(ex)
             raise
@@ -930,6 +955,17 @@ class Server:
         cls._asset_tracker = AssetTracker(cls._storage_client_async)
         await cls._asset_tracker.load_asset_records()
 
+    @classmethod
+    async def _start_latest_readings(cls):
+        host = '127.0.0.1' if cls._host == '0.0.0.0' else cls._host
+        callback_url = 'http://{}:{}{}'.format(host, cls.core_management_port, FEED_URI)
+        cls._latest_readings = LatestReadings(cls._readings_client_async, callback_url, cls._readings_feed)
+        cls._asset_index = AssetIndex(cls._readings_client_async, cls._latest_readings)
+        if cls.scheduler is not None:
+            # The purge task removes readings behind the back of the index
+            cls.scheduler.on_task_end('purge', cls._asset_index.purged)
+        await cls._latest_readings.start()
+
     @classmethod
     async def _get_alerts(cls):
         cls._alert_manager = AlertManager(cls._storage_client_async)
@@ -948,12 +984,14 @@ class Server:
             cls.core_server, cls.core_server_handler = cls._start_app(loop, cls.core_app, host, 0)
             address, cls.core_management_port = cls.core_server.sockets[0].getsockname()
             _logger.info('Management API started on http://%s:%s', address, cls.core_management_port)
+            startup_profiler.mark("management api")
             # see http://<core_mgt_host>:<core_mgt_port>/fledge/service for registered services
             # start storage
             loop.run_until_complete(cls._start_storage(loop))
 
             # get storage client
             loop.run_until_complete(cls._get_storage_client())
+            startup_profiler.mark("storage")
 
             if not cls.running_in_safe_mode:
                 # If readings table is empty, set last_object of all streams to 0
@@ -961,6 +999,7 @@ class Server:
 
             # obtain configuration manager and interest registry
             cls._configuration_manager = ConfigurationManager(cls._storage_client_async)
+            loop.run_until_complete(cls._configuration_manager.load_category_tree())
             cls._interest_registry = InterestRegistry(cls._configuration_manager)
 
             # Configuration Manager setup
@@ -968,6 +1007,7 @@ class Server:
 
             # Logging category
             loop.run_until_complete(cls.core_logger_setup())
+            startup_profiler.mark("configuration")
 
             # start scheduler
             # see scheduler.py start def FIXME
@@ -977,6 +1017,7 @@ class Server:
             # and only API operations and current state will be accessible (No jobs / processes will be triggered)
             #
             loop.run_until_complete(cls._start_scheduler())
+            startup_profiler.mark("scheduler")
 
             # start monitor
             loop.run_until_complete(cls._start_service_monitor())
@@ -1048,11 +1089,15 @@ class Server:
 
             # Create the configuration category parents
             loop.run_until_complete(cls._config_parents())
+            startup_profiler.mark("rest api")
 
             if not cls.running_in_safe_mode:
                 # Start asset tracker
                 loop.run_until_complete(cls._start_asset_tracker())
 
+                # Latest readings cache and asset index, the storage feed, if enabled, is registered on first use
+                loop.run_until_complete(cls._start_latest_readings())
+
                 # Start Alert Manager
                 loop.run_until_complete(cls._get_alerts())
 
@@ -1082,10 +1127,12 @@ class Server:
                             enabled=sch.enabled,
                             process_name=sch.process_name)
                         loop.run_until_complete(cls.scheduler._start_task(schedule_row, dryrun=True))
+                startup_profiler.mark("asset tracker, alerts and task dry runs")
             # Everything is complete in the startup sequence, write the audit log entry
             cls._audit = AuditLogger(cls._storage_client_async)
             audit_msg = {"message": "Running in safe mode"} if cls.running_in_safe_mode else None
             loop.run_until_complete(cls._audit.information('START', audit_msg))
+            startup_profiler.finish()
             if sys.version_info >= (3, 7, 1):
                 ignore_aiohttp_ssl_eror(loop)
             loop.run_forever()
@@ -1137,6 +1184,15 @@ class Server:
             # stop the REST api (exposed on service port)
             await cls.stop_rest_server()
 
+            if cls._asset_index is not None:
+                await cls._asset_index.stop()
+
+            if cls._latest_readings is not None:
+                await cls._latest_readings.stop()
+
+            # cancel the long running operations, their jobs are not resumed
+            await JobManager().stop()
+
             # Must write the audit log entry before we stop the storage service
             cls._audit = AuditLogger(cls._storage_client_async)
             audit_msg = {"message": "Exited from safe mode"} if cls.running_in_safe_mode else None
@@ -1290,6 +1346,20 @@ class Server:
         since_started = time.time() - cls._start_time
         return web.json_response({'uptime': int(since_started)})
 
+    @classmethod
+    async def get_startup_profile(cls, request):
+        """ import and phase timings of the startup of the core, see fledge.common.startup_profiler
+
+        :Example:
+            curl -sX GET http://localhost:<core mgt port>/fledge/service/profile
+        """
+        profile = startup_profiler.report()
+        if profile is None:
+            msg = "Startup profiling is not enabled, set {} to enable it".format(
+                startup_profiler.ENVIRONMENT_VARIABLE)
+            raise web.HTTPNotFound(reason=msg, body=json.dumps({"message": msg}))
+        return web.json_response(profile)
+
     @classmethod
     async def register(cls, request):
         """ Register a service
@@ -1801,9 +1871,24 @@ class Server:
 
     @classmethod
     async def get_track(cls, request):
-        res = await asset_tracker_api.get_asset_tracker_events(request)
+        res = await asset_tracker_api.query_asset_tracker_events(request)
         return res
 
+    @classmethod
+    async def readings_feed(cls, request):
+        """ Readings appended to the storage, posted by the storage service for the latest readings cache """
+        if cls._latest_readings is None or not cls._latest_readings.enabled:
+            return web.json_response({"readings": 0})
+        try:
+            readings = LatestReadings.parse_feed(await request.text())
+        except ValueError as err:
+            msg = str(err)
+            raise web.HTTPBadRequest(reason=msg, body=json.dumps({"message": msg}))
+        cls._latest_readings.update(readings)
+        if cls._asset_index is not None:
+            cls._asset_index.update(readings)
+        return web.json_response({"readings": len(readings)})
+
     @classmethod
     async def add_track(cls, request):
 
@@ -1862,6 +1947,7 @@ class Server:
     @classmethod
     async def refresh_cache(cls, request: web.Request) -> web.Response:
         from fledge.services.core.api.plugins import common
+        from fledge.plugins.common.plugin_index import PluginIndex
 
         data = await request.json()
         try:
@@ -1869,6 +1955,7 @@ class Server:
             # We may add with action & key combination basis later on
             common._get_available_packages.cache_clear()
             cls._package_cache_manager['list']['last_accessed_time'] = ""
+            PluginIndex.invalidate()
         except (TypeError, ValueError, KeyError) as err:
             raise web.HTTPBadRequest(reason=str(err), body=json.dumps({'message': str(err)}))
         except Exception as ex:
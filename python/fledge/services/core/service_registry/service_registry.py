@@ -21,10 +21,57 @@ __license__ = "Apache 2.0"
 __version__ = "${VERSION}"
 
 
+class _RegistryIndex:
+    """ Hash indexes of a list of service records by id, name, type, (address, port) and (address, management port)
+
+    Every index maps a key to the list of the records with that key, in the order of the registry list.
+    """
+
+    KEYS = {
+        '_id': lambda s: s._id,
+        '_name': lambda s: s._name,
+        '_type': lambda s: s._type,
+        'address_port': lambda s: (s._address, s._port),
+        'address_mgt_port': lambda s: (s._address, s._management_port)
+    }
+
+    __slots__ = ['registry', 'size', 'indexes']
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.size = 0
+        self.indexes = {k: {} for k in self.KEYS}
+        for record in registry:
+            self.add(record)
+
+    def is_current(self, registry):
+        """ False if the registry list was replaced or changed other than through add and remove """
+        return self.registry is registry and self.size == len(registry)
+
+    def add(self, record):
+        for k, key in self.KEYS.items():
+            self.indexes[k].setdefault(key(record), []).append(record)
+        self.size += 1
+
+    def remove(self, record):
+        for k, key in self.KEYS.items():
+            records = self.indexes[k][key(record)]
+            records.remove(record)
+            if not records:
+                del self.indexes[k][key(record)]
+        self.size -= 1
+
+    def get(self, k, value):
+        return self.indexes[k].get(value, [])
+
+
 class ServiceRegistry:
 
     _registry = list()
 
+    _index = None
+    """ _RegistryIndex of _registry """
+
     # Startup tokens to pass to service or tasks being started
     _startupTokens = dict()
 
@@ -112,7 +159,9 @@ class ServiceRegistry:
 
         service_id = str(uuid.uuid4()) if new_service is True else current_service_id
         registered_service = ServiceRecord(service_id, name, s_type, protocol, address, port, management_port)
+        index = cls._get_index()
         cls._registry.append(registered_service)
+        index.add(registered_service)
         cls._logger.info("Registered {}".format(str(registered_service)))
 
         # Remove startup token
@@ -184,7 +233,9 @@ class ServiceRegistry:
         :param service_id: a uuid of registered service
         """
         services = cls.get(idx=service_id)
+        index = cls._get_index()
         cls._registry.remove(services[0])
+        index.remove(services[0])
 
     @classmethod
     def _remove_from_scheduler_records(cls, service_name):
@@ -204,13 +255,25 @@ class ServiceRegistry:
     def all(cls):
         return cls._registry
 
+    @classmethod
+    def _get_index(cls):
+        """ The index of _registry, rebuilt if _registry was replaced or changed by other means than register and
+        remove_from_registry
+        """
+        if cls._index is None or not cls._index.is_current(cls._registry):
+            cls._index = _RegistryIndex(cls._registry)
+        return cls._index
+
     @classmethod
     def filter(cls, **kwargs):
         # OR based filter
         services = cls._registry
         for k, v in kwargs.items():
             if v:
-                services = [s for s in cls._registry if getattr(s, k, None) == v]
+                if k in _RegistryIndex.KEYS:
+                    services = list(cls._get_index().get(k, v))
+                else:
+                    services = [s for s in cls._registry if getattr(s, k, None) == v]
         return services
 
     @classmethod
@@ -224,7 +287,8 @@ class ServiceRegistry:
     def check_address_and_port(cls, address, port):
         # AND based check
         # ugly hack! <Make filter to support AND | OR>
-        services = [s for s in cls._registry if getattr(s, "_address") == address and getattr(s, "_port") == port and getattr(s, "_status") != ServiceRecord.Status.Failed]
+        services = [s for s in cls._get_index().get('address_port', (address, port))
+                    if s._status != ServiceRecord.Status.Failed]
         if len(services) == 0:
             return False
         return True
@@ -233,8 +297,8 @@ class ServiceRegistry:
     def check_address_and_mgt_port(cls, address, m_port):
         # AND based check
         # ugly hack! <Make filter to support AND | OR>
-        services = [s for s in cls._registry if getattr(s, "_address") == address
-                    and getattr(s, "_management_port") == m_port and getattr(s, "_status") != ServiceRecord.Status.Failed]
+        services = [s for s in cls._get_index().get('address_mgt_port', (address, m_port))
+                    if s._status != ServiceRecord.Status.Failed]
         if len(services) == 0:
             return False
         return True
@@ -243,7 +307,7 @@ class ServiceRegistry:
     def filter_by_name_and_type(cls, name, s_type):
         # AND based check
         # ugly hack! <Make filter to support AND | OR>
-        services = [s for s in cls._registry if getattr(s, "_name") == name and getattr(s, "_type") == s_type]
+        services = [s for s in cls._get_index().get('_name', name) if s._type == s_type]
         if len(services) == 0:
             raise service_registry_exceptions.DoesNotExist
         return services
@@ -6,6 +6,7 @@
 
 """ Provides utility functions to take snapshot of plugins"""
 
+import asyncio
 import os
 from os import path
 from os.path import basename
@@ -16,6 +17,7 @@ import time
 from collections import OrderedDict
 
 from fledge.common.common import _FLEDGE_ROOT
+from fledge.common.job_manager import JobCancelled
 from fledge.common.logger import FLCoreLogger
 
 
@@ -48,6 +50,22 @@ class SnapshotPluginBuilder:
             raise RuntimeError(str(ex))
 
     async def build(self):
+        """ Create a snapshot off the event loop
+
+        Returns:
+            snapshot id and file name
+        """
+        return await asyncio.get_event_loop().run_in_executor(None, self.create)
+
+    def create(self, job=None):
+        """ Create a snapshot, on the calling thread; when given its job, it is told of the progress and may be
+        cancelled between the plugin directories
+        """
+        def step(progress, message):
+            if job is not None:
+                job.check_cancelled()
+                job.set_progress(progress, message)
+
         def reset(tarinfo):
             tarinfo.uid = tarinfo.gid = 0
             tarinfo.uname = tarinfo.gname = "root"
@@ -60,19 +78,26 @@ class SnapshotPluginBuilder:
             tar_file_name = "{}/{}".format(self._out_file_path, snapshot_filename)
             pyz = tarfile.open(tar_file_name, "w:gz")
             try:
+                step(0, "Adding Python plugins")
                 # files are being added to tarfile with relative path and NOT with absolute path.
                 pyz.add("{}/python/fledge/plugins".format(_FLEDGE_ROOT),
                         arcname="python/fledge/plugins", recursive=True)
+                step(40, "Adding C plugins")
                 # C plugins location is different with "make install" and "make"
                 if path.exists("{}/bin".format(_FLEDGE_ROOT)) and path.exists("{}/bin/fledge".format(_FLEDGE_ROOT)):
                     pyz.add("{}/plugins".format(_FLEDGE_ROOT), arcname="plugins", recursive=True, filter=reset)
                 else:
                     pyz.add("{}/C/plugins".format(_FLEDGE_ROOT), arcname="C/plugins", recursive=True)
                     pyz.add("{}/plugins".format(_FLEDGE_ROOT), arcname="plugins", recursive=True)
+                    step(70, "Adding built C plugins")
                     pyz.add("{}/cmake_build/C/plugins".format(_FLEDGE_ROOT), arcname="cmake_build/C/plugins",
                             recursive=True)
             finally:
                 pyz.close()
+        except JobCancelled:
+            if os.path.isfile(tar_file_name):
+                os.remove(tar_file_name)
+            raise
         except Exception as ex:
             if os.path.isfile(tar_file_name):
                 os.remove(tar_file_name)
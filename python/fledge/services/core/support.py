@@ -6,20 +6,26 @@
 
 """ Provides utility functions to build a Fledge Support bundle.
 """
+import asyncio
 import datetime
 import os
+import re
+import threading
 from os.path import basename
 import glob
 import sys
 import shutil
 import json
 import tarfile
-import fnmatch
+import tempfile
 import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from fledge.common import utils
 from fledge.common.common import _FLEDGE_ROOT, _FLEDGE_DATA
 from fledge.common.configuration_manager import ConfigurationManager
+from fledge.common.job_manager import JobCancelled
 from fledge.common.logger import FLCoreLogger
 from fledge.common.plugin_discovery import PluginDiscovery
 from fledge.common.storage_client import payload_builder
@@ -39,14 +45,49 @@ _NO_OF_FILES_TO_RETAIN = 3
 _SYSLOG_FILE = '/var/log/messages' if utils.is_redhat_based() else '/var/log/syslog'
 _PATH = _FLEDGE_DATA if _FLEDGE_DATA else _FLEDGE_ROOT + '/data'
 
+COMPRESSIONS = OrderedDict([('gz', '.tar.gz'), ('bz2', '.tar.bz2'), ('xz', '.tar.xz'), ('none', '.tar')])
+""" Compression of a bundle and the extension of its file """
+BUNDLE_EXTENSIONS = tuple(COMPRESSIONS.values())
+DEFAULT_COMPRESSION = 'gz'
+DEFAULT_COMPRESSION_LEVEL = 6
+""" Level of the gzip and bzip2 compression, preset of the xz one; 6 is almost as small as 9 for logs and faster """
+_MAX_COLLECTORS = 4
+
+
+class _SerialTarFile(object):
+    """ Tar file the collectors add to from their threads, one member at a time """
+
+    def __init__(self, tar):
+        self._tar = tar
+        self._lock = threading.Lock()
+
+    def add(self, *args, **kwargs):
+        with self._lock:
+            self._tar.add(*args, **kwargs)
+
+    def close(self):
+        with self._lock:
+            self._tar.close()
+
 
 class SupportBuilder:
 
     _out_file_path = None
     _interim_file_path = None
     _storage = None
-
-    def __init__(self, support_dir):
+    _job = None
+    _executor = None
+    _compression = DEFAULT_COMPRESSION
+    _level = DEFAULT_COMPRESSION_LEVEL
+    _file_spec = None
+    _tar_file_name = None
+
+    _building = {}
+    """ Names of the bundles being built, or queued to be, and their jobs; a bundle is streamed to its download while
+    it grows
+    """
+
+    def __init__(self, support_dir, compression=DEFAULT_COMPRESSION, level=DEFAULT_COMPRESSION_LEVEL):
         try:
             if not os.path.exists(support_dir):
                 os.makedirs(support_dir)
@@ -55,111 +96,196 @@ class SupportBuilder:
 
             self._out_file_path = support_dir
             self._interim_file_path = support_dir
+            self._compression = compression
+            self._level = level
             self._storage = get_storage_async()  # from fledge.services.core.connect
         except (OSError, Exception) as ex:
             _LOGGER.error(ex, "Error in initializing SupportBuilder class.")
             raise RuntimeError(str(ex))
 
-    async def build(self):
+    @classmethod
+    def is_building(cls, bundle_name):
+        job = cls._building.get(basename(bundle_name))
+        if job is not None and job.done:
+            # Cancelled before it was started, the build never ran to forget its bundle
+            cls._building.pop(basename(bundle_name), None)
+            return False
+        return basename(bundle_name) in cls._building
+
+    def register(self, job):
+        """ Mark the bundle as being built from the time its job is queued, so that it may be asked for at once """
+        SupportBuilder._building[basename(self.bundle_name())] = job
+
+    def bundle_name(self):
+        """ Path of the bundle, named by the time it is asked for first; a bundle asked for in the same second as
+        another one, being built or not, is numbered after it
+        """
+        if self._tar_file_name is None:
+            spec = datetime.datetime.utcnow().strftime('%y%m%d-%H-%M-%S')
+            self._file_spec = spec
+            number = 1
+            while True:
+                tar_file_name = "{}/support-{}{}".format(self._out_file_path, self._file_spec,
+                                                         COMPRESSIONS[self._compression])
+                if not (self.is_building(tar_file_name) or os.path.exists(tar_file_name)):
+                    break
+                number += 1
+                self._file_spec = "{}-{}".format(spec, number)
+            self._tar_file_name = tar_file_name
+        return self._tar_file_name
+
+    async def build(self, job=None):
+        """ Build a support bundle; the blocking steps run off the event loop, on the job pool when given the job
+        the bundle is built by, which is then told of the progress and may be cancelled between steps
+        """
+        self._job = job
+        tar_file_name = self.bundle_name()
+        file_spec = self._file_spec
+        self._executor = ThreadPoolExecutor(max_workers=_MAX_COLLECTORS, thread_name_prefix='fledge-support')
+        SupportBuilder._building[basename(tar_file_name)] = job
+        interim_dir = None
         try:
-            today = datetime.datetime.utcnow()
-            file_spec = today.strftime('%y%m%d-%H-%M-%S')
-            tar_file_name = self._out_file_path+"/"+"support-{}.tar.gz".format(file_spec)
-            pyz = tarfile.open(tar_file_name, "w:gz")
+            # The interim files of each build are apart, as builds may run at the same time
+            interim_dir = self._interim_file_path = tempfile.mkdtemp(prefix='fledge-support-')
+            pyz = _SerialTarFile(await self._blocking(self._open_tar, tar_file_name))
             try:
+                self._progress(5, "Collecting system information")
                 # fledge version and schema info
                 await self.add_fledge_version_and_schema(pyz)
-                # Details of machine resources
-                self.add_machine_resources(pyz, file_spec)
-                # Process status of services or tasks
-                self.add_psinfo(pyz, file_spec)
-                # softwares installed list
-                self.add_software_list(pyz, file_spec)
-                # package logs
-                self.add_package_log_dir_content(pyz)
-                # pip packages list
-                self.add_python_packages_list(pyz, file_spec)
-                # all logs
-                self.add_syslog_fledge(pyz, file_spec)
-                # storage service logs
-                self.add_syslog_storage(pyz, file_spec)
-                # service registry
-                self.add_service_registry(pyz, file_spec)
-                # debug trace logs
-                self.add_debug_trace_log_dir_content(pyz)
-                # configuration related scripts
-                self.add_script_dir_content(pyz)
-                # utility computation files
-                self.add_syslog_utility(pyz)
-                cf_mgr = ConfigurationManager(self._storage)
-                try:
-                    # South services logs
-                    south_cat = await cf_mgr.get_category_child("South")
-                    south_categories = [sc["key"] for sc in south_cat]
-                    for service in south_categories:
-                        self.add_syslog_service(pyz, file_spec, service)
-                except:
-                    pass
-                try:
-                    # North services and tasks logs
-                    north_cat = await cf_mgr.get_category_child("North")
-                    north_categories = [nc["key"] for nc in north_cat]
-                    for task in north_categories:
-                        if task != "OMF_TYPES":
-                            self.add_syslog_service(pyz, file_spec, task)
-                except:
-                    pass
-                try:
-                    # external services logs
-                    schedule_list = await server.Server.scheduler.get_schedules()
-                    external_svc_processes = ('bucket_storage_c', 'dispatcher_c', 'management', 'notification_c')
-                    for sch in filter(lambda obj: obj.process_name in external_svc_processes, schedule_list):
-                        self.add_syslog_service(pyz, file_spec, sch.name)
-                except:
-                    pass
+                services, schedule_list = await self._get_log_sources()
+                self._progress(10, "Collecting logs, system information and tables")
                 # Tables related info
                 db_tables = {"configuration": "category", "log": "audit", "schedules": "schedule",
                              "scheduled_processes": "schedule-process", "monitors": "service-monitoring",
                              "statistics": "statistics", "alerts": "alerts"}
-                for tbl_name, file_name in sorted(db_tables.items()):
-                    await self.add_db_content(pyz, file_spec, tbl_name, file_name)
+                collectors = [
+                    # all logs, storage service logs and the logs of each service or task, in one pass over syslog
+                    self._blocking(self.add_syslog, pyz, file_spec, services),
+                    # Details of machine resources
+                    self._blocking(self.add_machine_resources, pyz, file_spec),
+                    # Process status of services or tasks
+                    self._blocking(self.add_psinfo, pyz, file_spec),
+                    # softwares installed list
+                    self._blocking(self.add_software_list, pyz, file_spec),
+                    # package logs
+                    self._blocking(self.add_package_log_dir_content, pyz),
+                    # pip packages list
+                    self._blocking(self.add_python_packages_list, pyz, file_spec),
+                    # service registry
+                    self._blocking(self.add_service_registry, pyz, file_spec),
+                    # debug trace logs
+                    self._blocking(self.add_debug_trace_log_dir_content, pyz),
+                    # configuration related scripts
+                    self._blocking(self.add_script_dir_content, pyz),
+                    # utility computation files
+                    self._blocking(self.add_syslog_utility, pyz)
+                ]
+                collectors.extend(self.add_db_content(pyz, file_spec, tbl_name, file_name)
+                                  for tbl_name, file_name in sorted(db_tables.items()))
                 # Control info only if dispatcher schedule available
-                for sch in filter(lambda obj: obj.process_name == 'dispatcher_c', schedule_list):
-                    await self.add_control_info(pyz)
+                if any(sch.process_name == 'dispatcher_c' for sch in schedule_list):
+                    collectors.append(self.add_control_info(pyz))
                 # Last 1000 rows of Statistics history
-                await self.add_table_statistics_history(pyz, file_spec)
+                collectors.append(self.add_table_statistics_history(pyz, file_spec))
                 # First 1000 rows of Plugin data
-                await self.add_table_plugin_data(pyz, file_spec)
+                collectors.append(self.add_table_plugin_data(pyz, file_spec))
                 # First 1000 rows of Streams
-                await self.add_table_streams(pyz, file_spec)
+                collectors.append(self.add_table_streams(pyz, file_spec))
+                await self._collect(collectors)
             finally:
-                pyz.close()
+                await self._blocking(pyz.close, check=False)
+        except JobCancelled:
+            if os.path.isfile(tar_file_name):
+                os.remove(tar_file_name)
+            raise
         except Exception as ex:
-            _LOGGER.error(ex, "Error in creating Support .tar.gz file.")
+            _LOGGER.error(ex, "Error in creating Support {} file.".format(COMPRESSIONS[self._compression]))
             raise RuntimeError(str(ex))
+        finally:
+            SupportBuilder._building.pop(basename(tar_file_name), None)
+            self._executor.shutdown(wait=False)
+            if interim_dir is not None:
+                shutil.rmtree(interim_dir, ignore_errors=True)
 
-        self.check_and_delete_temp_files(self._interim_file_path)
         _LOGGER.info("Support bundle %s successfully created.", tar_file_name)
         return tar_file_name
 
+    def _open_tar(self, tar_file_name):
+        if self._compression == 'none':
+            return tarfile.open(tar_file_name, "w")
+        level = {'preset': self._level} if self._compression == 'xz' else {'compresslevel': self._level}
+        return tarfile.open(tar_file_name, "w:{}".format(self._compression), **level)
+
+    async def _get_log_sources(self):
+        """ Names of the services and tasks whose syslog entries are collected, and the schedules """
+        services = []
+        schedule_list = []
+        cf_mgr = ConfigurationManager(self._storage)
+        try:
+            # South services logs
+            south_cat = await cf_mgr.get_category_child("South")
+            services.extend(sc["key"] for sc in south_cat)
+        except:
+            pass
+        try:
+            # North services and tasks logs
+            north_cat = await cf_mgr.get_category_child("North")
+            services.extend(nc["key"] for nc in north_cat if nc["key"] != "OMF_TYPES")
+        except:
+            pass
+        try:
+            # external services logs
+            schedule_list = await server.Server.scheduler.get_schedules()
+            external_svc_processes = ('bucket_storage_c', 'dispatcher_c', 'management', 'notification_c')
+            services.extend(sch.name for sch in schedule_list if sch.process_name in external_svc_processes)
+        except:
+            pass
+        return list(OrderedDict.fromkeys(services)), schedule_list
+
+    async def _collect(self, collectors):
+        """ Run the collectors at the same time; the first failure is raised once all of them are done, as the
+        bundle is closed after them
+        """
+        done = 0
+
+        async def collect(collector):
+            nonlocal done
+            try:
+                return await collector
+            finally:
+                done += 1
+                self._progress(10 + 85 * done // len(collectors), "Collected {} of {}".format(done, len(collectors)))
+
+        results = await asyncio.gather(*[collect(c) for c in collectors], return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        # a cancelled collector is reported before any other failure
+        for error in sorted(errors, key=lambda e: not isinstance(e, JobCancelled)):
+            raise error
+
+    async def _blocking(self, func, *args, check=True):
+        """ Run a blocking step on the collector pool of the build, checking first whether its job was cancelled """
+        def step():
+            if check and self._job is not None:
+                self._job.check_cancelled()
+            return func(*args)
+        return await asyncio.get_event_loop().run_in_executor(self._executor, step)
+
+    def _progress(self, progress, message):
+        if self._job is not None:
+            self._job.set_progress(progress, message)
+
     def check_and_delete_bundles(self, support_dir):
-        files = glob.glob(support_dir + "/" + "support*.tar.gz")
+        files = [f for f in glob.glob(support_dir + "/" + "support*") if f.endswith(BUNDLE_EXTENSIONS)]
         files.sort(key=os.path.getmtime)
         if len(files) >= _NO_OF_FILES_TO_RETAIN:
             for f in files[:-2]:
-                if os.path.isfile(f):
+                if os.path.isfile(f) and not self.is_building(f):
                     os.remove(os.path.join(support_dir, f))
 
-    def check_and_delete_temp_files(self, support_dir):
-        # Delete all non *.tar.gz files
-        for f in os.listdir(support_dir):
-            if not fnmatch.fnmatch(f, 'support*.tar.gz'):
-                os.remove(os.path.join(support_dir, f))
-
-    def write_to_tar(self, pyz, temp_file, data):
+    def write_to_tar(self, pyz, temp_file, data, arcname=None):
         with open(temp_file, 'w') as outfile:
             json.dump(data, outfile, indent=4)
-        pyz.add(temp_file, arcname=basename(temp_file))
+        pyz.add(temp_file, arcname=basename(temp_file) if arcname is None else arcname)
 
     async def add_fledge_version_and_schema(self, pyz):
         temp_file = self._interim_file_path + "/" + "fledge-info"
@@ -167,34 +293,44 @@ class SupportBuilder:
             lines = [line.rstrip() for line in f]
         self.write_to_tar(pyz, temp_file, lines)
 
-    def add_syslog_fledge(self, pyz, file_spec):
-        # The fledge entries from the syslog file
-        temp_file = self._interim_file_path + "/" + "syslog-{}".format(file_spec)
-        try:
-            subprocess.call("grep -a '{}' {} > {}".format("Fledge", _SYSLOG_FILE, temp_file), shell=True)
-        except OSError as ex:
-            raise RuntimeError("Error in creating {}. Error-{}".format(temp_file, str(ex)))
-        pyz.add(temp_file, arcname='logs/sys/{}'.format(basename(temp_file)))
-
-    def add_syslog_storage(self, pyz, file_spec):
-        # The contents of the syslog file that relate to the database layer (postgres)
-        temp_file = self._interim_file_path + "/" + "syslogStorage-{}".format(file_spec)
+    def add_syslog(self, pyz, file_spec, services):
+        # The fledge entries, the storage entries and those of each service or task from the syslog file, split in a
+        # single pass over it. Replace space occurrences with hyphen for service or task - so that file is created
+        temp_files = OrderedDict([
+            ('Fledge', self._interim_file_path + "/" + "syslog-{}".format(file_spec)),
+            ('Fledge Storage', self._interim_file_path + "/" + "syslogStorage-{}".format(file_spec))])
+        service_files = OrderedDict((s, self._interim_file_path + "/" + "syslog-{}-{}".format(
+            s.replace(' ', '-'), file_spec)) for s in services)
+        # longest first, so that a service whose name starts with the name of another is not taken for it
+        service_entry = re.compile(b'Fledge (' + b'|'.join(re.escape(s.encode()) for s in sorted(
+            services, key=len, reverse=True)) + b')\\[') if services else None
+        outs = {}
         try:
-            subprocess.call("grep -a '{}' {} > {}".format("Fledge Storage", _SYSLOG_FILE, temp_file), shell=True)
+            for temp_file in list(temp_files.values()) + list(service_files.values()):
+                if temp_file not in outs:
+                    outs[temp_file] = open(temp_file, 'wb')
+            fledge, storage = outs[temp_files['Fledge']], outs[temp_files['Fledge Storage']]
+            service_outs = {s.encode(): outs[f] for s, f in service_files.items()}
+            try:
+                with open(_SYSLOG_FILE, 'rb') as syslog:
+                    for line in syslog:
+                        if b'Fledge' not in line:
+                            continue
+                        fledge.write(line)
+                        if b'Fledge Storage' in line:
+                            storage.write(line)
+                        if service_entry is not None:
+                            for out in {service_outs[m.group(1)] for m in service_entry.finditer(line)}:
+                                out.write(line)
+            except FileNotFoundError as ex:
+                _LOGGER.warning("Syslog entries are not collected, {}".format(ex))
         except OSError as ex:
-            raise RuntimeError("Error in creating {}. Error-{}".format(temp_file, str(ex)))
-        pyz.add(temp_file, arcname='logs/sys/{}'.format(basename(temp_file)))
-
-    def add_syslog_service(self, pyz, file_spec, service):
-        # The fledge entries from the syslog file for a service or task
-        # Replace space occurrences with hyphen for service or task - so that file is created
-        tmp_svc = service.replace(' ', '-')
-        temp_file = self._interim_file_path + "/" + "syslog-{}-{}".format(tmp_svc, file_spec)
-        try:
-            subprocess.call("grep -a -E '(Fledge {})\[' {} > {}".format(service, _SYSLOG_FILE, temp_file), shell=True)
+            raise RuntimeError("Error in creating syslog files. Error-{}".format(str(ex)))
+        finally:
+            for out in outs.values():
+                out.close()
+        for temp_file in OrderedDict.fromkeys(list(temp_files.values()) + list(service_files.values())):
             pyz.add(temp_file, arcname='logs/sys/{}'.format(basename(temp_file)))
-        except Exception as ex:
-            raise RuntimeError("Error in creating {}. Error-{}".format(temp_file, str(ex)))
 
     def add_syslog_utility(self, pyz):
         # syslog utility files
@@ -206,7 +342,7 @@ class SupportBuilder:
     async def add_db_content(self, pyz, file_spec, tbl_name, file_name):
         temp_file = "{}/{}-{}".format(self._interim_file_path, file_name, file_spec)
         data = await self._storage.query_tbl(tbl_name)
-        self.write_to_tar(pyz, temp_file, data)
+        await self._blocking(self.write_to_tar, pyz, temp_file, data)
 
     async def add_table_statistics_history(self, pyz, file_spec):
         # The contents of the statistics history from the storage layer
@@ -216,7 +352,7 @@ class SupportBuilder:
             .ORDER_BY(['history_ts', 'DESC']) \
             .payload()
         data = await self._storage.query_tbl_with_payload("statistics_history", payload)
-        self.write_to_tar(pyz, temp_file, data)
+        await self._blocking(self.write_to_tar, pyz, temp_file, data)
 
     async def add_table_plugin_data(self, pyz, file_spec):
         # The contents of the plugin_data from the storage layer
@@ -226,7 +362,7 @@ class SupportBuilder:
             .ORDER_BY(['key', 'ASC']) \
             .payload()
         data = await self._storage.query_tbl_with_payload("plugin_data", payload)
-        self.write_to_tar(pyz, temp_file, data)
+        await self._blocking(self.write_to_tar, pyz, temp_file, data)
 
     async def add_table_streams(self, pyz, file_spec):
         # The contents of the streams from the storage layer
@@ -236,7 +372,7 @@ class SupportBuilder:
             .ORDER_BY(['id', 'ASC']) \
             .payload()
         data = await self._storage.query_tbl_with_payload("streams", payload)
-        self.write_to_tar(pyz, temp_file, data)
+        await self._blocking(self.write_to_tar, pyz, temp_file, data)
 
     def add_service_registry(self, pyz, file_spec):
         # The contents of the service registry
@@ -334,9 +470,7 @@ class SupportBuilder:
         for tbl in sorted(control_tables):
             temp_file = "{}/{}-{}".format(self._interim_file_path, tbl.replace("_", "-"), file_spec)
             data = await self._storage.query_tbl(tbl)
-            with open(temp_file, 'w') as outfile:
-                json.dump(data, outfile, indent=4)
-            pyz.add(temp_file, arcname='control/{}'.format(basename(temp_file)))
+            await self._blocking(self.write_to_tar, pyz, temp_file, data, 'control/{}'.format(basename(temp_file)))
 
     def add_software_list(self, pyz, file_spec) -> None:
         data = {
@@ -7,6 +7,9 @@
 
 """South Service starter"""
 
+from fledge.common import startup_profiler
+# Started before the south server is imported, to time its imports
+startup_profiler.start("south")
 from fledge.services.south.server import Server
 from fledge.common import logger
 
@@ -17,6 +20,8 @@ __version__ = "${VERSION}"
 
 if __name__ == '__main__':
     _logger = logger.setup("South")
+    startup_profiler.mark("imports")
     south_server = Server()
+    startup_profiler.mark("registration")
     south_server.run()
 
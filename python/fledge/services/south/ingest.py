@@ -245,10 +245,11 @@ class Ingest(object):
         cls.stats = await statistics.create_statistics(cls.storage_async)
 
         # Register static statistics
-        await cls.stats.register('READINGS', 'Readings received by Fledge')
-        await cls.stats.register('DISCARDED', 'Readings discarded at the input side by Fledge, i.e. '
-                                              'discarded before being placed in the buffer. This may be due to some '
-                                              'error in the readings themselves.')
+        await cls.stats.register_many({
+            'READINGS': 'Readings received by Fledge',
+            'DISCARDED': 'Readings discarded at the input side by Fledge, i.e. discarded before being placed in the '
+                         'buffer. This may be due to some error in the readings themselves.'})
+        cls.stats.start()
 
         cls._stop = False
         cls._started = True
@@ -275,6 +276,11 @@ class Ingest(object):
         except Exception:
             _LOGGER.exception('An exception was raised by Ingest._insert_readings')
 
+        try:
+            await cls.stats.stop()
+        except Exception:
+            _LOGGER.exception('Unable to write the readings statistics')
+
         cls._insert_readings_wait_tasks = None
         cls._insert_readings_tasks = None
         cls._readings_lists = None
@@ -391,7 +397,7 @@ class Ingest(object):
                         _LOGGER.warning('Insert failed: Queue index: %s Batch size: %s', list_index, batch_size)
                         break
 
-            await cls._write_statistics()
+            cls._write_statistics()
 
             del readings_list[:batch_size]
 
@@ -404,35 +410,16 @@ class Ingest(object):
         _LOGGER.info('Insert readings loop stopped')
 
     @classmethod
-    async def _write_statistics(cls):
-        """Periodically commits collected readings statistics"""
-
-        updates = {}
-
-        readings = cls._readings_stats
-        cls._readings_stats -= readings
-        updates.update({'READINGS': readings})
-
-        discarded_readings = cls._discarded_readings_stats
-        cls._discarded_readings_stats -= discarded_readings
-        updates.update({'DISCARDED': discarded_readings})
-
-        """ Register the statistics keys as this may be the first time the key has come into existence """
-        sensor_readings = cls._sensor_stats.copy()
-        for key in sensor_readings:
-            description = 'Readings received by Fledge since startup for sensor {}'.format(key)
-            await cls.stats.register(key, description)
-            cls._sensor_stats[key] -= sensor_readings[key]
-            updates.update({key: sensor_readings[key]})
-
-        try:
-            await cls.stats.update_bulk(updates)
-        except Exception as ex:
-            cls._readings_stats += readings
-            cls._discarded_readings_stats += discarded_readings
-            for key in sensor_readings:
-                cls._sensor_stats[key] += sensor_readings[key]
-            _LOGGER.exception(ex, 'An error occurred while writing sensor statistics')
+    def _write_statistics(cls):
+        """Hands the collected readings statistics to the statistics accumulator, which writes them periodically"""
+        cls.stats.add('READINGS', cls._readings_stats)
+        cls._readings_stats = 0
+        cls.stats.add('DISCARDED', cls._discarded_readings_stats)
+        cls._discarded_readings_stats = 0
+        # The sensor keys are registered by the next flush as this may be the first time the key has come into existence
+        for key, count in cls._sensor_stats.items():
+            cls.stats.add(key, count, 'Readings received by Fledge since startup for sensor {}'.format(key))
+        cls._sensor_stats = {}
 
     @classmethod
     def is_available(cls) -> bool:
@@ -10,7 +10,7 @@ import json
 import asyncio
 import sys
 from fledge.services.south import exceptions
-from fledge.common import logger
+from fledge.common import logger, startup_profiler
 from fledge.services.south.ingest import Ingest
 from fledge.services.common.microservice import FledgeMicroservice
 from aiohttp import web
@@ -95,6 +95,7 @@ class Server(FledgeMicroservice):
                                                                 dir=plugin_module_name,
                                                                 file=plugin_module_name)
                 self._plugin = __import__(import_file_name, fromlist=[''])
+                startup_profiler.mark("configuration and plugin import")
             except Exception as ex:
                 message = self._MESSAGES_LIST['e000003'].format(plugin_module_name, self._name, str(ex))
                 _LOGGER.error(message)
@@ -146,6 +147,8 @@ class Server(FledgeMicroservice):
 
             self._plugin_handle = self._plugin.plugin_init(self.config)
             await Ingest.start(self)
+            startup_profiler.mark("plugin init and ingest")
+            startup_profiler.finish()
 
             # Executes the requested plugin type
             if self._plugin_info['mode'] == 'async':
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" Resident worker of a Python task
+
+A worker is started once by the scheduler for a task module, e.g. ``python3 -m fledge.tasks.common.worker
+fledge.tasks.purge``, and imports the modules the task needs without running it. Every run of the task is then a
+child forked from the warm worker, which runs the ``__main__`` of the task module with the arguments of the run,
+so a run neither starts an interpreter nor imports fledge again, while a run which crashes or is killed only takes
+its own process down.
+
+The scheduler talks to the worker with JSON lines on its stdin and stdout:
+
+    {"id": 1, "argv": ["--port=8081", "--address=127.0.0.1", "--name=purge"]}  request to start a run
+    {"id": 1, "pid": 1234}                                                       the run has started
+    {"id": 1, "returncode": 0}                                                   the run has exited
+
+The worker exits once its stdin is closed and its runs have exited.
+"""
+
+import json
+import logging
+import os
+import runpy
+import select
+import signal
+import sys
+import traceback
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_REAP_INTERVAL = 1
+""" Seconds between the checks for exited runs should a SIGCHLD wakeup be missed """
+
+
+def preload(module):
+    """ Import the modules of a task by running its main module under a name which skips its __main__ block
+
+    A task which fails to import is left to fail in each of its runs, as it would without a worker.
+    """
+    try:
+        runpy.run_module(module, run_name='__fledge_worker__')
+    except Exception:
+        traceback.print_exc()
+
+
+def returncode(status):
+    """ The returncode of asyncio.subprocess.Process for a wait status: the exit code, or minus the signal """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def flush_logs():
+    """ Write out the log records still queued, as os._exit skips the exit handlers of the run which would """
+    fledge_logger = sys.modules.get('fledge.common.logger')
+    try:
+        if fledge_logger is not None:
+            fledge_logger._stop_listener()
+    finally:
+        logging.shutdown()
+
+
+def spawn(module, argv, channel):
+    """ Fork a run of the task and return its pid """
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 1
+    try:
+        # The run must not read or write the channel to the scheduler, nor get the signals of the worker
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for fd in channel:
+            os.close(fd)
+        sys.argv = [module] + list(argv)
+        runpy.run_module(module, run_name='__main__', alter_sys=True)
+        code = 0
+    except SystemExit as ex:
+        code = ex.code if isinstance(ex.code, int) else (0 if ex.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            flush_logs()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def serve(module, rfd, wfd):
+    """ Start a run for each request read from rfd and write its pid and returncode to wfd """
+    runs = {}
+    """ pid of each running run to the id of its request """
+    pending = b''
+    reading = True
+    # An exited run wakes the select up through the wakeup fd of SIGCHLD
+    wakeup_rfd, wakeup_wfd = os.pipe()
+    for fd in (wakeup_rfd, wakeup_wfd):
+        os.set_blocking(fd, False)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    signal.set_wakeup_fd(wakeup_wfd)
+    channel = (rfd, wfd, wakeup_rfd, wakeup_wfd)
+
+    def send(message):
+        os.write(wfd, (json.dumps(message) + '\n').encode())
+
+    while reading or runs:
+        readable, _, _ = select.select([rfd, wakeup_rfd] if reading else [wakeup_rfd], [], [], _REAP_INTERVAL)
+        if wakeup_rfd in readable:
+            try:
+                os.read(wakeup_rfd, 4096)
+            except BlockingIOError:
+                pass
+        if rfd in readable:
+            data = os.read(rfd, 65536)
+            if not data:
+                reading = False
+            pending += data
+            *lines, pending = pending.split(b'\n')
+            for line in lines:
+                if not line.strip():
+                    continue
+                request = json.loads(line.decode())
+                pid = spawn(module, request['argv'], channel)
+                runs[pid] = request['id']
+                send({"id": request['id'], "pid": pid})
+        while runs:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            run_id = runs.pop(pid, None)
+            if run_id is not None:
+                send({"id": run_id, "returncode": returncode(status)})
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.stderr.write("Usage: python3 -m fledge.tasks.common.worker <task module>\n")
+        sys.exit(2)
+    module = sys.argv[1]
+    # Keep the channel away from anything the task writes to stdout
+    rfd, wfd = os.dup(0), os.dup(1)
+    os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+    os.dup2(2, 1)
+    preload(module)
+    serve(module, rfd, wfd)
+
+
+if __name__ == '__main__':
+    main()
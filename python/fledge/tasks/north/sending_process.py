@@ -15,6 +15,10 @@
     in the translation process.
 """
 
+from fledge.common import startup_profiler
+if __name__ == "__main__":
+    # Started before the imports of the task, to time them
+    startup_profiler.start("north")
 import importlib
 import aiohttp
 import resource
@@ -31,12 +35,10 @@ from fledge.common.parser import Parser
 from fledge.common.storage_client.storage_client import StorageClientAsync, ReadingsStorageClientAsync
 from fledge.common.storage_client import payload_builder
 from fledge.common import statistics
-from fledge.common.jqfilter import JQFilter
 from fledge.common.audit_logger import AuditLogger
 from fledge.common.logger import FLCoreLogger
 from fledge.common.process import FledgeProcess
 from fledge.common.common import _FLEDGE_ROOT
-from fledge.services.core.api.plugins import common
 
 __author__ = "Stefano Simonelli, Massimiliano Pinto, Mark Riddoch, Amarendra K Sinha"
 __copyright__ = "Copyright (c) 2018 OSIsoft, LLC"
@@ -323,8 +325,9 @@ class SendingProcess(FledgeProcess):
         try:
             key = self.statistics_key
             _stats = await statistics.create_statistics(self._storage_async)
-            await _stats.update(key, num_sent)
-            await _stats.update(self.master_statistics_key, num_sent)
+            _stats.add(key, num_sent)
+            _stats.add(self.master_statistics_key, num_sent)
+            await _stats.flush()
         except Exception:
             _message = _MESSAGES_LIST["e000010"]
             SendingProcess._logger.error(_message)
@@ -599,6 +602,8 @@ class SendingProcess(FledgeProcess):
                             if 'applyFilter' in self._config_from_manager:
                                 # Handles the JQFilter functionality
                                 if self._config_from_manager['applyFilter']["value"].upper() == "TRUE":
+                                    # pyjq is only needed by the tasks which filter
+                                    from fledge.common.jqfilter import JQFilter
                                     jqfilter = JQFilter()
                                     # Steps needed to proper format the data generated by the JQFilter
                                     # to the one expected by the SP
@@ -816,6 +821,7 @@ class SendingProcess(FledgeProcess):
         return north_ok
 
     def _plugin_load(self):
+        from fledge.services.core.api.plugins import common
         try:
             plugin_module_path = "{}/python/fledge/plugins/{}/{}".format(_FLEDGE_ROOT, self._PLUGIN_TYPE, self._config['plugin'])
             self._plugin = common.load_python_plugin(plugin_module_path, self._config['plugin'], self._PLUGIN_TYPE)
@@ -1027,6 +1033,10 @@ class SendingProcess(FledgeProcess):
 
 if __name__ == "__main__":
 
+    startup_profiler.mark("imports")
     loop = asyncio.get_event_loop()
     sp = SendingProcess(loop)
+    startup_profiler.mark("init")
     loop.run_until_complete(sp.run())
+    startup_profiler.mark("run")
+    startup_profiler.finish()
@@ -8,6 +8,10 @@
 """Purge process starter"""
 
 import asyncio
+from fledge.common import startup_profiler
+if __name__ == '__main__':
+    # Started before the imports of the task, to time them
+    startup_profiler.start("purge")
 from fledge.common.logger import FLCoreLogger
 from fledge.tasks.purge.purge import Purge
 
@@ -19,6 +23,10 @@ __version__ = "${VERSION}"
 
 if __name__ == '__main__':
     _logger = FLCoreLogger().get_logger("Purge")
+    startup_profiler.mark("imports")
     loop = asyncio.get_event_loop()
     purge_process = Purge()
+    startup_profiler.mark("init")
     loop.run_until_complete(purge_process.run())
+    startup_profiler.mark("run")
+    startup_profiler.finish()
@@ -31,7 +31,7 @@ Statistics reported by Purge process are:
 import time
 from datetime import datetime, timedelta
 
-from fledge.common import statistics
+from fledge.common import asset_rollup, statistics
 from fledge.common.audit_logger import AuditLogger
 from fledge.common.configuration_manager import ConfigurationManager
 from fledge.common.logger import FLCoreLogger
@@ -88,6 +88,38 @@ class Purge(FledgeProcess):
             "displayName": "Retain Audit Trail Data (In Days)",
             "order": "5",
             "minimum": "1"
+        },
+        "retainMonitors": {
+            "description": "This is the measure of how long to retain performance monitor data for and should be measured in days.",
+            "type": "integer",
+            "default": "7",
+            "displayName": "Retain Performance Monitor Data (In Days)",
+            "order": "6",
+            "minimum": "1"
+        },
+        "retainRollupSeconds": {
+            "description": "This is the measure of how long to retain the 1 second asset rollups for and should be measured in hours.",
+            "type": "integer",
+            "default": "24",
+            "displayName": "Retain 1 Second Asset Rollups (In Hours)",
+            "order": "7",
+            "minimum": "1"
+        },
+        "retainRollupMinutes": {
+            "description": "This is the measure of how long to retain the 1 minute asset rollups for and should be measured in days.",
+            "type": "integer",
+            "default": "7",
+            "displayName": "Retain 1 Minute Asset Rollups (In Days)",
+            "order": "8",
+            "minimum": "1"
+        },
+        "retainRollupHours": {
+            "description": "This is the measure of how long to retain the 1 hour asset rollups for and should be measured in days.",
+            "type": "integer",
+            "default": "365",
+            "displayName": "Retain 1 Hour Asset Rollups (In Days)",
+            "order": "9",
+            "minimum": "1"
         }
     }
     _CONFIG_CATEGORY_NAME = 'PURGE_READ'
@@ -100,8 +132,9 @@ class Purge(FledgeProcess):
 
     async def write_statistics(self, total_purged, unsent_purged):
         stats = await statistics.create_statistics(self._storage_async)
-        await stats.update('PURGED', total_purged)
-        await stats.update('UNSNPURGED', unsent_purged)
+        stats.add('PURGED', total_purged)
+        stats.add('UNSNPURGED', unsent_purged)
+        await stats.flush()
 
     async def set_configuration(self):
         """" set the default configuration for purge
@@ -270,6 +303,26 @@ class Purge(FledgeProcess):
         payload = PayloadBuilder().WHERE(['ts', '<=', str(ts)]).payload()
         await self._storage_async.delete_from_tbl("log", payload)
 
+    async def purge_monitors(self, config):
+        """" Purge monitors table based on the Age which is defined in retainMonitors config item
+        """
+        # Monitors timestamps are recorded in UTC
+        ts = datetime.utcnow() - timedelta(days=int(config['retainMonitors']['value']))
+        payload = PayloadBuilder().WHERE(['ts', '<=', str(ts)]).payload()
+        await self._storage_async.delete_from_tbl("monitors", payload)
+
+    async def purge_rollups(self, config):
+        """" Purge asset rollups table based on the Age which is defined in the retainRollup config items of
+        each granularity
+        """
+        now = time.time()
+        for granularity, retain in ((1, int(config['retainRollupSeconds']['value']) * 3600),
+                                    (60, int(config['retainRollupMinutes']['value']) * 86400),
+                                    (3600, int(config['retainRollupHours']['value']) * 86400)):
+            payload = PayloadBuilder().WHERE(['granularity', '=', granularity]).AND_WHERE(
+                ['ts', '<=', asset_rollup.from_epoch(now - retain)]).payload()
+            await self._storage_async.delete_from_tbl(asset_rollup.ROLLUP_TABLE, payload)
+
     async def run(self):
         """" Starts the purge task
 
@@ -286,5 +339,7 @@ class Purge(FledgeProcess):
             await self.write_statistics(total_purged, unsent_purged)
             await self.purge_stats_history(config)
             await self.purge_audit_trail_log(config)
+            await self.purge_monitors(config)
+            await self.purge_rollups(config)
         except Exception as ex:
             self._logger.exception(ex)
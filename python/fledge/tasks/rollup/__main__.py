@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Asset rollup process starter"""
+
+import asyncio
+from fledge.common import startup_profiler
+if __name__ == '__main__':
+    # Started before the imports of the task, to time them
+    startup_profiler.start("rollup")
+from fledge.common.logger import FLCoreLogger
+from fledge.tasks.rollup.rollup import AssetRollup
+
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+if __name__ == '__main__':
+    _logger = FLCoreLogger().get_logger("AssetRollup")
+    startup_profiler.mark("imports")
+    loop = asyncio.get_event_loop()
+    rollup_process = AssetRollup()
+    startup_profiler.mark("init")
+    loop.run_until_complete(rollup_process.run())
+    startup_profiler.mark("run")
+    startup_profiler.finish()
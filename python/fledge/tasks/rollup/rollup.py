@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" Asset rollup task
+
+Reads the readings appended since its previous run, in blocks of reading ids, and appends the 1 second, 1 minute and
+1 hour rollups of each block to the asset_rollups table. Every rollup row records the highest reading id it includes,
+and the highest reading id read, including blocks without any numeric datapoint, is kept in the asset_rollups_position
+table. The next run resumes after the higher of the two. Readings arriving late, with a user_ts in the past, are still
+rolled up, into the bucket of their user_ts.
+
+The task is run by the 'asset rollup' schedule, which is created disabled; without it the asset API reads the readings.
+"""
+
+import json
+
+from fledge.common.asset_rollup import ROLLUP_TABLE, ROLLUP_POSITION_TABLE, RollupAccumulator
+from fledge.common.logger import FLCoreLogger
+from fledge.common.process import FledgeProcess
+from fledge.common.storage_client.payload_builder import PayloadBuilder
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+class AssetRollup(FledgeProcess):
+
+    BLOCK_SIZE = 5000
+    """ Readings fetched, and rolled up in one insert, at a time """
+
+    MAX_READINGS = 200000
+    """ Readings rolled up in one run, a backlog is caught up with by the next runs """
+
+    _logger = None
+
+    def __init__(self):
+        super().__init__()
+        self._logger = FLCoreLogger().get_logger("AssetRollup")
+
+    async def last_rolled_up_id(self) -> int:
+        """ Highest reading id read by the previous runs
+
+        The position is saved after the rollups are inserted, the rollups cover a run which failed in between.
+        """
+        payload = PayloadBuilder().AGGREGATE(["max", "last_id"]).payload()
+        results = await self._storage_async.query_tbl_with_payload(ROLLUP_TABLE, payload)
+        rows = results['rows']
+        # An empty table gives {'max_last_id': ''}
+        last_id = rows[0].get('max_last_id') if rows else None
+        rolled_up = int(last_id) if last_id not in (None, '') else 0
+        payload = PayloadBuilder().SELECT("last_id").WHERE(["id", "=", 1]).payload()
+        results = await self._storage_async.query_tbl_with_payload(ROLLUP_POSITION_TABLE, payload)
+        rows = results['rows']
+        position = int(rows[0]['last_id']) if rows else 0
+        return max(rolled_up, position)
+
+    async def save_position(self, last_id: int) -> None:
+        """ Record the highest reading id read, so that readings without numeric datapoints are not read again """
+        payload = PayloadBuilder().SET(last_id=last_id).WHERE(["id", "=", 1]).payload()
+        await self._storage_async.update_tbl(ROLLUP_POSITION_TABLE, payload)
+
+    async def rollup_block(self, readings: list) -> int:
+        """ Append the rollups of a block of readings, in one insert so a block is either rolled up or not at all
+
+        Returns:
+            number of rollup rows inserted
+        """
+        accumulator = RollupAccumulator()
+        for r in readings:
+            accumulator.add(r['id'], r['asset_code'], r['user_ts'], r['reading'])
+        rows = accumulator.rows()
+        if rows:
+            await self._storage_async.insert_into_tbl(ROLLUP_TABLE, json.dumps({"inserts": rows}))
+        return len(rows)
+
+    async def run(self):
+        """ Roll up the readings appended since the previous run """
+        if self.is_dry_run():
+            return
+        try:
+            first_id = last_id = await self.last_rolled_up_id()
+            processed = 0
+            inserted = 0
+            pending = False
+            while True:
+                results = await self._readings_storage_async.fetch(last_id + 1, self.BLOCK_SIZE)
+                readings = results['rows']
+                if not readings:
+                    break
+                inserted += await self.rollup_block(readings)
+                processed += len(readings)
+                last_id = max(r['id'] for r in readings)
+                if len(readings) < self.BLOCK_SIZE:
+                    break
+                if processed >= self.MAX_READINGS:
+                    pending = True
+                    break
+            if last_id != first_id:
+                await self.save_position(last_id)
+            if pending:
+                self._logger.warning("Stopped after the maximum of {} readings in a run, any readings after id {} "
+                                     "are left to the next runs".format(self.MAX_READINGS, last_id))
+            self._logger.debug("Rolled up {} readings into {} rows, up to reading id {}".format(
+                processed, inserted, last_id))
+        except Exception as ex:
+            self._logger.exception(ex, "Failed to roll up readings")
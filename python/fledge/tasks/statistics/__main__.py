@@ -8,6 +8,10 @@
 """Statistics history process starter"""
 
 import asyncio
+from fledge.common import startup_profiler
+if __name__ == '__main__':
+    # Started before the imports of the task, to time them
+    startup_profiler.start("statistics")
 from fledge.common.logger import FLCoreLogger
 from fledge.tasks.statistics.statistics_history import StatisticsHistory
 
@@ -19,6 +23,10 @@ __version__ = "${VERSION}"
 
 if __name__ == '__main__':
     _logger = FLCoreLogger().get_logger("StatisticsHistory")
+    startup_profiler.mark("imports")
     statistics_history_process = StatisticsHistory()
+    startup_profiler.mark("init")
     loop = asyncio.get_event_loop()
     loop.run_until_complete(statistics_history_process.run())
+    startup_profiler.mark("run")
+    startup_profiler.finish()
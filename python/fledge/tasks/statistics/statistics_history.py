@@ -15,58 +15,102 @@ import json
 from fledge.common import utils as common_utils
 from fledge.common.logger import FLCoreLogger
 from fledge.common.process import FledgeProcess
-from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.storage_client.payload_builder import PayloadBuilder, Param
 
 __author__ = "Ori Shadmon, Ashish Jabble"
 __copyright__ = "Copyright (c) 2017 OSI Soft, LLC"
 __license__ = "Apache 2.0"
 __version__ = "${VERSION}"
 
+_PREVIOUS_VALUE_TEMPLATE = PayloadBuilder().SET(previous_value=Param("value")).WHERE(
+    ["key", "=", Param("key")]).template()
 
-class StatisticsHistory(FledgeProcess):
 
-    _logger = None
+class StatisticsHistoryCollector(object):
+    """ Writes the delta of each statistics key since the previous collection to statistics_history
 
-    def __init__(self):
-        super().__init__()
-        self._logger = FLCoreLogger().get_logger("StatisticsHistory")
+    The previous_value of a key is only updated when its value changed. A run of zero deltas of a key is written as
+    a zero at its start and, once the key changes again or the collector is flushed, a zero at the last collection of
+    the run, which is only possible when the collector is kept between collections, as by the scheduler of the core;
+    a collector created for one collection writes every zero. A collection in which no key changed writes the end of
+    the runs at that collection, so that every collection has rows and an idle key is told from a collection which
+    did not happen.
+    """
+
+    def __init__(self, storage):
+        self._storage = storage
+        self._idle = {}
+        """ Keys in a run of zero deltas, to the history_ts of the last zero not written, None when written """
+
+    async def collect(self):
+        """ SELECT against the statistics table, to get a snapshot of the data at that moment.
+
+        Based on the snapshot:
+            1. INSERT the delta between `value` and `previous_value` into statistics_history
+            2. UPDATE the previous_value in statistics table to be equal to statistics.value at snapshot
+        """
+        current_time = common_utils.local_timestamp()
+        results = await self._storage.query_tbl("statistics")
+        updates = []
+        inserts = []
+        idle = {}
+        for r in results['rows']:
+            key = r['key']
+            value = int(r["value"])
+            delta = value - int(r["previous_value"])
+            if delta != 0:
+                updates.append(_PREVIOUS_VALUE_TEMPLATE.bind(value=value, key=key))
+                last_zero_ts = self._idle.get(key)
+                if last_zero_ts is not None:
+                    # The end of a run of zeros
+                    inserts.append({'key': key, 'value': 0, 'history_ts': last_zero_ts})
+                inserts.append({'key': key, 'value': delta, 'history_ts': current_time})
+            elif key in self._idle:
+                idle[key] = current_time
+            else:
+                # The start of a run of zeros
+                inserts.append({'key': key, 'value': 0, 'history_ts': current_time})
+                idle[key] = None
+        if not inserts:
+            # No key changed, the runs of zeros are ended at this collection and go on from it
+            inserts = [{'key': key, 'value': 0, 'history_ts': current_time} for key in idle]
+            idle = dict.fromkeys(idle)
+        if inserts:
+            await self._storage.insert_into_tbl("statistics_history", json.dumps({"inserts": inserts}))
+        self._idle = idle
+        if updates:
+            await self._bulk_update_previous_value({"updates": updates})
+
+    async def flush(self):
+        """ Write the zero at the last collection of each run of zeros which is going on, e.g. before the collector
+        is stopped
+        """
+        inserts = [{'key': key, 'value': 0, 'history_ts': ts} for key, ts in self._idle.items() if ts is not None]
+        if inserts:
+            await self._storage.insert_into_tbl("statistics_history", json.dumps({"inserts": inserts}))
+        self._idle = dict.fromkeys(self._idle)
 
     async def _bulk_update_previous_value(self, payload):
         """ UPDATE previous_value of column to have the same value as snapshot
-    
-        Query: 
-            UPDATE statistics_history SET previous_value = value WHERE key = key
+
+        Query:
+            UPDATE statistics SET previous_value = value WHERE key = key
         Args:
            payload: dict containing statistics keys and previous values
         """
-        await self._storage_async.update_tbl("statistics", json.dumps(payload, sort_keys=False))
+        await self._storage.update_tbl("statistics", json.dumps(payload, sort_keys=False))
+
+
+class StatisticsHistory(FledgeProcess):
+
+    _logger = None
+
+    def __init__(self):
+        super().__init__()
+        self._logger = FLCoreLogger().get_logger("StatisticsHistory")
 
     async def run(self):
-        """ SELECT against the statistics table, to get a snapshot of the data at that moment.
-    
-        Based on the snapshot:
-            1. INSERT the delta between `value` and `previous_value` into  statistics_history
-            2. UPDATE the previous_value in statistics table to be equal to statistics.value at snapshot 
-        """
+        """ Collect the statistics history once, see StatisticsHistoryCollector """
         if self.is_dry_run():
             return
-        current_time = common_utils.local_timestamp()
-        results = await self._storage_async.query_tbl("statistics")
-        # Bulk updates payload
-        payload = {"updates": []}
-        # Bulk inserts payload
-        insert_payload = {"inserts": []}
-        for r in results['rows']:
-            key = r['key']
-            value = int(r["value"])
-            previous_value = int(r["previous_value"])
-            delta = value - previous_value
-            payload_item = PayloadBuilder().SET(previous_value=value).WHERE(["key", "=", key]).payload()
-            # Add element to bulk updates
-            payload['updates'].append(json.loads(payload_item))
-            # Add element to bulk inserts
-            insert_payload['inserts'].append({'key': key, 'value': delta, 'history_ts': current_time})
-        # Bulk inserts
-        await self._storage_async.insert_into_tbl("statistics_history", json.dumps(insert_payload))
-        # Bulk updates
-        await self._bulk_update_previous_value(payload)
+        await StatisticsHistoryCollector(self._storage_async).collect()
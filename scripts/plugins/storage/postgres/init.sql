@@ -961,6 +961,38 @@ CREATE TABLE fledge.alerts (
        CONSTRAINT  alerts_pkey                 PRIMARY KEY (key) );
 
 
+-- Create asset rollups table
+-- Minimum, maximum, total and samples of the numeric datapoints of the readings at 1 second, 1 minute and 1 hour
+-- granularity, appended by the asset rollup task. A bucket may be spread over several rows.
+
+CREATE TABLE fledge.asset_rollups (
+       granularity integer                     NOT NULL,                                 -- Bucket size in seconds
+       asset_code  character varying(255)      NOT NULL,
+       datapoint   character varying(255)      NOT NULL,
+       ts          timestamp(6) with time zone NOT NULL,                                 -- Bucket start
+       minimum     double precision,
+       maximum     double precision,
+       total       double precision,
+       samples     bigint                      NOT NULL,
+       last_id     bigint                      NOT NULL );                               -- Highest reading id rolled up
+
+CREATE INDEX asset_rollups_ix1
+    ON fledge.asset_rollups(asset_code, granularity, ts);
+
+CREATE INDEX asset_rollups_ix2
+    ON fledge.asset_rollups(last_id);
+
+-- Create asset rollups position table
+-- Highest reading id the asset rollup task has read, rolled up or not, so that readings without numeric datapoints are
+-- not read again by the next run.
+
+CREATE TABLE fledge.asset_rollups_position (
+       id          integer                     NOT NULL,
+       last_id     bigint                      NOT NULL,                                 -- Highest reading id read
+       CONSTRAINT asset_rollups_position_pkey PRIMARY KEY (id) );
+
+INSERT INTO fledge.asset_rollups_position ( id, last_id ) VALUES ( 1, 0 );
+
 -- Grants to fledge schema
 GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA fledge TO PUBLIC;
 
@@ -1068,6 +1100,7 @@ INSERT INTO fledge.statistics ( key, description, value, previous_value )
 INSERT INTO fledge.scheduled_processes ( name, script ) VALUES ( 'purge',               '["tasks/purge"]'       );
 INSERT INTO fledge.scheduled_processes ( name, script ) VALUES ( 'purge_system',        '["tasks/purge_system"]');
 INSERT INTO fledge.scheduled_processes ( name, script ) VALUES ( 'stats collector',     '["tasks/statistics"]'  );
+INSERT INTO fledge.scheduled_processes ( name, script ) VALUES ( 'asset rollup',        '["tasks/rollup"]'      );
 INSERT INTO fledge.scheduled_processes ( name, script ) VALUES ( 'FledgeUpdater',       '["tasks/update"]'      );
 INSERT INTO fledge.scheduled_processes ( name, script ) VALUES ( 'certificate checker', '["tasks/check_certs"]' );
 INSERT INTO fledge.scheduled_processes ( name, script ) VALUES ( 'update checker',      '["tasks/check_updates"]');
@@ -1146,6 +1179,19 @@ INSERT INTO fledge.schedules ( id, schedule_name, process_name, schedule_type,
                 true                                    -- enabled
               );
 
+-- Asset rollup, disabled: enable it to answer the asset series queries from the rollups
+INSERT INTO fledge.schedules ( id, schedule_name, process_name, schedule_type,
+                                schedule_time, schedule_interval, exclusive, enabled )
+       VALUES ( 'd9208840-b622-4ef6-b308-955305d0df5e', -- id
+                'asset rollup',                         -- schedule_name
+                'asset rollup',                         -- process_name
+                3,                                      -- schedule_type (interval)
+                NULL,                                   -- schedule_time
+                '00:00:15',                             -- schedule_interval
+                true,                                   -- exclusive
+                false                                   -- enabled
+              );
+
 -- Update checker 
 INSERT INTO fledge.schedules ( id, schedule_name, process_name, schedule_type,
                                 schedule_time, schedule_interval, exclusive, enabled )
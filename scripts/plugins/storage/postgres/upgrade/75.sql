@@ -0,0 +1,45 @@
+-- Create asset rollups table
+-- Minimum, maximum, total and samples of the numeric datapoints of the readings at 1 second, 1 minute and 1 hour
+-- granularity, appended by the asset rollup task. A bucket may be spread over several rows.
+
+CREATE TABLE IF NOT EXISTS fledge.asset_rollups (
+       granularity integer                     NOT NULL,                                 -- Bucket size in seconds
+       asset_code  character varying(255)      NOT NULL,
+       datapoint   character varying(255)      NOT NULL,
+       ts          timestamp(6) with time zone NOT NULL,                                 -- Bucket start
+       minimum     double precision,
+       maximum     double precision,
+       total       double precision,
+       samples     bigint                      NOT NULL,
+       last_id     bigint                      NOT NULL );                               -- Highest reading id rolled up
+
+CREATE INDEX IF NOT EXISTS asset_rollups_ix1
+    ON fledge.asset_rollups(asset_code, granularity, ts);
+
+CREATE INDEX IF NOT EXISTS asset_rollups_ix2
+    ON fledge.asset_rollups(last_id);
+
+-- Create asset rollups position table
+-- Highest reading id the asset rollup task has read, rolled up or not, so that readings without numeric datapoints are
+-- not read again by the next run.
+
+CREATE TABLE IF NOT EXISTS fledge.asset_rollups_position (
+       id          integer                     NOT NULL,
+       last_id     bigint                      NOT NULL,                                 -- Highest reading id read
+       CONSTRAINT asset_rollups_position_pkey PRIMARY KEY (id) );
+
+INSERT INTO fledge.asset_rollups_position ( id, last_id ) SELECT 1, 0 WHERE NOT EXISTS (SELECT 1 FROM fledge.asset_rollups_position WHERE id = 1);
+
+-- Scheduled process and schedule entries for the asset rollup task, the schedule disabled as in init.sql
+INSERT INTO fledge.scheduled_processes ( name, script ) SELECT 'asset rollup', '["tasks/rollup"]' WHERE NOT EXISTS (SELECT 1 FROM fledge.scheduled_processes WHERE name = 'asset rollup');
+INSERT INTO fledge.schedules ( id, schedule_name, process_name, schedule_type,
+                                schedule_time, schedule_interval, exclusive, enabled )
+       VALUES ( 'd9208840-b622-4ef6-b308-955305d0df5e', -- id
+                'asset rollup',                         -- schedule_name
+                'asset rollup',                         -- process_name
+                3,                                      -- schedule_type (interval)
+                NULL,                                   -- schedule_time
+                '00:00:15',                             -- schedule_interval
+                true,                                   -- exclusive
+                false                                   -- enabled
+              );
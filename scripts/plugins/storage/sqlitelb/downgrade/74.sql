@@ -0,0 +1,6 @@
+DELETE FROM fledge.schedules WHERE process_name = 'asset rollup';
+DELETE FROM fledge.scheduled_processes WHERE name = 'asset rollup';
+DROP TABLE IF EXISTS fledge.asset_rollups_position;
+DROP INDEX IF EXISTS fledge.asset_rollups_ix1;
+DROP INDEX IF EXISTS fledge.asset_rollups_ix2;
+DROP TABLE IF EXISTS fledge.asset_rollups;
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" Throughput of the iprpc channel for large payloads and for pipelined calls
+
+An echo server is started with IPCModuleClient and each payload type is sent to it at each size, the round trip
+throughput counts the payload both ways. bytes and array.array are pickled; bytearray wrapped in pickle.PickleBuffer,
+and numpy arrays when numpy is installed, are sent as out-of-band buffers on python 3.8 and later. The small calls are
+then made one at a time and, with rpc_submit, pipelined in batches.
+
+Usage: python3 bench_iprpc.py [--sizes 1024,1048576,16777216,67108864] [--seconds 2] [--calls 2000] [--batch 32]
+"""
+
+import argparse
+import array
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+from fledge.common import iprpc
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_SERVER = '''
+from fledge.common import iprpc
+
+
+class EchoServer(iprpc.InterProcessRPC):
+    def echo(self, obj):
+        return obj
+
+
+if __name__ == '__main__':
+    EchoServer().serve()
+'''
+_MODULE = 'bench_iprpc_server'
+
+
+def payloads(size):
+    yield "bytes", os.urandom(size)
+    yield "array", array.array('B', os.urandom(size))
+    if hasattr(pickle, 'PickleBuffer'):
+        yield "PickleBuffer", pickle.PickleBuffer(bytearray(os.urandom(size)))
+    try:
+        import numpy
+    except ImportError:
+        return
+    yield "numpy", numpy.frombuffer(os.urandom(size), dtype=numpy.uint8).copy()
+
+
+def throughput(client, payload, size, seconds):
+    calls, started = 0, time.perf_counter()
+    while True:
+        client.echo(payload)
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= seconds:
+            return calls, 2 * size * calls / elapsed / 1e6
+
+
+def small_calls(client, calls, batch):
+    started = time.perf_counter()
+    for i in range(calls):
+        client.echo(i)
+    print("{:<14} {:>9.0f} calls/s".format("one at a time", calls / (time.perf_counter() - started)))
+    if not hasattr(iprpc.InterProcessRPCClient, 'rpc_submit'):
+        return
+    started = time.perf_counter()
+    for first in range(0, calls, batch):
+        futures = [client.rpc_submit({'method': 'echo', 'args': [i]}) for i in range(first, min(first + batch, calls))]
+        for f in futures:
+            f.result()
+    print("{:<14} {:>9.0f} calls/s".format("pipelined", calls / (time.perf_counter() - started)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1024,1048576,16777216,67108864', help='comma separated payload sizes')
+    parser.add_argument('--seconds', type=float, default=2, help='seconds of calls at each size')
+    parser.add_argument('--calls', type=int, default=2000, help='small calls in each mode')
+    parser.add_argument('--batch', type=int, default=32, help='small calls pipelined together')
+    args = parser.parse_args()
+
+    module_dir = tempfile.mkdtemp(prefix='fledge-bench-')
+    with open(os.path.join(module_dir, _MODULE + '.py'), 'w') as f:
+        f.write(_SERVER)
+    python_path = os.environ.get('PYTHONPATH', '')
+    os.environ['PYTHONPATH'] = os.pathsep.join(os.path.abspath(p) for p in python_path.split(os.pathsep) if p)
+    iprpc.IPCModuleClient._PYTHON = sys.executable
+    client = iprpc.IPCModuleClient(_MODULE, module_dir)
+    try:
+        for size in [int(s) for s in args.sizes.split(',')]:
+            for name, payload in payloads(size):
+                try:
+                    calls, rate = throughput(client, payload, size, args.seconds)
+                except Exception as ex:
+                    print("{:<14} {:>11} bytes  failed: {}".format(name, size, ex))
+                    continue
+                print("{:<14} {:>11} bytes  {:>7} calls  {:>9.1f} MB/s".format(name, size, calls, rate))
+        small_calls(client, args.calls, args.batch)
+    finally:
+        del client
+        shutil.rmtree(module_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" Event loop lag and per call latency of a log heavy coroutine
+
+Compares logging straight to a SysLogHandler, as every logger did before, with the queue handler returned by
+logger.get_queue_handler. Syslog is a local datagram socket read by a deliberately slow receiver, so a full socket
+buffer blocks the direct handler the way a busy syslog daemon does.
+
+Usage: python3 bench_logging.py [--messages 20000] [--receiver-delay 0.0001]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from logging.handlers import SysLogHandler
+
+from fledge.common import logger
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+def start_receiver(address, delay):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.bind(address)
+
+    def receive():
+        while True:
+            try:
+                sock.recv(4096)
+            except OSError:
+                return
+            time.sleep(delay)
+    threading.Thread(target=receive, daemon=True).start()
+    return sock
+
+
+async def ticker(lags, stop, interval=0.001):
+    while not stop.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - before - interval)
+
+
+async def log_heavy(_logger, messages, latencies):
+    for i in range(messages):
+        before = time.perf_counter()
+        _logger.info("Reading %d of asset %s ingested", i, "sinusoid")
+        latencies.append(time.perf_counter() - before)
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+
+
+async def run(_logger, messages):
+    lags, latencies = [], []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    await log_heavy(_logger, messages, latencies)
+    stop.set()
+    await tick
+    return lags, latencies
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def report(name, lags, latencies):
+    print("{:<8} call p50 {:>8.1f} us  p99 {:>8.1f} us  max {:>9.1f} us | loop lag max {:>8.2f} ms".format(
+        name, percentile(latencies, 50) * 1e6, percentile(latencies, 99) * 1e6, max(latencies) * 1e6,
+        max(lags) * 1e3 if lags else 0.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000, help='records logged by the coroutine')
+    parser.add_argument('--receiver-delay', type=float, default=0.0001, help='seconds the syslog receiver '
+                                                                             'sleeps per datagram')
+    args = parser.parse_args()
+
+    address = os.path.join(tempfile.mkdtemp(), 'log')
+    receiver = start_receiver(address, args.receiver_delay)
+    loop = asyncio.get_event_loop()
+
+    direct = logging.getLogger('bench.direct')
+    direct.propagate = False
+    direct.setLevel(logging.INFO)
+    handler = SysLogHandler(address=address)
+    handler.setFormatter(logging.Formatter('%(levelname)s: %(name)s: %(message)s'))
+    direct.addHandler(handler)
+    report("direct", *loop.run_until_complete(run(direct, args.messages)))
+
+    logger.SYSLOG_ADDRESS = address
+    queued = logger.setup('bench.queued', destination=logger.SYSLOG, level=logging.INFO)
+    queued.propagate = False
+    report("queued", *loop.run_until_complete(run(queued, args.messages)))
+    print("queued   dropped {} records".format(logger.get_dropped_count()))
+    # Let the listener write out the backlog before the receiver goes away
+    logger._stop_listener()
+    receiver.close()
+
+
+if __name__ == '__main__':
+    main()
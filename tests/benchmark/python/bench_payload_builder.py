@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" Per row cost of building a bulk statistics update payload
+
+Compares the former way of building a bulk payload, one PayloadBuilder per row serialised with payload() and parsed back
+with json.loads, with binding a PayloadTemplate compiled once.
+
+Usage: python3 bench_payload_builder.py [--rows 1000] [--repeat 5]
+"""
+
+import argparse
+import json
+import timeit
+
+from fledge.common.storage_client.payload_builder import PayloadBuilder, Param
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+def bulk_with_builder(stats):
+    payload = {"updates": []}
+    for k, v in stats.items():
+        payload_item = PayloadBuilder().WHERE(["key", "=", k]).EXPR(["value", "+", v]).payload()
+        payload['updates'].append(json.loads(payload_item))
+    return json.dumps(payload, sort_keys=False)
+
+
+_TEMPLATE = PayloadBuilder().WHERE(["key", "=", Param("key")]).EXPR(["value", "+", Param("increment")]).template()
+
+
+def bulk_with_template(stats):
+    payload = {"updates": [_TEMPLATE.bind(key=k, increment=v) for k, v in stats.items()]}
+    return json.dumps(payload, sort_keys=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000, help='statistics keys in one bulk update')
+    parser.add_argument('--repeat', type=int, default=5, help='best of given runs is reported')
+    args = parser.parse_args()
+
+    stats = {"ASSET_{}".format(i): i for i in range(args.rows)}
+    assert bulk_with_builder(stats) == bulk_with_template(stats)
+    results = {}
+    for name, fn in (("builder", bulk_with_builder), ("template", bulk_with_template)):
+        best = min(timeit.repeat(lambda: fn(stats), number=1, repeat=args.repeat))
+        results[name] = best
+        print("{:<10} {:>10.2f} us/row {:>10.2f} ms/bulk".format(name, best / args.rows * 1e6, best * 1e3))
+    print("speedup    {:>10.2f}x".format(results["builder"] / results["template"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" End to end cost of the Python readings pipeline, south ingest to storage to north
+
+The south phase adds readings with Ingest.add_readings, which the Ingest insert loop appends to storage with
+ReadingsStorageClientAsync.append and counts with the statistics. The north phase reads them back a block at a time
+with ReadingsStorageClientAsync.fetch, converts them with SendingProcess._transform_in_memory_data_readings and hands
+them to the empty north plugin. Storage is a stub aiohttp server, in a process of its own, which keeps the readings in
+memory, so the readings/s, CPU per reading and memory high water mark reported are those of the pipeline itself.
+
+Results can be saved and compared with an earlier run; the comparison exits non zero when the readings/s of a phase
+dropped by more than the tolerance.
+
+Usage: python3 bench_pipeline.py [--readings 50000] [--assets 10] [--datapoints 4] [--shape flat|nested|string]
+                                 [--block-size 5000] [--save results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import resource
+import socket
+import sys
+import time
+
+from aiohttp import web
+
+from fledge.common.service_record import ServiceRecord
+from fledge.common.storage_client.storage_client import StorageClientAsync, ReadingsStorageClientAsync
+from fledge.plugins.north.empty import empty
+from fledge.services.south.ingest import Ingest
+from fledge.tasks.north.sending_process import SendingProcess
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+SHAPES = ('flat', 'nested', 'string')
+
+
+def stub_storage(port):
+    """ Storage service stub: the readings append and fetch, and any table operation for the statistics """
+    readings = []
+
+    async def append(request):
+        doc = await request.json()
+        for r in doc['readings']:
+            r['id'] = len(readings) + 1
+            readings.append(r)
+        return web.json_response({"response": "appended", "readings_added": len(doc['readings'])})
+
+    async def fetch(request):
+        first = int(request.query['id'])
+        count = int(request.query['count'])
+        rows = readings[max(first - 1, 0):first - 1 + count]
+        return web.json_response({"count": len(rows), "rows": rows})
+
+    async def count(request):
+        return web.json_response({"count": len(readings)})
+
+    async def table(request):
+        await request.read()
+        return web.json_response({"count": 0, "rows": [], "response": "updated", "rows_affected": 1})
+
+    app = web.Application(client_max_size=256 * 1024 * 1024)
+    app.router.add_route('POST', '/storage/reading', append)
+    app.router.add_route('GET', '/storage/reading', fetch)
+    app.router.add_route('GET', '/bench/count', count)
+    app.router.add_route('*', '/storage/table/{table}', table)
+    app.router.add_route('*', '/storage/table/{table}/query', table)
+    web.run_app(app, host='127.0.0.1', port=port, print=None, handle_signals=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class _ManagementClient:
+    """ Just what Ingest asks of the core management client """
+
+    def __init__(self):
+        self._categories = {}
+
+    def create_configuration_category(self, payload):
+        doc = json.loads(payload)
+        self._categories[doc['key']] = {k: {"value": v["default"]} for k, v in doc['value'].items()}
+
+    def get_configuration_category(self, category_name):
+        return self._categories[category_name]
+
+    def create_child_category(self, parent, children):
+        pass
+
+    def get_asset_tracker_events(self):
+        return {'track': []}
+
+    def create_asset_tracker_event(self, payload):
+        pass
+
+
+class _SouthService:
+    """ Just what Ingest asks of its parent south service """
+
+    def __init__(self, storage, readings_storage):
+        self._name = "bench"
+        self.config = {}
+        self._plugin_info = {'config': {'plugin': {'default': 'bench'}}}
+        self._storage_async = storage
+        self._readings_storage_async = readings_storage
+        self._core_microservice_management_client = _ManagementClient()
+
+
+def make_reading(index, datapoints, shape):
+    if shape == 'flat':
+        return {"dp_{}".format(d): index * 0.5 + d for d in range(datapoints)}
+    if shape == 'nested':
+        return {"dp_{}".format(d): {"value": index * 0.5 + d, "quality": "good"} for d in range(datapoints)}
+    return {"dp_{}".format(d): str(index * 0.5 + d) for d in range(datapoints)}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def max_rss_mb():
+    # kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+def phase_result(readings, elapsed, cpu, latencies):
+    return {"readings": readings, "seconds": elapsed, "readings_per_second": readings / elapsed if elapsed else 0.0,
+            "cpu_us_per_reading": cpu / readings * 1e6 if readings else 0.0, "max_rss_mb": max_rss_mb(),
+            "latency_ms": {"p50": percentile(latencies, 50) * 1e3, "p95": percentile(latencies, 95) * 1e3,
+                           "p99": percentile(latencies, 99) * 1e3, "max": max(latencies) * 1e3 if latencies else 0.0}}
+
+
+async def south(args, storage, readings_storage):
+    """ Ingest the readings; latencies are those of the batches appended to storage """
+    latencies = []
+    append = readings_storage.append
+
+    async def timed_append(payload):
+        before = time.perf_counter()
+        try:
+            return await append(payload)
+        finally:
+            latencies.append(time.perf_counter() - before)
+    readings_storage.append = timed_append
+
+    await Ingest.start(_SouthService(storage, readings_storage))
+    assets = ["asset_{}".format(a) for a in range(args.assets)]
+    timestamp = "2024-03-01 10:00:00.000000+00:00"
+    cpu, started = cpu_seconds(), time.perf_counter()
+    for i in range(args.readings):
+        # Wait for the insert loop rather than have readings discarded
+        while not any(len(r) < Ingest._readings_list_size for r in Ingest._readings_lists):
+            await asyncio.sleep(0.001)
+        await Ingest.add_readings(assets[i % args.assets], timestamp, make_reading(i, args.datapoints, args.shape))
+    await Ingest.stop()
+    return phase_result(args.readings, time.perf_counter() - started, cpu_seconds() - cpu, latencies)
+
+
+async def north(args, readings_storage):
+    """ Fetch, convert and send the readings; latencies are those of the blocks """
+    handle = empty.plugin_init({})
+    latencies = []
+    sent = 0
+    last_id = 0
+    cpu, started = cpu_seconds(), time.perf_counter()
+    while True:
+        before = time.perf_counter()
+        block = await readings_storage.fetch(last_id + 1, args.block_size)
+        rows = SendingProcess._transform_in_memory_data_readings(block['rows'])
+        if not rows:
+            break
+        await empty.plugin_send(handle, rows, 1)
+        latencies.append(time.perf_counter() - before)
+        sent += len(rows)
+        last_id = rows[-1]['id']
+    empty.plugin_shutdown(handle)
+    return phase_result(sent, time.perf_counter() - started, cpu_seconds() - cpu, latencies)
+
+
+async def stored_count(port):
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        async with session.get('http://127.0.0.1:{}/bench/count'.format(port)) as resp:
+            return (await resp.json())['count']
+
+
+async def wait_for(port, timeout=10):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return await stored_count(port)
+        except OSError:
+            if time.time() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def report(name, result):
+    print("{:<6} {:>9} readings {:>10.0f} readings/s {:>8.2f} us CPU/reading {:>8.1f} MB max RSS | "
+          "latency p50 {:>8.2f} p95 {:>8.2f} p99 {:>8.2f} max {:>8.2f} ms".format(
+            name, result['readings'], result['readings_per_second'], result['cpu_us_per_reading'],
+            result['max_rss_mb'], result['latency_ms']['p50'], result['latency_ms']['p95'],
+            result['latency_ms']['p99'], result['latency_ms']['max']))
+
+
+def compare(results, baseline_file, tolerance):
+    """ Print the change of each phase from the baseline; False if readings/s dropped by more than tolerance """
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    ok = True
+    for name, result in results['phases'].items():
+        before = baseline['phases'].get(name)
+        if before is None:
+            continue
+        change = (result['readings_per_second'] - before['readings_per_second']) / before['readings_per_second']
+        cpu_change = (result['cpu_us_per_reading'] - before['cpu_us_per_reading']) / before['cpu_us_per_reading'] \
+            if before['cpu_us_per_reading'] else 0.0
+        regressed = change < -tolerance
+        ok = ok and not regressed
+        print("{:<6} readings/s {:>+7.1%}  CPU/reading {:>+7.1%}{}".format(
+            name, change, cpu_change, "  REGRESSION" if regressed else ""))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readings', type=int, default=50000, help='readings ingested and sent north')
+    parser.add_argument('--assets', type=int, default=10, help='assets the readings are spread over')
+    parser.add_argument('--datapoints', type=int, default=4, help='datapoints per reading')
+    parser.add_argument('--shape', choices=SHAPES, default='flat', help='numbers, nested objects or numeric strings '
+                                                                        'the north conversion parses')
+    parser.add_argument('--block-size', type=int, default=5000, help='readings fetched per north block')
+    parser.add_argument('--save', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='compare with the results saved by an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='readings/s drop reported as a regression')
+    args = parser.parse_args()
+
+    port = free_port()
+    storage_process = multiprocessing.Process(target=stub_storage, args=(port,), daemon=True)
+    storage_process.start()
+    loop = asyncio.get_event_loop()
+    try:
+        loop.run_until_complete(wait_for(port))
+        service = ServiceRecord("bench", "bench storage", "Storage", "http", "127.0.0.1", port, port)
+        storage = StorageClientAsync(None, None, svc=service)
+        readings_storage = ReadingsStorageClientAsync(None, None, svc=service)
+
+        phases = {"south": loop.run_until_complete(south(args, storage, readings_storage))}
+        stored = loop.run_until_complete(stored_count(port))
+        if stored != args.readings:
+            print("south stored {} of {} readings".format(stored, args.readings))
+        phases["north"] = loop.run_until_complete(north(args, readings_storage))
+    finally:
+        storage_process.terminate()
+        storage_process.join()
+
+    for name, result in phases.items():
+        report(name, result)
+    results = {"config": {k: v for k, v in vars(args).items() if k not in ('save', 'compare', 'tolerance')},
+               "python": platform.python_version(), "time": time.strftime("%Y-%m-%d %H:%M:%S"), "phases": phases}
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" Lookup cost of the core service and interest registries
+
+The registries are filled with the given number of services and interests, each service interested in an equal share
+of the categories, and the lookups the core makes on every management API call, service registration and
+configuration change are timed against the linear scans of the registry lists they replaced.
+
+Usage: python3 bench_registries.py [--services 500] [--interests 10000] [--lookups 20000]
+"""
+
+import argparse
+import random
+import time
+from unittest.mock import MagicMock
+
+from fledge.common.configuration_manager import ConfigurationManager
+from fledge.services.core.interest_registry.interest_registry import InterestRegistry
+from fledge.services.core.service_registry.service_registry import ServiceRegistry
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+def fill(services, interests):
+    ServiceRegistry._logger.disabled = True
+    ServiceRegistry._registry = list()
+    ids = [ServiceRegistry.register("svc_{}".format(i), "Southbound" if i % 2 else "Northbound", "127.0.0.1",
+                                    10000 + i, 20000 + i, 'http') for i in range(services)]
+    registry = InterestRegistry(MagicMock(spec=ConfigurationManager))
+    for i in range(interests):
+        registry.register(ids[i % services], "cat_{}".format(i // services))
+    return ids, registry
+
+
+def timed(lookups, call):
+    started = time.perf_counter()
+    for args in lookups:
+        call(*args)
+    return (time.perf_counter() - started) / len(lookups) * 1e6
+
+
+def scan_services(**kwargs):
+    services = ServiceRegistry._registry
+    for k, v in kwargs.items():
+        if v:
+            services = [s for s in ServiceRegistry._registry if getattr(s, k, None) == v]
+    return services
+
+
+def scan_interests(registry, **kwargs):
+    return [s for s in registry._registered_interests
+            if all(getattr(s, k, None) == v for k, v in kwargs.items() if v is not None)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--services', type=int, default=500, help='registered services')
+    parser.add_argument('--interests', type=int, default=10000, help='registered configuration interests')
+    parser.add_argument('--lookups', type=int, default=20000, help='lookups timed per operation')
+    args = parser.parse_args()
+
+    ids, registry = fill(args.services, args.interests)
+    rnd = random.Random(1)
+    service_ids = [(rnd.choice(ids),) for _ in range(args.lookups)]
+    ports = [("127.0.0.1", 10000 + rnd.randrange(args.services)) for _ in range(args.lookups)]
+    categories = [("cat_{}".format(rnd.randrange(max(args.interests // args.services, 1))),)
+                  for _ in range(args.lookups)]
+
+    operations = [
+        ("service by id", service_ids, lambda i: ServiceRegistry.get(idx=i), lambda i: scan_services(_id=i)),
+        ("service address and port", ports, ServiceRegistry.check_address_and_port,
+         lambda a, p: [s for s in ServiceRegistry._registry if s._address == a and s._port == p]),
+        ("interests of a service", service_ids, lambda i: registry.get(microservice_uuid=i),
+         lambda i: scan_interests(registry, _microservice_uuid=i)),
+        ("interests in a category", categories, lambda c: registry.get(category_name=c),
+         lambda c: scan_interests(registry, _category_name=c))
+    ]
+    print("{} services, {} interests".format(len(ServiceRegistry._registry), len(registry._registered_interests)))
+    for name, lookups, indexed, scan in operations:
+        indexed_us = timed(lookups, indexed)
+        scan_us = timed(lookups[:max(len(lookups) // 20, 1)], scan)
+        print("{:<26} indexed {:>9.2f} us  scan {:>9.2f} us  {:>8.1f}x".format(
+            name, indexed_us, scan_us, scan_us / indexed_us if indexed_us else 0.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" CPU cost of starting Python tasks as new processes against forking them from a resident worker
+
+A task module importing what the Fledge Python tasks import is run the given number of times, first as the scheduler
+starts a task, with a new python3 -m process for every run, then by a resident TaskWorker. The CPU time of the runs,
+user and system of all the child processes, and the wall time are compared.
+
+Usage: python3 bench_task_worker.py [--runs 50] [--concurrency 1] [--python python3]
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+from fledge.services.core.scheduler.task_worker import TaskWorker
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_TASK = '''
+import asyncio
+import sys
+from fledge.common.process import FledgeProcess
+from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.audit_logger import AuditLogger
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(asyncio.sleep(0))
+    sys.exit(0)
+'''
+_MODULE = 'bench_fledge_task'
+
+
+def children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def batches(runs, concurrency, start):
+    failed = 0
+    for first in range(0, runs, concurrency):
+        processes = [await start() for _ in range(min(concurrency, runs - first))]
+        failed += sum(1 for code in [await p.wait() for p in processes] if code != 0)
+    return failed
+
+
+async def per_run_processes(python, cwd, runs, concurrency):
+    async def start():
+        return await asyncio.create_subprocess_exec(python, "-m", _MODULE, "--name=bench", cwd=cwd)
+    return await batches(runs, concurrency, start)
+
+
+async def resident_worker(python, cwd, runs, concurrency):
+    TaskWorker._PYTHON = python
+    worker = TaskWorker(_MODULE, cwd)
+
+    async def start():
+        return await worker.run(["--name=bench"])
+    failed = await batches(runs, concurrency, start)
+    # The runs are children of the worker, their CPU time is counted once it exited
+    await worker.stop()
+    return failed
+
+
+def measure(loop, name, mode, *args):
+    cpu, wall = children_cpu(), time.perf_counter()
+    failed = loop.run_until_complete(mode(*args))
+    cpu, wall = children_cpu() - cpu, time.perf_counter() - wall
+    runs = args[2]
+    print("{:<18} cpu {:>8.3f} s  {:>7.2f} ms/run  wall {:>7.3f} s  failed {}".format(
+        name, cpu, cpu / runs * 1000, wall, failed))
+    return cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=50, help='runs of the task in each mode')
+    parser.add_argument('--concurrency', type=int, default=1, help='runs started together')
+    parser.add_argument('--python', default='python3', help='interpreter of the tasks and the worker')
+    args = parser.parse_args()
+
+    cwd = tempfile.mkdtemp(prefix='fledge-bench-')
+    with open(os.path.join(cwd, _MODULE + '.py'), 'w') as f:
+        f.write(_TASK)
+    python_path = os.environ.get('PYTHONPATH', '')
+    os.environ['PYTHONPATH'] = os.pathsep.join(
+        [os.path.abspath(p) for p in python_path.split(os.pathsep) if p] + [cwd])
+    loop = asyncio.get_event_loop()
+    try:
+        process_cpu = measure(loop, "process per run", per_run_processes, args.python, cwd, args.runs,
+                              args.concurrency)
+        worker_cpu = measure(loop, "resident worker", resident_worker, args.python, cwd, args.runs,
+                             args.concurrency)
+        print("CPU saved {:.1f}%".format((1 - worker_cpu / process_cpu) * 100 if process_cpu else 0.0))
+    finally:
+        shutil.rmtree(cwd)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,7 @@ import json
 import os
 import pytest
 import py
-from fledge.common.storage_client.payload_builder import PayloadBuilder
+from fledge.common.storage_client.payload_builder import PayloadBuilder, Param
 
 __author__ = "Vaibhav Singhal"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -547,3 +547,56 @@ class TestPayloadBuilderDelete:
     def test_delete_where_payload(self, input_where, input_table, expected):
         res = PayloadBuilder().DELETE(input_table).WHERE(input_where).payload()
         assert expected == json.loads(res)
+
+
+class TestPayloadBuilderInstance:
+    """
+    This class tests payload builders do not share state
+    """
+    def test_interleaved_builders(self):
+        first = PayloadBuilder().SELECT("name")
+        second = PayloadBuilder().SELECT("id").WHERE(["id", "=", 1])
+        first.WHERE(["name", "=", "test"])
+        assert {"return": ["name"], "where": {"column": "name", "condition": "=", "value": "test"}} == \
+            json.loads(first.payload())
+        assert {"return": ["id"], "where": {"column": "id", "condition": "=", "value": 1}} == \
+            json.loads(second.payload())
+
+    def test_initial_payload(self):
+        chain = PayloadBuilder().SELECT("id").chain_payload()
+        res = PayloadBuilder(chain).LIMIT(1).payload()
+        assert {"return": ["id"], "limit": 1} == json.loads(res)
+        assert {"return": ["id"]} == json.loads(PayloadBuilder().SELECT("id").payload())
+
+
+class TestPayloadTemplate:
+    """
+    This class tests payload templates compiled from payload builder
+    """
+    def test_bind(self):
+        template = PayloadBuilder().WHERE(["key", "=", Param("key")]).EXPR(
+            ["value", "+", Param("increment")]).template()
+        assert frozenset({"key", "increment"}) == template.params
+        for key, increment in (("READINGS", 10), ("PURGED", 2)):
+            expected = PayloadBuilder().WHERE(["key", "=", key]).EXPR(["value", "+", increment]).payload()
+            assert json.loads(expected) == template.bind(key=key, increment=increment)
+            assert expected == template.payload(key=key, increment=increment)
+
+    def test_bind_shares_constant_parts(self):
+        template = PayloadBuilder().SELECT("key", "value").WHERE(["key", "=", Param("key")]).template()
+        first = template.bind(key="a")
+        second = template.bind(key="b")
+        assert "a" == first["where"]["value"]
+        assert "b" == second["where"]["value"]
+        assert first["return"] is second["return"]
+
+    def test_template_without_param(self):
+        template = PayloadBuilder().SELECT("key").template()
+        assert frozenset() == template.params
+        assert {"return": ["key"]} == template.bind()
+
+    def test_bind_missing_param(self):
+        template = PayloadBuilder().SET(previous_value=Param("value")).WHERE(["key", "=", Param("key")]).template()
+        with pytest.raises(KeyError) as exc_info:
+            template.bind(key="READINGS")
+        assert "'value'" == str(exc_info.value)
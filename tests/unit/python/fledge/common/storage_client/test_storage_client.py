@@ -44,7 +44,9 @@ class FakeFledgeStorageSrvr:
             web.post('/storage/reading', self.readings_append),
             web.get('/storage/reading', self.readings_fetch),
             web.put('/storage/reading/query', self.readings_query),
-            web.put('/storage/reading/purge', self.readings_purge)
+            web.put('/storage/reading/purge', self.readings_purge),
+            web.post('/storage/reading/interest/{asset}', self.readings_interest),
+            web.delete('/storage/reading/interest/{asset}', self.readings_interest)
         ])
         self.handler = None
         self.server = None
@@ -158,6 +160,13 @@ class FakeFledgeStorageSrvr:
             "called": 1
         })
 
+    async def readings_interest(self, request):
+        payload = await request.json()
+        if 'url' not in payload:
+            return web.HTTPBadRequest(reason="bad data", text='{"error": "Missing url element in payload"}')
+        status = "registered" if request.method == 'POST' else "unregistered"
+        return web.json_response({request.match_info['asset']: status, "url": payload['url']})
+
 
 class TestStorageClientAsync:
 
@@ -767,3 +776,39 @@ class TestReadingsStorageAsyncClient:
         assert 1 == response["called"]
 
         await fake_storage_srvr.stop()
+
+    @pytest.mark.asyncio
+    async def test_register_unregister_interest(self, event_loop):
+        # POST, DELETE '/storage/reading/interest/{asset}'
+        fake_storage_srvr = FakeFledgeStorageSrvr(loop=event_loop)
+        await fake_storage_srvr.start()
+
+        mockServiceRecord = MagicMock(ServiceRecord)
+        mockServiceRecord._address = HOST
+        mockServiceRecord._type = "Storage"
+        mockServiceRecord._port = PORT
+        mockServiceRecord._management_port = 2000
+
+        rsc = ReadingsStorageClientAsync(1, 2, mockServiceRecord)
+        with pytest.raises(ValueError) as excinfo:
+            await rsc.register_interest(None, "http://localhost:1/cb")
+        assert "Asset code is missing" == str(excinfo.value)
+        with pytest.raises(ValueError) as excinfo:
+            await rsc.unregister_interest("*", "")
+        assert "Callback URL is missing" == str(excinfo.value)
+
+        response = await rsc.register_interest("*", "http://localhost:1/cb")
+        assert {"*": "registered", "url": "http://localhost:1/cb"} == response
+        response = await rsc.unregister_interest("my asset", "http://localhost:1/cb")
+        assert {"my asset": "unregistered", "url": "http://localhost:1/cb"} == response
+
+        with pytest.raises(StorageServerError) as excinfo:
+            with patch.object(_LOGGER, "error") as log_e:
+                with patch('json.dumps', return_value='{}'):
+                    await rsc.register_interest("*", "http://localhost:1/cb")
+            log_e.assert_called_once_with("%s url %s with payload: %s, Error code: %d, reason: %s, details: %s",
+                                          'POST', '/storage/reading/interest/*', '{}', 400, 'bad data',
+                                          {"error": "Missing url element in payload"})
+        assert 400 == excinfo.value.code
+
+        await fake_storage_srvr.stop()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Test fledge/common/asset_rollup.py"""
+
+import asyncio
+import json
+import sys
+from unittest.mock import patch, MagicMock
+import pytest
+
+from fledge.common import asset_rollup
+from fledge.common.storage_client.storage_client import StorageClientAsync
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def mock_coro(*args):
+    return None if len(args) == 0 else args[0]
+
+
+async def storage_result(result):
+    # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+    return await mock_coro(result) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(result))
+
+
+class TestAssetRollup:
+
+    @pytest.mark.parametrize("bucket_size, offset, expected", [
+        (1, 0, 1), ("10", 0, 1), (60, 0, 60), ("120", 0, 60), (7200, 0, 3600),
+        (60, 30, 1), (120, 60, 60), (7200, 3600, 3600),
+        (0.5, 0, None), ("1.5", 0, None), (1, 0.5, None), (0, 0, None), ("bla", 0, None), (None, 0, None)
+    ])
+    async def test_granularity_for(self, bucket_size, offset, expected):
+        assert expected == asset_rollup.granularity_for(bucket_size, offset)
+
+    @pytest.mark.parametrize("ts, expected", [
+        ("2024-03-01 10:15:30.123456+00:00", 1709288130),
+        ("2024-03-01 10:15:30", 1709288130),
+        ("2024-03-01 12:15:30.5+02:00", 1709288130),
+        ("2024-03-01 10:15:30+00", 1709288130),
+        ("2024-03-01 15:45:30.123+05:30", 1709288130),
+        ("not a timestamp", None)
+    ])
+    async def test_to_epoch(self, ts, expected):
+        assert expected == asset_rollup.to_epoch(ts)
+
+    async def test_from_epoch(self):
+        assert "2024-03-01 10:15:30+00:00" == asset_rollup.from_epoch(1709288130)
+        assert 1709288130 == asset_rollup.to_epoch(asset_rollup.from_epoch(1709288130))
+
+    async def test_accumulator(self):
+        acc = asset_rollup.RollupAccumulator()
+        acc.add(1, "sinusoid", "2024-03-01 10:15:30.100000+00:00", {"sinusoid": 1.5, "label": "x", "flag": True})
+        acc.add(2, "sinusoid", "2024-03-01 10:15:30.900000+00:00", {"sinusoid": -0.5})
+        acc.add(3, "sinusoid", "2024-03-01 10:15:31.000000+00:00", {"sinusoid": 2})
+        acc.add(4, "sinusoid", "bad", {"sinusoid": 2})
+        acc.add(5, "sinusoid", "2024-03-01 10:15:31.000000+00:00", "not a dict")
+        rows = {(r['granularity'], r['ts']): r for r in acc.rows()}
+        assert 4 == len(acc) == len(rows)
+        assert {"granularity": 1, "asset_code": "sinusoid", "datapoint": "sinusoid", "ts": "2024-03-01 10:15:30+00:00",
+                "minimum": -0.5, "maximum": 1.5, "total": 1.0, "samples": 2, "last_id": 2} == \
+            rows[(1, "2024-03-01 10:15:30+00:00")]
+        assert 3 == rows[(1, "2024-03-01 10:15:31+00:00")]['last_id']
+        minute = rows[(60, "2024-03-01 10:15:00+00:00")]
+        assert (-0.5, 2, 3.0, 3, 3) == (minute['minimum'], minute['maximum'], minute['total'], minute['samples'],
+                                        minute['last_id'])
+        assert 3 == rows[(3600, "2024-03-01 10:00:00+00:00")]['samples']
+
+    async def test_covered_window(self):
+        storage = MagicMock(spec=StorageClientAsync)
+        spans = {'rows': [{'asset_code': 'a', 'first': '2024-03-01 10:00:00+00:00', 'last': '2024-03-01 11:00:00+00:00'},
+                          {'asset_code': 'b', 'first': '2024-03-01 10:05:00+00:00', 'last': '2024-03-01 10:50:00+00:00'}]}
+        start = asset_rollup.to_epoch("2024-03-01 09:00:10")
+        stop = asset_rollup.to_epoch("2024-03-01 12:00:00")
+        _rv = await storage_result(spans)
+        with patch.object(storage, 'query_tbl_with_payload', return_value=_rv) as patch_query:
+            # up to the newest bucket of any of the assets, which may still be filling
+            assert (asset_rollup.to_epoch("2024-03-01 10:06:00"), asset_rollup.to_epoch("2024-03-01 10:50:00")) == \
+                await asset_rollup.covered_window(storage, ['a', 'b'], 60, start, stop, 120)
+            # buckets keyed by their middle
+            assert (asset_rollup.to_epoch("2024-03-01 10:05:00"), asset_rollup.to_epoch("2024-03-01 10:49:00")) == \
+                await asset_rollup.covered_window(storage, ['a', 'b'], 60, start, stop, 120, 60)
+            # an asset without rollups
+            assert await asset_rollup.covered_window(storage, ['a', 'c'], 60, start, stop, 120) is None
+            # no whole bucket within the window
+            assert await asset_rollup.covered_window(storage, ['a'], 60, start, start + 600, 120) is None
+            # recent buckets are read from the readings
+            with patch('time.time', return_value=asset_rollup.to_epoch("2024-03-01 10:30:30")):
+                assert (asset_rollup.to_epoch("2024-03-01 10:00:00"), asset_rollup.to_epoch("2024-03-01 10:29:00")) \
+                       == await asset_rollup.covered_window(storage, ['a'], 60, start, stop, 60)
+        args, _ = patch_query.call_args
+        assert "asset_rollups" == args[0]
+        assert {"aggregate": [{"operation": "min", "column": "ts", "alias": "first"},
+                              {"operation": "max", "column": "ts", "alias": "last"}],
+                "where": {"column": "asset_code", "condition": "in", "value": ["a"],
+                          "and": {"column": "granularity", "condition": "=", "value": 60}},
+                "group": "asset_code"} == json.loads(args[1])
+
+    async def test_query_buckets(self):
+        storage = MagicMock(spec=StorageClientAsync)
+        result = {'rows': [
+            {'asset_code': 'a', 'datapoint': 'x', 'ts': '2024-03-01 10:00:00+00:00', 'minimum': 1, 'maximum': 5,
+             'total': 6, 'samples': 2},
+            {'asset_code': 'a', 'datapoint': 'x', 'ts': '2024-03-01 10:01:00+00:00', 'minimum': 0, 'maximum': 3,
+             'total': 3, 'samples': 2},
+            {'asset_code': 'a', 'datapoint': 'x', 'ts': '2024-03-01 10:02:00+00:00', 'minimum': 4, 'maximum': 4,
+             'total': 4, 'samples': 1}]}
+        start = asset_rollup.to_epoch("2024-03-01 10:00:00")
+        _rv = await storage_result(result)
+        with patch.object(storage, 'query_tbl_with_payload', return_value=_rv) as patch_query:
+            buckets = await asset_rollup.query_buckets(storage, ['a'], 60, start, start + 240, 120, 'x')
+            assert {('a', start): {'x': [0.0, 5.0, 9.0, 4]}, ('a', start + 120): {'x': [4.0, 4.0, 4.0, 1]}} == buckets
+            # buckets keyed by their middle
+            buckets = await asset_rollup.query_buckets(storage, ['a'], 60, start, start + 240, 120, 'x', 60)
+            assert {('a', start): {'x': [1.0, 5.0, 6.0, 2]}, ('a', start + 120): {'x': [0.0, 4.0, 7.0, 3]}} == buckets
+        args, _ = patch_query.call_args
+        payload = json.loads(args[1])
+        assert "asset_rollups" == args[0]
+        assert ["asset_code", "datapoint", "ts"] == [g.strip() for g in payload['group'].split(',')]
+        assert {"column": "asset_code", "condition": "in", "value": ["a"],
+                "and": {"column": "granularity", "condition": "=", "value": 60,
+                        "and": {"column": "ts", "condition": ">=", "value": "2024-03-01 10:00:00+00:00",
+                                "and": {"column": "ts", "condition": "<", "value": "2024-03-01 10:04:00+00:00",
+                                        "and": {"column": "datapoint", "condition": "=", "value": "x"}}}}} == \
+            payload['where']
@@ -6,6 +6,7 @@
 
 """ Unit tests for common utils """
 
+from unittest.mock import patch
 import pytest
 from fledge.common import utils as common_utils
 from collections import Counter
@@ -30,3 +31,39 @@ class TestCommonUtils:
     def test_check_reserved(self, test_string, expected):
         actual = common_utils.check_reserved(test_string)
         assert expected == actual
+
+    @pytest.mark.parametrize("ts, expected", [
+        ("2024-02-19 16:35:46.736123+00:00", "2024-02-19 16:35:46.736123"),
+        ("2024-02-19 16:35:46.736123", "2024-02-19 16:35:46.736123"),
+        ("2024-02-19T16:35:46.5Z", "2024-02-19 16:35:46.500000"),
+        ("2024-02-19 16:35:46", "2024-02-19 16:35:46.000000"),
+        ("2024-02-19 18:05:46.000001+01:30", "2024-02-19 16:35:46.000001"),
+        ("2024-02-19 16:35:46.1-0500", "2024-02-19 21:35:46.100000"),
+        # Postgres timestamptz text
+        ("2024-01-01 00:00:00+00", "2024-01-01 00:00:00.000000"),
+        ("2024-01-01 05:30:00+05:30", "2024-01-01 00:00:00.000000"),
+        ("2024-01-01 00:00:00.123456+00", "2024-01-01 00:00:00.123456"),
+        ("2024-01-01 02:00:00.25+02", "2024-01-01 00:00:00.250000"),
+        ("2024-01-01 00:00:00-03", "2024-01-01 03:00:00.000000"),
+        ("blah", None),
+        (None, None)
+    ])
+    def test_utc_timestamp(self, ts, expected):
+        assert expected == common_utils.utc_timestamp(ts)
+
+    def test_ttl_cache(self):
+        calls = []
+
+        @common_utils.ttl_cache(30)
+        def installed(plugin_type):
+            calls.append(plugin_type)
+            return [plugin_type]
+
+        with patch('time.monotonic', side_effect=[0, 10, 10, 31, 32]):
+            assert ["south"] == installed("south")
+            assert ["south"] == installed("south")
+            assert ["north"] == installed("north")
+            assert ["south"] == installed("south")
+            installed.cache_clear()
+            assert ["south"] == installed("south")
+        assert ["south", "north", "south", "south"] == calls
@@ -7,7 +7,7 @@ from unittest.mock import MagicMock, patch, call
 import pytest
 import sys
 from fledge.common.configuration_manager import ConfigurationManager, ConfigurationManagerSingleton, \
-    _valid_type_strings, _logger, _optional_items
+    CategoryTree, _valid_type_strings, _logger, _optional_items
 from fledge.common.storage_client.payload_builder import PayloadBuilder
 from fledge.common.storage_client.storage_client import StorageClientAsync
 from fledge.common.storage_client.exceptions import StorageServerError
@@ -2307,6 +2307,34 @@ class TestConfigurationManager:
         assert 1 == log_exc.call_count
         log_exc.assert_called_once_with('Unable to get the "value" entry based on category_name %s and item_name %s', 'catname', 'item_name')
 
+    async def test_get_categories_item_value_entry(self, reset_singleton):
+        async def async_mock(return_value):
+            return return_value
+
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._cacheManager.update("Sine", "desc", {"plugin": {"value": "sinusoid"}})
+        c_mgr._cacheManager.update("NoPlugin", "desc", {"asset": {"value": "x"}})
+        result = {"rows": [{"key": "OPCUA", "value": "opcua"}], "count": 1}
+        _rv = await async_mock(result) if sys.version_info >= (3, 8) else asyncio.ensure_future(async_mock(result))
+        with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=_rv) as query_patch:
+            ret_val = await c_mgr.get_categories_item_value_entry(["Sine", "NoPlugin", "OPCUA", "Gone"], "plugin")
+        assert {"Sine": "sinusoid", "NoPlugin": None, "OPCUA": "opcua", "Gone": None} == ret_val
+        args, _ = query_patch.call_args
+        assert 'configuration' == args[0]
+        payload = json.loads(args[1])
+        assert {"column": "key", "condition": "in", "value": ["OPCUA", "Gone"]} == payload['where']
+        assert [{"json": {"column": "value", "properties": ["plugin", "value"]}, "alias": "value"}] == \
+            [r for r in payload['return'] if r != "key"]
+
+    async def test_get_categories_item_value_entry_all_cached(self, reset_singleton):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._cacheManager.update("Sine", "desc", {"plugin": {"value": "sinusoid"}})
+        with patch.object(storage_client_mock, 'query_tbl_with_payload') as query_patch:
+            assert {"Sine": "sinusoid"} == await c_mgr.get_categories_item_value_entry(["Sine"], "plugin")
+        query_patch.assert_not_called()
+
     async def test__create_new_category_good(self, reset_singleton):
         async def mock_coro():
             return {'response': [{'display_name': 'catname', 'category_name': 'catname', 'category_val': 'catval', 'description': 'catdesc'}]}
@@ -4414,3 +4442,94 @@ class TestConfigurationManager:
         assert 1 == log_warn.call_count
         log_warn.assert_called_once_with('For {} category, DISCARDING unrecognized entry name {} for item name {}'.
                                          format(CAT_NAME, entry_name, ITEM_NAME))
+
+
+TREE_CATEGORIES = {"rows": [{"key": "General", "description": "General", "display_name": "GEN"},
+                            {"key": "service", "description": "Fledge service", "display_name": "SERV"},
+                            {"key": "rest_api", "description": "User REST API", "display_name": "API"},
+                            {"key": "Advanced", "description": "Advanced", "display_name": "ADV"}], "count": 4}
+TREE_CHILDREN = {"rows": [{"parent": "General", "child": "service"}, {"parent": "service", "child": "rest_api"},
+                          {"parent": "General", "child": "SMNTR"}], "count": 3}
+
+
+class TestCategoryTree:
+    @pytest.fixture()
+    def c_mgr(self):
+        ConfigurationManagerSingleton._shared_state = {}
+        yield ConfigurationManager(MagicMock(spec=StorageClientAsync))
+        ConfigurationManagerSingleton._shared_state = {}
+
+    async def _load(self, c_mgr):
+        async def q_result(table, payload):
+            if table == "configuration":
+                assert {"return": ["key", "description", "display_name"]} == json.loads(payload)
+                return TREE_CATEGORIES
+            assert {"return": ["parent", "child"], "sort": {"column": "id", "direction": "asc"}} == \
+                json.loads(payload)
+            return TREE_CHILDREN
+
+        with patch.object(c_mgr._storage, 'query_tbl_with_payload', side_effect=q_result) as query_tbl_patch:
+            await c_mgr.load_category_tree()
+        assert 2 == query_tbl_patch.call_count
+
+    async def test_hierarchy_from_tree(self, c_mgr):
+        await self._load(c_mgr)
+        with patch.object(c_mgr._storage, 'query_tbl_with_payload') as query_tbl_patch:
+            assert [('General', 'General', 'GEN'), ('Advanced', 'Advanced', 'ADV')] == \
+                await c_mgr.get_all_category_names(root=True)
+            assert [('service', 'Fledge service', 'SERV'), ('rest_api', 'User REST API', 'API')] == \
+                await c_mgr.get_all_category_names(root=False)
+            assert [{"key": "General", "description": "General", "displayName": "GEN", "children": [
+                        {"key": "service", "description": "Fledge service", "displayName": "SERV", "children": [
+                            {"key": "rest_api", "description": "User REST API", "displayName": "API",
+                             "children": []}]}]},
+                    {"key": "Advanced", "description": "Advanced", "displayName": "ADV", "children": []}] == \
+                await c_mgr.get_all_category_names(root=True, children=True)
+            # SMNTR is not a category, as _read_child_info it is left out
+            assert [{"key": "service", "description": "Fledge service", "displayName": "SERV"}] == \
+                await c_mgr.get_category_child("General")
+            assert ["service", "rest_api", "SMNTR"] == await c_mgr._fetch_descendents("General")
+            with pytest.raises(ValueError) as ex:
+                await c_mgr.get_category_child("blah")
+            assert 'No such blah category exist' == str(ex.value)
+        query_tbl_patch.assert_not_called()
+
+    async def test_tree_maintained(self, c_mgr):
+        async def ok(*args):
+            return {"response": "inserted", "rows_affected": 1}
+
+        async def deleted(*args):
+            return {"response": "deleted", "rows_affected": 1}
+
+        await self._load(c_mgr)
+        with patch.object(c_mgr._storage, 'insert_into_tbl', side_effect=ok):
+            with patch.object(AuditLogger, 'information', side_effect=ok):
+                await c_mgr._create_new_category("North", {}, "North tasks", "NTH")
+            await c_mgr._create_child("Advanced", "North")
+        assert [{"key": "North", "description": "North tasks", "displayName": "NTH"}] == \
+            await c_mgr.get_category_child("Advanced")
+        assert ("North", "North tasks", "NTH") in await c_mgr.get_all_category_names(root=False)
+
+        with patch.object(c_mgr, '_read_category_val', side_effect=ok):
+            with patch.object(c_mgr._storage, 'delete_from_tbl', side_effect=deleted):
+                assert [] == await c_mgr.delete_child_category("Advanced", "North")
+                await c_mgr.delete_parent_category("General")
+        assert [] == await c_mgr.get_category_child("General")
+        assert ("service", "Fledge service", "SERV") in await c_mgr.get_all_category_names(root=True)
+
+    async def test_reload_after_interval(self, c_mgr):
+        await self._load(c_mgr)
+        c_mgr._category_tree.add_category("stale", "", "stale")
+        with patch('time.monotonic', return_value=c_mgr._category_tree.loaded + CategoryTree.RELOAD_INTERVAL):
+            await self._load(c_mgr)
+            assert "stale" not in [c[0] for c in await c_mgr.get_all_category_names(root=True)]
+
+    async def test_not_loaded(self, c_mgr):
+        with patch.object(c_mgr._storage, 'query_tbl_with_payload', side_effect=Exception("down")):
+            with patch.object(_logger, 'error') as patch_logger:
+                await c_mgr.load_category_tree()
+            assert 1 == patch_logger.call_count
+            assert await c_mgr._get_category_tree() is None
+            # the hierarchy is then read from storage
+            with pytest.raises(Exception):
+                await c_mgr.get_all_category_names(root=True)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Test fledge/common/downsample.py"""
+
+import math
+import pytest
+
+from fledge.common.downsample import Downsampler, EpochParser
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+def _sample(method, points, series, start=0, stop=None):
+    sampler = Downsampler(method, points, start, len(series) - 1 if stop is None else stop)
+    for x, y in enumerate(series):
+        sampler.add(x, y, (x, y))
+    return sampler.result()
+
+
+class TestEpochParser:
+
+    @pytest.mark.parametrize("ts, expected", [
+        ("2024-03-01 10:15:30", 1709288130.0),
+        ("2024-03-01 10:15:30.250000", 1709288130.25),
+        ("2024-03-01 12:15:30.250000+02:00", 1709288130.25),
+        ("2024-03-01 10:15:30.25+00:00", 1709288130.25)
+    ])
+    def test_parse(self, ts, expected):
+        assert expected == EpochParser()(ts)
+
+    def test_bad_timestamp(self):
+        with pytest.raises(ValueError):
+            EpochParser()("not a timestamp")
+
+
+class TestDownsampler:
+
+    @pytest.mark.parametrize("method, points, message", [
+        ("avg", 10, "downsample must be one of lttb, minmax"),
+        ("lttb", 2, "points must be at least 3 for lttb"),
+        ("minmax", 1, "points must be at least 2 for minmax")
+    ])
+    def test_bad_args(self, method, points, message):
+        with pytest.raises(ValueError) as ex:
+            Downsampler(method, points, 0, 10)
+        assert message == str(ex.value)
+
+    @pytest.mark.parametrize("method", ["lttb", "minmax"])
+    def test_no_points(self, method):
+        assert [] == Downsampler(method, 10, 0, 10).result()
+
+    @pytest.mark.parametrize("method", ["lttb", "minmax"])
+    def test_fewer_points_than_asked(self, method):
+        series = [1.0, 3.0, 2.0]
+        assert [(0, 1.0), (1, 3.0), (2, 2.0)] == _sample(method, 10, series)
+
+    def test_lttb(self):
+        series = [math.sin(x / 50) for x in range(10000)]
+        series[5003] = 25.0
+        result = _sample("lttb", 100, series)
+        assert 100 == len(result)
+        assert (0, series[0]) == result[0] and (9999, series[-1]) == result[-1]
+        assert [p[0] for p in result] == sorted(p[0] for p in result)
+        assert (5003, 25.0) in result
+
+    def test_minmax(self):
+        series = [float(x % 7) for x in range(1000)]
+        series[500] = -3.0
+        result = _sample("minmax", 20, series)
+        assert len(result) <= 20
+        assert [p[0] for p in result] == sorted(p[0] for p in result)
+        assert (500, -3.0) in result
+        assert all(p[1] in (0.0, 6.0, -3.0) for p in result)
+
+    def test_minmax_single_point_bucket(self):
+        # a point alone in its bucket is its minimum and maximum, returned once
+        sampler = Downsampler("minmax", 4, 0, 10)
+        sampler.add(1, 1.0, "a")
+        sampler.add(9, 2.0, "b")
+        assert ["a", "b"] == sampler.result()
+        assert 2 == len(sampler)
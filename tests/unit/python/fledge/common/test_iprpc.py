@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Test fledge/common/iprpc.py"""
+
+import array
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from fledge.common import iprpc
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_SERVER = '''
+from fledge.common import iprpc
+
+
+class ServerError(Exception):
+    pass
+
+
+class EchoServer(iprpc.InterProcessRPC):
+    def echo(self, obj):
+        return obj
+
+    def describe(self, obj):
+        return [type(obj).__name__, len(obj)]
+
+    def nothing(self):
+        return None
+
+    def fail(self, message):
+        raise ValueError(message)
+
+    def fail_unknown(self, message):
+        raise ServerError(message)
+
+
+if __name__ == '__main__':
+    EchoServer().serve()
+'''
+
+
+@pytest.fixture(scope="module")
+def client(tmpdir_factory):
+    module_dir = tmpdir_factory.mktemp("iprpc")
+    module_dir.join("echo_server.py").write(_SERVER)
+    python_dir = os.path.dirname(os.path.dirname(os.path.abspath(sys.modules['fledge'].__file__)))
+    with patch.dict(os.environ, {"PYTHONPATH": python_dir}), \
+            patch.object(iprpc.IPCModuleClient, "_PYTHON", sys.executable):
+        rpc = iprpc.IPCModuleClient("echo_server", str(module_dir))
+    yield rpc
+    rpc.rpc_close()
+
+
+@pytest.fixture
+def shared_fd():
+    fd, path = tempfile.mkstemp()
+    os.unlink(path)
+    os.ftruncate(fd, 4096)
+    yield fd
+    os.close(fd)
+
+
+class TestSharedRing:
+
+    def test_reserve(self, shared_fd):
+        ring = iprpc._SharedRing(shared_fd)
+        assert 0 == ring.reserve(0, 1000, 0)
+        assert 1000 == ring.reserve(1, 2000, 0)
+        assert 3000 == ring.reserve(2, 1000, 0)
+        # no room left before the frames the peer has not read
+        assert ring.reserve(3, 900, 0) is None
+        # a payload which does not fit before the end of the ring starts over at its beginning
+        assert 0 == ring.reserve(3, 900, 1)
+        assert ring.reserve(4, 200, 1) is None
+        assert 900 == ring.reserve(4, 100, 1)
+        assert 4096 == len(ring.map)
+
+    def test_grow_when_empty(self, shared_fd):
+        ring = iprpc._SharedRing(shared_fd)
+        reader = iprpc._SharedFile(shared_fd)
+        assert 0 == ring.reserve(0, 1000, 0)
+        payload = pickle.dumps(os.urandom(10000))
+        # too large while a frame is unread
+        assert ring.reserve(1, len(payload), 0) is None
+        assert 0 == ring.reserve(1, len(payload), 1)
+        assert len(ring.map) >= len(payload)
+        assert len(ring.map) == os.fstat(shared_fd).st_size
+
+        ring.write(0, [payload[:10], memoryview(payload)[10:]])
+        assert 4096 == len(reader.map)
+        assert pickle.loads(payload) == reader.loads(0, len(payload), [])
+        assert len(ring.map) == len(reader.map)
+
+
+class TestInterProcessRPC:
+
+    def test_call(self, client):
+        assert {"a": [1, 2.5, "x"]} == client.echo({"a": [1, 2.5, "x"]})
+        assert client.nothing() is None
+        with pytest.raises(ValueError) as ex:
+            client.fail("bad value")
+        assert "bad value" == str(ex.value)
+        with patch.object(iprpc._LOGGER, "warning") as patch_logger:
+            with pytest.raises(Exception) as ex:
+                client.fail_unknown("not builtin")
+        assert "ServerError: not builtin" == str(ex.value)
+        patch_logger.assert_called_once_with("unknown local exception ServerError")
+        with pytest.raises(AttributeError):
+            client.no_such_method()
+        # the server goes on after the exceptions
+        assert ["str", 2] == client.describe("ok")
+
+    def test_large_payloads(self, client):
+        size = 3 * iprpc.ARGFILE_SIZE
+        data = os.urandom(size)
+        assert data == client.echo(data)
+        values = array.array('d', range(size // 8))
+        result = client.echo(values)
+        assert isinstance(result, array.array) and values == result
+        buffer = bytearray(data)
+        result = client.echo(buffer)
+        assert isinstance(result, bytearray) and buffer == result
+        # the inline, small payloads still work after the large ones
+        assert ["bytes", 10] == client.describe(b'0123456789')
+
+    @pytest.mark.skipif(sys.version_info < (3, 8), reason="pickle protocol 5 is needed for out-of-band buffers")
+    def test_out_of_band(self, client):
+        data = os.urandom(iprpc.ARGFILE_SIZE)
+        stream, buffers = iprpc._dumps([pickle.PickleBuffer(bytearray(data)), b'small'])
+        assert 1 == len(buffers) and len(stream) < 100
+        assert ["memoryview", len(data)] == client.describe(pickle.PickleBuffer(data))
+        result = client.echo(pickle.PickleBuffer(bytearray(data)))
+        assert isinstance(result, bytearray) and data == result
+
+    def test_pipelined(self, client):
+        sizes = [10, 100000, 2 * iprpc.ARGFILE_SIZE, 20000, 300000] * 8
+        payloads = [os.urandom(size) for size in sizes]
+        futures = [client.rpc_submit({'method': 'describe', 'args': [p]}) for p in payloads]
+        failing = client.rpc_submit({'method': 'fail', 'args': ["in flight"]})
+        futures.append(client.rpc_submit({'method': 'echo', 'args': [payloads[2]]}))
+        assert [["bytes", size] for size in sizes] + [payloads[2]] == [f.result(timeout=30) for f in futures]
+        with pytest.raises(ValueError):
+            failing.result(timeout=30)
+
+    def test_threads(self, client):
+        results = {}
+
+        def calls(n):
+            results[n] = [client.echo([n, i, os.urandom(50000 * n)])[:2] for i in range(20)]
+        threads = [threading.Thread(target=calls, args=(n,)) for n in range(1, 5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(60)
+        assert {n: [[n, i] for i in range(20)] for n in range(1, 5)} == results
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Test fledge/common/job_manager.py"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+import pytest
+
+from fledge.common.job_manager import Job, JobCancelled, JobManager, JobManagerSingleton, _logger
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+@pytest.fixture
+def manager():
+    JobManagerSingleton._shared_state = {}
+    yield JobManager()
+    JobManagerSingleton._shared_state = {}
+
+
+@pytest.mark.asyncio
+class TestJobManager:
+
+    async def test_blocking_job(self, manager):
+        def work(job, a, b):
+            job.set_progress(50, "adding")
+            assert threading.current_thread().name.startswith('fledge-job')
+            return a + b
+
+        job = manager.submit("add", work, 1, 2)
+        assert Job.QUEUED == job.status
+        assert 3 == await job.wait()
+        assert Job.COMPLETED == job.status
+        assert {"id": job.id, "name": "add", "status": "completed", "progress": 100, "message": "adding",
+                "created": job.created, "started": job.started, "finished": job.finished,
+                "result": 3} == job.to_dict()
+        assert [job] == manager.get_all()
+        assert job is manager.get(job.id)
+        await manager.stop()
+
+    async def test_coroutine_job(self, manager):
+        async def work(job):
+            return await job.run_blocking(lambda: threading.current_thread().name)
+
+        assert (await manager.submit("thread", work).wait()).startswith('fledge-job')
+        await manager.stop()
+
+    async def test_failed_job(self, manager):
+        def work(job):
+            raise ValueError("bad input")
+
+        with patch.object(_logger, 'error') as patch_logger:
+            job = manager.submit("fail", work)
+            with pytest.raises(ValueError):
+                await job.wait()
+        patch_logger.assert_called_once()
+        assert Job.FAILED == job.status
+        assert "bad input" == job.to_dict()["error"]
+        assert "result" not in job.to_dict()
+
+    async def test_bounded_and_cancelled(self, manager):
+        release = threading.Event()
+
+        def work(job):
+            release.wait(5)
+            job.check_cancelled()
+            return "done"
+
+        jobs = [manager.submit("work {}".format(i), work) for i in range(JobManager.MAX_WORKERS + 1)]
+        await asyncio.sleep(0.1)
+        assert [Job.RUNNING] * JobManager.MAX_WORKERS + [Job.QUEUED] == [j.status for j in jobs]
+        # the queued job is cancelled at once, a running one at its next check
+        assert Job.CANCELLED == manager.cancel(jobs[-1].id).status
+        manager.cancel(jobs[0].id)
+        assert Job.RUNNING == jobs[0].status
+        release.set()
+        with pytest.raises(JobCancelled):
+            await jobs[0].wait()
+        with pytest.raises(JobCancelled):
+            await jobs[-1].wait()
+        assert "done" == await jobs[1].wait()
+        assert Job.CANCELLED == jobs[0].status
+        assert manager.cancel("blah") is None
+        await manager.stop()
+
+    async def test_retain(self, manager):
+        JobManager.RETAIN = 2
+        try:
+            jobs = [manager.submit("job", lambda job: None) for _ in range(3)]
+            for j in jobs:
+                await j.wait()
+            manager.submit("job", lambda job: None)
+            assert 2 == len(manager.get_all())
+            assert manager.get(jobs[0].id) is None
+        finally:
+            JobManager.RETAIN = 100
+            await manager.stop()
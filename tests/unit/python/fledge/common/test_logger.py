@@ -4,8 +4,11 @@
 # See: http://fledge-iot.readthedocs.io/
 # FLEDGE_END
 
-import pytest
 import logging
+import logging.handlers
+import queue
+from unittest.mock import patch
+import pytest
 
 from fledge.common import logger
 
@@ -93,3 +96,61 @@ class TestLogger:
                     log.setLevel(level) 
                     log.propagate = propagate
                     assert log is logger.setup(name, propagate=propagate, level=level)
+
+    def test_setup_shares_queue_handler(self):
+        first = logger.setup('first', destination=logger.CONSOLE)
+        second = logger.setup('second', destination=logger.CONSOLE)
+        handlers = [h for h in first.handlers if isinstance(h, logging.handlers.QueueHandler)]
+        assert 1 == len(handlers)
+        assert handlers[0] in second.handlers
+        # Calling setup again does not add another handler
+        logger.setup('first', destination=logger.CONSOLE)
+        assert 1 == len([h for h in first.handlers if isinstance(h, logging.handlers.QueueHandler)])
+
+    def test_fl_core_logger_handler(self):
+        instance = logger.FLCoreLogger().get_logger('flcore')
+        assert [logger.get_queue_handler([logger.SYSLOG, logger.CONSOLE])] == instance.handlers
+        assert (logger.SYSLOG, logger.CONSOLE) == instance.handlers[0].destinations
+
+    def test_listener_writes_to_target(self):
+        target = logging.handlers.BufferingHandler(100)
+        instance = logger.setup('listener', destination=logger.CONSOLE, level=logging.INFO)
+        with patch.dict(logger._target_handlers, {logger.CONSOLE: target}):
+            instance.info("Hello %s", "world")
+            logger._stop_listener()
+        assert ["Hello world"] == [r.getMessage() for r in target.buffer]
+        # Next handler request starts the listener again
+        logger.get_queue_handler([logger.CONSOLE])
+        assert logger._listener is not None
+
+    def test_rate_limit(self):
+        rate_limit = logger._RateLimitFilter()
+
+        def record(created, arg):
+            r = logging.LogRecord('rate', logging.ERROR, __file__, 1, "Storage down %s", (arg,), None)
+            r.created = created
+            return r
+
+        with patch.object(logger, 'RATE_LIMIT_BURST', 2), patch.object(logger, 'RATE_LIMIT_INTERVAL', 10):
+            assert [True, True, False, False] == [rate_limit.filter(record(t, t)) for t in range(4)]
+            assert {('rate', 'ERROR', "Storage down %s"): 2} == rate_limit.suppressed
+            # Another template has its own window
+            other = logging.LogRecord('rate', logging.ERROR, __file__, 1, "Other", None, None)
+            other.created = 3
+            assert rate_limit.filter(other) is True
+            # Next window reports suppressed records
+            r = record(10, 10)
+            assert rate_limit.filter(r) is True
+            assert "Storage down 10 [2 similar messages suppressed]" == r.getMessage()
+        with patch.object(logger, 'RATE_LIMIT_BURST', 0):
+            assert all(rate_limit.filter(record(11, i)) for i in range(5))
+
+    def test_queue_full_drops(self):
+        handler = logger.get_queue_handler([logger.CONSOLE])
+        full = queue.Queue(1)
+        full.put(None)
+        dropped = handler.dropped
+        with patch.object(handler, 'queue', full):
+            handler.enqueue(logging.LogRecord('full', logging.INFO, __file__, 1, "msg", None, None))
+        assert dropped + 1 == handler.dropped
+        assert logger.get_dropped_count() >= 1
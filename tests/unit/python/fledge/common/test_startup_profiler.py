@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Test fledge/common/startup_profiler.py"""
+
+import importlib
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from fledge.common import startup_profiler
+from fledge.common.startup_profiler import StartupProfiler
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+@pytest.fixture
+def modules(tmpdir, monkeypatch):
+    """ profiled_outer imports profiled_inner, profiled_broken raises """
+    tmpdir.join("profiled_inner.py").write("import time\ntime.sleep(0.02)\n")
+    tmpdir.join("profiled_outer.py").write("import profiled_inner\n")
+    tmpdir.join("profiled_broken.py").write("import profiled_inner\nraise ValueError('broken')\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+    yield tmpdir
+    for name in ("profiled_inner", "profiled_outer", "profiled_broken"):
+        sys.modules.pop(name, None)
+
+
+class TestStartupProfiler:
+
+    def test_imports_and_phases(self, modules):
+        profiler = StartupProfiler("test", str(modules.join("profiles")))
+        profiler.install()
+        try:
+            import profiled_outer
+            with pytest.raises(ValueError):
+                importlib.import_module("profiled_broken")
+        finally:
+            profiler.uninstall()
+        profiler.mark("imports")
+        profiler.mark("run")
+        # the profiled modules keep their own loader
+        assert profiled_outer.__loader__ is profiled_outer.__spec__.loader
+        assert type(profiled_outer.__loader__).__name__ != "_TimedLoader"
+
+        path = profiler.finish()
+        with open(path) as f:
+            profile = json.load(f)
+        assert profile == json.loads(json.dumps(profiler.report()))
+        assert "test" == profile["name"]
+        assert profile["finished"]
+        assert ["imports", "run"] == [p["name"] for p in profile["phases"]]
+        assert profile["phases"][1]["start"] >= profile["phases"][0]["duration"]
+
+        outer = [c for c in profile["imports"]["children"] if c["name"] == "profiled_outer"][0]
+        inner = outer["children"][0]
+        assert "profiled_inner" == inner["name"]
+        assert inner["total"] >= 0.02
+        assert outer["total"] >= inner["total"]
+        assert outer["self"] < inner["total"]
+        assert "profiled_broken" in [c["name"] for c in profile["imports"]["children"]]
+        assert "profiled_outer" == profile["slowest"][0]["name"]
+        # finished once
+        assert profiler.finish() is None
+
+    def test_start_from_environment(self, modules, monkeypatch):
+        with patch.object(startup_profiler, '_profiler', None):
+            monkeypatch.delenv(startup_profiler.ENVIRONMENT_VARIABLE, raising=False)
+            assert startup_profiler.start("test") is None
+            startup_profiler.mark("not profiled")
+            assert startup_profiler.finish() is None
+            assert startup_profiler.report() is None
+
+            monkeypatch.setenv(startup_profiler.ENVIRONMENT_VARIABLE, str(modules.join("profiles")))
+            profiler = startup_profiler.start("test")
+            try:
+                assert profiler is startup_profiler.start("again")
+                import profiled_outer
+                startup_profiler.mark("imports")
+            finally:
+                path = startup_profiler.finish()
+            assert startup_profiler._ImportTimer not in [type(f) for f in sys.meta_path]
+            assert path.startswith(str(modules.join("profiles", "test-")))
+            profile = startup_profiler.report()
+            assert ["imports"] == [p["name"] for p in profile["phases"]]
+            assert "profiled_outer" in [c["name"] for c in profile["imports"]["children"]]
@@ -72,7 +72,7 @@ class TestStatistics:
         """ Test that register results in a database insert """
         storageMock = MagicMock(spec=StorageClientAsync)
         stats = statistics.Statistics(storageMock)
-        stats._registered_keys = []
+        stats._registered_keys = set()
 
         async def mock_coro():
             await asyncio.sleep(0)
@@ -100,7 +100,7 @@ class TestStatistics:
         """ Test that register results in a database insert only once for same key"""
         storageMock = MagicMock(spec=StorageClientAsync)
         stats = statistics.Statistics(storageMock)
-        stats._registered_keys = []
+        stats._registered_keys = set()
 
         async def mock_coro():
             return {"response": "updated", "rows_affected": 1}
@@ -134,7 +134,7 @@ class TestStatistics:
         """Test the load key"""
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         s = statistics.Statistics(storage_client_mock)
-        s._registered_keys = []
+        s._registered_keys = set()
 
         async def mock_coro():
             return {'rows': [{"previous_value": 0, "value": 1,
@@ -154,7 +154,7 @@ class TestStatistics:
         """Test the load key exception"""
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         s = statistics.Statistics(storage_client_mock)
-        s._registered_keys = []
+        s._registered_keys = set()
 
         async def mock_coro():
             return Exception
@@ -272,3 +272,99 @@ class TestStatistics:
                 with patch.object(statistics._logger, 'exception') as logger_exception:
                     await s.add_update(stat_dict)
                 logger_exception.assert_called_once_with(*msg)
+
+
+async def _rv(value):
+    # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+    async def mock_coro():
+        return value
+    return await mock_coro() if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro())
+
+
+class TestStatisticsAccumulator:
+
+    @pytest.fixture
+    def stats(self):
+        shared_state = statistics.Statistics._shared_state
+        statistics.Statistics._shared_state = {}
+        s = statistics.Statistics(MagicMock(spec=StorageClientAsync))
+        s._registered_keys = {'READINGS'}
+        yield s
+        statistics.Statistics._shared_state = shared_state
+
+    async def test_add_and_flush(self, stats):
+        stats.add('READINGS', 2)
+        stats.add('READINGS', 3)
+        stats.add('PUMP1', 1, 'Pump readings')
+        stats.add('PUMP1')
+        with patch.object(stats._storage, 'insert_into_tbl',
+                          return_value=await _rv({"response": "inserted", "rows_affected": 1})) as patch_insert:
+            with patch.object(stats._storage, 'update_tbl',
+                              return_value=await _rv({"response": "updated", "rows_affected": 2})) as patch_update:
+                await stats.flush()
+                # nothing left to write
+                await stats.flush()
+        patch_insert.assert_called_once_with('statistics', json.dumps({"inserts": [
+            {"key": "PUMP1", "description": "Pump readings", "value": 0, "previous_value": 0}]}))
+        assert 1 == patch_update.call_count
+        updates = json.loads(patch_update.call_args[0][1])['updates']
+        assert [("READINGS", 5), ("PUMP1", 2)] == [(u['where']['value'], u['expressions'][0]['value'])
+                                                   for u in updates]
+        assert {'READINGS', 'PUMP1'} == stats._registered_keys
+        assert {} == stats._pending
+
+    @pytest.mark.parametrize("key, value_increment, exception_name, exception_message", [
+        (123456, 120, TypeError, "key must be a string"),
+        ('READINGS', '120', ValueError, "value must be an integer")
+    ])
+    async def test_add_with_invalid_params(self, stats, key, value_increment, exception_name, exception_message):
+        with pytest.raises(exception_name) as excinfo:
+            stats.add(key, value_increment)
+        assert exception_message == str(excinfo.value)
+        assert {} == stats._pending
+
+    async def test_flush_failure_keeps_increments(self, stats):
+        stats.add('READINGS', 2)
+        with patch.object(statistics._logger, 'exception'):
+            with patch.object(stats._storage, 'update_tbl', side_effect=Exception()):
+                with pytest.raises(Exception):
+                    await stats.flush()
+        stats.add('READINGS', 1)
+        assert {'READINGS': 3} == stats._pending
+
+    async def test_registration_failure_keeps_keys(self, stats):
+        stats.add('PUMP1', 1, 'Pump readings')
+        with patch.object(statistics._logger, 'exception'):
+            with patch.object(stats, '_load_keys', return_value=await _rv(None)):
+                with patch.object(stats._storage, 'insert_into_tbl', side_effect=Exception()) as patch_insert:
+                    with patch.object(stats._storage, 'update_tbl') as patch_update:
+                        with pytest.raises(Exception):
+                            await stats.flush()
+        assert 2 == patch_insert.call_count
+        patch_update.assert_not_called()
+        assert {'PUMP1': 'Pump readings'} == stats._new_keys
+        assert {'PUMP1': 1} == stats._pending
+
+    async def test_register_many_keys_created_by_another_process(self, stats):
+        rows = {"rows": [{"key": "READINGS"}, {"key": "PUMP1"}]}
+        with patch.object(stats._storage, 'query_tbl_with_payload', return_value=await _rv(rows)):
+            with patch.object(stats._storage, 'insert_into_tbl',
+                              side_effect=[Exception(), await _rv({"response": "inserted"})]) as patch_insert:
+                await stats.register_many({'READINGS': 'Readings', 'PUMP1': 'Pump', 'PUMP2': 'Pump'})
+        assert 2 == patch_insert.call_count
+        assert ['PUMP1', 'PUMP2'] == [r['key'] for r in json.loads(patch_insert.call_args_list[0][0][1])['inserts']]
+        assert ['PUMP2'] == [r['key'] for r in json.loads(patch_insert.call_args_list[1][0][1])['inserts']]
+        assert {'READINGS', 'PUMP1', 'PUMP2'} == stats._registered_keys
+
+    async def test_periodic_flush_and_stop(self, stats):
+        with patch.object(stats._storage, 'update_tbl',
+                          return_value=await _rv({"response": "updated", "rows_affected": 1})) as patch_update:
+            stats.start(0.01)
+            stats.add('READINGS', 1)
+            await asyncio.sleep(0.1)
+            assert 1 == patch_update.call_count
+            stats.add('READINGS', 4)
+            await stats.stop()
+        assert stats._flush_task is None
+        assert 2 == patch_update.call_count
+        assert 4 == json.loads(patch_update.call_args[0][1])['updates'][0]['expressions'][0]['value']
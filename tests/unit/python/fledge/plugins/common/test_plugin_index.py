@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+""" Unit tests for plugin index """
+
+import json
+import os
+from unittest.mock import patch
+import pytest
+
+from fledge.plugins.common import plugin_index
+from fledge.plugins.common.plugin_index import PluginIndex
+from fledge.services.core.api import utils as api_utils
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+def _plugin_info(name, dir):
+    return {"name": name.upper(), "version": "2.4.0", "type": dir, "interface": "1.0.0", "flag": 8,
+            "config": {"plugin": {"default": name}}}
+
+
+class TestPluginIndex:
+
+    @pytest.fixture(autouse=True)
+    def index(self, tmpdir):
+        lib_dir = tmpdir.mkdir("plugins")
+        libs = []
+        for name in ("omf", "sinusoid"):
+            lib = lib_dir.join("lib{}.so".format(name))
+            lib.write("binary")
+            libs.append((name, str(lib)))
+        index_file = str(tmpdir.join("etc", "plugin_index.json"))
+        with patch.object(plugin_index, '_INDEX_FILE', index_file):
+            with patch.object(api_utils, 'find_c_plugin_lib_paths', return_value=libs):
+                PluginIndex._plugins = None
+                PluginIndex._stale = set()
+                PluginIndex._verified = set()
+                PluginIndex._stamp = None
+                yield index_file
+                PluginIndex._plugins = None
+                PluginIndex._verified = set()
+
+    def test_get_builds_and_persists(self, index):
+        with patch.object(api_utils, 'get_plugin_info', side_effect=_plugin_info) as patch_info:
+            entries = PluginIndex.get("north")
+        assert 2 == patch_info.call_count
+        assert {"omf", "sinusoid"} == set(entries.keys())
+        assert {"name": "OMF", "version": "2.4.0", "type": "north", "interface": "1.0.0", "flag": 8} == \
+            {k: v for k, v in entries["omf"].items() if k not in ("path", "mtime", "size")}
+        with open(index) as fh:
+            doc = json.load(fh)
+        assert entries == doc['plugins']['north']
+        assert [] == doc['stale']
+
+    def test_get_is_answered_from_memory(self):
+        with patch.object(api_utils, 'get_plugin_info', side_effect=_plugin_info) as patch_info:
+            PluginIndex.get("north")
+            PluginIndex.get("north")
+        assert 2 == patch_info.call_count
+
+    def test_restart_reuses_unchanged_entries(self, index):
+        with patch.object(api_utils, 'get_plugin_info', side_effect=_plugin_info):
+            PluginIndex.get("north")
+        # A new process only has the index file; only the changed library is probed again
+        PluginIndex._plugins = None
+        PluginIndex._verified = set()
+        omf_lib = api_utils.find_c_plugin_lib_paths("north")[0][1]
+        with open(omf_lib, 'w') as fh:
+            fh.write("rebuilt binary")
+        with patch.object(api_utils, 'get_plugin_info', side_effect=_plugin_info) as patch_info:
+            entries = PluginIndex.get("north")
+        patch_info.assert_called_once_with("omf", dir="north")
+        assert os.path.getsize(omf_lib) == entries["omf"]["size"]
+
+    def test_invalidate_from_another_process(self, index):
+        with patch.object(api_utils, 'get_plugin_info', side_effect=_plugin_info):
+            PluginIndex.get("north")
+        with open(index) as fh:
+            doc = json.load(fh)
+        doc['stale'] = ["north"]
+        with open(index, 'w') as fh:
+            json.dump(doc, fh)
+        with patch.object(api_utils, 'get_plugin_info', side_effect=_plugin_info) as patch_info:
+            with patch.object(api_utils, 'find_c_plugin_lib_paths', return_value=[]):
+                assert {} == PluginIndex.get("north")
+        assert 0 == patch_info.call_count
+        assert "north" not in PluginIndex._stale
+
+    def test_invalidate(self, index):
+        with patch.object(api_utils, 'get_plugin_info', side_effect=_plugin_info):
+            PluginIndex.get("north")
+        PluginIndex.invalidate()
+        with open(index) as fh:
+            assert sorted(plugin_index._PLUGIN_TYPES) == json.load(fh)['stale']
+        with patch.object(api_utils, 'get_plugin_info', side_effect=_plugin_info) as patch_info:
+            PluginIndex.get("north")
+        assert 0 == patch_info.call_count
+
+    def test_failed_probe_is_not_recorded(self):
+        with patch.object(api_utils, 'get_plugin_info', return_value={}):
+            assert {} == PluginIndex.get("north")
@@ -6,9 +6,11 @@
 
 """ Unit tests for utils """
 
+from unittest.mock import patch
 import pytest
 import fledge.plugins.common.utils as utils
 from collections import Counter
+from fledge.plugins.common.plugin_index import PluginIndex
 
 
 class TestUtils:
@@ -32,3 +34,14 @@ class TestUtils:
     def test_bit_at_given_position_set_or_unset(self, number, bit_pos, expected):
         actual = utils.bit_at_given_position_set_or_unset(number, bit_pos)
         assert expected == actual
+
+    @pytest.mark.parametrize("directory, expected_dirs", [
+        (None, ["south", "north", "filter"]),
+        ("north", ["north", "filter"])
+    ])
+    def test_get_persist_plugins(self, directory, expected_dirs):
+        entries = {"omf": {"name": "OMF", "flag": 8}, "pi": {"name": "PI", "flag": 0},
+                   "broken": {"name": "broken", "flag": None}}
+        with patch.object(PluginIndex, 'get', return_value=entries) as patch_get:
+            assert ["OMF"] * len(expected_dirs) == utils.get_persist_plugins(directory)
+        assert expected_dirs == [c[0][0] for c in patch_get.call_args_list]
@@ -19,6 +19,7 @@ from fledge.services.core.api.plugins.exceptions import *
 from fledge.services.core import connect
 from fledge.common.storage_client.storage_client import StorageClientAsync
 from fledge.common.plugin_discovery import PluginDiscovery
+from fledge.plugins.common.plugin_index import PluginIndex
 
 __author__ = "Ashish Jabble"
 __copyright__ = "Copyright (c) 2019 Dianomic Systems Inc."
@@ -85,7 +86,7 @@ class TestPluginInstall:
 
         with patch.object(plugins_install, 'download', return_value=_rv) as download_patch:
             with patch.object(plugins_install, 'validate_checksum', return_value=False) as checksum_patch:
-                resp = await client.post('/fledge/plugins', data=json.dumps(param))
+                resp = await client.post('/fledge/plugins?wait=true', data=json.dumps(param))
                 assert 400 == resp.status
                 assert 'Checksum is failed.' == resp.reason
             checksum_patch.assert_called_once_with(checksum_value, tar_file_name)
@@ -121,7 +122,7 @@ class TestPluginInstall:
                 with patch.object(plugins_install, 'extract_file', return_value=sync_mock(files)) as extract_patch:
                     with patch.object(plugins_install, 'copy_file_install_requirement',
                                       return_value=(1, msg)) as copy_file_install_requirement_patch:
-                        resp = await client.post('/fledge/plugins', data=json.dumps(param))
+                        resp = await client.post('/fledge/plugins?wait=true', data=json.dumps(param))
                         assert 400 == resp.status
                         assert msg == resp.reason
                     assert copy_file_install_requirement_patch.called
@@ -150,20 +151,22 @@ class TestPluginInstall:
         else:
             _rv = asyncio.ensure_future(async_mock([tar_file_name]))
 
-        with patch.object(plugins_install, 'download', return_value=_rv) as download_patch:
-            with patch.object(plugins_install, 'validate_checksum', return_value=True) as checksum_patch:
-                with patch.object(plugins_install, 'extract_file', return_value=sync_mock(files)) as extract_patch:
-                    with patch.object(plugins_install, 'copy_file_install_requirement', return_value=(0, 'Success')) \
-                            as copy_file_install_requirement_patch:
-                        resp = await client.post('/fledge/plugins', data=json.dumps(param))
-                        assert 200 == resp.status
-                        r = await resp.text()
-                        output = json.loads(r)
-                        assert '{} is successfully downloaded and installed'.format(tar_file_name) == output['message']
-                    assert copy_file_install_requirement_patch.called
-                extract_patch.assert_called_once_with(tar_file_name, False)
-            checksum_patch.assert_called_once_with(checksum_value, tar_file_name)
-        download_patch.assert_called_once_with([url_value])
+        with patch.object(PluginIndex, 'invalidate') as invalidate_patch:
+            with patch.object(plugins_install, 'download', return_value=_rv) as download_patch:
+                with patch.object(plugins_install, 'validate_checksum', return_value=True) as checksum_patch:
+                    with patch.object(plugins_install, 'extract_file', return_value=sync_mock(files)) as extract_patch:
+                        with patch.object(plugins_install, 'copy_file_install_requirement', return_value=(0, 'Success')) \
+                                as copy_file_install_requirement_patch:
+                            resp = await client.post('/fledge/plugins?wait=true', data=json.dumps(param))
+                            assert 200 == resp.status
+                            r = await resp.text()
+                            output = json.loads(r)
+                            assert '{} is successfully downloaded and installed'.format(tar_file_name) == output['message']
+                        assert copy_file_install_requirement_patch.called
+                    extract_patch.assert_called_once_with(tar_file_name, False)
+                checksum_patch.assert_called_once_with(checksum_value, tar_file_name)
+            download_patch.assert_called_once_with([url_value])
+        invalidate_patch.assert_called_once_with()
 
     async def test_post_plugins_install_with_compressed_tar(self, client):
         async def async_mock(ret_val):
@@ -186,20 +189,22 @@ class TestPluginInstall:
         else:
             _rv = asyncio.ensure_future(async_mock([tar_file_name]))
 
-        with patch.object(plugins_install, 'download', return_value=_rv) as download_patch:
-            with patch.object(plugins_install, 'validate_checksum', return_value=True) as checksum_patch:
-                with patch.object(plugins_install, 'extract_file', return_value=sync_mock(files)) as extract_patch:
-                    with patch.object(plugins_install, 'copy_file_install_requirement', return_value=(0, 'Success')) \
-                            as copy_file_install_requirement_patch:
-                        resp = await client.post('/fledge/plugins', data=json.dumps(param))
-                        assert 200 == resp.status
-                        r = await resp.text()
-                        output = json.loads(r)
-                        assert '{} is successfully downloaded and installed'.format(tar_file_name) == output['message']
-                    assert copy_file_install_requirement_patch.called
-                extract_patch.assert_called_once_with(tar_file_name, True)
-            checksum_patch.assert_called_once_with(checksum_value, tar_file_name)
-        download_patch.assert_called_once_with([url_value])
+        with patch.object(PluginIndex, 'invalidate') as invalidate_patch:
+            with patch.object(plugins_install, 'download', return_value=_rv) as download_patch:
+                with patch.object(plugins_install, 'validate_checksum', return_value=True) as checksum_patch:
+                    with patch.object(plugins_install, 'extract_file', return_value=sync_mock(files)) as extract_patch:
+                        with patch.object(plugins_install, 'copy_file_install_requirement', return_value=(0, 'Success')) \
+                                as copy_file_install_requirement_patch:
+                            resp = await client.post('/fledge/plugins?wait=true', data=json.dumps(param))
+                            assert 200 == resp.status
+                            r = await resp.text()
+                            output = json.loads(r)
+                            assert '{} is successfully downloaded and installed'.format(tar_file_name) == output['message']
+                        assert copy_file_install_requirement_patch.called
+                    extract_patch.assert_called_once_with(tar_file_name, True)
+                checksum_patch.assert_called_once_with(checksum_value, tar_file_name)
+            download_patch.assert_called_once_with([url_value])
+        invalidate_patch.assert_called_once_with()
 
     @pytest.mark.parametrize("plugin_name, checksum, file_format", [
         ('coap', '4015c2dea1cc71dbf70a23f6a203eeb6', 'deb'),
@@ -220,18 +225,20 @@ class TestPluginInstall:
         else:
             _rv = asyncio.ensure_future(async_mock())        
 
-        with patch.object(plugins_install, 'download', return_value=_rv) as download_patch:
-            with patch.object(plugins_install, 'validate_checksum', return_value=True) as checksum_patch:
-                with patch.object(plugins_install, 'install_package', return_value=(0, 'Success')) \
-                        as install_package_patch:
-                    resp = await client.post('/fledge/plugins', data=json.dumps(param))
-                    assert 200 == resp.status
-                    result = await resp.text()
-                    response = json.loads(result)
-                    assert {"message": "{} is successfully downloaded and installed".format(plugin_name)} == response
-                install_package_patch.assert_called_once_with(plugin_name, pkg_mgt)
-            checksum_patch.assert_called_once_with(checksum, plugin_name)
-        download_patch.assert_called_once_with([url_value])
+        with patch.object(PluginIndex, 'invalidate') as invalidate_patch:
+            with patch.object(plugins_install, 'download', return_value=_rv) as download_patch:
+                with patch.object(plugins_install, 'validate_checksum', return_value=True) as checksum_patch:
+                    with patch.object(plugins_install, 'install_package', return_value=(0, 'Success')) \
+                            as install_package_patch:
+                        resp = await client.post('/fledge/plugins?wait=true', data=json.dumps(param))
+                        assert 200 == resp.status
+                        result = await resp.text()
+                        response = json.loads(result)
+                        assert {"message": "{} is successfully downloaded and installed".format(plugin_name)} == response
+                    install_package_patch.assert_called_once_with(plugin_name, pkg_mgt)
+                checksum_patch.assert_called_once_with(checksum, plugin_name)
+            download_patch.assert_called_once_with([url_value])
+        invalidate_patch.assert_called_once_with()
 
     @pytest.mark.parametrize("plugin_name, checksum, file_format", [
         ('coap', '4015c2dea1cc71dbf70a23f6a203eeb6', 'deb'),
@@ -270,7 +277,7 @@ class TestPluginInstall:
         with patch.object(plugins_install, 'download', return_value=_rv) as download_patch:
             with patch.object(plugins_install, 'validate_checksum', return_value=True) as checksum_patch:
                 with patch.object(plugins_install, 'install_package', return_value=(256, msg)) as install_package_patch:
-                    resp = await client.post('/fledge/plugins', data=json.dumps(param))
+                    resp = await client.post('/fledge/plugins?wait=true', data=json.dumps(param))
                     assert 400 == resp.status
                     assert msg == resp.reason
                 install_package_patch.assert_called_once_with(plugin_name, pkg_mgt)
@@ -31,6 +31,15 @@ class TestUtils:
 
             assert plugin_name, plugin_type == utils.find_c_plugin_libs(direction)
 
+    def test_find_c_plugin_libs_and_paths_share_walk(self, tmpdir):
+        south = tmpdir.mkdir("south")
+        south.mkdir("Random").join("libRandom.so").write("")
+        south.mkdir("FlirAX8").join("FlirAX8.json").write("{}")
+        south.join("README").write("not a plugin directory")
+        with patch.object(utils, '_lib_path', str(tmpdir)):
+            assert [('FlirAX8', 'json'), ('Random', 'binary')] == sorted(utils.find_c_plugin_libs('south'))
+            assert [('Random', str(south) + "/Random/libRandom.so")] == utils.find_c_plugin_lib_paths('south')
+
     def test_get_plugin_info_value_error(self):
         plugin_name = 'Random'
         with patch.object(utils, '_find_c_lib', return_value=None) as patch_lib:
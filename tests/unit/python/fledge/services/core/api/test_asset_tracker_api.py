@@ -14,8 +14,9 @@ import sys
 
 from fledge.common.audit_logger import AuditLogger
 from fledge.common.storage_client.storage_client import StorageClientAsync
-from fledge.services.core import routes, connect
+from fledge.services.core import routes, connect, server
 from fledge.services.core.api.asset_tracker import _logger, common_utils
+from fledge.services.core.asset_tracker.asset_tracker import AssetTracker, AssetTrackerRecords
 
 
 __author__ = "Ashish Jabble"
@@ -69,6 +70,51 @@ class TestAssetTracker:
             assert 'asset_tracker' == args[0]
             assert payload == json.loads(args[1])
 
+    async def test_get_asset_track_from_core_records(self, client):
+        rows = [{'asset': 'AirIntake', 'event': 'Ingest', 'fledge': 'Booth1', 'service': 'PT100_In1',
+                 'plugin': 'PT100', "timestamp": "2018-08-13 15:39:48.796", "deprecatedTimestamp": "", 'data': {}},
+                {'asset': 'AirIntake', 'event': 'Egress', 'fledge': 'Booth1', 'service': 'Display',
+                 'plugin': 'ShopFloorDisplay', "timestamp": "2018-08-13 16:00:00.134",
+                 "deprecatedTimestamp": "2018-08-14 16:00:00.134", 'data': {}}]
+        _rv = await mock_coro({"rows": rows, 'count': 2}) if sys.version_info >= (3, 8) \
+            else asyncio.ensure_future(mock_coro({"rows": rows, 'count': 2}))
+        storage_client_mock = MagicMock(StorageClientAsync)
+        tracker = AssetTracker(storage_client_mock)
+        tracker._registered_asset_records = AssetTrackerRecords()
+        with patch.object(server.Server, '_asset_tracker', tracker):
+            with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+                with patch.object(storage_client_mock, 'query_tbl_with_payload',
+                                  return_value=_rv) as patch_query_payload:
+                    for query, expected in [("", rows), ("?event=Egress", rows[1:]), ("?deprecated=true", rows[1:]),
+                                            ("?asset=AirIntake&service=PT100_In1", rows[:1]), ("?asset=blah", [])]:
+                        resp = await client.get('/fledge/track{}'.format(query))
+                        assert 200 == resp.status
+                        assert {'track': expected} == json.loads(await resp.text())
+                # storage is only queried again once the records are changed
+                patch_query_payload.assert_called_once_with('asset_tracker', AssetTrackerRecords.select().payload())
+
+    @pytest.mark.parametrize("rows, expected", [
+        ([], {"count": 0, "assets": []}),
+        ([{'asset': 'sinusoid', 'event': 'store', 'service': 'sine', 'plugin': 'sinusoid',
+           'data': {'count': 1, 'datapoints': ['sinusoid']}},
+          {'asset': 'motor', 'event': 'store', 'service': 'motor', 'plugin': 'modbus',
+           'data': {'count': 2, 'datapoints': ['rpm', 'current']}},
+          {'asset': 'motor', 'event': 'Ingest', 'service': 'motor', 'plugin': 'modbus', 'data': {}},
+          {'asset': 'motor', 'event': 'store', 'service': 'motor', 'plugin': 'modbus',
+           'data': {'count': 1, 'datapoints': ['rpm']}}],
+         {"count": 3, "assets": [{"asset": "sinusoid", "datapoints": ["sinusoid"]},
+                                 {"asset": "motor", "datapoints": ["rpm", "current"]}]})
+    ])
+    async def test_get_datapoint_usage(self, client, rows, expected):
+        _rv = await mock_coro({"rows": rows}) if sys.version_info >= (3, 8) \
+            else asyncio.ensure_future(mock_coro({"rows": rows}))
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=_rv):
+                resp = await client.get('/fledge/track/storage/assets')
+                assert 200 == resp.status
+                assert expected == json.loads(await resp.text())
+
     @pytest.mark.skip("Once initial code version approve, will add more tests")
     @pytest.mark.parametrize("request_params, payload", [
         ("asset", {}),
@@ -6,8 +6,10 @@
 
 import os
 import asyncio
+import io
 import json
 import sys
+import tarfile
 
 from unittest.mock import MagicMock, patch
 from collections import Counter
@@ -20,6 +22,7 @@ from fledge.services.core import connect
 from fledge.plugins.storage.common.backup import Backup
 from fledge.plugins.storage.common.restore import Restore
 from fledge.plugins.storage.common import exceptions
+from fledge.plugins.storage.common import lib
 
 from fledge.services.core.api import backup_restore
 from fledge.common.storage_client.storage_client import StorageClientAsync
@@ -260,8 +263,8 @@ class TestBackup:
         mimetypes.add_type('text/plain', '.tar.gz')
 
         storage_client_mock = MagicMock(StorageClientAsync)
-        response = {'id': 1, 'file_name': '/usr/local/fledge/data/backup/fledge.db', 'ts': '2018-02-15 15:18:41',
-                    'status': '2', 'type': '1'}
+        response = {'id': 1, 'file_name': '/usr/local/fledge/data/backup/fledge_backup_2021_10_04_11_12_11.tar.gz',
+                    'ts': '2018-02-15 15:18:41', 'status': '2', 'type': '1'}
 
         # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
         if sys.version_info.major == 3 and sys.version_info.minor >= 8:
@@ -273,13 +276,62 @@ class TestBackup:
             with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
                 with patch.object(Backup, 'get_backup_details', return_value=_rv) as patch_backup_detail:
                     with patch('os.path.isfile', return_value=True):
-                        with patch('tarfile.open'):
-                            resp = await client.get('/fledge/backup/{}/download'.format(1))
-                            assert 200 == resp.status
-                            assert 'OK' == resp.reason
+                        resp = await client.get('/fledge/backup/{}/download'.format(1))
+                        assert 200 == resp.status
+                        assert 'OK' == resp.reason
                 patch_backup_detail.assert_called_once_with(1)
         assert 1 == file_res.call_count
 
+    async def test_get_backup_download_legacy_db_is_streamed(self, client, tmpdir):
+        backup_dir = tmpdir.mkdir("backup")
+        db_file = backup_dir.join("fledge_backup_2019_10_04_11_12_11.db")
+        content = os.urandom(256 * 1024)
+        db_file.write_binary(content)
+        storage_client_mock = MagicMock(StorageClientAsync)
+        response = {'id': 1, 'file_name': 'data/backup/fledge_backup_2019_10_04_11_12_11.db',
+                    'ts': '2019-10-04 11:12:11', 'status': '2', 'type': '1'}
+        # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+        if sys.version_info.major == 3 and sys.version_info.minor >= 8:
+            _rv = await mock_coro(response)
+        else:
+            _rv = asyncio.ensure_future(mock_coro(response))
+
+        with patch.object(backup_restore, '_FLEDGE_DATA', str(tmpdir)):
+            with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+                with patch.object(Backup, 'get_backup_details', return_value=_rv):
+                    with patch("aiohttp.web.FileResponse") as file_res:
+                        resp = await client.get('/fledge/backup/{}/download'.format(1))
+                        assert 200 == resp.status
+                        assert 'application/gzip' == resp.headers['Content-Type']
+                        body = await resp.read()
+                    assert 0 == file_res.call_count
+        with tarfile.open(fileobj=io.BytesIO(body), mode="r:gz") as t:
+            assert ["fledge_backup_2019_10_04_11_12_11.db"] == t.getnames()
+            assert content == t.extractfile("fledge_backup_2019_10_04_11_12_11.db").read()
+        # No archive is left behind on disk
+        assert ["fledge_backup_2019_10_04_11_12_11.db"] == os.listdir(str(backup_dir))
+
+    async def test_get_backup_details_running_with_progress(self, client):
+        storage_client_mock = MagicMock(StorageClientAsync)
+        response = {'id': 1, 'file_name': '/usr/local/fledge/data/backup/fledge_backup_2021_10_04_11_12_11.tar.gz',
+                    'ts': '2021-10-04 11:12:11', 'status': '1', 'type': '1'}
+        progress = {"phase": "copy", "percent": 45.0, "remaining": 500, "total": 1000}
+        # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+        if sys.version_info.major == 3 and sys.version_info.minor >= 8:
+            _rv = await mock_coro(response)
+        else:
+            _rv = asyncio.ensure_future(mock_coro(response))
+
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(Backup, 'get_backup_details', return_value=_rv):
+                with patch.object(lib, 'read_backup_progress', return_value=progress) as patch_progress:
+                    resp = await client.get('/fledge/backup/{}'.format(1))
+                    assert 200 == resp.status
+                    json_response = json.loads(await resp.text())
+                    assert 'RUNNING' == json_response['status']
+                    assert progress == json_response['progress']
+                patch_progress.assert_called_once_with(response['file_name'])
+
 
 class TestRestore:
     """Unit test the Restore functionality"""
@@ -6,6 +6,7 @@
 
 
 import asyncio
+import gzip
 import json
 from unittest.mock import MagicMock, patch
 import sys
@@ -14,8 +15,13 @@ from aiohttp import web
 from aiohttp.web_urldispatcher import PlainResource, DynamicResource
 import pytest
 
+from fledge.common import asset_rollup
+from fledge.common.audit_logger import AuditLogger
 from fledge.services.core.api import browser
-from fledge.services.core import connect
+from fledge.services.core import connect, server
+from fledge.services.core.asset_index import AssetIndex
+from fledge.services.core.latest_readings import LatestReadings
+from fledge.common.storage_client.payload_builder import PayloadBuilder
 from fledge.common.storage_client.storage_client import ReadingsStorageClientAsync
 
 __author__ = "Ashish Jabble"
@@ -90,7 +96,7 @@ class TestBrowserAssets:
         return loop.run_until_complete(test_client(app))
 
     def test_routes_count(self, app):
-        assert 14 == len(app.router.resources())
+        assert 15 == len(app.router.resources())
 
     def test_routes_info(self, app):
         for index, route in enumerate(app.router.routes()):
@@ -116,36 +122,41 @@ class TestBrowserAssets:
                 assert "/fledge/asset/{asset_code}/latest" == res_info["formatter"]
                 assert str(route.handler).startswith("<function asset_latest")
             elif index == 4:
+                assert "GET" == route.method
+                assert type(route.resource) is DynamicResource
+                assert "/fledge/asset/{asset_code}/export" == res_info["formatter"]
+                assert str(route.handler).startswith("<function asset_export")
+            elif index == 5:
                 assert "GET" == route.method
                 assert type(route.resource) is DynamicResource
                 assert "/fledge/asset/{asset_code}/summary" == res_info["formatter"]
                 assert str(route.handler).startswith("<function asset_all_readings_summary")
-            elif index == 5:
+            elif index == 6:
                 assert "GET" == route.method
                 assert type(route.resource) is DynamicResource
                 assert "/fledge/asset/{asset_code}/timespan" == res_info["formatter"]
                 assert str(route.handler).startswith("<function asset_reading_timespan")
-            elif index == 6:
+            elif index == 7:
                 assert "GET" == route.method
                 assert type(route.resource) is DynamicResource
                 assert "/fledge/asset/{asset_code}/{reading}" == res_info["formatter"]
                 assert str(route.handler).startswith("<function asset_reading")
-            elif index == 7:
+            elif index == 8:
                 assert "GET" == route.method
                 assert type(route.resource) is DynamicResource
                 assert "/fledge/asset/{asset_code}/{reading}/summary" == res_info["formatter"]
                 assert str(route.handler).startswith("<function asset_summary")
-            elif index == 8:
+            elif index == 9:
                 assert "GET" == route.method
                 assert type(route.resource) is DynamicResource
                 assert "/fledge/asset/{asset_code}/{reading}/series" == res_info["formatter"]
                 assert str(route.handler).startswith("<function asset_averages")
-            elif index == 9:
+            elif index == 10:
                 assert "GET" == route.method
                 assert type(route.resource) is DynamicResource
                 assert "/fledge/asset/{asset_code}/bucket/{bucket_size}" == res_info["formatter"]
                 assert str(route.handler).startswith("<function asset_datapoints_with_bucket_size")
-            elif index == 10:
+            elif index == 11:
                 assert "GET" == route.method
                 assert type(route.resource) is DynamicResource
                 assert "/fledge/asset/{asset_code}/{reading}/bucket/{bucket_size}" == res_info["formatter"]
@@ -648,3 +659,337 @@ class TestBrowserAssets:
             args, _ = query_patch.call_args
             assert json.loads(payload) == json.loads(args[0])
             query_patch.assert_called_once_with(args[0])
+
+    async def test_latest_from_cache(self, client):
+        latest = MagicMock(LatestReadings)
+        rows = [{"reading": {"sinusoid": 0.5}, "timestamp": "2024-02-19 16:35:46.000002"}]
+        _rv = await mock_coro(rows) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(rows))
+        with patch.object(server.Server, '_latest_readings', latest):
+            with patch.object(connect, 'get_readings_async') as patch_readings:
+                with patch.object(latest, 'get', return_value=_rv) as patch_get:
+                    resp = await client.get('fledge/asset/sinusoid/latest')
+                    assert 200 == resp.status
+                    assert rows == json.loads(await resp.text())
+                patch_get.assert_called_once_with('sinusoid')
+            patch_readings.assert_not_called()
+
+    async def test_mostrecent_window_from_cache(self, client):
+        latest = MagicMock(LatestReadings)
+        timestamps = {"sinusoid": "2024-02-19 16:35:46.000000", "random": "2024-02-19 16:35:50.000000"}
+        _rv1 = await mock_coro(timestamps) if sys.version_info >= (3, 8) else \
+            asyncio.ensure_future(mock_coro(timestamps))
+        result = {"count": 0, "rows": []}
+        _rv2 = await mock_coro(result) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(result))
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(server.Server, '_latest_readings', latest):
+            with patch.object(latest, 'get_timestamps', return_value=_rv1) as patch_timestamps:
+                with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+                    with patch.object(readings_storage_client_mock, 'query', return_value=_rv2) as query_patch:
+                        resp = await client.get('fledge/asset/sinusoid?mostrecent=true&seconds=10&additional=random')
+                        assert 200 == resp.status
+                        assert {"sinusoid": [], "random": []} == json.loads(await resp.text())
+                    # Only the readings in window are queried
+                    query_patch.assert_called_once()
+                    payload = json.loads(query_patch.call_args[0][0])
+                    assert {"column": "user_ts", "condition": "<=", "value": "2024-02-19 16:35:50.000000+00:00",
+                            "and": {"column": "user_ts", "condition": ">", "value": "2024-02-19 16:35:40.000000"}
+                            } == payload['where']['and']
+            patch_timestamps.assert_called_once_with(['sinusoid', 'random'])
+
+    async def test_purge_invalidates_latest(self, client):
+        latest = MagicMock(LatestReadings)
+        index = MagicMock(AssetIndex)
+        result = {"purged": 0, "readings": 0, "unsentPurged": 0, "unsentRetained": 0}
+        _rv = await mock_coro(result) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(result))
+        _rv2 = await mock_coro(None) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(None))
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(server.Server, '_latest_readings', latest):
+            with patch.object(server.Server, '_asset_index', index):
+                with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+                    with patch.object(readings_storage_client_mock, 'purge', side_effect=[_rv, _rv]):
+                        with patch.object(AuditLogger, '__init__', return_value=None):
+                            with patch.object(AuditLogger, 'information', return_value=_rv2):
+                                resp = await client.delete('fledge/asset/sinusoid')
+                                assert 200 == resp.status
+                                resp = await client.delete('fledge/asset')
+                                assert 200 == resp.status
+        assert [('sinusoid',), ()] == [c[0] for c in latest.invalidate.call_args_list]
+        assert [('sinusoid',), ()] == [c[0] for c in index.invalidate.call_args_list]
+
+    async def test_counts_and_timespan_from_index(self, client):
+        index = MagicMock(AssetIndex)
+        counts = [{"count": 10, "assetCode": "sinusoid"}]
+        timespans = [{"asset_code": "sinusoid", "oldest": "2024-02-19 16:00:00.000000",
+                      "newest": "2024-02-19 16:35:46.000000"}]
+        _rv1 = await mock_coro(counts) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(counts))
+        _rv2 = await mock_coro(timespans) if sys.version_info >= (3, 8) else \
+            asyncio.ensure_future(mock_coro(timespans))
+        with patch.object(server.Server, '_asset_index', index):
+            with patch.object(connect, 'get_readings_async') as patch_readings:
+                with patch.object(index, 'counts', return_value=_rv1):
+                    resp = await client.get('fledge/asset')
+                    assert 200 == resp.status
+                    assert counts == json.loads(await resp.text())
+                with patch.object(index, 'timespans', return_value=_rv2):
+                    resp = await client.get('fledge/asset/timespan')
+                    assert 200 == resp.status
+                    assert timespans == json.loads(await resp.text())
+            patch_readings.assert_not_called()
+
+    async def test_series_from_rollups(self, client):
+        window = (1709287200, 1709290800)
+        buckets = {("sinusoid", 1709287200): {"sinusoid": [-1.0, 1.0, 6.0, 60]},
+                   ("sinusoid", 1709287260): {"sinusoid": [-0.5, 0.5, 0.0, 60]}}
+        _rv1 = await mock_coro(window) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(window))
+        _rv2 = await mock_coro(buckets) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(buckets))
+        newer = {"count": 1, "rows": [{"min": 0.1, "max": 0.2, "average": 0.15, "timestamp": "newer"}]}
+        older = {"count": 1, "rows": [{"min": 0.3, "max": 0.4, "average": 0.35, "timestamp": "older"}]}
+        _rv3 = [await mock_coro(newer), await mock_coro(older)] if sys.version_info >= (3, 8) else \
+            [asyncio.ensure_future(mock_coro(newer)), asyncio.ensure_future(mock_coro(older))]
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_storage_async'):
+            with patch.object(asset_rollup, 'covered_window', return_value=_rv1) as patch_window:
+                with patch.object(asset_rollup, 'query_buckets', return_value=_rv2) as patch_buckets:
+                    with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+                        with patch.object(readings_storage_client_mock, 'query',
+                                          side_effect=_rv3) as query_patch:
+                            resp = await client.get('fledge/asset/sinusoid/sinusoid/series?group=minutes&minutes=120')
+                            assert 200 == resp.status
+                            assert [newer['rows'][0],
+                                    {"min": -0.5, "max": 0.5, "average": 0.0,
+                                     "timestamp": asset_rollup.local_time(1709287260, '%Y-%m-%d %H:%M')},
+                                    {"min": -1.0, "max": 1.0, "average": 0.1,
+                                     "timestamp": asset_rollup.local_time(1709287200, '%Y-%m-%d %H:%M')},
+                                    older['rows'][0]] == json.loads(await resp.text())
+                args, _ = patch_buckets.call_args
+                assert (['sinusoid'], 60, 1709287200, 1709290800, 60, 'sinusoid', 0) == args[1:]
+            args, _ = patch_window.call_args
+            assert ['sinusoid'] == args[1] and 60 == args[2] and 7200 == args[4] - args[3]
+        # Readings newer and older than the rollups window
+        newer_payload, older_payload = [json.loads(c[0][0]) for c in query_patch.call_args_list]
+        assert {"column": "user_ts", "condition": ">=", "value": "2024-03-01 11:00:00"} == newer_payload['where']['and']
+        assert {"column": "user_ts", "condition": "newer", "value": 7200,
+                "and": {"column": "user_ts", "condition": "<", "value": "2024-03-01 10:00:00"}} == \
+            older_payload['where']['and']
+        assert "YYYY-MM-DD HH24:MI" == older_payload['group']['format']
+
+    async def test_readings_bucket_without_rollups(self, client):
+        result = {"count": 1, "rows": [{"min": 0.1, "max": 0.2, "average": 0.15, "timestamp": "2024-03-01 10:00:00"}]}
+        _rv = await mock_coro(None) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(None))
+        _rv2 = await mock_coro(result) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(result))
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_storage_async'):
+            with patch.object(asset_rollup, 'covered_window', return_value=_rv) as patch_window:
+                with patch.object(asset_rollup, 'query_buckets') as patch_buckets:
+                    with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+                        with patch.object(readings_storage_client_mock, 'query',
+                                          return_value=_rv2) as query_patch:
+                            resp = await client.get(
+                                'fledge/asset/sinusoid/sinusoid/bucket/60?start=1709287200&length=600')
+                            assert 200 == resp.status
+                            assert result['rows'] == json.loads(await resp.text())
+                patch_buckets.assert_not_called()
+            args, _ = patch_window.call_args
+            assert (['sinusoid'], 60, 1709287200.0, 1709287800.0, 60, 0) == args[1:]
+        payload = json.loads(query_patch.call_args[0][0])
+        assert 10 == payload['limit']
+        assert {"column": "user_ts", "condition": ">=", "value": "2024-03-01 10:00:00",
+                "and": {"column": "user_ts", "condition": "<=", "value": "2024-03-01 10:10:00"}} == \
+            payload['where']['and']
+
+    async def test_datapoints_bucket_from_rollups(self, client):
+        window = (1709287170, 1709287770)
+        buckets = {("sinusoid", 1709287200): {"sinusoid": [-1.0, 1.0, 6.0, 60]}}
+        _rv1 = await mock_coro(window) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(window))
+        _rv2 = await mock_coro(buckets) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(buckets))
+        _rv3 = [await mock_coro({"count": 0, "rows": []}), await mock_coro({"count": 0, "rows": []})] \
+            if sys.version_info >= (3, 8) else [asyncio.ensure_future(mock_coro({"count": 0, "rows": []})),
+                                                asyncio.ensure_future(mock_coro({"count": 0, "rows": []}))]
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_storage_async'):
+            with patch.object(asset_rollup, 'covered_window', return_value=_rv1) as patch_window:
+                with patch.object(asset_rollup, 'query_buckets', return_value=_rv2):
+                    with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+                        with patch.object(readings_storage_client_mock, 'query',
+                                          side_effect=_rv3):
+                            resp = await client.get('fledge/asset/sinusoid/bucket/60?start=1709287140&length=600')
+                            assert 200 == resp.status
+                            assert [{"asset_code": "sinusoid", "timestamp": asset_rollup.local_time(1709287200),
+                                     "reading": {"sinusoid": {"min": -1.0, "max": 1.0, "average": 0.1, "count": 60,
+                                                              "sum": 6.0}}}] == json.loads(await resp.text())
+            # buckets are keyed by their rounded middle
+            args, _ = patch_window.call_args
+            assert (['sinusoid'], 1, 60, 30) == (args[1], args[2], args[5], args[6])
+
+    async def test_reading_downsampled(self, client):
+        rows = [{"timestamp": "2024-03-01 10:00:{:02d}.000000".format(s), "temperature": v}
+                for s, v in enumerate([1.0, 1.0, 9.0, 1.0, "n/a", 1.0, 1.0])]
+        results = [{"count": len(rows), "rows": rows}] + [{"count": 0, "rows": []}] * (browser.DOWNSAMPLE_SLICES - 1)
+        _rv = [await mock_coro(r) for r in results] if sys.version_info >= (3, 8) else \
+            [asyncio.ensure_future(mock_coro(r)) for r in results]
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+            with patch.object(readings_storage_client_mock, 'query', side_effect=_rv) as patch_query:
+                resp = await client.get('fledge/asset/fogbench_humidity/temperature?minutes=10&downsample=minmax&'
+                                        'points=2')
+                assert 200 == resp.status
+                # the minimum and maximum of a single bucket, newest first
+                assert [rows[2], rows[0]] == json.loads(await resp.text())
+        assert browser.DOWNSAMPLE_SLICES == patch_query.call_count
+        args, _ = patch_query.call_args_list[0]
+        payload = json.loads(args[0])
+        assert [{"column": "user_ts", "direction": "asc"}, {"column": "id", "direction": "asc"}] == payload['sort']
+        assert browser.DOWNSAMPLE_PAGE_SIZE == payload['limit']
+        assert "id" in payload['return']
+        assert "in" == payload['where']['condition']
+        assert ">=" == payload['where']['and']['condition']
+        assert "<" == payload['where']['and']['and']['condition']
+        args, _ = patch_query.call_args
+        assert "<=" == json.loads(args[0])['where']['and']['and']['condition']
+
+    async def test_stream_readings_pages(self):
+        def row(_id, second):
+            return {"id": _id, "timestamp": "2024-03-01 10:00:{:02d}.000000".format(second), "x": _id}
+        # 3 readings share the timestamp of the end of the first page, more than a page
+        pages = [[row(1, 0), row(2, 1)], [row(2, 1), row(3, 1)], [row(2, 1), row(3, 1), row(4, 1), row(5, 2)],
+                 [row(5, 2), row(6, 3)], [row(6, 3)]]
+        queries = []
+
+        async def query(payload):
+            queries.append(json.loads(payload))
+            return {"count": len(pages[0]), "rows": pages.pop(0) if pages else []}
+
+        def select():
+            return PayloadBuilder().SELECT(("id", "user_ts", "x")).ALIAS("return", ("user_ts", "timestamp")) \
+                .chain_payload()
+
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+            with patch.object(readings_storage_client_mock, 'query', side_effect=query):
+                with patch.object(browser, 'DOWNSAMPLE_SLICES', 1):
+                    with patch.object(browser, 'DOWNSAMPLE_PAGE_SIZE', 2):
+                        rows = [r async for r in browser._stream_readings(["a"], select, 1709287200, 1709287260)]
+        # each reading once, in time order and without its id
+        assert [1, 2, 3, 4, 5, 6] == [r["x"] for r in rows]
+        assert all("id" not in r for r in rows)
+        assert [2, 2, 4, 2, 2] == [q['limit'] for q in queries]
+        assert ["2024-03-01 10:00:00.000000", "2024-03-01 10:00:01.000000", "2024-03-01 10:00:01.000000",
+                "2024-03-01 10:00:02.000000", "2024-03-01 10:00:03.000000"] == [
+            q['where']['and']['value'] for q in queries]
+
+    @pytest.mark.parametrize("request_params, message", [
+        ('?downsample=lttb&points=100', "downsample can only be given if one of seconds, minutes or hours is also "
+                                        "given"),
+        ('?minutes=10&downsample=lttb', "points must be an integer of at least 3 for lttb"),
+        ('?minutes=10&downsample=lttb&points=2', "points must be an integer of at least 3 for lttb"),
+        ('?minutes=10&downsample=avg&points=10', "downsample must be one of lttb, minmax"),
+        ('?minutes=-1&downsample=minmax&points=10', "Time must be a positive integer")
+    ])
+    async def test_bad_downsample(self, client, request_params, message):
+        resp = await client.get('fledge/asset/fogbench_humidity/temperature{}'.format(request_params))
+        assert 400 == resp.status
+        assert message == resp.reason
+
+    async def test_readings_bucket_downsampled(self, client):
+        rows = [{"timestamp": "2024-03-01 10:00:{:02d}.000000".format(s), "sinusoid": float(s % 3)} for s in range(9)]
+        results = [{"count": len(rows), "rows": rows}] + [{"count": 0, "rows": []}] * (browser.DOWNSAMPLE_SLICES - 1)
+        _rv = [await mock_coro(r) for r in results] if sys.version_info >= (3, 8) else \
+            [asyncio.ensure_future(mock_coro(r)) for r in results]
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+            with patch.object(readings_storage_client_mock, 'query', side_effect=_rv):
+                # the number of buckets is the default number of points
+                resp = await client.get('fledge/asset/sinusoid/sinusoid/bucket/3?start=1709287200&length=9&'
+                                        'downsample=lttb')
+                assert 200 == resp.status
+                result = json.loads(await resp.text())
+        assert 3 == len(result)
+        assert rows[-1] == result[0] and rows[0] == result[-1]
+
+    async def test_datapoints_bucket_downsampled(self, client):
+        rows = [{"asset_code": "a", "timestamp": "2024-03-01 10:00:0{}.000000".format(s),
+                 "reading": {"x": float(s), "y": float(-s), "label": "z"}} for s in range(6)]
+        results = [{"count": len(rows), "rows": rows}] + [{"count": 0, "rows": []}] * (browser.DOWNSAMPLE_SLICES - 1)
+        _rv = [await mock_coro(r) for r in results] if sys.version_info >= (3, 8) else \
+            [asyncio.ensure_future(mock_coro(r)) for r in results]
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+            with patch.object(readings_storage_client_mock, 'query', side_effect=_rv):
+                resp = await client.get('fledge/asset/a/bucket/1?start=1709287200&length=6&downsample=minmax&'
+                                        'points=2')
+                assert 200 == resp.status
+                # the rows selected for any datapoint, once each
+                assert [rows[5], rows[0]] == json.loads(await resp.text())
+
+    @pytest.mark.parametrize("request_params, content_type", [
+        ('', 'application/x-ndjson'),
+        ('?format=ndjson', 'application/x-ndjson'),
+        ('?compress=gzip', 'application/gzip')
+    ])
+    async def test_export_ndjson(self, client, request_params, content_type):
+        pages = [{"count": 2, "rows": [
+                     {"id": 1, "asset_code": "a", "timestamp": "2024-03-01 10:00:00.000000", "reading": {"x": 1}},
+                     {"id": 4, "asset_code": "b", "timestamp": "2024-03-01 10:00:01.000000", "reading": {"x": 2}}]},
+                 {"count": 1, "rows": [
+                     {"id": 7, "asset_code": "a", "timestamp": "2024-03-01 10:00:02.000000", "reading": {"x": 3}}]}]
+        _rv = [await mock_coro(p) for p in pages] if sys.version_info >= (3, 8) else \
+            [asyncio.ensure_future(mock_coro(p)) for p in pages]
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(browser, 'EXPORT_PAGE_SIZE', 2):
+            with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+                with patch.object(readings_storage_client_mock, 'query', side_effect=_rv) as patch_query:
+                    resp = await client.get('fledge/asset/a,b/export{}'.format(request_params))
+                    assert 200 == resp.status
+                    assert content_type == resp.headers['Content-Type']
+                    body = await resp.read()
+        if 'gzip' in request_params:
+            assert 'attachment; filename="a_b.ndjson.gz"' == resp.headers['Content-Disposition']
+            body = gzip.decompress(body)
+        assert pages[0]['rows'] + pages[1]['rows'] == [json.loads(line) for line in body.decode().splitlines()]
+        # keyset pagination on the reading id
+        assert 2 == patch_query.call_count
+        for (args, _), last_id in zip(patch_query.call_args_list, (0, 4)):
+            payload = json.loads(args[0])
+            assert {"column": "asset_code", "condition": "in", "value": ["a", "b"],
+                    "and": {"column": "id", "condition": ">", "value": last_id}} == payload['where']
+            assert {"column": "id", "direction": "asc"} == payload['sort']
+            assert 2 == payload['limit']
+
+    async def test_export_csv(self, client):
+        page = {"count": 1, "rows": [{"id": 1, "asset_code": "a", "timestamp": "2024-03-01 10:00:00.000000",
+                                      "reading": {"x": 1.5, "label": "a, b", "image": "__DPIMAGE:2,2,8_AAAA"}}]}
+        _rv = await mock_coro(page) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(page))
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+            with patch.object(readings_storage_client_mock, 'query', return_value=_rv) as patch_query:
+                resp = await client.get('fledge/asset/a/export?format=csv&minutes=10')
+                assert 200 == resp.status
+                assert 'text/csv' == resp.headers['Content-Type']
+                assert ['id,asset_code,timestamp,datapoint,value',
+                        '1,a,2024-03-01 10:00:00.000000,x,1.5',
+                        '1,a,2024-03-01 10:00:00.000000,label,"a, b"',
+                        '1,a,2024-03-01 10:00:00.000000,image,{}'.format(browser.IMAGE_PLACEHOLDER)] == \
+                    (await resp.text()).splitlines()
+        args, _ = patch_query.call_args
+        window = json.loads(args[0])['where']['and']['and']
+        assert (">=", "<=") == (window['condition'], window['and']['condition'])
+
+    @pytest.mark.parametrize("request_params, message", [
+        ('?format=xml', "format must be one of ndjson, csv"),
+        ('?compress=zip', "compress must be gzip"),
+        ('?images=none', "images request query should either be include or exclude.")
+    ])
+    async def test_bad_export(self, client, request_params, message):
+        resp = await client.get('fledge/asset/a/export{}'.format(request_params))
+        assert 400 == resp.status
+        assert message == resp.reason
+
+    async def test_export_storage_error(self, client):
+        result = {"message": "Storage error"}
+        _rv = await mock_coro(result) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(result))
+        readings_storage_client_mock = MagicMock(ReadingsStorageClientAsync)
+        with patch.object(connect, 'get_readings_async', return_value=readings_storage_client_mock):
+            with patch.object(readings_storage_client_mock, 'query', return_value=_rv):
+                resp = await client.get('fledge/asset/a/export')
+                assert 400 == resp.status
+                assert "Storage error" == resp.reason
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+from aiohttp import web
+import pytest
+
+from fledge.common.job_manager import JobManager, JobManagerSingleton
+from fledge.common.web import middleware
+from fledge.services.core import routes
+from fledge.services.core.support import SupportBuilder
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+class TestJob:
+
+    @pytest.fixture
+    def client(self, loop, test_client):
+        JobManagerSingleton._shared_state = {}
+        app = web.Application(loop=loop, middlewares=[middleware.optional_auth_middleware])
+        # fill the routes table
+        routes.setup(app)
+        yield loop.run_until_complete(test_client(app))
+        loop.run_until_complete(JobManager().stop())
+        JobManagerSingleton._shared_state = {}
+
+    async def test_get_jobs(self, client):
+        done = JobManager().submit("done", lambda job: "result")
+        await done.wait()
+        resp = await client.get('/fledge/job')
+        assert 200 == resp.status
+        jobs = json.loads(await resp.text())['jobs']
+        assert [done.to_dict()] == jobs
+        assert "result" == jobs[0]["result"]
+        resp = await client.get('/fledge/job?status=running')
+        assert {"jobs": []} == json.loads(await resp.text())
+
+    async def test_get_job(self, client):
+        done = JobManager().submit("done", lambda job: None)
+        await done.wait()
+        resp = await client.get('/fledge/job/{}'.format(done.id))
+        assert 200 == resp.status
+        assert "completed" == json.loads(await resp.text())["status"]
+        resp = await client.get('/fledge/job/blah')
+        assert 404 == resp.status
+        assert "Job blah not found" == resp.reason
+
+    async def test_cancel_job(self, client):
+        release = threading.Event()
+
+        def work(job):
+            release.wait(5)
+            job.check_cancelled()
+
+        running = JobManager().submit("running", work)
+        await asyncio.sleep(0.1)
+        resp = await client.delete('/fledge/job/{}'.format(running.id))
+        assert 200 == resp.status
+        assert "running" == json.loads(await resp.text())["status"]
+        release.set()
+        await asyncio.sleep(0.1)
+        assert "cancelled" == running.status
+        resp = await client.delete('/fledge/job/blah')
+        assert 404 == resp.status
+
+        done = JobManager().submit("done", lambda job: None)
+        await done.wait()
+        resp = await client.delete('/fledge/job/{}'.format(done.id))
+        assert 409 == resp.status
+        assert "Job {} is already completed".format(done.id) == resp.reason
+
+    async def test_support_bundle_job(self, client):
+        async def build(job=None):
+            job.set_progress(50, "half way")
+            return 'support-180301-13-35-23.tar.gz'
+
+        with patch.object(SupportBuilder, "__init__", return_value=None):
+            with patch.object(SupportBuilder, "build", side_effect=build):
+                resp = await client.post('/fledge/support')
+                assert 202 == resp.status
+                result = json.loads(await resp.text())
+                assert "Support bundle creation started." == result["message"]
+                assert "fledge/job/{}".format(result["id"]) == result["statusLink"]
+                assert result["bundle"].startswith("support-") and result["bundle"].endswith(".tar.gz")
+                assert "fledge/support/{}".format(result["bundle"]) == result["bundleLink"]
+                await JobManager().get(result["id"]).wait()
+        resp = await client.get('/fledge/job/{}'.format(result["id"]))
+        assert {"status": "completed", "progress": 100, "message": "half way",
+                "result": 'support-180301-13-35-23.tar.gz'} == {
+            k: v for k, v in json.loads(await resp.text()).items() if k in ("status", "progress", "message", "result")}
+
+    async def test_bad_wait(self, client):
+        resp = await client.post('/fledge/support?wait=blah')
+        assert 400 == resp.status
+        assert "wait must be true or false" == resp.reason
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+import asyncio
+import json
+import sys
+import uuid
+from unittest.mock import MagicMock, patch
+import pytest
+from aiohttp import web
+
+from fledge.common.configuration_manager import ConfigurationManager
+from fledge.common.plugin_discovery import PluginDiscovery
+from fledge.common.storage_client.storage_client import StorageClientAsync
+from fledge.services.core import connect, routes, server
+from fledge.services.core.api import north
+from fledge.services.core.scheduler.entities import StartUpSchedule
+from fledge.services.core.scheduler.scheduler import Scheduler
+from fledge.services.core.service_registry.service_registry import ServiceRegistry
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+async def mock_coro(return_value):
+    return return_value
+
+
+def _schedule(name, enabled):
+    sch = StartUpSchedule()
+    sch.schedule_id = uuid.uuid4()
+    sch.name = name
+    sch.process_name = "north_C"
+    sch.enabled = enabled
+    return sch
+
+
+class TestNorth:
+    """ North services overview API """
+
+    @pytest.fixture
+    def client(self, loop, test_client):
+        app = web.Application(loop=loop)
+        routes.setup(app)
+        return loop.run_until_complete(test_client(app))
+
+    @pytest.fixture(autouse=True)
+    def registry(self):
+        ServiceRegistry._registry = []
+        north._get_installed_plugins.cache_clear()
+        yield
+        ServiceRegistry._registry = []
+        north._get_installed_plugins.cache_clear()
+
+    async def test_get_north_services(self, client):
+        ServiceRegistry.register("OMF", "Northbound", "127.0.0.1", 1234, 4321, 'http')
+        server.Server.scheduler = Scheduler(None, None)
+        children = [{"key": "OMF"}, {"key": "HTTP"}]
+        schedules = [_schedule("OMF", True), _schedule("HTTP", False), _schedule("Other", True)]
+        stats = {"rows": [{"key": "OMF", "value": 100}], "count": 1}
+        plugins = {"OMF": "OMF", "HTTP": "httpc"}
+        installed = [{"name": "OMF", "version": "2.4.0"}]
+        if sys.version_info >= (3, 8):
+            _rv1 = await mock_coro(children)
+            _rv2 = await mock_coro(schedules)
+            _rv3 = await mock_coro({})
+            _rv4 = await mock_coro(stats)
+            _rv5 = await mock_coro(plugins)
+        else:
+            _rv1 = asyncio.ensure_future(mock_coro(children))
+            _rv2 = asyncio.ensure_future(mock_coro(schedules))
+            _rv3 = asyncio.ensure_future(mock_coro({}))
+            _rv4 = asyncio.ensure_future(mock_coro(stats))
+            _rv5 = asyncio.ensure_future(mock_coro(plugins))
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(ConfigurationManager, 'get_category_child', return_value=_rv1):
+                with patch.object(server.Server.scheduler, 'get_schedules', return_value=_rv2):
+                    with patch.object(north, '_get_tasks_status', return_value=_rv3):
+                        with patch.object(storage_client_mock, 'query_tbl_with_payload',
+                                          return_value=_rv4) as patch_query:
+                            with patch.object(ConfigurationManager, 'get_categories_item_value_entry',
+                                              return_value=_rv5) as patch_plugins:
+                                with patch.object(PluginDiscovery, 'get_plugins_installed',
+                                                  return_value=installed):
+                                    resp = await client.get('/fledge/north')
+                                    assert 200 == resp.status
+                                    result = json.loads(await resp.text())
+                            patch_plugins.assert_called_once_with(["OMF", "HTTP"], 'plugin')
+                        patch_query.assert_called_once()
+        assert ["OMF", "HTTP"] == [r['name'] for r in result]
+        assert 'running' == result[0]['status']
+        assert 100 == result[0]['sent']
+        assert {"name": "OMF", "version": "2.4.0"} == result[0]['plugin']
+        assert '' == result[1]['status']
+        assert -1 == result[1]['sent']
+        assert {"name": "httpc", "version": ""} == result[1]['plugin']
+
+    async def test_get_tasks_status(self):
+        server.Server.scheduler = Scheduler(None, None)
+        rows = [{"schedule_name": "HTTP", "process_name": "north", "state": 2},
+                {"schedule_name": "OMF", "process_name": "north_c", "state": 1},
+                {"schedule_name": "purge", "process_name": "purge", "state": 2}]
+        _rv = await mock_coro(rows) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(rows))
+        with patch.object(server.Server.scheduler, 'get_latest_tasks', return_value=_rv):
+            tasks = await north._get_tasks_status()
+        assert {"HTTP": rows[0], "OMF": rows[1]} == tasks
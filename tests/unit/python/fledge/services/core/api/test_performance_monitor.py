@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+import asyncio
+import json
+import sys
+from unittest.mock import MagicMock, patch
+import pytest
+from aiohttp import web
+
+from fledge.common.storage_client.storage_client import StorageClientAsync
+from fledge.services.core import connect, routes
+
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+class TestPerformanceMonitor:
+    """ Performance monitors API """
+
+    @pytest.fixture
+    def client(self, loop, test_client):
+        app = web.Application(loop=loop)
+        routes.setup(app)
+        return loop.run_until_complete(test_client(app))
+
+    async def async_mock(self, return_value):
+        return return_value
+
+    async def test_get_all(self, client):
+        rows = [{"service": "Sine", "monitor": "queueLength", "average": 10, "maximum": 12, "minimum": 8,
+                 "samples": 60, "timestamp": "2024-02-19 16:35:46.736"},
+                {"service": "Sine", "monitor": "queueLength", "average": 11, "maximum": 13, "minimum": 9,
+                 "samples": 60, "timestamp": "2024-02-19 16:34:46.713"},
+                {"service": "Storage", "monitor": "insert rows log", "average": 1, "maximum": 1, "minimum": 1,
+                 "samples": 2, "timestamp": "2024-02-19 16:35:46.690"}]
+        result = {"rows": rows, "count": 3}
+        rv = await self.async_mock(result) if sys.version_info >= (3, 8) else \
+            asyncio.ensure_future(self.async_mock(result))
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=rv) as patch_query:
+                resp = await client.get('/fledge/monitors')
+                assert 200 == resp.status
+                json_response = json.loads(await resp.text())
+                assert {"Sine", "Storage"} == set(json_response['monitors'].keys())
+                assert 2 == len(json_response['monitors']['Sine']['queueLength'])
+                assert 'service' not in json_response['monitors']['Sine']['queueLength'][0]
+            args, _ = patch_query.call_args
+            assert 'monitors' == args[0]
+            payload = json.loads(args[1])
+            assert 'sort' not in payload
+            assert 'where' not in payload
+            assert 'limit' not in payload
+
+    async def test_get_by_service_with_window_and_limit(self, client):
+        # latest first from storage, returned oldest first as without a limit
+        rows = [{"service": "Sine", "monitor": "queueLength", "average": 11, "maximum": 13, "minimum": 9,
+                 "samples": 60, "timestamp": "2024-02-19 16:35:46.713"},
+                {"service": "Sine", "monitor": "queueLength", "average": 10, "maximum": 12, "minimum": 8,
+                 "samples": 60, "timestamp": "2024-02-19 16:34:46.736"}]
+        result = {"rows": rows, "count": 2}
+        rv = await self.async_mock(result) if sys.version_info >= (3, 8) else \
+            asyncio.ensure_future(self.async_mock(result))
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=rv) as patch_query:
+                resp = await client.get('/fledge/monitors/Sine?from=1708360000&to=1708363600&limit=10')
+                assert 200 == resp.status
+                json_response = json.loads(await resp.text())
+                assert "Sine" == json_response["service"]
+                assert ["2024-02-19 16:34:46.736", "2024-02-19 16:35:46.713"] == [
+                    v["timestamp"] for v in json_response["monitors"][0]["values"]]
+            args, _ = patch_query.call_args
+            payload = json.loads(args[1])
+            assert {"column": "service", "condition": "=", "value": "Sine",
+                    "and": {"column": "ts", "condition": ">=", "value": "2024-02-19 16:26:40.000000",
+                            "and": {"column": "ts", "condition": "<=", "value": "2024-02-19 17:26:40.000000"}}
+                    } == payload['where']
+            assert 10 == payload['limit']
+            assert {"column": "ts", "direction": "desc"} == payload['sort']
+
+    async def test_get_by_service_and_counter_with_bucket(self, client):
+        rows = [{"service": "Sine", "monitor": "queueLength", "average": 10.5, "maximum": 13, "minimum": 8,
+                 "samples": 120, "timestamp": "2024-02-19 16:30:00"}]
+        result = {"rows": rows, "count": 1}
+        rv = await self.async_mock(result) if sys.version_info >= (3, 8) else \
+            asyncio.ensure_future(self.async_mock(result))
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=rv) as patch_query:
+                resp = await client.get('/fledge/monitors/Sine/queueLength?bucket=600')
+                assert 200 == resp.status
+                json_response = json.loads(await resp.text())
+                assert {"service": "Sine", "monitors": {"monitor": "queueLength", "values": [
+                    {"average": 10.5, "maximum": 13, "minimum": 8, "samples": 120,
+                     "timestamp": "2024-02-19 16:30:00"}]}} == json_response
+            args, _ = patch_query.call_args
+            payload = json.loads(args[1])
+            assert 'sort' not in payload
+            assert "service, monitor" == payload['group']
+            assert {"timestamp": "ts", "size": "600", "format": "YYYY-MM-DD HH24:MI:SS",
+                    "alias": "timestamp"} == payload['timebucket']
+            assert ['min', 'max', 'avg', 'sum'] == [a['operation'] for a in payload['aggregate']]
+
+    @pytest.mark.parametrize("query, msg", [
+        ("from=blah", "from must be a valid UTC timestamp in seconds since epoch."),
+        ("to=blah", "to must be a valid UTC timestamp in seconds since epoch."),
+        ("limit=0", "limit must be a positive integer."),
+        ("limit=-1", "limit must be a positive integer."),
+        ("bucket=blah", "bucket must be a positive integer in seconds."),
+        ("bucket=0", "bucket must be a positive integer in seconds.")
+    ])
+    async def test_bad_query_params(self, client, query, msg):
+        for url in ('/fledge/monitors', '/fledge/monitors/Sine', '/fledge/monitors/Sine/queueLength'):
+            resp = await client.get('{}?{}'.format(url, query))
+            assert 400 == resp.status
+            assert msg == resp.reason
+            assert {"message": msg} == json.loads(await resp.text())
@@ -1127,45 +1127,39 @@ class TestTasks:
                     assert 404 == resp.status
                     assert "No Tasks found" == resp.reason
 
-    @pytest.mark.parametrize("request_params", ['', '?name=bla'])
-    async def test_get_tasks_latest(self, client, request_params):
-        storage_client_mock = MagicMock(StorageClientAsync)
-        response = {'count': 2, 'rows': [
-            {'pid': '1', 'reason': '', 'exit_code': '0', 'id': '1',
-             'process_name': 'bla', 'schedule_name': 'bla', 'end_time': '2018', 'start_time': '2018', 'state': '2'}]}
-        
+    @pytest.mark.parametrize("request_params, name", [('', None), ('?name=bla', 'bla')])
+    async def test_get_tasks_latest(self, client, request_params, name):
+        rows = [{'pid': '1', 'reason': '', 'exit_code': '0', 'id': '1', 'process_name': 'bla', 'schedule_name': 'bla',
+                 'end_time': '2018', 'start_time': '2018', 'state': '2'}]
+
         # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
         if sys.version_info.major == 3 and sys.version_info.minor >= 8:
-            _rv1 = await mock_coro_response(response)
+            _rv1 = await mock_coro_response(rows)
         else:
-            _rv1 = asyncio.ensure_future(mock_coro_response(response))
-        
-        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
-            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=_rv1):
-                resp = await client.get('/fledge/task/latest{}'.format(request_params))
-                assert 200 == resp.status
-                result = await resp.text()
-                json_response = json.loads(result)
-                assert {'tasks': [{'reason': '', 'name': 'bla', 'processName': 'bla',
-                                   'state': 'Complete', 'exitCode': '0', 'endTime': '2018',
-                                   'pid': '1', 'startTime': '2018', 'id': '1'}]} == json_response
+            _rv1 = asyncio.ensure_future(mock_coro_response(rows))
+
+        with patch.object(server.Server.scheduler, 'get_latest_tasks', return_value=_rv1) as patch_latest:
+            resp = await client.get('/fledge/task/latest{}'.format(request_params))
+            assert 200 == resp.status
+            result = await resp.text()
+            json_response = json.loads(result)
+            assert {'tasks': [{'reason': '', 'name': 'bla', 'processName': 'bla',
+                               'state': 'Complete', 'exitCode': '0', 'endTime': '2018',
+                               'pid': '1', 'startTime': '2018', 'id': '1'}]} == json_response
+        patch_latest.assert_called_once_with(name)
 
     @pytest.mark.parametrize("request_params", ['', '?name=not_exist'])
     async def test_get_tasks_latest_no_task_exception(self, client, request_params):
-        storage_client_mock = MagicMock(StorageClientAsync)
-        response = {'count': 0, 'rows': []}
-        
         # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
         if sys.version_info.major == 3 and sys.version_info.minor >= 8:
-            _rv1 = await mock_coro_response(response)
+            _rv1 = await mock_coro_response([])
         else:
-            _rv1 = asyncio.ensure_future(mock_coro_response(response))
-        
-        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
-            with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=_rv1):
-                resp = await client.get('/fledge/task/latest{}'.format(request_params))
-                assert 404 == resp.status
-                assert "No Tasks found" == resp.reason
+            _rv1 = asyncio.ensure_future(mock_coro_response([]))
+
+        with patch.object(server.Server.scheduler, 'get_latest_tasks', return_value=_rv1):
+            resp = await client.get('/fledge/task/latest{}'.format(request_params))
+            assert 404 == resp.status
+            assert "No Tasks found" == resp.reason
 
     async def test_cancel_task(self, client):
         async def mock_coro():
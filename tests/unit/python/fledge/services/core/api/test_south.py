@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+import asyncio
+import json
+import sys
+from unittest.mock import MagicMock, patch
+import pytest
+from aiohttp import web
+
+from fledge.common.configuration_manager import ConfigurationManager
+from fledge.common.plugin_discovery import PluginDiscovery
+from fledge.common.storage_client.storage_client import StorageClientAsync
+from fledge.services.core import connect, routes
+from fledge.services.core.api import south
+from fledge.services.core.service_registry.service_registry import ServiceRegistry
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+async def mock_coro(return_value):
+    return return_value
+
+
+class TestSouth:
+    """ South services overview API """
+
+    @pytest.fixture
+    def client(self, loop, test_client):
+        app = web.Application(loop=loop)
+        routes.setup(app)
+        return loop.run_until_complete(test_client(app))
+
+    @pytest.fixture(autouse=True)
+    def registry(self):
+        ServiceRegistry._registry = []
+        south._get_installed_plugins.cache_clear()
+        yield
+        ServiceRegistry._registry = []
+        south._get_installed_plugins.cache_clear()
+
+    async def test_get_south_services(self, client):
+        ServiceRegistry.register("Sine", "Southbound", "127.0.0.1", 1234, 4321, 'http')
+        children = [{"key": "Sine"}, {"key": "Random"}, {"key": "Remote"}]
+        plugins = {"Sine": "sinusoid", "Random": "random", "Remote": None}
+        tables = {
+            'asset_tracker': {"rows": [{"service": "Sine", "asset": "sinusoid", "plugin": "sinusoid"},
+                                       {"service": "Random", "asset": "random", "plugin": "random"},
+                                       {"service": "Random", "asset": "old", "plugin": "oldplugin"}], "count": 3},
+            'statistics': {"rows": [{"key": "SINUSOID", "value": 10}, {"key": "RANDOM", "value": 5}], "count": 2},
+            'schedules': {"rows": [{"schedule_name": "Sine", "enabled": "t"},
+                                   {"schedule_name": "Random", "enabled": "f"}], "count": 2}
+        }
+
+        async def query_tbl_with_payload(tbl_name, payload):
+            return tables[tbl_name]
+
+        storage_client_mock = MagicMock(StorageClientAsync)
+        installed = [{"name": "sinusoid", "version": "2.4.0"}, {"name": "random", "version": "2.3.0"}]
+        _rv1 = await mock_coro(children) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(children))
+        _rv2 = await mock_coro(plugins) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_coro(plugins))
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(ConfigurationManager, 'get_category_child', return_value=_rv1):
+                with patch.object(ConfigurationManager, 'get_categories_item_value_entry',
+                                  return_value=_rv2) as patch_plugins:
+                    with patch.object(PluginDiscovery, 'get_plugins_installed',
+                                      return_value=installed) as patch_installed:
+                        with patch.object(storage_client_mock, 'query_tbl_with_payload',
+                                          side_effect=query_tbl_with_payload) as patch_query:
+                            resp = await client.get('/fledge/south')
+                            assert 200 == resp.status
+                            services = json.loads(await resp.text())['services']
+                            # cached installed plugins list is reused on next request
+                            resp = await client.get('/fledge/south')
+                            assert 200 == resp.status
+                        patch_installed.assert_called_once_with("south", False)
+                patch_plugins.assert_called_with(["Sine", "Random", "Remote"], 'plugin')
+        # One asset tracker, statistics and schedules query per request
+        assert ['asset_tracker', 'statistics', 'schedules'] * 2 == [c[0][0] for c in patch_query.call_args_list]
+        assert ["Sine", "Random", "Remote"] == [s['name'] for s in services]
+        assert 'running' == services[0]['status']
+        assert [{"count": 10, "asset": "sinusoid"}] == services[0]['assets']
+        assert {"name": "sinusoid", "version": "2.4.0"} == services[0]['plugin']
+        assert services[0]['schedule_enabled'] is True
+        assert [{"count": 5, "asset": "random"}] == services[1]['assets']
+        assert services[1]['schedule_enabled'] is False
+        assert {"name": "", "version": ""} == services[2]['plugin']
+        assert [] == services[2]['assets']
+        assert 'unknown' == services[2]['schedule_enabled']
+
+    async def test_get_south_services_without_category(self, client):
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(ConfigurationManager, 'get_category_child', side_effect=ValueError):
+                resp = await client.get('/fledge/south')
+                assert 200 == resp.status
+                assert {'services': []} == json.loads(await resp.text())
@@ -15,7 +15,7 @@ from aiohttp import web
 import pytest
 
 from fledge.services.core import routes
-from fledge.services.core import connect
+from fledge.services.core import connect, server
 from fledge.common.storage_client.storage_client import StorageClientAsync
 
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -264,6 +264,37 @@ class TestStatistics:
         assert query_patch.called
         assert 3 == query_patch.call_count
 
+    async def test_get_statistics_history_in_core(self, client):
+        # rows of an idle key skipped by a resident stats collector are reported as 0, limit is the time of as many
+        # collections
+        output = {"interval": 60, 'statistics': [{"READINGS": 1, "BUFFERED": 0, "history_ts": "2018-02-20 13:16:24.321"},
+                                                 {"READINGS": 0, "BUFFERED": 10, "history_ts": "2018-02-20 13:15:24.321"}]}
+        p1 = {"return": [{"column": "history_ts", "alias": "history_ts", "format": "YYYY-MM-DD HH24:MI:SS.MS"}, "key", "value"],
+              "sort": {"column": "history_ts", "direction": "desc"},
+              "where": {"column": "1", "condition": "=", "value": 1,
+                        "and": {"column": "history_ts", "condition": "newer", "value": 120}}}
+
+        @asyncio.coroutine
+        def q_result(*args):
+            table = args[0]
+            if table == 'statistics_history':
+                assert p1 == json.loads(args[1])
+                return {"rows": [{"key": "READINGS", "value": 1, "history_ts": "2018-02-20 13:16:24.321"},
+                                 {"key": "READINGS", "value": 0, "history_ts": "2018-02-20 13:15:24.321"},
+                                 {"key": "BUFFERED", "value": 10, "history_ts": "2018-02-20 13:15:24.321"},
+                                 {"key": "BUFFERED", "value": 0, "history_ts": "2018-02-20 13:14:24.321"}]}
+            if table == 'schedules':
+                return {"rows": [{"schedule_interval": "00:01:00"}]}
+
+        mock_async_storage_client = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=mock_async_storage_client):
+            with patch.object(server.Server, 'scheduler', MagicMock(stats_collector_in_core=True)):
+                with patch.object(mock_async_storage_client, 'query_tbl_with_payload', side_effect=q_result) as query_patch:
+                    resp = await client.get("/fledge/statistics/history?limit=2")
+            assert 200 == resp.status
+            assert output == json.loads(await resp.text())
+        assert 2 == query_patch.call_count
+
     @pytest.mark.parametrize("request_limit", [-1, 'blah'])
     async def test_get_statistics_history_bad_limit(self, client, request_limit):
         mock_async_storage_client = MagicMock(StorageClientAsync)
@@ -494,9 +525,11 @@ class TestStatistics:
         output = {'rates': {'READINGS': {'1': 45.0, '5': 9.0}}}
         p1 = ({"where": {"value": "stats collector", "condition": "=", "column": "process_name"},
                "return": ["schedule_interval"]})
-        p2 = {"return": ["value"], "where": {"column": "key", "condition": "=", "value": "READINGS"},
+        p2 = {"return": ["value"], "where": {"column": "key", "condition": "=", "value": "READINGS",
+                                                 "and": {"column": "history_ts", "condition": "newer", "value": 60}},
               "sort": {"column": "history_ts", "direction": "desc"}, "limit": 4}
-        p3 = {"return": ["value"], "where": {"column": "key", "condition": "=", "value": "READINGS"},
+        p3 = {"return": ["value"], "where": {"column": "key", "condition": "=", "value": "READINGS",
+                                                 "and": {"column": "history_ts", "condition": "newer", "value": 300}},
               "sort": {"column": "history_ts", "direction": "desc"}, "limit": 20}
 
         async def async_mock(return_value):
@@ -99,7 +99,7 @@ class TestBundleSupport:
             mockwalk.assert_called_once_with(path)
 
     async def test_get_support_bundle_by_name_bad_request(self, client):
-        resp = await client.get('/fledge/support/support-180301-13-35-23.tar')
+        resp = await client.get('/fledge/support/support-180301-13-35-23.zip')
         assert 400 == resp.status
         assert 'Bundle file extension is invalid' == resp.reason
 
@@ -124,7 +124,7 @@ class TestBundleSupport:
             
         with patch.object(SupportBuilder, "__init__", return_value=None):
             with patch.object(SupportBuilder, "build", return_value=_rv):
-                resp = await client.post('/fledge/support')
+                resp = await client.post('/fledge/support?wait=true')
                 res = await resp.text()
                 jdict = json.loads(res)
                 assert 200 == resp.status
@@ -135,13 +135,78 @@ class TestBundleSupport:
         with patch.object(SupportBuilder, "__init__", return_value=None):
             with patch.object(SupportBuilder, "build", side_effect=RuntimeError("blah")):
                 with patch.object(support._logger, "error") as patch_logger:
-                    resp = await client.post('/fledge/support')
+                    resp = await client.post('/fledge/support?wait=true')
                     assert 500 == resp.status
                     assert msg == resp.reason
                 assert 1 == patch_logger.call_count
                 args = patch_logger.call_args
                 assert msg == args[0][1]
 
+    async def test_get_support_bundle_being_built(self, client, tmpdir):
+        bundle_name = 'support-180301-13-35-23.tar.xz'
+        bundle = tmpdir.join(bundle_name)
+        bundle.write_binary(b'first')
+
+        async def finish():
+            await asyncio.sleep(0.1)
+            with open(str(bundle), 'ab') as f:
+                f.write(b' second')
+            SupportBuilder._building.pop(bundle_name)
+
+        SupportBuilder._building[bundle_name] = None
+        with patch.object(support, '_get_support_dir', return_value=str(tmpdir)):
+            with patch.object(support, '_STREAM_POLL_INTERVAL', 0.01):
+                asyncio.ensure_future(finish())
+                resp = await client.get('/fledge/support/{}'.format(bundle_name))
+                assert 200 == resp.status
+                assert b'first second' == await resp.read()
+        assert not SupportBuilder.is_building(bundle_name)
+
+    async def test_get_support_bundle_queued(self, client, tmpdir):
+        bundle_name = 'support-180301-13-35-23.tar.gz'
+        bundle = tmpdir.join(bundle_name)
+
+        async def start():
+            await asyncio.sleep(0.1)
+            bundle.write_binary(b'bundle')
+            SupportBuilder._building.pop(bundle_name)
+
+        SupportBuilder._building[bundle_name] = None
+        with patch.object(support, '_get_support_dir', return_value=str(tmpdir)):
+            with patch.object(support, '_STREAM_POLL_INTERVAL', 0.01):
+                asyncio.ensure_future(start())
+                resp = await client.get('/fledge/support/{}'.format(bundle_name))
+                assert 200 == resp.status
+                assert b'bundle' == await resp.read()
+
+    async def test_get_support_bundle_cancelled_while_queued(self, client, tmpdir):
+        bundle_name = 'support-180301-13-35-23.tar.gz'
+        queued = MagicMock(done=False)
+
+        async def cancel():
+            await asyncio.sleep(0.1)
+            queued.done = True
+
+        SupportBuilder._building[bundle_name] = queued
+        with patch.object(support, '_get_support_dir', return_value=str(tmpdir)):
+            with patch.object(support, '_STREAM_POLL_INTERVAL', 0.01):
+                asyncio.ensure_future(cancel())
+                resp = await client.get('/fledge/support/{}'.format(bundle_name))
+                assert 404 == resp.status
+                assert '{} not found'.format(bundle_name) == resp.reason
+        assert bundle_name not in SupportBuilder._building
+
+    @pytest.mark.parametrize("param, message", [
+        ("compression=zip", "compression must be one of gz, bz2, xz, none"),
+        ("level=0", "level must be an integer from 1 to 9"),
+        ("level=fast", "level must be an integer from 1 to 9")
+    ])
+    async def test_bad_compression_in_create_support_bundle(self, client, param, message):
+        resp = await client.post('/fledge/support?{}'.format(param))
+        assert 400 == resp.status
+        assert message == resp.reason
+        assert {"message": message} == json.loads(await resp.text())
+
     async def test_get_syslog_entries_all_ok(self, client):
         def mock_syslog():
             return """
@@ -512,6 +512,7 @@ class TestTask:
         scheduler = mocker.patch.object(server.Server, "scheduler", MagicMock())
         delete_schedule = mocker.patch.object(scheduler, "delete_schedule", return_value=_rv2)
         disable_schedule = mocker.patch.object(scheduler, "disable_schedule", return_value=_rv2)
+        forget_recent_tasks = mocker.patch.object(scheduler, "forget_recent_tasks", return_value=_rv2)
         delete_task_entry_with_schedule_id = mocker.patch.object(task, "delete_task_entry_with_schedule_id",
                                                                  return_value=_rv2)
         delete_configuration = mocker.patch.object(ConfigurationManager, "delete_category_and_children_recursively",
@@ -539,6 +540,7 @@ class TestTask:
         disable_schedule_calls = [call(UUID(sch_id))]
         disable_schedule.assert_has_calls(disable_schedule_calls, any_order=True)
 
+        forget_recent_tasks.assert_called_once_with(UUID(sch_id))
         assert 1 == delete_task_entry_with_schedule_id.call_count
         args, kwargs = delete_task_entry_with_schedule_id.call_args_list[0]
         assert UUID(sch_id) in args
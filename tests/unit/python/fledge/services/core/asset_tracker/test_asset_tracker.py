@@ -10,7 +10,7 @@ import pytest
 import sys
 import asyncio
 
-from fledge.services.core.asset_tracker.asset_tracker import AssetTracker
+from fledge.services.core.asset_tracker.asset_tracker import AssetTracker, AssetTrackerRecords
 from fledge.common.storage_client.storage_client import StorageClientAsync
 from fledge.common.configuration_manager import ConfigurationManager
 
@@ -35,7 +35,7 @@ class TestAssetTracker:
     async def test_load_asset_records(self, result, asset_list):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         asset_tracker = AssetTracker(storage_client_mock)
-        asset_tracker._registered_asset_records = []
+        asset_tracker._registered_asset_records = AssetTrackerRecords()
 
         async def mock_coro():
             return result
@@ -48,14 +48,18 @@ class TestAssetTracker:
 
         with patch.object(asset_tracker._storage, 'query_tbl_with_payload', return_value=_rv) as patch_query_tbl:
             await asset_tracker.load_asset_records()
-            assert asset_list == asset_tracker._registered_asset_records
+            for a in asset_list:
+                assert asset_tracker._registered_asset_records.contains(
+                    a['asset'], a['event'], a['service'], a['plugin'], a['data'])
+            # rows are loaded in full by the asset tracker API
+            assert not asset_tracker._registered_asset_records.is_current()
         patch_query_tbl.assert_called_once_with('asset_tracker', '{"return": ["asset", "event", "service", "plugin", "data"]}')
 
     async def test_add_asset_record(self):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         asset_tracker = AssetTracker(storage_client_mock)
         cfg_manager = ConfigurationManager(storage_client_mock)
-        asset_tracker._registered_asset_records = []
+        asset_tracker._registered_asset_records = AssetTrackerRecords()
         payload = {"plugin": "sinusoid", "asset": "sinusoid", "event": "Ingest", "fledge": "Fledge", "service": "sine", "data":"{}"}
 
         async def mock_coro():
@@ -80,5 +84,67 @@ class TestAssetTracker:
             assert 'asset_tracker' == args[0]
             assert payload == json.loads(args[1])
         patch_get_cat_item.assert_called_once_with(category_name='service', item_name='name')
+        # a duplicate record is not inserted again
+        with patch.object(asset_tracker._storage, 'insert_into_tbl') as patch_insert_tbl:
+            assert {} == await asset_tracker.add_asset_record(
+                asset='sinusoid', event='Ingest', service='sine', plugin='sinusoid', jsondata='{}')
+        patch_insert_tbl.assert_not_called()
 
     # TODO: will add -ve tests later
+
+
+class TestAssetTrackerRecords:
+
+    @pytest.fixture
+    def records(self, loop):
+        rows = [
+            {'asset': 'sinusoid', 'event': 'Ingest', 'service': 'sine', 'plugin': 'sinusoid',
+             'deprecatedTimestamp': '', 'data': {}},
+            {'asset': 'sinusoid', 'event': 'store', 'service': 'sine', 'plugin': 'sinusoid',
+             'deprecatedTimestamp': '', 'data': {'count': 1, 'datapoints': ['sinusoid']}},
+            {'asset': 'motor', 'event': 'store', 'service': 'motor', 'plugin': 'modbus',
+             'deprecatedTimestamp': '2024-01-01 10:10:10.100', 'data': {'count': 2, 'datapoints': ['rpm', 'current']}},
+            {'asset': 'sinusoid', 'event': 'store', 'service': 'sine2', 'plugin': 'sinusoid',
+             'deprecatedTimestamp': '', 'data': {'count': 2, 'datapoints': ['sinusoid', 'cos']}},
+            {'asset': 'motor', 'event': 'store', 'service': 'motor', 'plugin': 'modbus',
+             'deprecatedTimestamp': '', 'data': {'count': 1, 'datapoints': ['rpm']}}
+        ]
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        records = AssetTrackerRecords()
+
+        async def mock_coro():
+            return {'rows': rows, 'count': len(rows)}
+
+        # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+        _rv = loop.run_until_complete(mock_coro()) if sys.version_info >= (3, 8) \
+            else asyncio.ensure_future(mock_coro(), loop=loop)
+        with patch.object(storage_client_mock, 'query_tbl_with_payload', return_value=_rv) as patch_query_tbl:
+            loop.run_until_complete(records.load(storage_client_mock))
+        patch_query_tbl.assert_called_once_with('asset_tracker', records.select().payload())
+        return records
+
+    async def test_find(self, records):
+        assert records.is_current()
+        assert 5 == len(records.find())
+        assert ['sine', 'sine2'] == [r['service'] for r in records.find(asset='sinusoid', event='store')]
+        assert [records.rows[2]] == records.find(deprecated=True)
+        assert [] == records.find(service='blah')
+
+    async def test_contains_and_add(self, records):
+        assert records.contains('motor', 'store', 'motor', 'modbus', {'datapoints': ['rpm'], 'count': 1})
+        assert not records.contains('motor', 'store', 'motor', 'modbus', {'count': 3})
+        records.add('motor', 'store', 'motor', 'modbus', {'count': 3})
+        assert records.contains('motor', 'store', 'motor', 'modbus', {'count': 3})
+        assert not records.is_current()
+
+    async def test_datapoint_usage(self, records):
+        count, assets = records.datapoint_usage()
+        assert 4 == count
+        assert [{'asset': 'sinusoid', 'datapoints': ['sinusoid', 'cos']},
+                {'asset': 'motor', 'datapoints': ['rpm', 'current']}] == assets
+        assets[0]['datapoints'].append('blah')
+        assert ['sinusoid', 'cos'] == records.datapoint_usage()[1][0]['datapoints']
+
+    async def test_stale(self, records):
+        records.loaded -= AssetTrackerRecords.RELOAD_INTERVAL
+        assert not records.is_current()
@@ -191,3 +191,24 @@ class TestInterestRegistry:
         assert ret_val[0]._registration_id is id_2_2
         assert ret_val[0]._microservice_uuid is 'muuid2'
         assert ret_val[0]._category_name is 'catname2'
+
+    def test_indexes_follow_register_and_unregister(self, reset_singleton):
+        configuration_manager_mock = MagicMock(spec=ConfigurationManager)
+        i_reg = InterestRegistry(configuration_manager_mock)
+        id_1_1 = i_reg.register('muuid1', 'catname1')
+        id_2_1 = i_reg.register('muuid2', 'catname1')
+        id_1_2 = i_reg.register('muuid1', 'catname2')
+
+        assert [id_1_1, id_1_2] == [i._registration_id for i in i_reg.get(microservice_uuid='muuid1')]
+        assert [id_2_1] == [i._registration_id for i in i_reg.get(registration_id=id_2_1, category_name='catname1')]
+        with pytest.raises(interest_registry_exceptions.DoesNotExist):
+            i_reg.get(registration_id=id_2_1, microservice_uuid='muuid1')
+
+        i_reg.unregister(id_1_1)
+        assert [id_2_1] == [i._registration_id for i in i_reg.get(category_name='catname1')]
+        with pytest.raises(interest_registry_exceptions.DoesNotExist):
+            i_reg.get(registration_id=id_1_1)
+        i_reg.unregister(id_1_2)
+        assert 'muuid1' not in i_reg._interests_by_microservice
+        assert 'catname2' not in i_reg._interests_by_category
+        assert [id_2_1] == list(i_reg._interests_by_id)
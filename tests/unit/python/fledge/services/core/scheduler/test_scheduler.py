@@ -6,6 +6,8 @@
 
 import asyncio
 import datetime
+import os
+import signal
 import logging
 import uuid
 import time
@@ -16,6 +18,7 @@ import sys
 import copy
 import pytest
 from fledge.services.core.scheduler.scheduler import Scheduler, AuditLogger, ConfigurationManager
+from fledge.services.core.scheduler.task_worker import TaskWorker
 from fledge.services.core.scheduler.entities import *
 from fledge.services.core.scheduler.exceptions import *
 from fledge.common.storage_client.storage_client import StorageClientAsync
@@ -30,6 +33,10 @@ async def mock_task():
     return ""
 
 
+async def mock_rows(rows):
+    return rows
+
+
 async def mock_process():
     m = MagicMock()
     m.pid = 9999
@@ -143,6 +150,13 @@ class TestScheduler:
                               _task_processes=mock_task_processes,
                               _schedule_executions=mock_schedule_executions)
         mocker.patch.object(scheduler, '_process_scripts', return_value="North Readings to PI")
+        log_exception = mocker.patch.object(scheduler._logger, "exception")
+        failing_callback = MagicMock(side_effect=Exception("failed"))
+        task_end_callback = MagicMock()
+        other_callback = MagicMock()
+        scheduler.on_task_end("North Readings to PI", failing_callback)
+        scheduler.on_task_end("North Readings to PI", task_end_callback)
+        scheduler.on_task_end("purge", other_callback)
 
         # WHEN
         await scheduler._wait_for_task_completion(mock_task_process)
@@ -154,6 +168,11 @@ class TestScheduler:
         args, kwargs = log_info.call_args_list[0]
         assert 'OMF to PI north' in args
         assert 'North Readings to PI' in args
+        # The callbacks of the process are called, even after one fails
+        failing_callback.assert_called_once_with()
+        task_end_callback.assert_called_once_with()
+        other_callback.assert_not_called()
+        assert 1 == log_exception.call_count
 
     @pytest.mark.asyncio
     async def test__start_task(self, mocker):
@@ -195,10 +214,9 @@ class TestScheduler:
             _rv = asyncio.ensure_future(mock_process())
 
         mocker.patch.object(asyncio, 'create_subprocess_exec', return_value=_rv)
-        mocker.patch.object(asyncio, 'ensure_future', return_value=asyncio.ensure_future(mock_task()))
         mocker.patch.object(scheduler, '_resume_check_schedules')
         mocker.patch.object(scheduler, '_process_scripts', return_value="North Readings to PI")
-        mocker.patch.object(scheduler, '_wait_for_task_completion')
+        mocker.patch.object(scheduler, '_wait_for_task_completion', return_value=asyncio.ensure_future(mock_task()))
 
         # Confirm that task has not started yet
         assert 0 == len(scheduler._schedule_executions[schedule.id].task_processes)
@@ -215,6 +233,90 @@ class TestScheduler:
         assert "Process started: Schedule '%s' process '%s' task %s pid %s, %s running tasks\n%s" in args
         assert 'OMF to PI north' in args
         assert 'North Readings to PI' in args
+        # The row of the started task is queued, write it rather than leave the delayed write pending
+        assert scheduler._task_states_write_task is not None
+        await scheduler._flush_task_states()
+        assert scheduler._task_states_write_task is None
+
+    @pytest.mark.asyncio
+    async def test__in_core_task(self, mocker):
+        # GIVEN
+        from fledge.tasks.statistics.statistics_history import StatisticsHistoryCollector
+        scheduler = Scheduler()
+        scheduler._storage_async = MockStorageAsync(core_management_host=None, core_management_port=None)
+        log_error = mocker.patch.object(scheduler._logger, "error")
+        schedule = scheduler._ScheduleRow(
+            id=uuid.UUID("2176eb68-7303-11e7-8cf7-a6006ad3dba0"),
+            process_name="stats collector",
+            name="stats collection",
+            type=Schedule.Type.INTERVAL,
+            repeat=datetime.timedelta(seconds=15),
+            repeat_seconds=15,
+            time=None,
+            day=None,
+            exclusive=True,
+            enabled=True)
+        collected = []
+
+        async def collect():
+            collected.append(scheduler._statistics_history)
+            if len(collected) == 2:
+                raise RuntimeError("storage down")
+            if len(collected) == 3:
+                await asyncio.sleep(10)
+
+        mocker.patch.object(StatisticsHistoryCollector, "collect", side_effect=collect)
+
+        # WHEN / THEN only the stats collector runs in the core, once enabled
+        assert scheduler._in_core_task(schedule) is None
+        scheduler._stats_collector_in_core = True
+        assert scheduler._in_core_task(schedule._replace(process_name="purge")) is None
+
+        process = scheduler._InCoreProcess(scheduler._in_core_task(schedule))
+        assert os.getpid() == process.pid
+        assert process.returncode is None
+        assert 0 == await process.wait()
+
+        process = scheduler._InCoreProcess(scheduler._in_core_task(schedule))
+        assert 1 == await process.wait()
+        assert 1 == log_error.call_count
+        # the collector is kept between its tasks
+        assert collected[0] is collected[1]
+
+        process = scheduler._InCoreProcess(scheduler._in_core_task(schedule))
+        await asyncio.sleep(0.1)
+        process.terminate()
+        assert -signal.SIGTERM == await process.wait()
+
+    @pytest.mark.asyncio
+    async def test__task_worker(self, mocker):
+        # GIVEN
+        scheduler = Scheduler()
+        scheduler._process_scripts = {"purge": (["tasks/purge"], 999), "backup": (["tasks/backup"], 999),
+                                      "north_c": (["tasks/north_c"], 999)}
+        schedule = scheduler._ScheduleRow(
+            id=uuid.UUID("cea17db8-6ccc-11e7-907b-a6006ad3dba0"),
+            process_name="purge",
+            name="purge",
+            type=Schedule.Type.INTERVAL,
+            repeat=datetime.timedelta(hours=1),
+            repeat_seconds=3600,
+            time=None,
+            day=None,
+            exclusive=True,
+            enabled=True)
+
+        # WHEN / THEN only the Python tasks of RESIDENT_TASK_MODULES run in a worker, once enabled
+        assert scheduler._task_worker(schedule) is None
+        scheduler._resident_task_workers = True
+        assert scheduler._task_worker(schedule._replace(type=Schedule.Type.STARTUP)) is None
+        assert scheduler._task_worker(schedule._replace(process_name="backup")) is None
+        assert scheduler._task_worker(schedule._replace(process_name="north_c")) is None
+        task_worker = scheduler._task_worker(schedule)
+        assert isinstance(task_worker, TaskWorker)
+        assert "fledge.tasks.purge" == task_worker._module
+        # one worker per task script
+        assert task_worker is scheduler._task_worker(schedule._replace(name="purge again"))
 
     @pytest.mark.asyncio
     async def test_purge_tasks(self, mocker):
@@ -233,6 +335,41 @@ class TestScheduler:
         assert scheduler._purge_tasks_task is None
         assert scheduler._last_task_purge_time is not None
 
+    @pytest.mark.asyncio
+    async def test_purge_tasks_in_batches(self, mocker):
+        # GIVEN
+        scheduler = Scheduler()
+        scheduler._storage_async = MockStorageAsync(core_management_host=None, core_management_port=None)
+        mocker.patch.multiple(scheduler, _ready=True, _paused=False, _DELETE_TASKS_LIMIT=2)
+        mocker.patch.object(scheduler, '_max_completed_task_age', datetime.timedelta(days=30))
+        batches = [{"rows": [{"id": "t1"}, {"id": "t2"}]}, {"rows": [{"id": "t3"}, {"id": "t4"}]},
+                   {"rows": [{"id": "t5"}]}]
+        # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+        if sys.version_info.major == 3 and sys.version_info.minor >= 8:
+            query_rv = [await mock_rows(b) for b in batches]
+            delete_rv = [await mock_task() for _ in batches]
+        else:
+            query_rv = [asyncio.ensure_future(mock_rows(b)) for b in batches]
+            delete_rv = [asyncio.ensure_future(mock_task()) for _ in batches]
+        query = mocker.patch.object(scheduler._storage_async, 'query_tbl_with_payload', side_effect=query_rv)
+        delete = mocker.patch.object(scheduler._storage_async, 'delete_from_tbl', side_effect=delete_rv)
+        scheduler._recent_tasks["t1"] = Task()
+        scheduler._latest_tasks = {"purged": {"id": "t4"}, "other": {"id": "t6"}}
+
+        # WHEN
+        await scheduler.purge_tasks()
+
+        # THEN
+        assert 3 == query.call_count
+        select = json.loads(query.call_args[0][1])
+        assert 2 == select['limit']
+        assert {"column": "start_time", "direction": "asc"} == select['sort']
+        assert [["t1", "t2"], ["t3", "t4"], ["t5"]] == [json.loads(c[0][1])['where']['value']
+                                                        for c in delete.call_args_list]
+        assert "t1" not in scheduler._recent_tasks
+        assert {"other": {"id": "t6"}} == scheduler._latest_tasks
+        assert scheduler._last_task_purge_time is not None
+
     @pytest.mark.asyncio
     async def test__check_purge_tasks(self, mocker):
         # TODO: Mandatory - Add negative tests for full code coverage
@@ -535,6 +672,8 @@ class TestScheduler:
         assert 1 == get_cat.call_count
         assert scheduler._max_running_tasks is not None
         assert scheduler._max_completed_task_age is not None
+        assert scheduler._stats_collector_in_core is False
+        assert scheduler._resident_task_workers is False
 
     @pytest.mark.asyncio
     async def test_start(self, mocker):
@@ -587,17 +726,21 @@ class TestScheduler:
         mocker.patch.object(scheduler, '_purge_tasks_task', return_value=asyncio.ensure_future(asyncio.sleep(.1)))
         mocker.patch.object(scheduler, '_scheduler_loop_task', return_value=asyncio.ensure_future(asyncio.sleep(.1)))
         current_time = time.time()
+        statistics_history = mocker.MagicMock()
+        statistics_history.flush.return_value = asyncio.ensure_future(mock_task())
         mocker.patch.multiple(scheduler, _core_management_port=9999,
                               _core_management_host="0.0.0.0",
                               _start_time=current_time - 3600,
                               _paused=False,
-                              _task_processes={})
+                              _task_processes={},
+                              _statistics_history=statistics_history)
 
         # WHEN
         retval = await scheduler.stop()
 
         # THEN
         assert retval is True
+        statistics_history.flush.assert_called_once_with()
         assert scheduler._schedule_executions is None
         assert scheduler._task_processes is None
         assert scheduler._schedules is None
@@ -1258,6 +1401,22 @@ class TestScheduler:
         task_id = list(scheduler._schedule_executions[schedule.id].task_processes.keys())[0]
 
         # WHEN
+        # The task is one of the recent tasks
+        task = await scheduler.get_task(task_id)
+
+        # THEN
+        assert str(task_id) == task.task_id
+        assert schedule.process_name == task.process_name
+        assert task.reason is None
+        assert task.state == Task.State.RUNNING
+        assert task.cancel_requested is None
+        assert task.start_time is not None
+        assert task.end_time is None
+        assert task.exit_code is None
+
+        # WHEN
+        # Any other task is read from the tasks table
+        scheduler._recent_tasks.clear()
         task = await scheduler.get_task(task_id)
 
         # THEN
@@ -1344,12 +1503,139 @@ class TestScheduler:
             tasks = await scheduler.get_tasks()
 
         # THEN
-        payload = {"return": ["id", "process_name", "schedule_name", "state", {"alias": "start_time", "column": "start_time", "format": "YYYY-MM-DD HH24:MI:SS.MS"}, {"alias": "end_time", "column": "end_time", "format": "YYYY-MM-DD HH24:MI:SS.MS"}, "reason", "exit_code"], "limit": 100}
+        payload = {"return": ["id", "process_name", "schedule_name", "state", {"alias": "start_time", "column": "start_time", "format": "YYYY-MM-DD HH24:MI:SS.MS"}, {"alias": "end_time", "column": "end_time", "format": "YYYY-MM-DD HH24:MI:SS.MS"}, "reason", "exit_code"], "limit": 100, "sort": {"column": "start_time", "direction": "desc"}}
         args, kwargs = log_exception.call_args
         assert 'Query failed: %s' == args[0]
         p = json.loads(args[1])
         assert payload == p
 
+    @pytest.mark.asyncio
+    async def test_get_tasks_from_recent_tasks(self, mocker):
+        # GIVEN
+        scheduler, schedule, log_info, log_exception, log_error, log_debug = await self.scheduler_fixture(mocker)
+        other = schedule._replace(id=uuid.uuid4(), name="stats collector", process_name="stats collector")
+        for s in (schedule, other, schedule):
+            scheduler._queue_task_start(uuid.uuid4(), 9999, s)
+        scheduler._queue_task_end(list(scheduler._recent_tasks)[0], schedule.name, 0, Task.State.COMPLETE)
+        query = mocker.patch.object(scheduler._storage_async, 'query_tbl_with_payload')
+
+        # WHEN
+        newest = await scheduler.get_tasks(limit=2)
+        by_name = await scheduler.get_tasks(limit=2, where=["schedule_name", "=", schedule.name])
+        complete = await scheduler.get_tasks(limit=1, where=(["schedule_name", "=", schedule.name],
+                                                            ["state", "=", Task.State.COMPLETE.value]))
+
+        # THEN
+        recent = list(scheduler._recent_tasks.values())
+        assert [recent[2], recent[1]] == newest
+        assert [recent[2], recent[0]] == by_name
+        assert [recent[0]] == complete
+        assert Task.State.COMPLETE == complete[0].state
+        assert 0 == complete[0].exit_code
+        assert complete[0].end_time is not None
+        query.assert_not_called()
+        await scheduler._flush_task_states()
+
+    @pytest.mark.asyncio
+    async def test_task_states_written_in_bulk(self, mocker):
+        # GIVEN
+        scheduler, schedule, log_info, log_exception, log_error, log_debug = await self.scheduler_fixture(mocker)
+        insert = mocker.patch.object(scheduler._storage_async, 'insert_into_tbl',
+                                     return_value=asyncio.ensure_future(mock_task()))
+        update = mocker.patch.object(scheduler._storage_async, 'update_tbl',
+                                     return_value=asyncio.ensure_future(mock_task()))
+        task_ids = [uuid.uuid4() for _ in range(3)]
+
+        # WHEN
+        for task_id in task_ids:
+            scheduler._queue_task_start(task_id, 9999, schedule)
+        # Completed before its row is written
+        scheduler._queue_task_end(task_ids[0], schedule.name, 0, Task.State.COMPLETE)
+        await scheduler._flush_task_states()
+        scheduler._queue_task_end(task_ids[1], schedule.name, -15, Task.State.CANCELED)
+        scheduler._queue_task_end(task_ids[2], schedule.name, 1, Task.State.COMPLETE)
+        await scheduler._flush_task_states()
+
+        # THEN
+        assert 1 == insert.call_count
+        rows = json.loads(insert.call_args[0][1])['inserts']
+        assert [str(task_id) for task_id in task_ids] == [row['id'] for row in rows]
+        assert [2, 1, 1] == [row['state'] for row in rows]
+        assert 0 == rows[0]['exit_code'] and 'end_time' in rows[0]
+        assert 'end_time' not in rows[1]
+        assert 1 == update.call_count
+        updates = json.loads(update.call_args[0][1])['updates']
+        assert [(str(task_ids[1]), 3, -15), (str(task_ids[2]), 2, 1)] == [
+            (u['where']['value'], u['values']['state'], u['values']['exit_code']) for u in updates]
+        assert scheduler._task_states_write_task is None
+
+    @pytest.mark.asyncio
+    async def test_get_latest_tasks(self, mocker):
+        # GIVEN
+        scheduler, schedule, log_info, log_exception, log_error, log_debug = await self.scheduler_fixture(mocker)
+        rows = {"count": 3, "rows": [
+            {"id": "t3", "schedule_name": "purge", "process_name": "purge", "state": 2,
+             "start_time": "2018-02-06 13:28:14.477", "end_time": "2018-02-06 13:28:15.856", "reason": None,
+             "pid": 1, "exit_code": 0},
+            {"id": "t2", "schedule_name": schedule.name, "process_name": schedule.process_name, "state": 2,
+             "start_time": "2018-02-06 13:28:13.477", "end_time": "2018-02-06 13:28:13.856", "reason": None,
+             "pid": 2, "exit_code": 0},
+            {"id": "t1", "schedule_name": "purge", "process_name": "purge", "state": 2,
+             "start_time": "2018-02-06 13:28:12.477", "end_time": "2018-02-06 13:28:12.856", "reason": None,
+             "pid": 3, "exit_code": 0}]}
+        # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+        _rv = await mock_rows(rows) if sys.version_info >= (3, 8) else asyncio.ensure_future(mock_rows(rows))
+        query = mocker.patch.object(scheduler._storage_async, 'query_tbl_with_payload', return_value=_rv)
+        task_id = uuid.uuid4()
+        scheduler._queue_task_start(task_id, 9999, schedule)
+
+        # WHEN
+        latest = await scheduler.get_latest_tasks()
+
+        # THEN
+        # The tasks started since the scheduler started are newer than those in the tasks table
+        assert [schedule.name, "purge"] == [row["schedule_name"] for row in latest]
+        assert str(task_id) == latest[0]["id"]
+        assert int(Task.State.RUNNING) == latest[0]["state"]
+        assert "t3" == latest[1]["id"]
+        assert {"column": "start_time", "direction": "desc"} == json.loads(query.call_args[0][1])["sort"]
+
+        # WHEN
+        scheduler._queue_task_end(task_id, schedule.name, 0, Task.State.COMPLETE)
+        latest = await scheduler.get_latest_tasks(schedule.name)
+
+        # THEN
+        assert 1 == len(latest)
+        assert int(Task.State.COMPLETE) == latest[0]["state"]
+        assert 0 == latest[0]["exit_code"]
+        assert latest[0]["end_time"] is not None
+        assert [] == await scheduler.get_latest_tasks("not a schedule")
+        scheduler.forget_latest_task("purge")
+        assert [schedule.name] == [row["schedule_name"] for row in await scheduler.get_latest_tasks()]
+        assert 1 == query.call_count
+        await scheduler._flush_task_states()
+
+    @pytest.mark.asyncio
+    async def test_forget_recent_tasks(self, mocker):
+        scheduler = Scheduler()
+        scheduler._storage_async = MockStorageAsync(core_management_host=None, core_management_port=None)
+        insert = mocker.patch.object(scheduler._storage_async, "insert_into_tbl", side_effect=mock_rows)
+        kept, forgotten = [scheduler._ScheduleRow(
+            id=uuid.uuid4(), name=name, type=Schedule.Type.INTERVAL, day=None, time=None,
+            repeat=datetime.timedelta(seconds=30), repeat_seconds=30, exclusive=True, enabled=True,
+            process_name="north_c") for name in ("kept", "forgotten")]
+        task_ids = [uuid.uuid4() for _ in range(3)]
+        scheduler._queue_task_start(task_ids[0], 1, forgotten)
+        scheduler._queue_task_start(task_ids[1], 2, kept)
+        scheduler._queue_task_start(task_ids[2], 3, forgotten)
+
+        await scheduler.forget_recent_tasks(forgotten.id)
+
+        # the queued rows are written before the rows of the schedule are deleted
+        assert 1 == insert.call_count
+        assert scheduler._task_states_write_task is None
+        assert [str(task_ids[1])] == list(scheduler._recent_tasks)
+
     @pytest.mark.asyncio
     async def test_cancel_task_all_ok(self, mocker):
         # GIVEN
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Test fledge/services/core/scheduler/task_worker.py with fledge/tasks/common/worker.py"""
+
+import asyncio
+import os
+import signal
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from fledge.services.core.scheduler.task_worker import TaskWorker, _logger
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_TASK = '''
+import sys
+import time
+
+print("writes to stdout do not reach the scheduler")
+
+if __name__ == '__main__':
+    code, seconds = sys.argv[1:3]
+    time.sleep(float(seconds))
+    if code == "log":
+        from fledge.common import logger
+        logger.setup("fake_task", destination=logger.CONSOLE).warning("logged just before the exit")
+        sys.exit(0)
+    if code == "abort":
+        import os
+        os.abort()
+    sys.exit(int(code))
+'''
+
+
+@pytest.fixture
+def worker(tmpdir, monkeypatch):
+    tmpdir.join("fake_task.py").write(_TASK)
+    python_dir = os.path.dirname(os.path.dirname(os.path.abspath(sys.modules['fledge'].__file__)))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([python_dir, str(tmpdir)]))
+    monkeypatch.setattr(TaskWorker, "_PYTHON", sys.executable)
+    return TaskWorker("fake_task", str(tmpdir))
+
+
+@pytest.mark.asyncio
+class TestTaskWorker:
+
+    async def test_runs(self, worker):
+        run = await worker.run(["3", "0"])
+        worker_pid = worker.pid
+        assert run.pid not in (None, worker_pid, os.getpid())
+        assert 3 == await run.wait()
+        assert 3 == run.returncode
+
+        # a run killed or crashing takes only its own process down
+        run = await worker.run(["0", "10"])
+        assert run.returncode is None
+        run.terminate()
+        assert -signal.SIGTERM == await run.wait()
+        run = await worker.run(["abort", "0"])
+        assert -signal.SIGABRT == await run.wait()
+
+        runs = [await worker.run(["0", "0.1"]) for _ in range(3)]
+        assert [0, 0, 0] == [await r.wait() for r in runs]
+        assert worker_pid == worker.pid
+        await worker.stop()
+        assert worker.pid is None
+
+    async def test_run_logs_written_at_exit(self, worker, capfd):
+        # the records still queued to the log listener thread of the run are written before it exits
+        run = await worker.run(["log", "0"])
+        assert 0 == await run.wait()
+        await worker.stop()
+        assert "logged just before the exit" in capfd.readouterr().err
+
+    async def test_worker_exited(self, worker):
+        run = await worker.run(["0", "10"])
+        worker_pid = worker.pid
+        with patch.object(_logger, "warning") as patch_logger:
+            os.kill(worker_pid, signal.SIGKILL)
+            assert 1 == await run.wait()
+        patch_logger.assert_called_once()
+        os.kill(run.pid, signal.SIGKILL)
+        # the next run starts a new worker
+        run = await worker.run(["0", "0"])
+        assert 0 == await run.wait()
+        assert worker.pid not in (None, worker_pid)
+        await worker.stop()
@@ -7,6 +7,7 @@
 from unittest.mock import patch
 import pytest
 
+from fledge.common.service_record import ServiceRecord
 from fledge.services.core.service_registry.service_registry import ServiceRegistry
 from fledge.services.core.service_registry.exceptions import *
 from fledge.services.core.interest_registry.interest_registry import InterestRegistry
@@ -151,3 +152,39 @@ class TestServiceRegistry:
                 assert 0 == len(ServiceRegistry._registry)
             assert 0 == log_info.call_count
         assert excinfo.type is DoesNotExist
+
+    def test_lookups_follow_register_and_remove(self):
+        with patch.object(ServiceRegistry._logger, 'info'):
+            s1 = ServiceRegistry.register("S1", "Southbound", "127.0.0.1", 1234, 4321, 'http')
+            s2 = ServiceRegistry.register("S2", "Southbound", "127.0.0.1", None, 4322, 'http')
+            s3 = ServiceRegistry.register("N1", "Northbound", "localhost", 1234, 4323, 'http')
+        assert [s1, s2] == [s._id for s in ServiceRegistry.get(s_type="Southbound")]
+        assert [s3] == [s._id for s in ServiceRegistry.get(name="N1")]
+        # the last given attribute wins
+        assert [s3] == [s._id for s in ServiceRegistry.filter(_id=s1, _name="N1")]
+        assert [s2] == [s._id for s in ServiceRegistry.filter_by_name_and_type("S2", "Southbound")]
+        with pytest.raises(DoesNotExist):
+            ServiceRegistry.filter_by_name_and_type("S2", "Northbound")
+        assert ServiceRegistry.check_address_and_port("localhost", 1234) is True
+        assert ServiceRegistry.check_address_and_mgt_port("127.0.0.1", 4322) is True
+
+        ServiceRegistry.remove_from_registry(s1)
+        assert [s2] == [s._id for s in ServiceRegistry.get(s_type="Southbound")]
+        assert ServiceRegistry.check_address_and_port("127.0.0.1", 1234) is False
+        with pytest.raises(DoesNotExist):
+            ServiceRegistry.get(idx=s1)
+
+        ServiceRegistry.get(idx=s3)[0]._status = ServiceRecord.Status.Failed
+        # failed services do not hold on to their ports
+        assert ServiceRegistry.check_address_and_port("localhost", 1234) is False
+        assert 1 == len(ServiceRegistry.get(name="N1"))
+
+    def test_index_rebuilt_when_registry_replaced(self):
+        with patch.object(ServiceRegistry._logger, 'info'):
+            s_id = ServiceRegistry.register("A name", "Storage", "127.0.0.1", 1234, 4321, 'http')
+        record = ServiceRegistry.get(idx=s_id)[0]
+        ServiceRegistry._registry = list()
+        with pytest.raises(DoesNotExist):
+            ServiceRegistry.get(idx=s_id)
+        ServiceRegistry._registry.append(record)
+        assert [record] == ServiceRegistry.get(name="A name")
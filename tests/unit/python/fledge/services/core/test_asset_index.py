@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+import asyncio
+import json
+import sys
+from unittest.mock import MagicMock, patch
+import pytest
+
+from fledge.common.storage_client.storage_client import ReadingsStorageClientAsync
+from fledge.services.core import asset_index
+from fledge.services.core.asset_index import AssetIndex
+from fledge.services.core.latest_readings import LatestReadings
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+COUNTS = {"count": 2, "rows": [{"count": 10, "asset_code": "sinusoid"}, {"count": 3, "asset_code": "random"}]}
+TIMESPANS = {"count": 2, "rows": [
+    {"asset_code": "sinusoid", "oldest": "2024-02-19 16:00:00.000000", "newest": "2024-02-19 16:35:46.000000"},
+    {"asset_code": "random", "oldest": "2024-02-19 16:10:00.000000", "newest": "2024-02-19 16:20:00.000000"}]}
+INDEX = {"count": 2, "rows": [dict(c, **t) for c, t in zip(COUNTS["rows"], TIMESPANS["rows"])]}
+
+
+async def mock_coro(return_value):
+    return return_value
+
+
+async def rv(return_value):
+    # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+    return await mock_coro(return_value) if sys.version_info >= (3, 8) else \
+        asyncio.ensure_future(mock_coro(return_value))
+
+
+@pytest.mark.asyncio
+class TestAssetIndex:
+
+    @pytest.fixture
+    def index(self):
+        feed = MagicMock(LatestReadings)
+        feed.feed_active = True
+        return AssetIndex(MagicMock(ReadingsStorageClientAsync), feed)
+
+    async def _reconcile(self, index):
+        with patch.object(index._feed, 'ensure_feed', return_value=await rv(None)):
+            with patch.object(index._readings_storage, 'query', return_value=await rv(INDEX)) as patch_query:
+                counts = await index.counts()
+        # counts and timespans with one query
+        patch_query.assert_called_once_with(
+            '{"aggregate": [{"operation": "count", "column": "*", "alias": "count"}, '
+            '{"operation": "min", "column": "user_ts", "alias": "oldest"}, '
+            '{"operation": "max", "column": "user_ts", "alias": "newest"}], "group": "asset_code"}')
+        return counts
+
+    async def test_counts_and_timespans_from_index(self, index):
+        assert [{"count": 3, "assetCode": "random"}, {"count": 10, "assetCode": "sinusoid"}] == \
+            await self._reconcile(index)
+        index.update([
+            {"asset_code": "sinusoid", "reading": {"sinusoid": 0.5}, "user_ts": "2024-02-19 16:35:47.000000+00:00"},
+            {"asset_code": "random", "reading": {"random": 7}, "user_ts": "2024-02-19 16:05:00.000000+00:00"},
+            {"asset_code": "new", "reading": {"new": 1}, "user_ts": "2024-02-19 16:36:00.000000+00:00"},
+            {"asset_code": "bad", "user_ts": "not a timestamp"},
+            "garbage"
+        ])
+        with patch.object(index._feed, 'ensure_feed', return_value=await rv(None)):
+            with patch.object(index._readings_storage, 'query') as patch_query:
+                assert [{"count": 1, "assetCode": "new"}, {"count": 4, "assetCode": "random"},
+                        {"count": 11, "assetCode": "sinusoid"}] == await index.counts()
+                assert [{"asset_code": "new", "oldest": "2024-02-19 16:36:00.000000",
+                         "newest": "2024-02-19 16:36:00.000000"},
+                        {"asset_code": "random", "oldest": "2024-02-19 16:05:00.000000",
+                         "newest": "2024-02-19 16:20:00.000000"},
+                        {"asset_code": "sinusoid", "oldest": "2024-02-19 16:00:00.000000",
+                         "newest": "2024-02-19 16:35:47.000000"}] == await index.timespans()
+                index.invalidate("random")
+                assert ["new", "sinusoid"] == [c["assetCode"] for c in await index.counts()]
+                index.invalidate()
+                assert [] == await index.counts()
+            patch_query.assert_not_called()
+        assert 4 == index.hits
+        assert 1 == index.misses
+        await index.stop()
+
+    async def test_reconcile_after_purge(self, index):
+        await self._reconcile(index)
+        rows = {"count": 1, "rows": [dict(TIMESPANS["rows"][1], count=5)]}
+        with patch.object(index._readings_storage, 'query', return_value=await rv(rows)) as patch_query:
+            await asyncio.sleep(0.05)
+            # not before the purge task has run
+            patch_query.assert_not_called()
+            index.purged()
+            for _ in range(100):
+                if patch_query.call_count:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            await index.stop()
+        assert 1 == patch_query.call_count
+        # Purged by the purge task meanwhile
+        assert {"random": [5, "2024-02-19 16:10:00.000000", "2024-02-19 16:20:00.000000"]} == index._entries
+        assert index._reconcile_task is None
+
+    async def test_reconcile_in_background(self, index):
+        with patch.object(AssetIndex, 'RECONCILE_INTERVAL', 0.01):
+            await self._reconcile(index)
+            rows = {"count": 1, "rows": [dict(TIMESPANS["rows"][1], count=5)]}
+            with patch.object(index._readings_storage, 'query', return_value=await rv(rows)) as patch_query:
+                for _ in range(100):
+                    if patch_query.call_count:
+                        break
+                    await asyncio.sleep(0.01)
+                await index.stop()
+        assert 1 <= patch_query.call_count
+        assert {"random": [5, "2024-02-19 16:10:00.000000", "2024-02-19 16:20:00.000000"]} == index._entries
+        assert index._reconcile_task is None
+
+    async def test_feed_stopped(self, index):
+        await self._reconcile(index)
+        task = index._reconcile_task
+        assert task is not None
+        index._feed.feed_active = False
+        with patch.object(index._feed, 'ensure_feed', return_value=await rv(None)):
+            with patch.object(index._readings_storage, 'query', return_value=await rv(COUNTS)):
+                await index.counts()
+        await asyncio.sleep(0)
+        # reconciled no more, nor served
+        assert task.cancelled()
+        assert index._reconcile_task is None
+        assert index._loaded is False
+
+    async def test_reconcile_failure_in_background(self, index):
+        with patch.object(AssetIndex, 'RECONCILE_INTERVAL', 0.01):
+            await self._reconcile(index)
+            entries = dict(index._entries)
+            with patch.object(index._readings_storage, 'query',
+                              side_effect=Exception("storage is down")) as patch_query:
+                with patch.object(asset_index._logger, 'warning') as patch_logger:
+                    for _ in range(100):
+                        if patch_logger.call_count:
+                            break
+                        await asyncio.sleep(0.01)
+                    await index.stop()
+        assert 1 <= patch_query.call_count
+        patch_logger.assert_called_with("Failed to reconcile the asset index: storage is down")
+        # the index is served as it was
+        assert entries == index._entries
+
+    async def test_without_feed(self, index):
+        index._feed.feed_active = False
+        with patch.object(index._feed, 'ensure_feed', return_value=await rv(None)):
+            with patch.object(index._readings_storage, 'query', return_value=await rv(COUNTS)) as patch_query:
+                # one query, answered in the storage order
+                assert [{"count": 10, "assetCode": "sinusoid"}, {"count": 3, "assetCode": "random"}] == \
+                    await index.counts()
+            assert {"aggregate": {"operation": "count", "column": "*", "alias": "count"},
+                    "group": "asset_code"} == json.loads(patch_query.call_args[0][0])
+            with patch.object(index._readings_storage, 'query', return_value=await rv(TIMESPANS)) as patch_query:
+                assert TIMESPANS["rows"] == await index.timespans()
+            patch_query.assert_called_once_with(
+                '{"aggregate": [{"operation": "min", "column": "user_ts", "alias": "oldest"}, '
+                '{"operation": "max", "column": "user_ts", "alias": "newest"}], "group": "asset_code"}')
+        # appended readings can not be counted without the feed
+        index.update([{"asset_code": "sinusoid", "user_ts": "2024-02-19 16:35:47.000000+00:00"}])
+        assert {} == index._entries
+        assert index._reconcile_task is None
+        assert 2 == index.misses
+
+    async def test_storage_error(self, index):
+        with patch.object(index._feed, 'ensure_feed', return_value=await rv(None)):
+            with patch.object(index._readings_storage, 'query',
+                              return_value=await rv({"message": "failed"})):
+                with pytest.raises(ValueError) as ex:
+                    await index.counts()
+        assert "failed" == str(ex.value)
+        assert index._loaded is False
+        assert index._reconcile_task is None
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+import asyncio
+import json
+import sys
+from unittest.mock import MagicMock, patch
+import pytest
+
+from fledge.common.storage_client.storage_client import ReadingsStorageClientAsync
+from fledge.services.core import latest_readings
+from fledge.services.core.latest_readings import LatestReadings
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+CALLBACK_URL = "http://127.0.0.1:40000/fledge/readings/feed"
+
+
+async def mock_coro(return_value):
+    return return_value
+
+
+async def rv(return_value):
+    # Changed in version 3.8: patch() now returns an AsyncMock if the target is an async function.
+    return await mock_coro(return_value) if sys.version_info >= (3, 8) else \
+        asyncio.ensure_future(mock_coro(return_value))
+
+
+class TestLatestReadings:
+
+    @pytest.fixture
+    def cache(self):
+        return LatestReadings(MagicMock(ReadingsStorageClientAsync), CALLBACK_URL, latest_readings.FEED_ALL_ASSETS)
+
+    async def _activate(self, cache):
+        with patch.object(cache._readings_storage, 'unregister_interest',
+                          return_value=await rv({"*": "unregistered"})) as patch_unregister:
+            with patch.object(cache._readings_storage, 'register_interest',
+                              return_value=await rv({"*": "registered"})) as patch_register:
+                with patch.object(cache._readings_storage, 'query',
+                                  return_value=await rv({"rows": [], "count": 0})):
+                    assert [] == await cache.get("unknown")
+        # A registration left by an earlier run is removed first, so that readings are not posted twice
+        patch_unregister.assert_called_once_with('*', CALLBACK_URL)
+        patch_register.assert_called_once_with('*', CALLBACK_URL)
+        assert cache.feed_active is True
+
+    async def test_feed_serves_latest_without_query(self, cache):
+        await self._activate(cache)
+        cache.update([
+            {"asset_code": "sinusoid", "reading": {"sinusoid": 0.5}, "user_ts": "2024-02-19 16:35:46.000002+00:00"},
+            {"asset_code": "sinusoid", "reading": {"sinusoid": 0.1}, "user_ts": "2024-02-19 16:35:46.000001+00:00"},
+            {"asset_code": "random", "reading": {"random": 7}, "user_ts": "2024-02-19 16:35:45.000000+00:00"},
+            {"asset_code": "no reading", "user_ts": "2024-02-19 16:35:45.000000+00:00"},
+            "garbage"
+        ])
+        with patch.object(cache._readings_storage, 'query') as patch_query:
+            assert [{"reading": {"sinusoid": 0.5}, "timestamp": "2024-02-19 16:35:46.000002"}] == \
+                   await cache.get("sinusoid")
+            assert {"sinusoid": "2024-02-19 16:35:46.000002", "random": "2024-02-19 16:35:45.000000"} == \
+                await cache.get_timestamps(["sinusoid", "random"])
+        patch_query.assert_not_called()
+        assert 3 == cache.hits
+
+    async def test_miss_is_read_from_storage_and_cached(self, cache):
+        await self._activate(cache)
+        row = {"reading": {"humidity": 60}, "timestamp": "2024-02-19 16:35:46.736123"}
+        with patch.object(cache._readings_storage, 'query',
+                          return_value=await rv({"rows": [row], "count": 1})) as patch_query:
+            assert [row] == await cache.get("humidity")
+            assert [row] == await cache.get("humidity")
+        patch_query.assert_called_once_with(
+            '{"return": ["reading", {"column": "user_ts", "alias": "timestamp", '
+            '"timezone": "utc"}], "where": {"column": "asset_code", '
+            '"condition": "=", "value": "humidity"}, "limit": 1, "sort": {"column": "user_ts", "direction": "desc"}}')
+        # An older reading from the feed does not replace the cached one
+        cache.update([{"asset_code": "humidity", "reading": {"humidity": 1}, "user_ts": "2024-02-19 16:35:40"}])
+        assert [row] == await cache.get("humidity")
+
+    async def test_stale_entry_is_refreshed(self, cache):
+        await self._activate(cache)
+        cache.update([{"asset_code": "sinusoid", "reading": {"sinusoid": 0.5}, "user_ts": "2024-02-19 16:35:46"}])
+        with patch.object(LatestReadings, 'FRESHNESS', 0):
+            with patch.object(cache._readings_storage, 'query',
+                              return_value=await rv({"rows": [], "count": 0})) as patch_query:
+                # Purged meanwhile
+                assert [] == await cache.get("sinusoid")
+            assert 1 == patch_query.call_count
+        assert "sinusoid" not in cache._entries
+
+    async def test_no_feed_always_reads_storage(self, cache):
+        row = {"reading": {"humidity": 60}, "timestamp": "2024-02-19 16:35:46.736123"}
+        with patch.object(cache._readings_storage, 'unregister_interest', side_effect=Exception("Not found")) \
+                as patch_unregister:
+            with patch.object(cache._readings_storage, 'query',
+                              return_value=await rv({"rows": [row], "count": 1})) as patch_query:
+                with patch.object(latest_readings._logger, 'warning') as patch_logger:
+                    assert [row] == await cache.get("humidity")
+                    assert [row] == await cache.get("humidity")
+                assert 1 == patch_logger.call_count
+            assert 2 == patch_query.call_count
+        # Registration is retried after RETRY_INTERVAL only
+        assert 1 == patch_unregister.call_count
+        assert cache.feed_active is False
+        cache.update([{"asset_code": "humidity", "reading": {"humidity": 1}, "user_ts": "2024-02-19 16:35:50"}])
+        # Feed updates are ignored until the feed is registered
+        assert row["timestamp"] == cache._entries["humidity"][0]
+
+    async def test_query_error(self, cache):
+        await self._activate(cache)
+        with patch.object(cache._readings_storage, 'query', return_value=await rv({"message": "bad payload"})):
+            with pytest.raises(ValueError) as excinfo:
+                await cache.get("humidity")
+        assert "bad payload" == str(excinfo.value)
+
+    async def test_invalidate_and_stop(self, cache):
+        await self._activate(cache)
+        cache.update([{"asset_code": "a", "reading": {"a": 1}, "user_ts": "2024-02-19 16:35:46"},
+                      {"asset_code": "b", "reading": {"b": 1}, "user_ts": "2024-02-19 16:35:46"}])
+        cache.invalidate("a")
+        assert ["b"] == list(cache._entries)
+        cache.invalidate()
+        assert {} == cache._entries
+        with patch.object(cache._readings_storage, 'unregister_interest',
+                          return_value=await rv({"*": "unregistered"})) as patch_unregister:
+            await cache.stop()
+            await cache.stop()
+        patch_unregister.assert_called_once_with('*', CALLBACK_URL)
+        assert cache.feed_active is False
+
+    async def test_feed_off(self):
+        cache = LatestReadings(MagicMock(ReadingsStorageClientAsync), CALLBACK_URL)
+        assert cache.enabled is False
+        row = {"reading": {"humidity": 60}, "timestamp": "2024-02-19 16:35:46.736123"}
+        with patch.object(cache._readings_storage, 'register_interest') as patch_register:
+            with patch.object(cache._readings_storage, 'query',
+                              return_value=await rv({"rows": [row], "count": 1})) as patch_query:
+                assert [row] == await cache.get("humidity")
+                assert [row] == await cache.get("humidity")
+            assert 2 == patch_query.call_count
+        patch_register.assert_not_called()
+        assert cache.feed_active is False
+
+    async def test_feed_of_queried_assets(self):
+        cache = LatestReadings(MagicMock(ReadingsStorageClientAsync), CALLBACK_URL, latest_readings.FEED_QUERIED_ASSETS)
+        assert cache.enabled is True
+        row = {"reading": {"humidity": 60}, "timestamp": "2024-02-19 16:35:46.736123"}
+        with patch.object(LatestReadings, 'MAX_ASSETS', 1):
+            with patch.object(cache._readings_storage, 'unregister_interest',
+                              return_value=await rv({"humidity": "unregistered"})) as patch_unregister:
+                with patch.object(cache._readings_storage, 'register_interest',
+                                  return_value=await rv({"humidity": "registered"})) as patch_register:
+                    with patch.object(cache._readings_storage, 'query',
+                                      return_value=await rv({"rows": [row], "count": 1})) as patch_query:
+                        assert [row] == await cache.get("humidity")
+                        assert [row] == await cache.get("humidity")
+                        # Beyond MAX_ASSETS assets are read from storage
+                        assert [row] == await cache.get("pressure")
+                        assert [row] == await cache.get("pressure")
+                    assert 3 == patch_query.call_count
+            patch_unregister.assert_called_once_with("humidity", CALLBACK_URL)
+            patch_register.assert_called_once_with("humidity", CALLBACK_URL)
+        # The asset index needs the feed of all assets
+        assert cache.feed_active is False
+        cache.update([{"asset_code": "humidity", "reading": {"humidity": 61}, "user_ts": "2024-02-19 16:35:50"},
+                      {"asset_code": "pressure", "reading": {"pressure": 1}, "user_ts": "2024-02-19 16:35:50"}])
+        assert [{"reading": {"humidity": 61}, "timestamp": "2024-02-19 16:35:50.000000"}] == await cache.get("humidity")
+        # Not in the feed, so the reading read from storage is kept
+        assert row["reading"] == cache._entries["pressure"][1]
+        with patch.object(cache._readings_storage, 'unregister_interest',
+                          return_value=await rv({"humidity": "unregistered"})) as patch_unregister:
+            await cache.stop()
+        patch_unregister.assert_called_once_with("humidity", CALLBACK_URL)
+
+    async def test_start_clears_stale_registration(self, cache):
+        with patch.object(cache._readings_storage, 'unregister_interest',
+                          return_value=await rv({"*": "unregistered"})) as patch_unregister:
+            await cache.start()
+        patch_unregister.assert_called_once_with('*', CALLBACK_URL)
+        with patch.object(cache._readings_storage, 'unregister_interest', side_effect=Exception("Not found")):
+            with patch.object(latest_readings._logger, 'warning') as patch_logger:
+                await cache.start()
+        assert 1 == patch_logger.call_count
+
+    @pytest.mark.parametrize("body, readings", [
+        ('{"readings": []}', []),
+        (json.dumps({"readings": [{"asset_code": "a"}]}), [{"asset_code": "a"}])
+    ])
+    def test_parse_feed(self, body, readings):
+        assert readings == LatestReadings.parse_feed(body)
+
+    @pytest.mark.parametrize("body", ['{"reading": []}', '[]', '{"readings": {}}', 'blah'])
+    def test_bad_parse_feed(self, body):
+        with pytest.raises(ValueError):
+            LatestReadings.parse_feed(body)
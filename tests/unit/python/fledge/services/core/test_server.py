@@ -17,9 +17,12 @@ from multidict import CIMultiDict
 import pytest
 import sys
 
+from fledge.common import startup_profiler
 from fledge.services.common.microservice_management import routes as management_routes
 from fledge.services.core import server
 from fledge.services.core.server import Server
+from fledge.services.core.asset_index import AssetIndex
+from fledge.services.core.latest_readings import LatestReadings
 from fledge.common.web import middleware
 from fledge.services.core.interest_registry.interest_registry import InterestRegistry
 from fledge.services.core.interest_registry.interest_record import InterestRecord
@@ -731,6 +734,44 @@ class TestServer:
         assert 'uptime' in json_response
         assert 0.0 < json_response["uptime"]
 
+    async def test_get_startup_profile(self, client):
+        with patch.object(startup_profiler, '_profiler', None):
+            resp = await client.get('/fledge/service/profile')
+            assert 404 == resp.status
+            assert "Startup profiling is not enabled, set FLEDGE_STARTUP_PROFILE to enable it" == resp.reason
+        profiler = startup_profiler.StartupProfiler("core")
+        profiler.mark("storage")
+        with patch.object(startup_profiler, '_profiler', profiler):
+            resp = await client.get('/fledge/service/profile')
+            assert 200 == resp.status
+            profile = json.loads(await resp.text())
+        assert "core" == profile["name"]
+        assert ["storage"] == [p["name"] for p in profile["phases"]]
+
+    async def test_readings_feed(self, client):
+        readings = [{"asset_code": "sinusoid", "reading": {"sinusoid": 0.5}, "user_ts": "2024-02-19 16:35:46+00:00"}]
+        with patch.object(Server, '_latest_readings', None):
+            resp = await client.post('/fledge/readings/feed', data=json.dumps({"readings": readings}))
+            assert 200 == resp.status
+            assert {"readings": 0} == json.loads(await resp.text())
+        latest = MagicMock(LatestReadings)
+        index = MagicMock(AssetIndex)
+        with patch.object(Server, '_latest_readings', latest):
+            with patch.object(Server, '_asset_index', index):
+                resp = await client.post('/fledge/readings/feed', data=json.dumps({"readings": readings}))
+                assert 200 == resp.status
+                assert {"readings": 1} == json.loads(await resp.text())
+                resp = await client.post('/fledge/readings/feed', data='{"rows": []}')
+                assert 400 == resp.status
+                assert "readings list is missing from the payload" == resp.reason
+                # Left posting by a core with the feed enabled, not parsed
+                latest.enabled = False
+                resp = await client.post('/fledge/readings/feed', data='{"rows": []}')
+                assert 200 == resp.status
+                assert {"readings": 0} == json.loads(await resp.text())
+        latest.update.assert_called_once_with(readings)
+        index.update.assert_called_once_with(readings)
+
     @pytest.mark.asyncio
     async def test_shutdown(self, mocker):
         async def return_async_value(val):
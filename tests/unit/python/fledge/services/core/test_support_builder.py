@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Test fledge/services/core/support.py"""
+
+import asyncio
+import datetime
+import os
+import tarfile
+import threading
+from unittest.mock import MagicMock, patch
+import pytest
+
+from fledge.common.job_manager import Job, JobCancelled
+from fledge.services.core import server  # imported first, the builder imports the core server
+from fledge.services.core import support
+from fledge.services.core.support import SupportBuilder, _SerialTarFile
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+@pytest.fixture
+def builder(tmpdir):
+    with patch.object(support, 'get_storage_async'):
+        return SupportBuilder(str(tmpdir))
+
+
+class TestSupportBuilder:
+
+    def test_add_syslog(self, builder, tmpdir):
+        syslog = tmpdir.join('syslog')
+        syslog.write_binary(b'\n'.join([
+            b'Jan 1 host Fledge[10]: INFO: core',
+            b'Jan 1 host Fledge Storage[11]: INFO: storage',
+            b'Jan 1 host Fledge Sine[12]: INFO: sine',
+            b'Jan 1 host Fledge Sine 2[13]: INFO: sine 2',
+            b'Jan 1 host kernel: \xff not fledge',
+            b'']))
+        pyz = MagicMock()
+        with patch.object(support, '_SYSLOG_FILE', str(syslog)):
+            builder.add_syslog(pyz, 'spec', ['Sine', 'Sine 2', 'Sine'])
+        assert ['logs/sys/syslog-spec', 'logs/sys/syslogStorage-spec', 'logs/sys/syslog-Sine-spec',
+                'logs/sys/syslog-Sine-2-spec'] == [c[1]['arcname'] for c in pyz.add.call_args_list]
+        assert 4 == len(tmpdir.join('syslog-spec').readlines())
+        assert ['Jan 1 host Fledge Storage[11]: INFO: storage\n'] == tmpdir.join('syslogStorage-spec').readlines()
+        assert ['Jan 1 host Fledge Sine[12]: INFO: sine\n'] == tmpdir.join('syslog-Sine-spec').readlines()
+        assert ['Jan 1 host Fledge Sine 2[13]: INFO: sine 2\n'] == tmpdir.join('syslog-Sine-2-spec').readlines()
+
+    def test_add_syslog_without_syslog(self, builder, tmpdir):
+        pyz = MagicMock()
+        with patch.object(support, '_SYSLOG_FILE', str(tmpdir.join('blah'))):
+            with patch.object(support._LOGGER, 'warning') as patch_logger:
+                builder.add_syslog(pyz, 'spec', [])
+        patch_logger.assert_called_once()
+        assert 2 == pyz.add.call_count
+        assert '' == tmpdir.join('syslog-spec').read()
+
+    @pytest.mark.parametrize("compression, extension", [
+        ('gz', '.tar.gz'), ('bz2', '.tar.bz2'), ('xz', '.tar.xz'), ('none', '.tar')])
+    def test_compression(self, tmpdir, compression, extension):
+        with patch.object(support, 'get_storage_async'):
+            builder = SupportBuilder(str(tmpdir), compression, 1)
+        name = builder.bundle_name()
+        assert name.endswith(extension) and name == builder.bundle_name()
+        tmpdir.join('member').write('data')
+        pyz = _SerialTarFile(builder._open_tar(name))
+        pyz.add(str(tmpdir.join('member')), arcname='member')
+        pyz.close()
+        with tarfile.open(name) as tar:
+            assert ['member'] == tar.getnames()
+
+    def test_bundle_name_unique(self, tmpdir):
+        with patch.object(support, 'get_storage_async'):
+            builders = [SupportBuilder(str(tmpdir)) for _ in range(3)]
+        tmpdir.join('support-240301-10-15-30-2.tar.gz').write('')
+        now = datetime.datetime(2024, 3, 1, 10, 15, 30)
+        with patch.object(support.datetime, 'datetime') as patch_datetime:
+            patch_datetime.utcnow.return_value = now
+            for b in builders:
+                b.register(None)
+        names = [b.bundle_name().split('/')[-1] for b in builders]
+        for name in names:
+            SupportBuilder._building.pop(name)
+        # named after the bundles being built and the bundle already there, in the same second
+        assert ['support-240301-10-15-30.tar.gz', 'support-240301-10-15-30-3.tar.gz',
+                'support-240301-10-15-30-4.tar.gz'] == names
+
+    async def test_build_interim_files_apart(self, builder, tmpdir):
+        tmpdir.join('interim-of-another-build').write('')
+        interim = []
+
+        async def no_info(pyz):
+            pass
+
+        async def no_sources():
+            return [], []
+
+        async def collect(collectors):
+            for c in collectors:
+                c.close()
+            interim.append(builder._interim_file_path)
+            with open(builder._interim_file_path + '/fledge-info', 'w') as f:
+                f.write('info')
+
+        with patch.object(builder, 'add_fledge_version_and_schema', side_effect=no_info), \
+                patch.object(builder, '_get_log_sources', side_effect=no_sources), \
+                patch.object(builder, '_collect', side_effect=collect):
+            name = await builder.build()
+        assert str(tmpdir) != interim[0]
+        assert not os.path.exists(interim[0])
+        assert sorted(['interim-of-another-build', name.split('/')[-1]]) == sorted(f.basename for f in tmpdir.listdir())
+        assert not SupportBuilder.is_building(name)
+
+    def test_register(self, builder):
+        job = MagicMock(done=False)
+        builder.register(job)
+        name = builder.bundle_name().split('/')[-1]
+        assert SupportBuilder.is_building(name)
+        # cancelled while queued, the build never runs to forget it
+        job.done = True
+        assert not SupportBuilder.is_building(name)
+        assert name not in SupportBuilder._building
+
+    async def test_collect(self, builder):
+        started = []
+        release = threading.Event()
+        job = Job("Support bundle", None)
+
+        def collector(n):
+            started.append(n)
+            # all collectors run at the same time
+            release.wait(1) if len(started) < 3 else release.set()
+            return n
+
+        async def failing():
+            raise ValueError("blah")
+
+        builder._job = job
+        builder._executor = support.ThreadPoolExecutor(max_workers=support._MAX_COLLECTORS)
+        try:
+            await builder._collect([builder._blocking(collector, n) for n in range(3)])
+            assert [0, 1, 2] == sorted(started)
+            assert 95 == job.progress
+            with pytest.raises(ValueError):
+                await builder._collect([failing(), builder._blocking(collector, 3)])
+            job._cancel_requested.set()
+            with pytest.raises(JobCancelled):
+                await builder._collect([failing(), builder._blocking(collector, 4)])
+            assert 4 not in started
+        finally:
+            builder._executor.shutdown()
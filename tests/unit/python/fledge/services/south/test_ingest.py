@@ -191,11 +191,18 @@ class TestIngest:
 
         class mock_stat:
             def __init__(self):
-                pass
+                self.started = False
+                self.stopped = False
 
-            async def register(self, key, desc):
+            async def register_many(self, keys):
                 return None
 
+            def start(self):
+                self.started = True
+
+            async def stop(self):
+                self.stopped = True
+
         async def mock_create(storage):
             return mock_stat()
 
@@ -227,6 +234,7 @@ class TestIngest:
         # THEN
         assert 1 == create_cfg.call_count
         assert 1 == get_cfg.call_count
+        assert Ingest.stats.started is True
         assert Ingest._stop is False
         assert Ingest._started is True
         assert Ingest._readings_list_size == int(Ingest._readings_buffer_size / (
@@ -243,11 +251,18 @@ class TestIngest:
 
         class mock_stat:
             def __init__(self):
-                pass
+                self.started = False
+                self.stopped = False
 
-            async def register(self, key, desc):
+            async def register_many(self, keys):
                 return None
 
+            def start(self):
+                self.started = True
+
+            async def stop(self):
+                self.stopped = True
+
         async def mock_create(storage):
             return mock_stat()
 
@@ -289,6 +304,7 @@ class TestIngest:
         assert Ingest._readings_list_batch_size_reached is None
         assert Ingest._readings_list_not_empty is None
         assert Ingest._readings_lists_not_full is None
+        assert Ingest.stats.stopped is True
         assert 0 == log_exception.call_count
 
     @pytest.mark.asyncio
@@ -305,10 +321,25 @@ class TestIngest:
     async def test__insert_readings(self, mocker):
         pass
 
-    @pytest.mark.skip(reason="This method uses a while True loop. Investigate as to how to write unit test for an infinite loop.")
     @pytest.mark.asyncio
     async def test_write_statistics(self, mocker):
-        pass
+        # GIVEN
+        Ingest.stats = MagicMock()
+        Ingest._readings_stats = 3
+        Ingest._discarded_readings_stats = 1
+        Ingest._sensor_stats = {'PUMP1': 2, 'PUMP2': 1}
+
+        # WHEN
+        Ingest._write_statistics()
+
+        # THEN
+        Ingest.stats.add.assert_has_calls([
+            call('READINGS', 3), call('DISCARDED', 1),
+            call('PUMP1', 2, 'Readings received by Fledge since startup for sensor PUMP1'),
+            call('PUMP2', 1, 'Readings received by Fledge since startup for sensor PUMP2')])
+        assert 0 == Ingest._readings_stats
+        assert 0 == Ingest._discarded_readings_stats
+        assert {} == Ingest._sensor_stats
 
     @pytest.mark.asyncio
     async def test_is_available_at_start(self, mocker):
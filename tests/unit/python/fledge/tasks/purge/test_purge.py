@@ -67,12 +67,12 @@ class TestPurge:
         
         with patch.object(FledgeProcess, '__init__'):
             with patch.object(Statistics, '_load_keys', return_value=_rv):
-                with patch.object(Statistics, 'update', return_value=_rv) as mock_stats_update:
+                with patch.object(Statistics, 'update_bulk', return_value=_rv) as mock_stats_update:
                     with patch.object(mock_audit_logger, "__init__", return_value=None):
                         p = Purge()
                         p._storage_async = mock_storage_client_async
                         await p.write_statistics(1, 2)
-                mock_stats_update.assert_has_calls([call('PURGED', 1), call('UNSNPURGED', 2)])
+                mock_stats_update.assert_called_once_with({'PURGED': 1, 'UNSNPURGED': 2})
 
     async def test_set_configuration(self):
         """Test that purge's set_configuration returns configuration item with key 'PURGE_READ' """
@@ -95,7 +95,7 @@ class TestPurge:
                     mock_create_child_cat.assert_called_once_with('Utilities', ['PURGE_READ'])
                 args, _ = mock_create_cat.call_args
                 assert 4 == len(args)
-                assert 5 == len(args[1].keys())
+                assert 9 == len(args[1].keys())
                 assert 'PURGE_READ' == args[0]
                 assert 'Purge the readings, log, statistics history table' == args[2]
                 assert args[3] is True
@@ -341,14 +341,40 @@ class TestPurge:
                         with patch.object(p, 'write_statistics', return_value=_rv3) as mock_write_stats:
                             with patch.object(p, 'purge_stats_history', return_value=_rv3) as mock_purge_stats_history:
                                 with patch.object(p, 'purge_audit_trail_log', return_value=_rv3) as mock_purge_audit:
-                                    await p.run()
-                                    # Test the positive case when no error in try block
+                                    with patch.object(p, 'purge_monitors', return_value=_rv3) as mock_purge_monitors:
+                                        with patch.object(p, 'purge_rollups', return_value=_rv3) as mock_purge_rollups:
+                                            await p.run()
+                                            # Test the positive case when no error in try block
+                                        mock_purge_rollups.assert_called_once_with("Some config")
+                                    mock_purge_monitors.assert_called_once_with("Some config")
                                 mock_purge_audit.assert_called_once_with("Some config")
                             mock_purge_stats_history.assert_called_once_with("Some config")
                         mock_write_stats.assert_called_once_with(1, 2)
                     mock_purge_data.assert_called_once_with("Some config")
                 mock_set_config.assert_called_once_with()
 
+    async def test_purge_rollups(self):
+        """Test that the asset rollups of each granularity are purged as per their retain config item"""
+        mock_storage_client_async = MagicMock(spec=StorageClientAsync)
+        mock_audit_logger = AuditLogger(mock_storage_client_async)
+        config = {"retainRollupSeconds": {"value": "24"}, "retainRollupMinutes": {"value": "7"},
+                  "retainRollupHours": {"value": "365"}}
+        _rv = await mock_value({"response": "deleted", "rows_affected": 1}) if sys.version_info.major == 3 and \
+            sys.version_info.minor >= 8 else asyncio.ensure_future(mock_value({"response": "deleted"}))
+        with patch.object(FledgeProcess, '__init__'):
+            with patch.object(mock_audit_logger, "__init__", return_value=None):
+                p = Purge()
+                p._storage_async = MagicMock(spec=StorageClientAsync)
+                with patch('time.time', return_value=86400 * 400):
+                    with patch.object(p._storage_async, "delete_from_tbl", return_value=_rv) as patch_delete:
+                        await p.purge_rollups(config)
+                assert 3 == patch_delete.call_count
+                calls = [(c[0][0], json.loads(c[0][1])) for c in patch_delete.call_args_list]
+                assert [("asset_rollups", 1, "1971-02-04 00:00:00+00:00"),
+                        ("asset_rollups", 60, "1971-01-29 00:00:00+00:00"),
+                        ("asset_rollups", 3600, "1970-02-05 00:00:00+00:00")] == [
+                    (table, payload["where"]["value"], payload["where"]["and"]["value"]) for table, payload in calls]
+
     async def test_run_exception(self, event_loop):
         """Test that run calls all units of purge process and checks the exception handling"""
 
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# FLEDGE_BEGIN
+# See: http://fledge-iot.readthedocs.io/
+# FLEDGE_END
+
+"""Test tasks/rollup/rollup.py"""
+
+import asyncio
+import json
+import sys
+from unittest.mock import patch, MagicMock
+import pytest
+
+from fledge.common.logger import FLCoreLogger
+from fledge.common.process import FledgeProcess
+from fledge.common.storage_client.storage_client import StorageClientAsync, ReadingsStorageClientAsync
+from fledge.tasks.rollup.rollup import AssetRollup
+
+__author__ = "Dianomic Systems"
+__copyright__ = "Copyright (c) 2026 Dianomic Systems Inc."
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def mock_coro(*args):
+    return None if len(args) == 0 else args[0]
+
+
+def _reading(_id, ts, value):
+    return {"id": _id, "asset_code": "sinusoid", "reading": {"sinusoid": value},
+            "user_ts": "2024-03-01 10:15:{:02d}.000000+00:00".format(ts), "ts": "2024-03-01 10:15:59.000000+00:00"}
+
+
+@pytest.fixture
+def rollup():
+    with patch.object(FledgeProcess, '__init__'):
+        with patch.object(FLCoreLogger, "get_logger"):
+            _rollup = AssetRollup()
+    _rollup._storage_async = MagicMock(spec=StorageClientAsync)
+    _rollup._readings_storage_async = MagicMock(spec=ReadingsStorageClientAsync)
+    _rollup._dryrun = False
+    return _rollup
+
+
+class TestAssetRollup:
+
+    async def test_init(self):
+        with patch.object(FledgeProcess, "__init__") as mock_process:
+            with patch.object(FLCoreLogger, "get_logger") as log:
+                ar = AssetRollup()
+                assert isinstance(ar, AssetRollup)
+            log.assert_called_once_with("AssetRollup")
+        mock_process.assert_called_once_with()
+
+    @pytest.mark.parametrize("rows, position, expected", [
+        ([{"max_last_id": ""}], [{"last_id": 0}], 0),
+        ([{"max_last_id": 1234}], [{"last_id": 0}], 1234),
+        ([{"max_last_id": 1234}], [{"last_id": 5000}], 5000),
+        ([{"max_last_id": 1234}], [{"last_id": 1000}], 1234),
+        ([], [], 0)
+    ])
+    async def test_last_rolled_up_id(self, rollup, rows, position, expected):
+        async def query(table, payload):
+            results = rows if table == 'asset_rollups' else position
+            return {"rows": results, "count": len(results)}
+
+        with patch.object(rollup._storage_async, 'query_tbl_with_payload', side_effect=query) as patch_query:
+            assert expected == await rollup.last_rolled_up_id()
+        assert 2 == patch_query.call_count
+        args = [c[0] for c in patch_query.call_args_list]
+        assert ('asset_rollups', '{"aggregate": {"operation": "max", "column": "last_id"}}') == args[0]
+        assert ('asset_rollups_position', '{"return": ["last_id"], "where": {"column": "id", "condition": "=", '
+                                          '"value": 1}}') == args[1]
+
+    async def test_save_position(self, rollup):
+        _rv = await mock_coro({"response": "updated", "rows_affected": 1}) if sys.version_info >= (3, 8) else \
+            asyncio.ensure_future(mock_coro({"response": "updated", "rows_affected": 1}))
+        with patch.object(rollup._storage_async, 'update_tbl', return_value=_rv) as patch_update:
+            await rollup.save_position(42)
+        patch_update.assert_called_once_with(
+            'asset_rollups_position', '{"values": {"last_id": 42}, "where": {"column": "id", "condition": "=", '
+                                      '"value": 1}}')
+
+    async def test_rollup_block(self, rollup):
+        _rv = await mock_coro({"response": "inserted", "rows_affected": 3}) if sys.version_info >= (3, 8) else \
+            asyncio.ensure_future(mock_coro({"response": "inserted", "rows_affected": 3}))
+        with patch.object(rollup._storage_async, 'insert_into_tbl', return_value=_rv) as patch_insert:
+            assert 4 == await rollup.rollup_block([_reading(7, 1, 1.0), _reading(8, 1, 3.0), _reading(9, 2, 2.0)])
+        args, _ = patch_insert.call_args
+        assert 'asset_rollups' == args[0]
+        rows = sorted(json.loads(args[1])['inserts'], key=lambda r: (r['granularity'], r['ts']))
+        assert [(1, "2024-03-01 10:15:01+00:00", 1.0, 3.0, 4.0, 2, 8),
+                (1, "2024-03-01 10:15:02+00:00", 2.0, 2.0, 2.0, 1, 9),
+                (60, "2024-03-01 10:15:00+00:00", 1.0, 3.0, 6.0, 3, 9),
+                (3600, "2024-03-01 10:00:00+00:00", 1.0, 3.0, 6.0, 3, 9)] == [
+            (r['granularity'], r['ts'], r['minimum'], r['maximum'], r['total'], r['samples'], r['last_id'])
+            for r in rows]
+
+    async def test_rollup_block_without_numeric_datapoints(self, rollup):
+        reading = _reading(1, 1, "text")
+        with patch.object(rollup._storage_async, 'insert_into_tbl') as patch_insert:
+            assert 0 == await rollup.rollup_block([reading])
+        patch_insert.assert_not_called()
+
+    async def test_run(self, rollup):
+        blocks = [{"rows": [_reading(11, 1, 1.0), _reading(12, 2, 2.0)]}, {"rows": [_reading(13, 3, 3.0)]},
+                  {"rows": []}]
+        fetched = []
+
+        async def fetch(reading_id, count):
+            fetched.append((reading_id, count))
+            return blocks[len(fetched) - 1]
+
+        async def last_rolled_up_id():
+            return 10
+
+        async def rollup_block(readings):
+            return len(readings)
+
+        with patch.object(AssetRollup, 'BLOCK_SIZE', 2):
+            with patch.object(rollup._readings_storage_async, 'fetch', side_effect=fetch):
+                with patch.object(rollup, 'last_rolled_up_id', side_effect=last_rolled_up_id):
+                    with patch.object(rollup, 'rollup_block', side_effect=rollup_block) as patch_block:
+                        with patch.object(rollup, 'save_position', side_effect=mock_coro) as patch_save:
+                            await rollup.run()
+        # a short block is the last one
+        assert [(11, 2), (13, 2)] == fetched
+        assert 2 == patch_block.call_count
+        patch_save.assert_called_once_with(13)
+        rollup._logger.warning.assert_not_called()
+
+    async def test_run_stops_at_max_readings(self, rollup):
+        fetched = []
+
+        async def fetch(reading_id, count):
+            fetched.append(reading_id)
+            # Readings without numeric datapoints, the position moves on all the same
+            return {"rows": [_reading(reading_id + i, 1, "text") for i in range(count)]}
+
+        async def last_rolled_up_id():
+            return 0
+
+        with patch.object(AssetRollup, 'BLOCK_SIZE', 2):
+            with patch.object(AssetRollup, 'MAX_READINGS', 4):
+                with patch.object(rollup._readings_storage_async, 'fetch', side_effect=fetch):
+                    with patch.object(rollup, 'last_rolled_up_id', side_effect=last_rolled_up_id):
+                        with patch.object(rollup._storage_async, 'insert_into_tbl') as patch_insert:
+                            with patch.object(rollup, 'save_position', side_effect=mock_coro) as patch_save:
+                                await rollup.run()
+        assert [1, 3] == fetched
+        patch_insert.assert_not_called()
+        patch_save.assert_called_once_with(4)
+        rollup._logger.warning.assert_called_once_with(
+            "Stopped after the maximum of 4 readings in a run, any readings after id 4 are left to the next runs")
+
+    async def test_run_nothing_new(self, rollup):
+        async def fetch(reading_id, count):
+            return {"rows": []}
+
+        async def last_rolled_up_id():
+            return 10
+
+        with patch.object(rollup._readings_storage_async, 'fetch', side_effect=fetch):
+            with patch.object(rollup, 'last_rolled_up_id', side_effect=last_rolled_up_id):
+                with patch.object(rollup, 'save_position') as patch_save:
+                    await rollup.run()
+        patch_save.assert_not_called()
+
+    async def test_run_exception(self, rollup):
+        async def last_rolled_up_id():
+            raise RuntimeError("storage is down")
+
+        with patch.object(rollup, 'last_rolled_up_id', side_effect=last_rolled_up_id):
+            await rollup.run()
+        assert 1 == rollup._logger.exception.call_count
@@ -12,9 +12,10 @@ import pytest
 import sys
 
 import ast
+import json
 from fledge.common.logger import FLCoreLogger
 from fledge.common.process import FledgeProcess
-from fledge.tasks.statistics.statistics_history import StatisticsHistory
+from fledge.tasks.statistics.statistics_history import StatisticsHistory, StatisticsHistoryCollector
 from fledge.common.storage_client.storage_client import StorageClientAsync
 
 __author__ = "Vaibhav Singhal"
@@ -52,19 +53,16 @@ class TestStatisticsHistory:
             _rv = await mock_coro(None)
         else:
             _rv = asyncio.ensure_future(mock_coro(None))
-        
-        with patch.object(FledgeProcess, '__init__'):
-            with patch.object(FLCoreLogger, "get_logger"):
-                sh = StatisticsHistory()
-                sh._storage_async = MagicMock(spec=StorageClientAsync)
-                payload = {'updates': [{'where': {'value': 'Bla', 'condition': '=', 'column': 'key'}, 'values': {'previous_value': 1}}]}
-                with patch.object(sh._storage_async, "update_tbl", return_value=_rv) as patch_storage:
-                    await sh._bulk_update_previous_value(payload)
-                args, kwargs = patch_storage.call_args
-                assert "statistics" == args[0]
-                payload = ast.literal_eval(args[1])
-                assert "Bla" == payload["updates"][0]["where"]["value"]
-                assert 1 == payload["updates"][0]["values"]["previous_value"]
+
+        collector = StatisticsHistoryCollector(MagicMock(spec=StorageClientAsync))
+        payload = {'updates': [{'where': {'value': 'Bla', 'condition': '=', 'column': 'key'}, 'values': {'previous_value': 1}}]}
+        with patch.object(collector._storage, "update_tbl", return_value=_rv) as patch_storage:
+            await collector._bulk_update_previous_value(payload)
+        args, kwargs = patch_storage.call_args
+        assert "statistics" == args[0]
+        payload = ast.literal_eval(args[1])
+        assert "Bla" == payload["updates"][0]["where"]["value"]
+        assert 1 == payload["updates"][0]["values"]["previous_value"]
 
     async def test_run(self):
         with patch.object(FledgeProcess, '__init__'):
@@ -89,9 +87,57 @@ class TestStatisticsHistory:
                     _rv2 = asyncio.ensure_future(mock_coro(None))
 
                 with patch.object(sh._storage_async, "query_tbl", return_value=_rv1) as mock_keys:
-                    with patch.object(sh, "_bulk_update_previous_value", return_value=_rv2) as mock_update:
+                    with patch.object(sh._storage_async, "update_tbl", return_value=_rv2) as mock_update:
                         with patch.object(sh._storage_async, "insert_into_tbl", return_value=_rv2) as mock_bulk_insert:
                             await sh.run()
                     assert 1 == mock_bulk_insert.call_count
-                    assert 1 == mock_update.call_count
+                    # no key changed
+                    assert 0 == mock_update.call_count
                 mock_keys.assert_called_once_with('statistics')
+
+
+class TestStatisticsHistoryCollector:
+
+    @staticmethod
+    def _rows(readings, purged):
+        return {'count': 2, 'rows': [{'key': 'READINGS', 'value': readings[0], 'previous_value': readings[1]},
+                                     {'key': 'PURGED', 'value': purged[0], 'previous_value': purged[1]}]}
+
+    async def test_collect(self):
+        snapshots = [self._rows((10, 0), (0, 0)), self._rows((10, 10), (0, 0)), self._rows((10, 10), (0, 0)),
+                     self._rows((15, 10), (0, 0))]
+        inserts = []
+        updates = []
+
+        async def query_tbl(table):
+            return snapshots.pop(0)
+
+        async def insert_into_tbl(table, payload):
+            assert "statistics_history" == table
+            inserts.append([(r['key'], r['value'], r['history_ts']) for r in json.loads(payload)['inserts']])
+
+        async def update_tbl(table, payload):
+            assert "statistics" == table
+            updates.append([(u['where']['value'], u['values']['previous_value']) for u in json.loads(payload)['updates']])
+
+        storage = MagicMock(spec=StorageClientAsync)
+        collector = StatisticsHistoryCollector(storage)
+        with patch.object(storage, "query_tbl", side_effect=query_tbl):
+            with patch.object(storage, "insert_into_tbl", side_effect=insert_into_tbl):
+                with patch.object(storage, "update_tbl", side_effect=update_tbl):
+                    with patch("fledge.common.utils.local_timestamp", side_effect=["t1", "t2", "t3", "t4"]):
+                        for _ in range(4):
+                            await collector.collect()
+                    assert {"PURGED": "t4"} == collector._idle
+                    await collector.flush()
+
+        # only the changed key gets its previous_value updated
+        assert [[("READINGS", 10)], [("READINGS", 15)]] == updates
+        # a run of zeros is written at its first collection and at its last one, once the key changes or the
+        # collector is flushed; a collection in which no key changed ends the runs there
+        assert [[("READINGS", 10, "t1"), ("PURGED", 0, "t1")],
+                [("READINGS", 0, "t2")],
+                [("READINGS", 0, "t3"), ("PURGED", 0, "t3")],
+                [("READINGS", 5, "t4")],
+                [("PURGED", 0, "t4")]] == inserts
+        assert {"PURGED": None} == collector._idle